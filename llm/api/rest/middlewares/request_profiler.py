@@ -0,0 +1,47 @@
+"""
+Per-request timing breakdown middleware for the API.
+Reports where a request spent its time when the client asks for it.
+"""
+from fastapi import Request
+from typing import Callable
+import json
+
+from orchestration.monitoring.profiling import start_request_profile, end_request_profile
+
+# Request header that enables the timing breakdown
+DEBUG_TIMING_HEADER = "X-Debug-Timing"
+
+class RequestProfiler:
+    """
+    Middleware that attaches a hot path timing breakdown to responses.
+
+    When the request carries a truthy ``X-Debug-Timing`` header, the time
+    spent in profiled sections (parse, simplify, render, LLM calls, ...) is
+    returned in a standard ``Server-Timing`` header and as JSON in
+    ``X-Timing-Breakdown``. Other requests are passed through untouched.
+    """
+    
+    async def __call__(self, request: Request, call_next: Callable):
+        """
+        Process the request, collecting a timing breakdown if requested.
+        
+        Args:
+            request: The incoming request
+            call_next: The next middleware or endpoint handler
+            
+        Returns:
+            Response: The endpoint response, with timing headers if requested
+        """
+        flag = request.headers.get(DEBUG_TIMING_HEADER, "").lower()
+        if flag in ("", "0", "false", "no"):
+            return await call_next(request)
+        
+        profile, token = start_request_profile()
+        try:
+            response = await call_next(request)
+        finally:
+            end_request_profile(token)
+        
+        response.headers["Server-Timing"] = profile.server_timing()
+        response.headers["X-Timing-Breakdown"] = json.dumps(profile.to_dict())
+        return response
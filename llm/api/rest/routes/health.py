@@ -13,6 +13,7 @@ from datetime import datetime, timedelta
 from math_llm_system.orchestration.agents.registry import AgentRegistry
 from math_llm_system.orchestration.message_bus.rabbitmq_wrapper import RabbitMQBus
 from math_llm_system.database.access.mongodb_wrapper import MongoDBWrapper
+from math_llm_system.database.access.connection_pool import run_in_db_executor
 from math_llm_system.core.mistral.inference import MistralInference
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -144,7 +145,7 @@ async def database_health(mongodb: MongoDBWrapper = Depends(get_mongodb)):
                 "error": str(e)
             }
     
-    result = get_cached_or_compute("database_health", check_database)
+    result = await run_in_db_executor(get_cached_or_compute, "database_health", check_database)
     
     if result["status"] != "connected":
         raise HTTPException(
@@ -12,6 +12,8 @@ import uuid
 import os
 from datetime import datetime
 from core.agent.llm_agent import CoreLLMAgent
+from orchestration.agents.registry import get_agent_registry
+from database.access.connection_pool import AsyncRepository
 
 logger = logging.getLogger(__name__)
 
@@ -62,13 +64,24 @@ async def get_orchestration_manager():
     
     return {"start_workflow": start_workflow}
 
+class TransientConversationRepository:
+    """Stand-in that only assigns IDs when MongoDB is not available."""
+    
+    async def create_conversation(self, user_id: str, title: Optional[str] = None) -> str:
+        return str(uuid.uuid4())
+    
+    async def add_interaction(self, conversation_id: str, user_input: Dict[str, Any],
+                              system_response: Dict[str, Any]) -> str:
+        return str(uuid.uuid4())
+
 async def get_conversation_repository():
     """Get the conversation repository instance."""
-    # Simple implementation that tracks conversations
-    return {
-        "create_conversation": lambda *args, **kwargs: str(uuid.uuid4()),
-        "add_interaction": lambda *args, **kwargs: str(uuid.uuid4())
-    }
+    # Registered at startup when MongoDB is reachable, with the shared
+    # query cache; calls run on the database thread pool
+    service_info = get_agent_registry().get_service_info("conversation_repository")
+    if service_info and "instance" in service_info:
+        return AsyncRepository(service_info["instance"])
+    return TransientConversationRepository()
 
 # Background task for processing math queries
 def process_math_query(workflow_id: str, query: str):
@@ -138,13 +151,13 @@ async def math_query(
         # Create conversation if needed
         conversation_id = request.conversation_id
         if not conversation_id:
-            conversation_id = conversation_repo["create_conversation"](
+            conversation_id = await conversation_repo.create_conversation(
                 user_id=request.user_id or "anonymous",
                 title=f"Conversation {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             )
         
         # Add user interaction
-        interaction_id = conversation_repo["add_interaction"](
+        interaction_id = await conversation_repo.add_interaction(
             conversation_id=conversation_id,
             user_input={"text": request.query, "type": "text"},
             system_response={"status": "processing"}
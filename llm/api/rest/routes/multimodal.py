@@ -20,10 +20,13 @@ from pydantic import BaseModel, Field
 from multimodal.unified_pipeline.content_router import ContentRouter
 from multimodal.unified_pipeline.input_processor import InputProcessor
 from multimodal.unified_pipeline.ambiguity_handler import AmbiguityHandler
+from multimodal.unified_pipeline.pdf_processor import get_pdf_processor, combine_page_results
+from multimodal.utils.pdf_utils import PYMUPDF_AVAILABLE
 from multimodal.context.context_manager import get_context_manager
 from orchestration.manager.orchestration_manager import get_orchestration_manager
 from multimodal.interaction.feedback_processor import FeedbackProcessor
 from multimodal.agent.input_agent import get_input_agent
+from api.websocket.multimodal_handler import send_processing_update
 
 # Initialize router
 router = APIRouter(
@@ -447,15 +450,87 @@ async def process_user_feedback(feedback_request: FeedbackRequest):
         raise HTTPException(status_code=500, detail=f"Error processing feedback: {str(e)}")
 
 
+async def process_pdf_task(session_id: str, file_name: str, pdf_content: bytes,
+                           conversation_id: Optional[str] = None,
+                           context_id: Optional[str] = None):
+    """
+    Background task processing a PDF and streaming page results over WebSocket.
+    
+    Once every page is processed, the combined result is added to the
+    context and starts the workflow, as other uploads do.
+    """
+    start_time = datetime.now()
+    pages = []
+    
+    try:
+        async for page in get_pdf_processor().stream_pages(pdf_content):
+            pages.append(page)
+            await send_processing_update(session_id, "pdf_page", page)
+    except Exception as e:
+        logger.error(f"Error processing PDF {file_name}: {str(e)}")
+        await send_processing_update(session_id, "pdf_error", {
+            "original_filename": file_name,
+            "error": str(e)
+        })
+        return
+    
+    processed_input = combine_page_results(pages)
+    processed_input["original_filename"] = file_name
+    
+    if processed_input["success"] and context_id:
+        entity_id = context_manager.add_entity_to_context(
+            context_id,
+            {
+                "type": "file",
+                "source": "api",
+                "file_name": file_name,
+                "mime_type": "application/pdf",
+                "processed_data": processed_input
+            },
+            "pdf"
+        )
+        if entity_id:
+            processed_input["entity_id"] = entity_id
+    
+    start_workflow = processed_input["success"] and conversation_id
+    if start_workflow:
+        processed_input["workflow_id"] = str(uuid.uuid4())
+    
+    processing_time = (datetime.now() - start_time).total_seconds() * 1000
+    await send_processing_update(session_id, "pdf_complete", {
+        "original_filename": file_name,
+        "page_count": len(pages),
+        "failed_pages": sorted(page["page"] for page in pages if not page.get("success", False)),
+        "cached_pages": sum(1 for page in pages if page.get("cached")),
+        "entity_id": processed_input.get("entity_id"),
+        "workflow_id": processed_input.get("workflow_id"),
+        "processing_time_ms": round(processing_time, 2)
+    })
+    
+    if start_workflow:
+        await start_workflow_task(
+            workflow_id=processed_input["workflow_id"],
+            workflow_type="multimodal_processing",
+            initial_data={
+                "processed_input": processed_input,
+                "conversation_id": conversation_id,
+                "context_id": context_id
+            }
+        )
+
+
 @router.post("/upload")
 async def upload_file(file: UploadFile, 
                      conversation_id: Optional[str] = Form(None),
                      context_id: Optional[str] = Form(None),
+                     session_id: Optional[str] = Form(None),
                      background_tasks: BackgroundTasks = None):
     """
     Upload a file for multimodal processing.
     
-    Alternative to the /input endpoint for direct file uploads.
+    Alternative to the /input endpoint for direct file uploads. PDFs are
+    processed in the background; subscribe to the session over WebSocket
+    (before uploading, to see the first pages) for per-page results.
     """
     start_time = datetime.now()
     
@@ -466,6 +541,28 @@ async def upload_file(file: UploadFile,
         # Get file type
         mime_type = file.content_type
         
+        if mime_type == "application/pdf":
+            if not PYMUPDF_AVAILABLE:
+                raise HTTPException(status_code=501, detail="PDF processing is not available")
+            
+            session_id = session_id or conversation_id or str(uuid.uuid4())
+            background_tasks.add_task(
+                process_pdf_task, session_id, file.filename, file_content,
+                conversation_id=conversation_id,
+                context_id=context_id
+            )
+            
+            processing_time = (datetime.now() - start_time).total_seconds() * 1000
+            return {
+                "success": True,
+                "input_type": "pdf",
+                "original_filename": file.filename,
+                "mime_type": mime_type,
+                "session_id": session_id,
+                "status": "processing",
+                "processing_time_ms": round(processing_time, 2)
+            }
+        
         # Save to temporary file for processing
         with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp:
             temp.write(file_content)
@@ -480,8 +577,6 @@ async def upload_file(file: UploadFile,
                 with open(temp_path, "r") as f:
                     text_content = f.read()
                 processed_input = input_processor.process_input(text_content, mime_type)
-            elif mime_type == "application/pdf":
-                processed_input = input_processor.process_input(temp_path, mime_type)
             else:
                 raise HTTPException(status_code=400, detail=f"Unsupported file type: {mime_type}")
                 
@@ -595,6 +690,8 @@ async def upload_file(file: UploadFile,
             if os.path.exists(temp_path):
                 os.remove(temp_path)
                 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing file upload: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing file upload: {str(e)}")
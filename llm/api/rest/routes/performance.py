@@ -2,9 +2,10 @@
 Performance monitoring and optimization endpoints.
 Provides API access to performance metrics, diagnostics, and optimization controls.
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import Dict, Any, List, Optional
+import asyncio
 import time
 import psutil
 import os
@@ -15,7 +16,11 @@ from math_llm_system.orchestration.performance.resource_manager import ResourceM
 from math_llm_system.math_processing.computation.computation_cache import ComputationCache
 from math_llm_system.database.optimization.query_optimizer import QueryOptimizer
 from math_llm_system.database.access.mongodb_wrapper import MongoDBWrapper
+from math_llm_system.database.access.connection_pool import run_in_db_executor
+from math_llm_system.database.cache.query_cache import get_query_cache
+from math_llm_system.database.optimization.index_advisor import get_index_advisor
 from math_llm_system.orchestration.monitoring.metrics import MetricsCollector
+from math_llm_system.orchestration.monitoring.profiling import SamplingProfiler, ProfilerBusyError
 
 router = APIRouter(prefix="/performance", tags=["performance"])
 
@@ -163,9 +168,16 @@ async def get_cache_statistics(
     cache_metrics = computation_cache.get_metrics()
     cache_health = computation_cache.get_health()
     
+    # Hit rates of the repository query cache, per collection
+    query_cache = get_query_cache()
+    
     return {
         "metrics": cache_metrics,
         "health": cache_health,
+        "query_cache": {
+            "entries": len(query_cache),
+            "collections": query_cache.stats()
+        },
         "status": "healthy" if cache_health["redis_available"] else "degraded"
     }
 
@@ -194,18 +206,24 @@ async def get_database_statistics(
     Get database performance statistics.
     Provides metrics on query performance, indexes, and optimization.
     """
-    # Get statistics for key collections
-    collection_stats = {}
-    client = mongodb.get_client()
-    db = client[mongodb.get_database_name()]
-    
-    for collection_name in ["conversations", "interactions", "expressions", "visualizations"]:
-        try:
-            collection = db[collection_name]
-            stats = query_optimizer.get_collection_statistics(collection)
-            collection_stats[collection_name] = stats
-        except Exception as e:
-            collection_stats[collection_name] = {"error": str(e)}
+    def collect_statistics():
+        # Get statistics for key collections
+        collection_stats = {}
+        client = mongodb.get_client()
+        db = client[mongodb.get_database_name()]
+        
+        for collection_name in ["conversations", "interactions", "expressions", "visualizations"]:
+            try:
+                collection = db[collection_name]
+                stats = query_optimizer.get_collection_statistics(collection)
+                collection_stats[collection_name] = stats
+            except Exception as e:
+                collection_stats[collection_name] = {"error": str(e)}
+        
+        return collection_stats
+    
+    # Database commands run on the database thread pool, off the event loop
+    collection_stats = await run_in_db_executor(collect_statistics)
     
     # Get optimization report
     optimization_report = query_optimizer.generate_optimization_report()
@@ -337,6 +355,70 @@ async def get_latency_metrics(
         "timestamp": time.time()
     }
 
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Check the admin token when MATH_LLM_ADMIN_TOKEN is configured."""
+    expected = os.environ.get("MATH_LLM_ADMIN_TOKEN")
+    if expected and x_admin_token != expected:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.get("/database/advisor", response_model=Dict[str, Any])
+async def get_index_advisor_report():
+    """
+    Get the index advisor's proposals and applied indexes.
+    Applied indexes include the latency of their query shape before and after.
+    """
+    advisor = get_index_advisor()
+    if advisor is None:
+        return {"enabled": False, "timestamp": time.time()}
+    
+    report = await run_in_db_executor(advisor.report)
+    return dict(report, enabled=True, timestamp=time.time())
+
+@router.post("/database/advisor/run", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def run_index_advisor():
+    """
+    Run the index advisor immediately instead of waiting for its next cycle.
+    """
+    advisor = get_index_advisor()
+    if advisor is None:
+        raise HTTPException(status_code=409, detail="Query sampling is disabled (MATH_LLM_QUERY_SAMPLE_RATE)")
+    
+    changes = await run_in_db_executor(advisor.run_once)
+    return {"changes": changes, "timestamp": time.time()}
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def capture_profile(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    include_idle: bool = False
+):
+    """
+    Run the sampling profiler on the live process.
+    Returns collapsed stacks for flame graph tools or a speedscope file.
+    
+    Args:
+        seconds: How long to sample for
+        interval_ms: Time between samples in milliseconds
+        format: Output format ("collapsed" or "speedscope")
+        include_idle: Keep samples of threads waiting for work
+    """
+    profiler = SamplingProfiler(interval=interval_ms / 1000, include_idle=include_idle)
+    
+    try:
+        # Sample from a worker thread so the event loop keeps serving requests
+        await asyncio.to_thread(profiler.run, seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if format == "speedscope":
+        return JSONResponse(
+            content=profiler.speedscope(),
+            headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'}
+        )
+    
+    return PlainTextResponse(profiler.collapsed())
+
 @router.post("/set-optimization-level", response_model=Dict[str, Any])
 async def set_optimization_level(
     optimizer: PerformanceOptimizer = Depends(get_performance_optimizer),
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Body, Form, Depends, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from typing import Dict, Any, List, Optional
 import os
 import json
@@ -10,6 +10,10 @@ from visualization.agent.viz_agent import VisualizationAgent
 from visualization.agent.advanced_viz_agent import AdvancedVisualizationAgent
 from visualization.selection.context_analyzer import VisualizationSelector
 from database.access.visualization_repository import VisualizationRepository
+from database.access.connection_pool import AsyncRepository
+from database.access.pagination import InvalidCursorError
+from database.access.write_behind import get_write_buffer
+from database.cache.query_cache import get_query_cache
 
 # Initialize router
 router = APIRouter(prefix="/visualization", tags=["visualization"])
@@ -26,7 +30,12 @@ base_config = {
 viz_agent = VisualizationAgent(base_config)
 advanced_viz_agent = AdvancedVisualizationAgent(base_config)
 viz_selector = VisualizationSelector()
-viz_repository = VisualizationRepository()
+# Repository calls run on the database thread pool, off the event loop;
+# inserts are written behind in batches and list queries are cached
+viz_repository = AsyncRepository(VisualizationRepository(
+    write_buffer=get_write_buffer(),
+    query_cache=get_query_cache()
+))
 
 # Add numpy type conversion function
 def convert_numpy_types(obj):
@@ -88,7 +97,7 @@ async def generate_visualization(
         # Add interaction ID if provided and storing to database
         if interaction_id and "file_path" in result and result.get("success", False):
             try:
-                viz_id = viz_repository.store_visualization(
+                viz_id = await viz_repository.store_visualization(
                     visualization_type=visualization_type,
                     parameters=parameters,
                     file_path=result["file_path"],
@@ -143,7 +152,7 @@ async def get_visualization_by_id(
     """Get a visualization by ID."""
     try:
         # Retrieve from database
-        visualization = viz_repository.get_visualization(visualization_id)
+        visualization = await viz_repository.get_visualization(visualization_id)
         
         if not visualization:
             raise HTTPException(status_code=404, detail="Visualization not found")
@@ -167,37 +176,72 @@ async def get_visualization_by_id(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve visualization: {str(e)}")
 
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated field list (None returns whole documents)."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
 @router.get("/by-interaction/{interaction_id}")
 async def get_visualizations_by_interaction(
-    interaction_id: str
+    interaction_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
-    """Get all visualizations for an interaction."""
+    """Get a page of visualizations for an interaction, newest first."""
     try:
         # Retrieve from database
-        visualizations = viz_repository.get_visualizations_by_interaction(interaction_id)
+        page = await viz_repository.get_visualizations_page(
+            interaction_id, limit=limit, cursor=cursor, fields=parse_fields(fields)
+        )
         
         return {
             "interaction_id": interaction_id,
-            "visualizations": visualizations,
-            "count": len(visualizations)
+            "visualizations": page["items"],
+            "count": len(page["items"]),
+            "next_cursor": page["next_cursor"]
         }
     
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve visualizations: {str(e)}")
 
 @router.get("/recent")
 async def get_recent_visualizations(
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
-    """Get recent visualizations."""
+    """Get a page of recent visualizations."""
     try:
         # Retrieve from database
-        visualizations = viz_repository.get_recent_visualizations(limit)
+        page = await viz_repository.get_visualizations_page(
+            limit=limit, cursor=cursor, fields=parse_fields(fields)
+        )
         
         return {
-            "visualizations": visualizations,
-            "count": len(visualizations)
+            "visualizations": page["items"],
+            "count": len(page["items"]),
+            "next_cursor": page["next_cursor"]
         }
     
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve recent visualizations: {str(e)}")
+
+@router.get("/export")
+async def export_visualizations(
+    interaction_id: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    """Stream visualizations as newline-delimited JSON, newest first."""
+    async def lines():
+        async for visualization in viz_repository.stream_visualizations(
+            interaction_id, fields=parse_fields(fields)
+        ):
+            yield json.dumps(convert_numpy_types(visualization), default=str) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -10,6 +10,7 @@ import sys
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response
 import uvicorn
 
 from .routes import math, multimodal
@@ -17,6 +18,12 @@ from api.websocket.server import websocket_router
 from api.rest.routes.visualization import router as visualization_router
 from api.rest.routes.nlp_visualization import router as nlp_visualization_router
 from .system_init import initialize_system
+from .middlewares.request_profiler import RequestProfiler
+from orchestration.monitoring.metrics import get_registry, PROMETHEUS_CONTENT_TYPE
+from database.access.connection_pool import close_clients
+from database.access.write_behind import close_write_buffer
+from database.optimization.index_advisor import get_index_advisor
+from orchestration.context.token_counter import get_token_counter
 
 # Configure logging
 logging.basicConfig(
@@ -49,8 +56,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Timing-Breakdown"],
 )
 
+# Attach hot path timings to responses of requests that ask for them
+app.middleware("http")(RequestProfiler())
+
 # Include routers
 app.include_router(math.router)
 app.include_router(multimodal.router)
@@ -83,6 +94,35 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Metrics endpoint in the Prometheus text exposition format."""
+    return Response(
+        content=get_registry().export_metrics("prometheus"),
+        media_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+@app.on_event("startup")
+def start_index_advisor():
+    """Start the index advisor when query sampling is enabled."""
+    advisor = get_index_advisor()
+    if advisor is not None:
+        advisor.start()
+
+@app.on_event("startup")
+def start_tokenizer_loading():
+    """Load the token counting tokenizer in the background."""
+    get_token_counter().start_loading()
+
+@app.on_event("shutdown")
+def close_database_connections():
+    """Flush buffered writes and close the shared MongoDB connection pool."""
+    advisor = get_index_advisor()
+    if advisor is not None:
+        advisor.stop()
+    close_write_buffer()
+    close_clients()
+
 def start_server(host: str = "0.0.0.0", port: int = 8000):
     """
     Start the API server.
@@ -242,6 +242,8 @@ def initialize_mongodb():
                     }
                 )
                 logger.info("Registered MongoDB service")
+                
+                initialize_repositories(mongodb_wrapper, mongodb_uri)
                 return True
             else:
                 logger.info("Failed to connect to MongoDB")
@@ -255,4 +257,61 @@ def initialize_mongodb():
     except Exception as e:
         logger.info(f"MongoDB initialization skipped: {e}")
     
-    return False 
\ No newline at end of file
+    return False 
+
+def initialize_repositories(mongodb_wrapper, mongodb_uri: str):
+    """
+    Register the database repositories.
+    
+    Repositories share the process-wide query cache, conversation and
+    expression writes go through the shared write-behind buffer, and
+    expression similarity search uses the shared fingerprint index (filled
+    from the stored expressions when it starts empty).
+    """
+    from database.access.conversation_repository import ConversationRepository
+    from database.access.expression_repository import ExpressionRepository
+    from database.access.write_behind import get_write_buffer
+    from database.cache.query_cache import get_query_cache
+    from database.vector.ivf_index import get_expression_index
+    from math_processing.knowledge.repository import KnowledgeRepository
+    
+    query_cache = get_query_cache()
+    write_buffer = get_write_buffer()
+    
+    registry.register_service(
+        service_id="conversation_repository",
+        service_info={
+            "name": "Conversation Repository",
+            "instance": ConversationRepository(
+                mongodb_wrapper,
+                write_buffer=write_buffer,
+                query_cache=query_cache
+            )
+        }
+    )
+    
+    expression_index = get_expression_index()
+    expression_repository = ExpressionRepository(
+        mongodb_wrapper,
+        write_buffer=write_buffer,
+        query_cache=query_cache,
+        vector_index=expression_index
+    )
+    expression_repository.reconcile_index()
+    
+    registry.register_service(
+        service_id="expression_repository",
+        service_info={
+            "name": "Expression Repository",
+            "instance": expression_repository
+        }
+    )
+    
+    registry.register_service(
+        service_id="knowledge_repository",
+        service_info={
+            "name": "Knowledge Repository",
+            "instance": KnowledgeRepository(mongodb_uri, query_cache=query_cache)
+        }
+    )
+    logger.info("Registered database repositories")
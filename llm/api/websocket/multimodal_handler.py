@@ -7,6 +7,7 @@ updates on multimodal processing.
 import logging
 import json
 import asyncio
+import datetime
 from typing import Dict, Any, List, Set, Optional
 from fastapi import WebSocket, WebSocketDisconnect
 
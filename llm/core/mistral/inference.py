@@ -13,6 +13,8 @@ from typing import List, Dict, Any, Optional, Union
 import torch
 from threading import Thread
 
+from orchestration.monitoring.profiling import profiled
+
 logger = logging.getLogger(__name__)
 
 # Try to import vLLM for optimized inference (only used when not using LMStudio)
@@ -61,6 +63,7 @@ class LMStudioInference:
         except Exception as e:
             logger.warning(f"Could not connect to LMStudio API at {self.api_url}: {str(e)}")
     
+    @profiled("llm_call")
     def generate(
         self,
         prompt: str,
@@ -106,7 +109,7 @@ class LMStudioInference:
             payload["stop"] = stop_sequences
         
         # Log request
-        logger.info(f"Sending request to LMStudio API with {len(prompt)} chars")
+        logger.info("Sending request to LMStudio API with %d chars", len(prompt))
         start_time = time.time()
         
         try:
@@ -115,7 +118,7 @@ class LMStudioInference:
             else:
                 return self._generate_complete(payload)
         except Exception as e:
-            logger.error(f"Error in LMStudio API request: {e}")
+            logger.error("Error in LMStudio API request: %s", e)
             return f"Error generating response: {str(e)}"
     
     def _generate_complete(self, payload: Dict[str, Any]) -> str:
@@ -132,11 +135,11 @@ class LMStudioInference:
         generation_time = time.time() - payload.get("start_time", time.time())
         
         if response.status_code != 200:
-            logger.error(f"LMStudio API error: {response.status_code} {response.text}")
+            logger.error("LMStudio API error: %s %s", response.status_code, response.text)
             return f"API Error: {response.status_code}"
         
         result = response.json()
-        logger.info(f"Generation completed in {generation_time:.2f}s")
+        logger.info("Generation completed in %.2fs", generation_time)
         
         # Extract the response text
         if "choices" in result and len(result["choices"]) > 0:
@@ -158,7 +161,7 @@ class LMStudioInference:
         response = requests.post(self.complete_url, json=payload, stream=True)
         
         if response.status_code != 200:
-            logger.error(f"LMStudio API streaming error: {response.status_code} {response.text}")
+            logger.error("LMStudio API streaming error: %s %s", response.status_code, response.text)
             return [f"API Error: {response.status_code}"]
         
         chunks = []
@@ -174,10 +177,10 @@ class LMStudioInference:
                             chunk = line_json["choices"][0]["text"]
                             chunks.append(chunk)
                 except Exception as e:
-                    logger.error(f"Error parsing streaming response: {e}")
+                    logger.error("Error parsing streaming response: %s", e)
         
         generation_time = time.time() - start_time
-        logger.info(f"Streaming generation completed in {generation_time:.2f}s")
+        logger.info("Streaming generation completed in %.2fs", generation_time)
         
         return chunks
 
@@ -320,6 +323,7 @@ class InferenceEngine:
         
         logger.info("Transformers initialized successfully")
     
+    @profiled("llm_call")
     def generate(
         self,
         prompt: str,
@@ -431,12 +435,12 @@ class InferenceEngine:
                 streamed_outputs.append(output.outputs[0].text)
             
             generation_time = time.time() - start_time
-            logger.info(f"Generation completed in {generation_time:.2f}s")
+            logger.info("Generation completed in %.2fs", generation_time)
             return streamed_outputs
         else:
             outputs = self.llm.generate(prompt, sampling_params)
             generation_time = time.time() - start_time
-            logger.info(f"Generation completed in {generation_time:.2f}s")
+            logger.info("Generation completed in %.2fs", generation_time)
             
             # Extract the generated text
             return outputs[0].outputs[0].text
@@ -513,12 +517,12 @@ class InferenceEngine:
             
             thread.join()
             generation_time = time.time() - start_time
-            logger.info(f"Generation completed in {generation_time:.2f}s")
+            logger.info("Generation completed in %.2fs", generation_time)
             return streamed_outputs
         else:
             output_ids = self.model.generate(input_ids, **gen_kwargs)
             generation_time = time.time() - start_time
-            logger.info(f"Generation completed in {generation_time:.2f}s")
+            logger.info("Generation completed in %.2fs", generation_time)
             
             # Decode the output, skipping the prompt
             output_text = self.tokenizer.decode(output_ids[0][input_ids.shape[1]:], skip_special_tokens=True)
@@ -5,8 +5,11 @@ This module handles classifying mathematical questions into appropriate domains
 to apply domain-specific prompting and reasoning.
 """
 import logging
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple
 
+from math_processing.classification.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 # Keywords and phrases associated with each mathematical domain
@@ -46,6 +49,24 @@ DOMAIN_KEYWORDS = {
     ]
 }
 
+# Substring matcher over all domain keywords
+_KEYWORD_MATCHER = KeywordMatcher(DOMAIN_KEYWORDS)
+
+
+@lru_cache(maxsize=1024)
+def _domain_scores(query: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    Count the keywords of each domain contained in a query.
+    
+    Args:
+        query: The mathematical question to score
+        
+    Returns:
+        (domain, score) pairs in DOMAIN_KEYWORDS order
+    """
+    counts = _KEYWORD_MATCHER.count(query)
+    return tuple((domain, counts.get(domain, 0)) for domain in DOMAIN_KEYWORDS)
+
 def classify_domain(query: str) -> str:
     """
     Classify a mathematical query into a specific domain.
@@ -56,15 +77,8 @@ def classify_domain(query: str) -> str:
     Returns:
         The most likely mathematical domain
     """
-    query = query.lower()
-    
     # Count keyword occurrences for each domain
-    domain_scores: Dict[str, int] = {domain: 0 for domain in DOMAIN_KEYWORDS}
-    
-    for domain, keywords in DOMAIN_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword.lower() in query:
-                domain_scores[domain] += 1
+    domain_scores: Dict[str, int] = dict(_domain_scores(query.lower()))
     
     # Find the domain with the highest score
     max_score = 0
@@ -153,15 +167,11 @@ def get_detailed_classification(query: str) -> Dict[str, Any]:
     primary_domain = classify_domain(query)
     
     # Get domain scores for confidence
-    domain_scores: Dict[str, int] = {domain: 0 for domain in DOMAIN_KEYWORDS}
-    for domain, keywords in DOMAIN_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword.lower() in query.lower():
-                domain_scores[domain] += 1
+    domain_scores: Dict[str, int] = dict(_domain_scores(query.lower()))
     
     # Calculate confidence as the ratio of the highest score to the total
     total_score = sum(domain_scores.values())
-    confidence = domain_scores[primary_domain] / max(total_score, 1)
+    confidence = domain_scores.get(primary_domain, 0) / max(total_score, 1)
     
     # Extract entities
     entities = extract_mathematical_entities(query)
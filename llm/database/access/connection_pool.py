@@ -0,0 +1,202 @@
+"""
+Shared MongoDB connection pool for the Mathematical Multimodal LLM System.
+
+Every repository gets its client from this module, so the process holds one
+tuned connection pool per server instead of one per repository instance.
+Async code reaches the database through ``AsyncRepository``, which runs the
+driver calls on a thread pool sized to the connection pool so queries never
+block the event loop.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from pymongo import MongoClient
+from pymongo.database import Database
+
+from config.mongodb_config import get_mongo_config
+from database.optimization.index_advisor import get_query_sampler
+
+logger = logging.getLogger(__name__)
+
+# Pool settings applied to every client; environment config and explicit options override them
+POOL_DEFAULTS = {
+    "maxPoolSize": int(os.environ.get("MATH_LLM_MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.environ.get("MATH_LLM_MONGO_MIN_POOL_SIZE", "2")),
+    "maxIdleTimeMS": 60000,
+    "waitQueueTimeoutMS": 10000,
+    "connectTimeoutMS": 5000,
+    "serverSelectionTimeoutMS": 5000,
+    "retryWrites": True,
+    "retryReads": True,
+}
+
+_clients: Dict[Tuple[str, Tuple], MongoClient] = {}
+_clients_lock = threading.Lock()
+_client_factory: Callable[..., MongoClient] = MongoClient
+_executor: Optional[ThreadPoolExecutor] = None
+_config: Optional[Dict[str, Any]] = None
+
+
+def _mongo_config() -> Dict[str, Any]:
+    # Read once; get_mongo_config logs on every call
+    global _config
+    if _config is None:
+        _config = get_mongo_config()
+    return _config
+
+
+def _pool_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(POOL_DEFAULTS)
+    merged.update(_mongo_config().get("options", {}))
+    # Feed sampled queries to the index advisor when sampling is enabled
+    sampler = get_query_sampler()
+    if sampler is not None:
+        merged["event_listeners"] = [sampler]
+    merged.update(options)
+    return merged
+
+
+def get_client(uri: Optional[str] = None, verify: bool = False, **options) -> MongoClient:
+    """
+    Get the shared client for a MongoDB server.
+
+    Clients are created once per URI and option set and reused by every
+    caller, so all repositories draw from the same connection pool.
+
+    Args:
+        uri: MongoDB connection URI (defaults to the environment configuration)
+        verify: Ping the server when the client is first created
+        **options: Client options overriding the pool defaults
+
+    Returns:
+        The shared MongoClient
+    """
+    if uri is None:
+        uri = _mongo_config()["uri"]
+    options = _pool_options(options)
+    key = (uri, tuple(sorted((name, repr(value)) for name, value in options.items())))
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            logger.info(f"Creating MongoDB connection pool (maxPoolSize={options['maxPoolSize']})")
+            client = _client_factory(uri, **options)
+            if verify:
+                try:
+                    client.admin.command('ping')
+                except Exception:
+                    client.close()
+                    raise
+            _clients[key] = client
+    return client
+
+
+def get_database(database_name: Optional[str] = None, uri: Optional[str] = None) -> Database:
+    """
+    Get a database from the shared client.
+
+    Args:
+        database_name: Database name (defaults to the environment configuration)
+        uri: MongoDB connection URI (defaults to the environment configuration)
+    """
+    if database_name is None:
+        database_name = _mongo_config()["database"]
+    return get_client(uri)[database_name]
+
+
+def set_client_factory(factory: Callable[..., MongoClient]) -> None:
+    """
+    Replace the callable used to create clients, closing existing ones.
+
+    Used to run against a stand-in such as ``mongomock.MongoClient``.
+    """
+    global _client_factory
+    close_clients()
+    _client_factory = factory
+
+
+def close_clients() -> None:
+    """Close every shared client. Call at process shutdown."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.error(f"Error closing MongoDB connection: {e}")
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Get the thread pool running database calls for async code."""
+    global _executor
+    if _executor is None:
+        with _clients_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_pool_options({})["maxPoolSize"],
+                    thread_name_prefix="mongo-io"
+                )
+    return _executor
+
+
+async def run_in_db_executor(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking database call on the database thread pool.
+
+    The caller's context variables (trace span, request profile) are
+    carried over to the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_db_executor(), call)
+
+
+class AsyncRepository:
+    """
+    Async view of a synchronous repository.
+
+    Every public method of the wrapped object becomes a coroutine function
+    with the same signature, executed on the database thread pool. Methods
+    that are already coroutine or async generator functions, and other
+    attributes, are passed through unchanged.
+
+    Example:
+        visualizations = AsyncRepository(VisualizationRepository())
+        record = await visualizations.get_visualization(visualization_id)
+    """
+
+    def __init__(self, repository: Any):
+        self._repository = repository
+
+    @property
+    def sync(self) -> Any:
+        """The wrapped synchronous repository."""
+        return self._repository
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._repository, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+        if inspect.iscoroutinefunction(attribute) or inspect.isasyncgenfunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def method(*args, **kwargs):
+            return await run_in_db_executor(attribute, *args, **kwargs)
+
+        # Cache so later lookups skip __getattr__
+        self.__dict__[name] = method
+        return method
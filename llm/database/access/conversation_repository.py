@@ -6,27 +6,41 @@ This module provides a repository for managing conversation data in MongoDB.
 
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Iterable
 
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
 from pymongo.collection import Collection
 from pymongo.errors import PyMongoError
 
+from database.access.pagination import (
+    InvalidCursorError, find_page, projection_for, stream_documents, stringify_ids
+)
+from database.cache.query_cache import read_through, invalidate
+
 logger = logging.getLogger(__name__)
 
 class ConversationRepository:
     """Repository for managing conversations and interactions."""
     
-    def __init__(self, mongodb_wrapper):
+    def __init__(self, mongodb_wrapper, write_buffer=None, query_cache=None):
         """
         Initialize the conversation repository.
         
         Args:
             mongodb_wrapper: MongoDB wrapper instance
+            write_buffer: Optional WriteBehindBuffer taking interaction writes
+                off the caller's critical path
+            query_cache: Optional QueryCache for conversation and interaction reads
         """
         self.mongodb = mongodb_wrapper
+        self.write_buffer = write_buffer
+        self.query_cache = query_cache
         self.conversations = self.mongodb.get_collection("conversations")
         self.interactions = self.mongodb.get_collection("interactions")
+        
+        if write_buffer is not None and query_cache is not None:
+            write_buffer.add_flush_listener(query_cache.invalidate_namespace)
     
     def create_conversation(self, user_id: str, title: Optional[str] = None) -> Optional[str]:
         """
@@ -54,6 +68,7 @@ class ConversationRepository:
             # Insert into database
             result = self.conversations.insert_one(conversation)
             conversation_id = str(result.inserted_id)
+            invalidate(self.query_cache, self.conversations)
             
             logger.info(f"Created conversation {conversation_id} for user {user_id}")
             return conversation_id
@@ -116,6 +131,7 @@ class ConversationRepository:
             
             # Create interaction document
             interaction = {
+                "_id": ObjectId(),
                 "conversation_id": conv_obj_id,
                 "timestamp": datetime.now(),
                 "user_input": user_input,
@@ -124,34 +140,41 @@ class ConversationRepository:
                 "visualizations": []     # Will be populated by references
             }
             
-            # Insert into database
-            result = self.interactions.insert_one(interaction)
-            interaction_id = str(result.inserted_id)
-            
-            # Update conversation metadata
-            self.conversations.update_one(
-                {"_id": conv_obj_id},
-                {
-                    "$inc": {"interaction_count": 1},
-                    "$set": {"updated_at": datetime.now()},
-                    "$addToSet": {"math_domains": {"$each": user_input.get("math_domains", [])}}
-                }
-            )
+            interaction_id = str(interaction["_id"])
+            conversation_update = {
+                "$inc": {"interaction_count": 1},
+                "$set": {"updated_at": datetime.now()},
+                "$addToSet": {"math_domains": {"$each": user_input.get("math_domains", [])}}
+            }
+            
+            if self.write_buffer is not None:
+                # Both writes are batched with other requests' writes
+                self.write_buffer.insert(self.interactions, interaction)
+                self.write_buffer.update(self.conversations, {"_id": conv_obj_id}, conversation_update)
+            else:
+                # Insert into database
+                self.interactions.insert_one(interaction)
+                
+                # Update conversation metadata
+                self.conversations.update_one({"_id": conv_obj_id}, conversation_update)
+                invalidate(self.query_cache, self.interactions, self.conversations)
             
             logger.info(f"Added interaction {interaction_id} to conversation {conversation_id}")
             return interaction_id
             
-        except PyMongoError as e:
+        except (PyMongoError, InvalidId) as e:
             logger.error(f"Failed to add interaction to conversation {conversation_id}: {e}")
             return None
     
-    def get_interactions(self, conversation_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_interactions(self, conversation_id: str, limit: int = 50,
+                         fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """
         Get interactions for a conversation.
         
         Args:
             conversation_id: ID of the conversation
             limit: Maximum number of interactions to retrieve
+            fields: Fields to return (whole documents when None)
             
         Returns:
             List of interaction documents
@@ -159,49 +182,115 @@ class ConversationRepository:
         try:
             # Convert string ID to ObjectId
             conv_obj_id = ObjectId(conversation_id)
+            query = {"conversation_id": conv_obj_id}
+            projection = projection_for(fields)
             
-            # Retrieve from database
-            cursor = self.interactions.find(
-                {"conversation_id": conv_obj_id}
-            ).sort("timestamp", -1).limit(limit)
-            
-            # Convert ObjectIds to strings for serialization
-            interactions = []
-            for interaction in cursor:
-                interaction["_id"] = str(interaction["_id"])
-                interaction["conversation_id"] = str(interaction["conversation_id"])
-                interactions.append(interaction)
+            def load():
+                # Retrieve from database
+                cursor = self.interactions.find(query, projection).sort("timestamp", -1).limit(limit)
+                
+                # Convert ObjectIds to strings for serialization
+                return stringify_ids(list(cursor), "conversation_id")
             
-            return interactions
+            return read_through(
+                self.query_cache, self.interactions, query, load,
+                projection=projection, sort=[("timestamp", -1)], limit=limit
+            )
             
         except PyMongoError as e:
             logger.error(f"Failed to get interactions for conversation {conversation_id}: {e}")
             return []
     
-    def get_user_conversations(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_interactions_page(self, conversation_id: str, limit: int = 50,
+                              cursor: Optional[str] = None,
+                              fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Get one page of a conversation's interactions, newest first.
+        
+        Args:
+            conversation_id: ID of the conversation
+            limit: Maximum number of interactions in the page
+            cursor: ``next_cursor`` of the previous page
+            fields: Fields to return (whole documents when None)
+            
+        Returns:
+            ``{"items": [...], "next_cursor": ...}``; ``next_cursor`` is None on the last page
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        try:
+            query = {"conversation_id": ObjectId(conversation_id)}
+            projection = projection_for(fields)
+            
+            def load():
+                page = find_page(self.interactions, query, "timestamp", -1, limit, cursor, projection)
+                stringify_ids(page["items"], "conversation_id")
+                return page
+            
+            return read_through(
+                self.query_cache, self.interactions, query, load,
+                projection=projection, sort=[("timestamp", -1)], limit=limit, cursor=cursor
+            )
+            
+        except InvalidCursorError:
+            raise
+        except PyMongoError as e:
+            logger.error(f"Failed to get interactions for conversation {conversation_id}: {e}")
+            return {"items": [], "next_cursor": None}
+    
+    async def stream_interactions(self, conversation_id: str,
+                                  fields: Optional[Iterable[str]] = None,
+                                  batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a conversation's interactions, newest first, without loading them all.
+        
+        Args:
+            conversation_id: ID of the conversation
+            fields: Fields to return (whole documents when None)
+            batch_size: Documents read per query
+            
+        Yields:
+            Interaction documents
+        """
+        query = {"conversation_id": ObjectId(conversation_id)}
+        async for interaction in stream_documents(
+            self.interactions, query, "timestamp", -1, projection_for(fields), batch_size
+        ):
+            yield stringify_ids([interaction], "conversation_id")[0]
+    
+    def get_user_conversations(self, user_id: str, limit: int = 20,
+                               fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """
         Get conversations for a user.
         
         Args:
             user_id: ID of the user
             limit: Maximum number of conversations to retrieve
+            fields: Fields to return (whole documents when None)
             
         Returns:
             List of conversation documents
         """
         try:
-            # Retrieve from database
-            cursor = self.conversations.find(
-                {"user_id": user_id}
-            ).sort("updated_at", -1).limit(limit)
+            query = {"user_id": user_id}
+            projection = projection_for(fields)
             
-            # Convert ObjectIds to strings for serialization
-            conversations = []
-            for conversation in cursor:
-                conversation["_id"] = str(conversation["_id"])
-                conversations.append(conversation)
+            def load():
+                # Retrieve from database
+                cursor = self.conversations.find(query, projection).sort("updated_at", -1).limit(limit)
+                
+                # Convert ObjectIds to strings for serialization
+                conversations = []
+                for conversation in cursor:
+                    conversation["_id"] = str(conversation["_id"])
+                    conversations.append(conversation)
+                return conversations
             
-            return conversations
+            return read_through(
+                self.query_cache, self.conversations, query, load,
+                projection=projection, sort=[("updated_at", -1)], limit=limit
+            )
             
         except PyMongoError as e:
             logger.error(f"Failed to get conversations for user {user_id}: {e}")
@@ -5,28 +5,47 @@ This module provides a repository for managing mathematical expression data in M
 """
 
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Set
 
+import numpy as np
 from bson.objectid import ObjectId
 from pymongo.collection import Collection
 from pymongo.errors import PyMongoError
 
+from database.cache.query_cache import invalidate
+from database.vector.fingerprint import fingerprint
+
 logger = logging.getLogger(__name__)
 
+# Expressions stored up to this long before the index's last row are
+# rechecked when reconciling, to cover ids generated slightly out of order
+RECONCILE_WINDOW_SECONDS = 300
+
 class ExpressionRepository:
     """Repository for managing mathematical expressions."""
     
-    def __init__(self, mongodb_wrapper):
+    def __init__(self, mongodb_wrapper, write_buffer=None, query_cache=None, vector_index=None):
         """
         Initialize the expression repository.
         
         Args:
             mongodb_wrapper: MongoDB wrapper instance
+            write_buffer: Optional WriteBehindBuffer taking expression writes
+                off the caller's critical path
+            query_cache: Optional QueryCache to invalidate on writes
+            vector_index: Optional VectorIndex of expression fingerprints
+                serving similarity searches
         """
         self.mongodb = mongodb_wrapper
+        self.write_buffer = write_buffer
+        self.query_cache = query_cache
+        self.vector_index = vector_index
         self.expressions = self.mongodb.get_collection("mathematical_expressions")
         self.interactions = self.mongodb.get_collection("interactions")
+        
+        if write_buffer is not None and query_cache is not None:
+            write_buffer.add_flush_listener(query_cache.invalidate_namespace)
     
     def store_expression(self, interaction_id: str, 
                         latex_representation: str,
@@ -50,13 +69,18 @@ class ExpressionRepository:
             # Convert string ID to ObjectId
             interaction_obj_id = ObjectId(interaction_id)
             
-            # Check if interaction exists
-            if not self.interactions.find_one({"_id": interaction_obj_id}):
+            # Check if interaction exists (it may still be waiting in the write buffer)
+            pending = (
+                self.write_buffer is not None
+                and self.write_buffer.pending_document(self.interactions, interaction_obj_id) is not None
+            )
+            if not pending and not self.interactions.find_one({"_id": interaction_obj_id}):
                 logger.error(f"Cannot store expression: Interaction {interaction_id} not found")
                 return None
             
             # Create expression document
             expression = {
+                "_id": ObjectId(),
                 "interaction_id": interaction_obj_id,
                 "latex_representation": latex_representation,
                 "symbolic_representation": symbolic_representation,
@@ -65,15 +89,23 @@ class ExpressionRepository:
                 "created_at": datetime.now()
             }
             
-            # Insert into database
-            result = self.expressions.insert_one(expression)
-            expression_id = str(result.inserted_id)
+            expression_id = str(expression["_id"])
+            interaction_update = {"$push": {"math_expressions": expression["_id"]}}
             
-            # Update interaction to reference this expression
-            self.interactions.update_one(
-                {"_id": interaction_obj_id},
-                {"$push": {"math_expressions": ObjectId(expression_id)}}
-            )
+            if self.write_buffer is not None:
+                # Both writes are batched with other requests' writes
+                self.write_buffer.insert(self.expressions, expression)
+                self.write_buffer.update(self.interactions, {"_id": interaction_obj_id}, interaction_update)
+            else:
+                # Insert into database
+                self.expressions.insert_one(expression)
+                
+                # Update interaction to reference this expression
+                self.interactions.update_one({"_id": interaction_obj_id}, interaction_update)
+                invalidate(self.query_cache, self.expressions, self.interactions)
+            
+            if self.vector_index is not None:
+                self.vector_index.add_one(expression_id, fingerprint(latex_representation, self.vector_index.dim))
             
             logger.info(f"Stored expression {expression_id} for interaction {interaction_id}")
             return expression_id
@@ -112,19 +144,104 @@ class ExpressionRepository:
             logger.error(f"Failed to get expression {expression_id}: {e}")
             return None
     
+    def index_expressions(self, batch_size: int = 1024, query: Optional[Dict[str, Any]] = None,
+                          exclude: Optional[Set[str]] = None) -> int:
+        """
+        Add stored expressions to the vector index.
+        
+        Used to populate an empty index, e.g. the first time a deployment
+        runs with one; expressions stored afterwards are indexed as they are
+        written.
+        
+        Args:
+            batch_size: Number of expressions fingerprinted per index append
+            query: Optional filter selecting the expressions to index
+            exclude: Optional ids of expressions already in the index
+            
+        Returns:
+            Number of expressions indexed
+        """
+        if self.vector_index is None:
+            return 0
+        
+        indexed = 0
+        ids, vectors = [], []
+        
+        def append():
+            self.vector_index.add(ids, np.stack(vectors))
+            ids.clear()
+            vectors.clear()
+        
+        try:
+            cursor = self.expressions.find(
+                query or {}, {"latex_representation": 1}
+            ).sort("_id", 1).batch_size(batch_size)
+            for expression in cursor:
+                if exclude and str(expression["_id"]) in exclude:
+                    continue
+                ids.append(str(expression["_id"]))
+                vectors.append(fingerprint(expression.get("latex_representation", ""), self.vector_index.dim))
+                indexed += 1
+                if len(ids) >= batch_size:
+                    append()
+            if ids:
+                append()
+        except PyMongoError as e:
+            logger.error(f"Failed to index stored expressions: {e}")
+        
+        self.vector_index.flush()
+        logger.info(f"Indexed {indexed} stored expressions")
+        return indexed
+    
+    def reconcile_index(self, window_seconds: float = RECONCILE_WINDOW_SECONDS) -> int:
+        """
+        Index stored expressions that are missing from the vector index.
+        
+        Run at startup: rows appended after the index was last flushed are
+        lost if the process exits abruptly, so every expression stored after
+        the last persisted row (less a small window) is indexed unless it
+        is already present. An empty index is populated in full.
+        
+        Args:
+            window_seconds: How far before the last row's id to recheck
+            
+        Returns:
+            Number of expressions indexed
+        """
+        if self.vector_index is None:
+            return 0
+        
+        last_id = self.vector_index.last_id()
+        if last_id is None:
+            return self.index_expressions()
+        if not ObjectId.is_valid(last_id):
+            return self.index_expressions(exclude=self.vector_index.ids_from(""))
+        
+        since = ObjectId.from_datetime(ObjectId(last_id).generation_time - timedelta(seconds=window_seconds))
+        return self.index_expressions(
+            query={"_id": {"$gte": since}},
+            exclude=self.vector_index.ids_from(str(since))
+        )
+    
     def find_similar_expressions(self, latex_representation: str, 
                                 limit: int = 5) -> List[Dict[str, Any]]:
         """
-        Find similar mathematical expressions using text search.
+        Find similar mathematical expressions.
+        
+        Uses the structural fingerprint index when one is configured, adding
+        a ``similarity`` score to each result, and text search otherwise.
         
         Args:
             latex_representation: LaTeX representation to search for
             limit: Maximum number of expressions to retrieve
             
         Returns:
-            List of similar expression documents
+            List of similar expression documents, most similar first
         """
         try:
+            if self.vector_index is not None:
+                return self._find_similar_indexed(latex_representation, limit)
+            
             # Use text search to find similar expressions
             cursor = self.expressions.find(
                 {"$text": {"$search": latex_representation}}
@@ -143,6 +260,33 @@ class ExpressionRepository:
             logger.error(f"Failed to find similar expressions: {e}")
             return []
     
+    def _find_similar_indexed(self, latex_representation: str, limit: int) -> List[Dict[str, Any]]:
+        """Find similar expressions through the vector index."""
+        matches = self.vector_index.search(
+            fingerprint(latex_representation, self.vector_index.dim), limit
+        )
+        if not matches:
+            return []
+        
+        ids = [ObjectId(expression_id) for expression_id, _ in matches]
+        documents = {doc["_id"]: doc for doc in self.expressions.find({"_id": {"$in": ids}})}
+        
+        expressions = []
+        for obj_id, (_, score) in zip(ids, matches):
+            expression = documents.get(obj_id)
+            if expression is None and self.write_buffer is not None:
+                expression = self.write_buffer.pending_document(self.expressions, obj_id)
+            if expression is None:
+                # Indexed but deleted, or lost before it was written
+                continue
+            expression = dict(expression)
+            expression["_id"] = str(expression["_id"])
+            expression["interaction_id"] = str(expression["interaction_id"])
+            expression["similarity"] = score
+            expressions.append(expression)
+        
+        return expressions
+    
     def get_expressions_by_domain(self, math_domain: str, 
                                  limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -7,9 +7,11 @@ configurations, and performance metrics in the database.
 import logging
 import datetime
 from typing import Dict, Any, List, Optional, Union
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING
 from bson.objectid import ObjectId
 
+from database.access.connection_pool import get_client
+
 logger = logging.getLogger(__name__)
 
 class ModelRepository:
@@ -23,7 +25,7 @@ class ModelRepository:
             connection_string: MongoDB connection string
             db_name: Database name
         """
-        self.client = MongoClient(connection_string)
+        self.client = get_client(connection_string)
         self.db = self.client[db_name]
         self.models = self.db.models
         self.model_versions = self.db.model_versions
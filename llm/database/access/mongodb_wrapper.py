@@ -10,17 +10,25 @@ from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.collection import Collection
 
+from orchestration.monitoring.profiling import profiled
+from database.access.connection_pool import get_client
+
 logger = logging.getLogger(__name__)
 
 class MongoDBWrapper:
-    """Wrapper for MongoDB connection and operations."""
+    """
+    Wrapper for MongoDB connection and operations.
+    
+    Wrappers share the process-wide connection pool from ``connection_pool``;
+    use ``AsyncRepository`` to call them from async code.
+    """
     
-    def __init__(self, connection_string: str, database_name: str = "math_llm_system"):
+    def __init__(self, connection_string: Optional[str] = None, database_name: str = "math_llm_system"):
         """
         Initialize MongoDB connection.
         
         Args:
-            connection_string: MongoDB connection URI
+            connection_string: MongoDB connection URI (defaults to the environment configuration)
             database_name: Name of the database to use
         """
         self.connection_string = connection_string
@@ -33,16 +41,21 @@ class MongoDBWrapper:
     def _connect(self) -> None:
         """Establish connection to MongoDB."""
         try:
-            logger.info(f"Connecting to MongoDB: {self.connection_string}")
-            self.client = MongoClient(self.connection_string)
+            # The shared client is pinged once, when its pool is created
+            self.client = get_client(self.connection_string, verify=True)
             self.db = self.client[self.database_name]
-            # Ping database to check connection
-            self.client.admin.command('ping')
-            logger.info("MongoDB connection established successfully")
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
     
+    def get_client(self) -> MongoClient:
+        """Get the shared MongoDB client."""
+        return self.client
+    
+    def get_database_name(self) -> str:
+        """Get the name of the database in use."""
+        return self.database_name
+    
     def get_collection(self, collection_name: str) -> Collection:
         """
         Get a reference to a MongoDB collection.
@@ -55,6 +68,7 @@ class MongoDBWrapper:
         """
         return self.db[collection_name]
     
+    @profiled("mongo_query")
     def insert_one(self, collection_name: str, document: Dict[str, Any]) -> str:
         """
         Insert a single document into a collection.
@@ -74,6 +88,7 @@ class MongoDBWrapper:
             logger.error(f"Failed to insert document into {collection_name}: {e}")
             raise
     
+    @profiled("mongo_query")
     def find_one(self, collection_name: str, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Find a single document in a collection.
@@ -92,6 +107,7 @@ class MongoDBWrapper:
             logger.error(f"Failed to find document in {collection_name}: {e}")
             raise
     
+    @profiled("mongo_query")
     def find_many(self, collection_name: str, query: Dict[str, Any], 
                  limit: int = 0, sort: Optional[List] = None) -> List[Dict[str, Any]]:
         """
@@ -121,6 +137,7 @@ class MongoDBWrapper:
             logger.error(f"Failed to find documents in {collection_name}: {e}")
             raise
     
+    @profiled("mongo_query")
     def update_one(self, collection_name: str, query: Dict[str, Any], 
                   update: Dict[str, Any], upsert: bool = False) -> int:
         """
@@ -144,10 +161,11 @@ class MongoDBWrapper:
             raise
     
     def close(self) -> None:
-        """Close the MongoDB connection."""
-        if self.client:
-            try:
-                self.client.close()
-                logger.info("MongoDB connection closed")
-            except Exception as e:
-                logger.error(f"Error closing MongoDB connection: {e}")
+        """
+        Release this wrapper's connection.
+        
+        The shared pool stays open for other users; it is closed by
+        ``connection_pool.close_clients`` at shutdown.
+        """
+        self.client = None
+        self.db = None
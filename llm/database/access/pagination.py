@@ -0,0 +1,130 @@
+"""
+Projection, keyset pagination and streaming for repository reads.
+
+Pages are ordered on an indexed field with ``_id`` as a tie-breaker and
+continue from an opaque cursor holding the last row's sort values, so a page
+costs an index range scan however deep it is (unlike ``skip``). Streaming
+reads run the same page query repeatedly on the database thread pool and
+yield documents from an async generator.
+"""
+import base64
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from bson import json_util
+from pymongo.collection import Collection
+
+from database.access.connection_pool import run_in_db_executor
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a page cursor cannot be decoded."""
+
+
+def projection_for(fields: Optional[Iterable[str]], *required: str) -> Optional[Dict[str, int]]:
+    """
+    Build an inclusion projection.
+
+    Args:
+        fields: Fields to return, or None for whole documents
+        *required: Fields always returned (such as the sort field)
+
+    Returns:
+        Projection document, or None for whole documents
+    """
+    if fields is None:
+        return None
+    projection = {field: 1 for field in fields}
+    projection.update({field: 1 for field in required})
+    return projection
+
+
+def encode_cursor(document: Dict[str, Any], sort_field: str) -> str:
+    """Encode the position after ``document`` as an opaque cursor."""
+    position = {"v": document.get(sort_field), "id": document["_id"]}
+    raw = json_util.dumps(position, json_options=json_util.CANONICAL_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor made by ``encode_cursor``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json_util.loads(raw.decode("utf-8"))
+        return {"v": position["v"], "id": position["id"]}
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid page cursor: {e}") from e
+
+
+def keyset_query(query: Dict[str, Any], sort_field: str, direction: int,
+                 cursor: Optional[str]) -> Dict[str, Any]:
+    """Restrict ``query`` to the rows after ``cursor`` in (sort_field, _id) order."""
+    if not cursor:
+        return query
+    position = decode_cursor(cursor)
+    op = "$lt" if direction < 0 else "$gt"
+    after = {"$or": [
+        {sort_field: {op: position["v"]}},
+        {sort_field: position["v"], "_id": {op: position["id"]}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+def find_page(collection: Collection, query: Dict[str, Any], sort_field: str,
+              direction: int = -1, limit: int = 20, cursor: Optional[str] = None,
+              projection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Read one page of a query in keyset order.
+
+    Args:
+        collection: Collection to read
+        query: Query filter
+        sort_field: Indexed field ordering the pages
+        direction: 1 for ascending, -1 for descending
+        limit: Maximum documents in the page
+        cursor: Cursor from the previous page, or None for the first page
+        projection: Fields to return
+
+    Returns:
+        ``{"items": [...], "next_cursor": str or None}``; ``next_cursor`` is
+        None on the last page
+    """
+    if projection and all(projection.values()):
+        # The cursor needs the sort field of the last row
+        projection = dict(projection, **{sort_field: 1})
+    documents = list(
+        collection.find(keyset_query(query, sort_field, direction, cursor), projection)
+        .sort([(sort_field, direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+    next_cursor = encode_cursor(documents[limit - 1], sort_field) if len(documents) > limit else None
+    return {"items": documents[:limit], "next_cursor": next_cursor}
+
+
+async def stream_documents(collection: Collection, query: Dict[str, Any], sort_field: str,
+                           direction: int = -1, projection: Optional[Dict[str, Any]] = None,
+                           batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream every document matching a query without holding the result set.
+
+    Each batch is a keyset page read on the database thread pool, so the
+    event loop is never blocked and at most one batch is in memory.
+    """
+    cursor = None
+    while True:
+        page = await run_in_db_executor(
+            find_page, collection, query, sort_field, direction, batch_size, cursor, projection
+        )
+        for document in page["items"]:
+            yield document
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+def stringify_ids(documents: List[Dict[str, Any]], *fields: str) -> List[Dict[str, Any]]:
+    """Convert ``_id`` and the given ObjectId fields to strings for serialization."""
+    for document in documents:
+        for field in ("_id",) + fields:
+            if field in document and document[field] is not None:
+                document[field] = str(document[field])
+    return documents
@@ -1,24 +1,36 @@
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, AsyncIterator, Iterable, List, Optional, Union
 from bson import ObjectId
 import os
 from datetime import datetime
 
 from database.access.mongodb_wrapper import MongoDBWrapper
+from database.access.pagination import (
+    InvalidCursorError, find_page, projection_for, stream_documents
+)
+from database.cache.query_cache import read_through, invalidate
 
 class VisualizationRepository:
     """
     Repository for storing and retrieving visualization data.
     """
     
-    def __init__(self, connection_string: Optional[str] = None):
+    def __init__(self, connection_string: Optional[str] = None, write_buffer=None, query_cache=None):
         """
         Initialize the Visualization Repository.
         
         Args:
             connection_string: MongoDB connection string (optional)
+            write_buffer: Optional WriteBehindBuffer taking inserts off the
+                caller's critical path
+            query_cache: Optional QueryCache for list queries
         """
         self.db = MongoDBWrapper(connection_string).db
         self.visualizations = self.db.visualizations
+        self.write_buffer = write_buffer
+        self.query_cache = query_cache
+        
+        if write_buffer is not None and query_cache is not None:
+            write_buffer.add_flush_listener(query_cache.invalidate_namespace)
     
     def store_visualization(
         self, 
@@ -56,7 +68,11 @@ class VisualizationRepository:
             visualization["interaction_id"] = interaction_id
         
         # Insert into database
+        if self.write_buffer is not None:
+            return str(self.write_buffer.insert(self.visualizations, visualization))
+        
         result = self.visualizations.insert_one(visualization)
+        invalidate(self.query_cache, self.visualizations)
         
         return str(result.inserted_id)
     
@@ -71,7 +87,14 @@ class VisualizationRepository:
             Visualization document or None if not found
         """
         try:
-            result = self.visualizations.find_one({"_id": ObjectId(visualization_id)})
+            obj_id = ObjectId(visualization_id)
+            result = None
+            if self.write_buffer is not None:
+                # Serve visualizations that are stored but not yet flushed
+                pending = self.write_buffer.pending_document(self.visualizations, obj_id)
+                result = dict(pending) if pending is not None else None
+            if result is None:
+                result = self.visualizations.find_one({"_id": obj_id})
             
             if result:
                 # Convert ObjectId to string for serialization
@@ -89,60 +112,124 @@ class VisualizationRepository:
             print(f"Error retrieving visualization: {e}")
             return None
     
-    def get_visualizations_by_interaction(self, interaction_id: str) -> List[Dict[str, Any]]:
+    def _prepare(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert ObjectIds to strings and refresh the file flag of a document."""
+        result["_id"] = str(result["_id"])
+        
+        # Check if file still exists
+        if "file_path" in result:
+            result["file_exists"] = os.path.exists(result["file_path"])
+        
+        return result
+    
+    def get_visualizations_by_interaction(self, interaction_id: str,
+                                          fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve all visualizations for a specific interaction.
         
         Args:
             interaction_id: ID of the interaction
+            fields: Fields to return (whole documents when None)
             
         Returns:
             List of visualization documents
         """
         try:
-            results = list(self.visualizations.find({"interaction_id": interaction_id}))
-            
-            # Convert ObjectId to string for serialization
-            for result in results:
-                result["_id"] = str(result["_id"])
-                
-                # Check if file still exists
-                if "file_path" in result:
-                    result["file_exists"] = os.path.exists(result["file_path"])
+            query = {"interaction_id": interaction_id}
+            projection = projection_for(fields)
+            results = read_through(
+                self.query_cache, self.visualizations, query,
+                lambda: list(self.visualizations.find(query, projection)),
+                projection=projection
+            )
             
-            return results
+            return [self._prepare(result) for result in results]
             
         except Exception as e:
             print(f"Error retrieving visualizations: {e}")
             return []
     
-    def get_recent_visualizations(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_recent_visualizations(self, limit: int = 10,
+                                  fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve recent visualizations.
         
         Args:
             limit: Maximum number of visualizations to return
+            fields: Fields to return (whole documents when None)
             
         Returns:
             List of visualization documents
         """
         try:
-            results = list(self.visualizations.find().sort("created_at", -1).limit(limit))
+            projection = projection_for(fields)
+            results = read_through(
+                self.query_cache, self.visualizations, {},
+                lambda: list(self.visualizations.find({}, projection).sort("created_at", -1).limit(limit)),
+                projection=projection, sort=[("created_at", -1)], limit=limit
+            )
             
-            # Convert ObjectId to string for serialization
-            for result in results:
-                result["_id"] = str(result["_id"])
-                
-                # Check if file still exists
-                if "file_path" in result:
-                    result["file_exists"] = os.path.exists(result["file_path"])
-            
-            return results
+            return [self._prepare(result) for result in results]
             
         except Exception as e:
             print(f"Error retrieving recent visualizations: {e}")
             return []
     
+    def get_visualizations_page(self, interaction_id: Optional[str] = None, limit: int = 20,
+                                cursor: Optional[str] = None,
+                                fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Retrieve one page of visualizations, newest first.
+        
+        Args:
+            interaction_id: Only visualizations of this interaction (all when None)
+            limit: Maximum number of visualizations in the page
+            cursor: ``next_cursor`` of the previous page
+            fields: Fields to return (whole documents when None)
+            
+        Returns:
+            ``{"items": [...], "next_cursor": ...}``; ``next_cursor`` is None on the last page
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        query = {"interaction_id": interaction_id} if interaction_id else {}
+        projection = projection_for(fields)
+        try:
+            page = read_through(
+                self.query_cache, self.visualizations, query,
+                lambda: find_page(self.visualizations, query, "created_at", -1, limit, cursor, projection),
+                projection=projection, sort=[("created_at", -1)], limit=limit, cursor=cursor
+            )
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            print(f"Error retrieving visualizations page: {e}")
+            return {"items": [], "next_cursor": None}
+        
+        page["items"] = [self._prepare(result) for result in page["items"]]
+        return page
+    
+    async def stream_visualizations(self, interaction_id: Optional[str] = None,
+                                    fields: Optional[Iterable[str]] = None,
+                                    batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream visualizations, newest first, without loading them all.
+        
+        Args:
+            interaction_id: Only visualizations of this interaction (all when None)
+            fields: Fields to return (whole documents when None)
+            batch_size: Documents read per query
+            
+        Yields:
+            Visualization documents
+        """
+        query = {"interaction_id": interaction_id} if interaction_id else {}
+        async for result in stream_documents(
+            self.visualizations, query, "created_at", -1, projection_for(fields), batch_size
+        ):
+            yield self._prepare(result)
+    
     def delete_visualization(self, visualization_id: str, delete_file: bool = False) -> bool:
         """
         Delete a visualization from the database.
@@ -155,6 +242,10 @@ class VisualizationRepository:
             True if deletion was successful, False otherwise
         """
         try:
+            # Write out a pending insert so it cannot reappear after the delete
+            if self.write_buffer is not None:
+                self.write_buffer.flush()
+            
             # Get visualization first if we need to delete the file
             file_path = None
             if delete_file:
@@ -164,6 +255,7 @@ class VisualizationRepository:
             
             # Delete from database
             result = self.visualizations.delete_one({"_id": ObjectId(visualization_id)})
+            invalidate(self.query_cache, self.visualizations)
             
             # Delete file if requested
             if delete_file and file_path and os.path.exists(file_path):
@@ -0,0 +1,416 @@
+"""
+Write-behind buffer for MongoDB persistence.
+
+Repositories hand inserts and updates to a ``WriteBehindBuffer`` instead of
+writing them inside the request. A background thread drains the buffer
+periodically and writes each collection's share with one unordered
+``bulk_write``, merging repeated updates to the same document.
+Documents get client-side ``_id`` values, so callers still receive IDs
+immediately.
+
+Writes can optionally be spooled to local JSON-lines files before they are
+acknowledged; spooled writes that were never flushed (for example after a
+crash) are replayed when the next buffer starts. Replay gives at-least-once
+delivery: replayed inserts are deduplicated by ``_id``, replayed updates are
+applied again.
+"""
+import atexit
+import glob
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from bson import json_util
+from bson.objectid import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from database.access.connection_pool import get_client
+
+logger = logging.getLogger(__name__)
+
+# Update operators whose effects can be merged into a single update
+_MERGEABLE_OPERATORS = {"$set", "$inc", "$addToSet", "$push"}
+DUPLICATE_KEY_ERROR = 11000
+
+CollectionKey = Tuple[str, str]
+
+
+class WriteBufferFullError(PyMongoError):
+    """Raised when the buffer is full and the database cannot take the backlog."""
+
+
+def _merge_updates(first: Dict[str, Any], second: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Merge two update documents applied one after the other.
+
+    Returns:
+        The merged update, or None when the two cannot be combined
+    """
+    if not set(first).union(second) <= _MERGEABLE_OPERATORS:
+        return None
+
+    # A field touched by different operators must keep its order of application
+    fields: Dict[str, str] = {}
+    for update in (first, second):
+        for operator, values in update.items():
+            for field in values:
+                if fields.setdefault(field, operator) != operator:
+                    return None
+
+    merged = {operator: dict(values) for operator, values in first.items()}
+    for operator, values in second.items():
+        target = merged.setdefault(operator, {})
+        for field, value in values.items():
+            if field not in target:
+                target[field] = value
+            elif operator == "$set":
+                target[field] = value
+            elif operator == "$inc":
+                target[field] = target[field] + value
+            else:
+                # $addToSet and $push: concatenate the values, keeping plain $each modifiers only
+                previous = target[field]
+                if any(isinstance(v, dict) and set(v) - {"$each"} for v in (previous, value)):
+                    return None
+                previous = previous["$each"] if isinstance(previous, dict) else [previous]
+                value = value["$each"] if isinstance(value, dict) else [value]
+                target[field] = {"$each": list(previous) + list(value)}
+    return merged
+
+
+class WriteBehindBuffer:
+    """
+    Bounded buffer coalescing MongoDB writes into periodic bulk writes.
+
+    Args:
+        max_pending: Maximum buffered operations; when full, the caller flushes inline
+            and ``WriteBufferFullError`` is raised if the backlog cannot be written
+        flush_interval: Seconds between background flushes
+        spool_dir: Directory for durable spool files (None disables spooling)
+        fsync: Sync spool writes to disk before acknowledging them
+        client: MongoDB client for replayed writes (defaults to the shared client)
+    """
+
+    def __init__(self, max_pending: int = 10000, flush_interval: float = 0.2,
+                 spool_dir: Optional[str] = None, fsync: bool = False, client=None):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.spool_dir = spool_dir
+        self.fsync = fsync
+        self._client = client
+
+        # Each operation: (kind, (database, collection), payload)
+        self._queue: deque = deque()
+        self._pending_inserts: Dict[Tuple[str, str, Any], Dict[str, Any]] = {}
+        self._collections: Dict[CollectionKey, Collection] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._spool_file = None
+        self._spool_seq = 0
+        self._spool_segments: List[str] = []
+        self._retry_segments: List[str] = []
+        self._flush_listeners: List[Callable[[str, str], None]] = []
+
+        self.stats = {"queued": 0, "written": 0, "merged": 0, "failed": 0, "flushes": 0, "replayed": 0}
+
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+            self._replay_spool()
+            self._open_spool_segment()
+
+    # Spooling
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.spool_dir, f"writes-{seq:08d}.jsonl")
+
+    def _open_spool_segment(self):
+        self._spool_seq += 1
+        path = self._segment_path(self._spool_seq)
+        self._spool_file = open(path, "a", encoding="utf-8")
+        self._spool_segments.append(path)
+
+    def _spool(self, record: Dict[str, Any]):
+        self._spool_file.write(json_util.dumps(record, json_options=json_util.CANONICAL_JSON_OPTIONS) + "\n")
+        self._spool_file.flush()
+        if self.fsync:
+            os.fsync(self._spool_file.fileno())
+
+    def _replay_spool(self):
+        segments = sorted(glob.glob(os.path.join(self.spool_dir, "writes-*.jsonl")))
+        for path in segments:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json_util.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-write
+                        logger.warning(f"Skipping unreadable spool record in {path}")
+                        continue
+                    self._enqueue(record["kind"], (record["db"], record["coll"]), record["payload"])
+                    self.stats["replayed"] += 1
+            seq = int(os.path.basename(path)[len("writes-"):-len(".jsonl")])
+            self._spool_seq = max(self._spool_seq, seq)
+        self._spool_segments.extend(segments)
+        if self.stats["replayed"]:
+            logger.info(f"Replaying {self.stats['replayed']} spooled writes")
+            self._ensure_thread()
+
+    # Queueing
+
+    def _enqueue(self, kind: str, key: CollectionKey, payload: Dict[str, Any]):
+        self._queue.append((kind, key, payload))
+        if kind == "insert":
+            self._pending_inserts[(key[0], key[1], payload["_id"])] = payload
+        self.stats["queued"] += 1
+
+    def _submit(self, collection: Collection, kind: str, payload: Dict[str, Any]):
+        if self._closed:
+            raise RuntimeError("Write-behind buffer is closed")
+        key = (collection.database.name, collection.name)
+
+        if len(self._queue) >= self.max_pending:
+            # Backpressure: write the backlog on the caller's thread
+            self.flush()
+            if len(self._queue) >= self.max_pending:
+                raise WriteBufferFullError(f"{len(self._queue)} writes pending and the database is unavailable")
+
+        with self._lock:
+            self._collections.setdefault(key, collection)
+            if self._spool_file is not None:
+                self._spool({"kind": kind, "db": key[0], "coll": key[1], "payload": payload})
+            self._enqueue(kind, key, payload)
+        self._ensure_thread()
+
+    def insert(self, collection: Collection, document: Dict[str, Any]) -> ObjectId:
+        """
+        Queue a document insert.
+
+        Args:
+            collection: Target collection
+            document: Document to insert; an ``_id`` is assigned if missing
+
+        Returns:
+            The document's ``_id``
+        """
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        self._submit(collection, "insert", document)
+        return document["_id"]
+
+    def update(self, collection: Collection, query: Dict[str, Any],
+               update: Dict[str, Any], upsert: bool = False):
+        """
+        Queue a single-document update.
+
+        Args:
+            collection: Target collection
+            query: Filter selecting the document
+            update: Update operations
+            upsert: Whether to insert if the document doesn't exist
+        """
+        self._submit(collection, "update", {"filter": query, "update": update, "upsert": upsert})
+
+    def add_flush_listener(self, listener: Callable[[str, str], None]):
+        """
+        Register a callable run with the database and collection names after
+        writes to that collection are flushed (e.g. to invalidate caches).
+        """
+        with self._lock:
+            if listener not in self._flush_listeners:
+                self._flush_listeners.append(listener)
+
+    def _notify_flushed(self, key: CollectionKey):
+        for listener in list(self._flush_listeners):
+            try:
+                listener(*key)
+            except Exception as e:
+                logger.error(f"Write-behind flush listener failed: {e}")
+
+    def pending_document(self, collection: Collection, document_id: Any) -> Optional[Dict[str, Any]]:
+        """Get a queued insert that has not been written yet, for read-your-writes checks."""
+        return self._pending_inserts.get((collection.database.name, collection.name, document_id))
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    # Flushing
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None and not self._closed:
+                    self._thread = threading.Thread(
+                        target=self._flush_loop, name="write-behind", daemon=True
+                    )
+                    self._thread.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}")
+
+    def _collection(self, key: CollectionKey) -> Collection:
+        collection = self._collections.get(key)
+        if collection is None:
+            client = self._client or get_client()
+            collection = client[key[0]][key[1]]
+            self._collections[key] = collection
+        return collection
+
+    def _build_requests(self, operations) -> Dict[CollectionKey, List]:
+        inserts: Dict[CollectionKey, List] = {}
+        updates: Dict[CollectionKey, Dict[Tuple[str, bool], List[Dict[str, Any]]]] = {}
+
+        for kind, key, payload in operations:
+            if kind == "insert":
+                inserts.setdefault(key, []).append(InsertOne(payload))
+                continue
+            by_filter = updates.setdefault(key, {})
+            filter_key = (json_util.dumps(payload["filter"], sort_keys=True), payload["upsert"])
+            pending = by_filter.setdefault(filter_key, [])
+            merged = _merge_updates(pending[-1]["update"], payload["update"]) if pending else None
+            if merged is not None:
+                pending[-1] = dict(pending[-1], update=merged)
+                self.stats["merged"] += 1
+            else:
+                pending.append(payload)
+
+        requests: Dict[CollectionKey, List] = {}
+        for key in list(inserts) + [k for k in updates if k not in inserts]:
+            batch = list(inserts.get(key, []))
+            for pending in updates.get(key, {}).values():
+                batch.extend(
+                    UpdateOne(p["filter"], p["update"], upsert=p["upsert"]) for p in pending
+                )
+            requests[key] = batch
+        return requests
+
+    def flush(self) -> int:
+        """
+        Write all buffered operations.
+
+        Operations that fail with a transient error are put back at the
+        front of the buffer and retried on the next flush.
+
+        Returns:
+            Number of operations written
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._queue:
+                    return 0
+                operations = list(self._queue)
+                self._queue.clear()
+                segments = self._retry_segments + self._spool_segments
+                self._retry_segments = []
+                self._spool_segments = []
+                if self._spool_file is not None:
+                    self._spool_file.close()
+                    self._open_spool_segment()
+
+            written = 0
+            failed_keys = set()
+            requests = self._build_requests(operations)
+            for key, batch in requests.items():
+                try:
+                    # Unordered bulk writes send all inserts before any update
+                    self._collection(key).bulk_write(batch, ordered=False)
+                    written += len(batch)
+                    self._notify_flushed(key)
+                except BulkWriteError as e:
+                    errors = [
+                        error for error in e.details.get("writeErrors", [])
+                        if error.get("code") != DUPLICATE_KEY_ERROR
+                    ]
+                    written += len(batch) - len(errors)
+                    self.stats["failed"] += len(errors)
+                    for error in errors[:5]:
+                        logger.error(f"Write-behind write to {key[0]}.{key[1]} failed: {error.get('errmsg')}")
+                    self._notify_flushed(key)
+                except PyMongoError as e:
+                    logger.warning(f"Write-behind flush to {key[0]}.{key[1]} failed, will retry: {e}")
+                    failed_keys.add(key)
+
+            with self._lock:
+                retry = [op for op in operations if op[1] in failed_keys]
+                self._queue.extendleft(reversed(retry))
+                for kind, key, payload in operations:
+                    if kind == "insert" and key not in failed_keys:
+                        self._pending_inserts.pop((key[0], key[1], payload["_id"]), None)
+                if retry:
+                    self._retry_segments = segments
+            if not retry:
+                for path in segments:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+            self.stats["written"] += written
+            self.stats["flushes"] += 1
+            return written
+
+    def close(self, timeout: float = 10.0):
+        """Flush remaining operations and stop the background thread."""
+        if self._closed:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue and time.monotonic() < deadline:
+            if not self.flush() and self._queue:
+                time.sleep(0.1)
+        if self._queue:
+            logger.error(f"Write-behind buffer closed with {len(self._queue)} unwritten operations")
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+            # Keep only segments that still hold unwritten operations
+            if not self._queue:
+                for path in self._spool_segments:
+                    if os.path.exists(path) and os.path.getsize(path) == 0:
+                        os.remove(path)
+
+
+# Process-wide buffer
+_write_buffer: Optional[WriteBehindBuffer] = None
+_write_buffer_lock = threading.Lock()
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    """Get the process-wide write-behind buffer, creating it on first use."""
+    global _write_buffer
+    if _write_buffer is None:
+        with _write_buffer_lock:
+            if _write_buffer is None:
+                _write_buffer = WriteBehindBuffer(
+                    max_pending=int(os.environ.get("MATH_LLM_WRITE_BEHIND_MAX_PENDING", "10000")),
+                    flush_interval=float(os.environ.get("MATH_LLM_WRITE_BEHIND_INTERVAL", "0.2")),
+                    spool_dir=os.environ.get("MATH_LLM_WRITE_SPOOL_DIR") or None
+                )
+                atexit.register(_write_buffer.close)
+    return _write_buffer
+
+
+def close_write_buffer():
+    """Flush and close the process-wide buffer if it was created."""
+    if _write_buffer is not None:
+        _write_buffer.close()
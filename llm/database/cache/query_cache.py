@@ -0,0 +1,234 @@
+"""
+Read-through cache for repository query results.
+
+Results are keyed on the collection namespace and the normalized query,
+projection, sort and paging options, held for a bounded time in a bounded
+LRU, and invalidated per collection when the repositories write to it, when
+buffered writes are flushed, or when a change stream reports a change.
+"""
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple
+
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from database.optimization.query_keys import query_key
+from orchestration.monitoring.metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results with per-entry TTL.
+
+    Each collection namespace carries a generation counter that every
+    invalidation bumps; a load that started before an invalidation is not
+    cached, so a slow read cannot store data older than a concurrent write.
+
+    Args:
+        max_entries: Maximum cached results
+        ttl: Seconds a result stays valid
+        copy_results: Return deep copies so callers can modify results freely
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 30.0, copy_results: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.copy_results = copy_results
+
+        # key -> (expires_at, namespace, value)
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._keys_by_namespace: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._counters: Dict[Tuple[str, str], Any] = {}
+        self._watchers: Dict[str, threading.Thread] = {}
+
+    @staticmethod
+    def namespace(collection: Collection) -> str:
+        """Get the cache namespace of a collection."""
+        return collection.full_name
+
+    def _count(self, namespace: str, outcome: str):
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+        stats[outcome] += 1
+        counter = self._counters.get((namespace, outcome))
+        if counter is None:
+            counter = get_registry().counter(
+                f"database.cache.{outcome}",
+                f"Query cache {outcome}",
+                labels={"collection": namespace}
+            )
+            self._counters[(namespace, outcome)] = counter
+        counter.increment()
+
+    def get_or_load(self, collection: Collection, query: Optional[Dict[str, Any]],
+                    loader: Callable[[], Any],
+                    projection: Optional[Dict[str, Any]] = None,
+                    sort: Optional[List[Tuple[str, int]]] = None,
+                    **options) -> Any:
+        """
+        Get a cached query result, loading and caching it on a miss.
+
+        Args:
+            collection: Collection the query reads
+            query: Query filter
+            loader: Callable running the query
+            projection: Query projection
+            sort: Query sort
+            **options: Other parameters affecting the result (limit, skip, ...)
+
+        Returns:
+            The query result
+        """
+        namespace = self.namespace(collection)
+        key = query_key(namespace, query, projection, sort, **options)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._entries.move_to_end(key)
+                value = entry[2]
+                hit = True
+            else:
+                generation = self._generations.get(namespace, 0)
+                hit = False
+
+        if hit:
+            self._count(namespace, "hits")
+            return copy.deepcopy(value) if self.copy_results else value
+
+        self._count(namespace, "misses")
+        value = loader()
+
+        with self._lock:
+            if self._generations.get(namespace, 0) == generation:
+                self._store(key, namespace, value, time.monotonic() + self.ttl)
+        return value
+
+    def _store(self, key: str, namespace: str, value: Any, expires_at: float):
+        stored = copy.deepcopy(value) if self.copy_results else value
+        self._entries[key] = (expires_at, namespace, stored)
+        self._entries.move_to_end(key)
+        self._keys_by_namespace.setdefault(namespace, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, (_, old_namespace, _) = self._entries.popitem(last=False)
+            self._keys_by_namespace.get(old_namespace, set()).discard(old_key)
+
+    def invalidate(self, collection: Collection):
+        """Drop every cached result of a collection."""
+        self.invalidate_namespace(self.namespace(collection))
+
+    def invalidate_namespace(self, database_name: str, collection_name: Optional[str] = None):
+        """
+        Drop every cached result of a collection namespace.
+
+        Accepts either a full ``"db.collection"`` namespace or the database
+        and collection names, matching write-behind flush listeners.
+        """
+        namespace = database_name if collection_name is None else f"{database_name}.{collection_name}"
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in self._keys_by_namespace.pop(namespace, ()):
+                self._entries.pop(key, None)
+        self._count(namespace, "invalidations")
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            for namespace in self._keys_by_namespace:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._entries.clear()
+            self._keys_by_namespace.clear()
+
+    def watch(self, collection: Collection) -> bool:
+        """
+        Invalidate a collection from a change stream, catching writes made by other processes.
+
+        Change streams need a replica set; on other deployments this returns
+        False and invalidation relies on the repository write methods.
+
+        Returns:
+            True if a change stream was opened
+        """
+        namespace = self.namespace(collection)
+        if namespace in self._watchers:
+            return True
+        try:
+            stream = collection.watch()
+        except (PyMongoError, NotImplementedError) as e:
+            logger.debug(f"Change streams unavailable for {namespace}: {e}")
+            return False
+
+        def follow():
+            try:
+                with stream:
+                    for _ in stream:
+                        self.invalidate_namespace(namespace)
+            except PyMongoError as e:
+                logger.warning(f"Change stream for {namespace} stopped: {e}")
+                # Unseen changes may have been missed
+                self.invalidate_namespace(namespace)
+            finally:
+                self._watchers.pop(namespace, None)
+
+        thread = threading.Thread(target=follow, name=f"cache-watch-{namespace}", daemon=True)
+        self._watchers[namespace] = thread
+        thread.start()
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get hits, misses, invalidations and hit rate per collection."""
+        result = {}
+        for namespace, stats in list(self._stats.items()):
+            lookups = stats["hits"] + stats["misses"]
+            result[namespace] = dict(stats, hit_rate=stats["hits"] / lookups if lookups else 0.0)
+        return result
+
+
+def read_through(cache: Optional[QueryCache], collection: Collection,
+                 query: Optional[Dict[str, Any]], loader: Callable[[], Any], **kwargs) -> Any:
+    """Run a query through ``cache`` when one is configured, or directly otherwise."""
+    if cache is None:
+        return loader()
+    return cache.get_or_load(collection, query, loader, **kwargs)
+
+
+def invalidate(cache: Optional[QueryCache], *collections: Collection):
+    """Invalidate collections in ``cache`` when one is configured."""
+    if cache is not None:
+        for collection in collections:
+            cache.invalidate(collection)
+
+
+# Process-wide cache
+_query_cache: Optional[QueryCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Get the process-wide query cache, creating it on first use."""
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryCache(
+                    max_entries=int(os.environ.get("MATH_LLM_QUERY_CACHE_SIZE", "2048")),
+                    ttl=float(os.environ.get("MATH_LLM_QUERY_CACHE_TTL", "30"))
+                )
+    return _query_cache
@@ -0,0 +1,446 @@
+"""
+Background index advisor driven by sampled production queries.
+
+``QuerySampler`` is a driver command listener installed on the shared
+connection pool: it samples the filters of reads, updates and deletes,
+aggregates them by normalized query shape, and counts writes per collection.
+``IndexAdvisor`` periodically takes the shapes costing the most slow-query
+time, asks ``QueryOptimizer`` for index recommendations, and proposes them
+(dry run) or creates them (apply), within a budget on indexes per collection
+and on write amplification. Every change records the latency of its query
+shape before and after, so the effect of each index is measurable.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo import IndexModel, MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+from orchestration.monitoring.metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+# Commands whose filter can use an index, and the field holding it
+_READ_COMMANDS = {"find": "filter", "count": "query", "distinct": "query"}
+_WRITE_COMMANDS = {"insert": "documents", "update": "updates", "delete": "deletes"}
+
+
+def query_shape(query: Any) -> Any:
+    """
+    Normalize a query filter to its shape.
+
+    Values become ``"?"`` while field names and operators are kept, so
+    ``{"user_id": "a"}`` and ``{"user_id": "b"}`` share a shape.
+    """
+    if isinstance(query, dict):
+        shape = {}
+        for key, value in query.items():
+            if key in ("$and", "$or", "$nor") and isinstance(value, list):
+                shape[key] = [query_shape(item) for item in value]
+            elif isinstance(value, dict) and any(str(k).startswith("$") for k in value):
+                shape[key] = {op: "?" if op != "$not" else query_shape(v) for op, v in value.items()}
+            elif isinstance(value, dict):
+                shape[key] = query_shape(value)
+            else:
+                shape[key] = "?"
+        return dict(sorted(shape.items()))
+    return "?"
+
+
+def _sort_spec(sort: Any) -> Optional[List[Tuple[str, int]]]:
+    if not sort:
+        return None
+    return [(field, int(direction)) for field, direction in dict(sort).items()]
+
+
+class ShapeStats:
+    """Sampled executions of one query shape."""
+
+    def __init__(self, namespace: str, shape: Any, example: Dict[str, Any],
+                 sort: Optional[List[Tuple[str, int]]], window: int):
+        self.namespace = namespace
+        self.shape = shape
+        self.example = example
+        self.sort = sort
+        self.count = 0
+        self.slow_count = 0
+        self.total_ms = 0.0
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    def record(self, duration_ms: float, slow: bool):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.slow_count += slow
+        self.latencies.append(duration_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency summary of the recent samples."""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {"samples": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+        return {
+            "samples": len(ordered),
+            "mean_ms": sum(ordered) / len(ordered),
+            "p50_ms": ordered[len(ordered) // 2],
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        }
+
+
+class QuerySampler(monitoring.CommandListener):
+    """
+    Driver command listener sampling query shapes and write volume.
+
+    Args:
+        sample_rate: Fraction of reads recorded
+        slow_ms: Duration above which a query counts as slow
+        window: Recent latencies kept per shape
+        max_shapes: Maximum distinct shapes tracked
+    """
+
+    def __init__(self, sample_rate: float = 0.1, slow_ms: float = 100.0,
+                 window: int = 500, max_shapes: int = 1000):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.window = window
+        self.max_shapes = max_shapes
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[Any, int], List[Tuple[str, Any, Dict[str, Any], Any]]] = {}
+        self._shapes: Dict[str, ShapeStats] = {}
+        self._reads: Dict[str, int] = {}
+        self._writes: Dict[str, int] = {}
+        self._slow_counters: Dict[str, Any] = {}
+
+    # CommandListener interface
+
+    def started(self, event):
+        name = event.command_name
+        command = event.command
+        collection = command.get(name)
+        if not isinstance(collection, str):
+            return
+        namespace = f"{event.database_name}.{collection}"
+
+        if name in _WRITE_COMMANDS:
+            items = command.get(_WRITE_COMMANDS[name]) or []
+            with self._lock:
+                self._writes[namespace] = self._writes.get(namespace, 0) + len(items)
+            if name == "insert" or random.random() >= self.sample_rate:
+                return
+            # Update and delete filters are index lookups too
+            queries = [(item.get("q") or {}, None) for item in items[:1]]
+        elif name in _READ_COMMANDS:
+            with self._lock:
+                self._reads[namespace] = self._reads.get(namespace, 0) + 1
+            if random.random() >= self.sample_rate:
+                return
+            queries = [(command.get(_READ_COMMANDS[name]) or {}, command.get("sort"))]
+        else:
+            return
+
+        self._inflight[(event.connection_id, event.request_id)] = [
+            (namespace, query_shape(query), dict(query), _sort_spec(sort)) for query, sort in queries
+        ]
+
+    def succeeded(self, event):
+        sampled = self._inflight.pop((event.connection_id, event.request_id), None)
+        if sampled:
+            self.record(sampled, event.duration_micros / 1000.0)
+
+    def failed(self, event):
+        self._inflight.pop((event.connection_id, event.request_id), None)
+
+    # Aggregation
+
+    def record(self, sampled: List[Tuple[str, Any, Dict[str, Any], Any]], duration_ms: float):
+        """Record the duration of sampled queries."""
+        slow = duration_ms > self.slow_ms
+        for namespace, shape, example, sort in sampled:
+            key = self.shape_key(namespace, shape, sort)
+            with self._lock:
+                stats = self._shapes.get(key)
+                if stats is None:
+                    if len(self._shapes) >= self.max_shapes:
+                        continue
+                    stats = self._shapes[key] = ShapeStats(namespace, shape, example, sort, self.window)
+                stats.record(duration_ms, slow)
+            if slow:
+                self._slow_counter(namespace).increment()
+
+    @staticmethod
+    def shape_key(namespace: str, shape: Any, sort: Optional[List[Tuple[str, int]]]) -> str:
+        """Get the aggregation key of a query shape."""
+        return f"{namespace}:{json.dumps([shape, sort], sort_keys=True)}"
+
+    def _slow_counter(self, namespace: str):
+        counter = self._slow_counters.get(namespace)
+        if counter is None:
+            counter = get_registry().counter(
+                "database.slow_queries", "Sampled slow queries", labels={"collection": namespace}
+            )
+            self._slow_counters[namespace] = counter
+        return counter
+
+    def top_offenders(self, limit: int = 5, min_samples: int = 20) -> List[Tuple[str, ShapeStats]]:
+        """Get the shapes with the most slow-query time."""
+        with self._lock:
+            candidates = [
+                (key, stats) for key, stats in self._shapes.items()
+                if stats.slow_count and stats.count >= min_samples
+            ]
+        candidates.sort(key=lambda item: item[1].slow_count * item[1].total_ms / item[1].count, reverse=True)
+        return candidates[:limit]
+
+    def shape(self, key: str) -> Optional[ShapeStats]:
+        """Get the statistics of a shape."""
+        return self._shapes.get(key)
+
+    def reset_shape(self, key: str):
+        """Start a fresh latency window for a shape."""
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is not None:
+                self._shapes[key] = ShapeStats(stats.namespace, stats.shape, stats.example, stats.sort, self.window)
+
+    def write_ratio(self, namespace: str) -> float:
+        """Fraction of a collection's commands that are writes."""
+        reads = self._reads.get(namespace, 0)
+        writes = self._writes.get(namespace, 0)
+        return writes / (reads + writes) if reads + writes else 0.0
+
+    def slow_query_count(self) -> int:
+        """Total sampled slow queries across shapes."""
+        with self._lock:
+            return sum(stats.slow_count for stats in self._shapes.values())
+
+
+class IndexAdvisor:
+    """
+    Propose or create indexes for the slowest sampled query shapes.
+
+    Args:
+        client: MongoDB client the queries run on
+        sampler: QuerySampler installed on that client
+        optimizer: QueryOptimizer producing recommendations
+        apply: Create indexes instead of only proposing them
+        interval: Seconds between runs of the background loop
+        top_n: Shapes considered per run
+        min_samples: Samples a shape needs before it is considered, and
+            before an applied change is measured
+        max_indexes_per_collection: Budget of secondary indexes per collection
+        max_write_amplification: Budget on write ratio times index writes per
+            document write; write-heavy collections get fewer indexes
+    """
+
+    def __init__(self, client: MongoClient, sampler: QuerySampler, optimizer=None,
+                 apply: bool = False, interval: float = 300.0, top_n: int = 5,
+                 min_samples: int = 20, max_indexes_per_collection: int = 10,
+                 max_write_amplification: float = 2.0):
+        if optimizer is None:
+            from database.optimization.query_optimizer import QueryOptimizer
+            optimizer = QueryOptimizer(client)
+        self.client = client
+        self.sampler = sampler
+        self.optimizer = optimizer
+        self.apply = apply
+        self.interval = interval
+        self.top_n = top_n
+        self.min_samples = min_samples
+        self.max_indexes_per_collection = max_indexes_per_collection
+        self.max_write_amplification = max_write_amplification
+
+        self.changes: List[Dict[str, Any]] = []
+        self._proposed: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _collection(self, namespace: str):
+        database_name, collection_name = namespace.split(".", 1)
+        return self.client[database_name][collection_name]
+
+    @staticmethod
+    def _covered(index_keys: List[List[Tuple[str, int]]], keys: List[Tuple[str, int]]) -> bool:
+        # An existing index serves the query if the recommendation is its prefix
+        return any(existing[:len(keys)] == keys for existing in index_keys)
+
+    def _check_budget(self, namespace: str, secondary_indexes: int) -> Optional[str]:
+        if secondary_indexes >= self.max_indexes_per_collection:
+            return f"collection already has {secondary_indexes} secondary indexes"
+        amplification = self.sampler.write_ratio(namespace) * (secondary_indexes + 2)
+        if amplification > self.max_write_amplification:
+            return f"write amplification {amplification:.2f} would exceed {self.max_write_amplification}"
+        return None
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        """
+        Review the top offenders once.
+
+        Returns:
+            Changes proposed or applied in this run
+        """
+        self._measure()
+        made = []
+        for key, stats in self.sampler.top_offenders(self.top_n, self.min_samples):
+            if any(change["shape_key"] == key for change in self.changes):
+                continue
+            collection = self._collection(stats.namespace)
+            try:
+                index_keys = [
+                    [(field, int(direction)) for field, direction in info["key"]]
+                    for name, info in collection.index_information().items() if name != "_id_"
+                ]
+                explain_plan = self.optimizer._get_explain_plan(collection, stats.example, None, stats.sort)
+                recommendations = self.optimizer._recommend_indexes(collection, stats.example, stats.sort)
+            except PyMongoError as e:
+                logger.warning(f"Index advisor could not inspect {stats.namespace}: {e}")
+                continue
+            if not recommendations:
+                continue
+
+            # The compound recommendation, when there is one, serves equality and range together
+            recommendation = recommendations[-1]
+            keys = [(field, int(direction)) for field, direction in recommendation["keys"]]
+            if explain_plan and not self.optimizer._check_needs_index(explain_plan):
+                continue
+            if self._covered(index_keys, keys):
+                continue
+
+            change = {
+                "shape_key": key,
+                "collection": stats.namespace,
+                "shape": stats.shape,
+                "keys": keys,
+                "name": recommendation["name"],
+                "reason": recommendation["reason"],
+                "before": dict(stats.summary(), slow_count=stats.slow_count, count=stats.count),
+                "after": None,
+                "status": "proposed",
+                "at": time.time(),
+            }
+            skipped = self._check_budget(stats.namespace, len(index_keys))
+            if skipped:
+                change["status"] = "over_budget"
+                change["detail"] = skipped
+            elif self.apply:
+                try:
+                    collection.create_indexes([IndexModel(keys, name=recommendation["name"])])
+                    change["status"] = "applied"
+                    # Measure the shape afresh against the new index
+                    self.sampler.reset_shape(key)
+                    logger.info(f"Index advisor created {recommendation['name']} on {stats.namespace}")
+                except PyMongoError as e:
+                    change["status"] = "failed"
+                    change["detail"] = str(e)
+                    logger.error(f"Index advisor failed to create {recommendation['name']}: {e}")
+
+            if change["status"] in ("proposed", "over_budget"):
+                # Proposals are refreshed each run rather than accumulated
+                self._proposed[(stats.namespace, change["name"])] = change
+            else:
+                self.changes.append(change)
+            made.append(change)
+        return made
+
+    def _measure(self):
+        for change in self.changes:
+            if change["status"] != "applied" or change["after"] is not None:
+                continue
+            stats = self.sampler.shape(change["shape_key"])
+            if stats is None or stats.count < self.min_samples:
+                continue
+            after = dict(stats.summary(), slow_count=stats.slow_count, count=stats.count)
+            change["after"] = after
+            before_mean = change["before"]["mean_ms"]
+            change["improvement"] = 1 - after["mean_ms"] / before_mean if before_mean else 0.0
+            change["slow_rate_before"] = change["before"]["slow_count"] / max(change["before"]["count"], 1)
+            change["slow_rate_after"] = after["slow_count"] / max(after["count"], 1)
+
+    def report(self) -> Dict[str, Any]:
+        """Get proposals, applied changes and their measured effect."""
+        self._measure()
+        return {
+            "mode": "apply" if self.apply else "dry_run",
+            "slow_queries": self.sampler.slow_query_count(),
+            "proposals": list(self._proposed.values()),
+            "changes": self.changes,
+        }
+
+    def start(self):
+        """Run the advisor periodically on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Index advisor run failed: {e}")
+
+        self._thread = threading.Thread(target=loop, name="index-advisor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background loop."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Process-wide sampler and advisor
+_sampler: Optional[QuerySampler] = None
+_advisor: Optional[IndexAdvisor] = None
+_lock = threading.Lock()
+
+
+def get_query_sampler() -> Optional[QuerySampler]:
+    """
+    Get the process-wide query sampler.
+
+    Sampling is enabled by ``MATH_LLM_QUERY_SAMPLE_RATE`` (a fraction above
+    zero); returns None when it is disabled.
+    """
+    global _sampler
+    rate = float(os.environ.get("MATH_LLM_QUERY_SAMPLE_RATE", "0"))
+    if rate <= 0:
+        return None
+    if _sampler is None:
+        with _lock:
+            if _sampler is None:
+                _sampler = QuerySampler(
+                    sample_rate=rate,
+                    slow_ms=float(os.environ.get("MATH_LLM_SLOW_QUERY_MS", "100"))
+                )
+    return _sampler
+
+
+def get_index_advisor() -> Optional[IndexAdvisor]:
+    """
+    Get the process-wide index advisor, or None when query sampling is disabled.
+
+    ``MATH_LLM_INDEX_ADVISOR`` selects ``dry_run`` (default) or ``apply``, and
+    ``MATH_LLM_INDEX_ADVISOR_INTERVAL`` the seconds between runs.
+    """
+    global _advisor
+    sampler = get_query_sampler()
+    if sampler is None:
+        return None
+    if _advisor is None:
+        from database.access.connection_pool import get_client
+        with _lock:
+            if _advisor is None:
+                _advisor = IndexAdvisor(
+                    get_client(),
+                    sampler,
+                    apply=os.environ.get("MATH_LLM_INDEX_ADVISOR", "dry_run") == "apply",
+                    interval=float(os.environ.get("MATH_LLM_INDEX_ADVISOR_INTERVAL", "300"))
+                )
+    return _advisor
@@ -0,0 +1,65 @@
+"""
+Query normalization shared by the query optimizer and the query result cache.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+
+def normalize_for_key(obj: Any) -> Any:
+    """
+    Normalize an object for use in a cache key.
+    
+    Dictionaries are sorted by key and tuples become lists, so equivalent
+    queries normalize identically. Values that are not JSON types keep their
+    type in the key (an ObjectId becomes {"$oid": ...}, as in extended JSON),
+    since MongoDB does not match them against their string form.
+    
+    Args:
+        obj: Object to normalize
+        
+    Returns:
+        Normalized object suitable for hashing
+    """
+    if isinstance(obj, dict):
+        return {k: normalize_for_key(v) for k, v in sorted(obj.items())}
+    elif isinstance(obj, (list, tuple)):
+        return [normalize_for_key(item) for item in obj]
+    elif isinstance(obj, ObjectId):
+        return {"$oid": str(obj)}
+    elif isinstance(obj, datetime):
+        return {"$date": obj.isoformat()}
+    elif obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    elif callable(obj):
+        return str(obj)
+    else:
+        return {f"${type(obj).__name__}": str(obj)}
+
+
+def query_key(namespace: str, query: Optional[Dict[str, Any]],
+              projection: Optional[Dict[str, Any]] = None,
+              sort: Optional[List[Tuple[str, int]]] = None,
+              **options) -> str:
+    """
+    Build a deterministic key for a query.
+    
+    Args:
+        namespace: Collection namespace (e.g. "db.collection")
+        query: Query filter
+        projection: Query projection
+        sort: Query sort
+        **options: Other parameters affecting the result (limit, skip, ...)
+        
+    Returns:
+        String key for the query
+    """
+    normalized = {
+        "query": normalize_for_key(query or {}),
+        "projection": normalize_for_key(projection) if projection else None,
+        "sort": normalize_for_key(sort) if sort else None,
+        "options": normalize_for_key(options)
+    }
+    return f"{namespace}:{json.dumps(normalized, sort_keys=True, default=str)}"
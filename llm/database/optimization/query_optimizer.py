@@ -12,7 +12,8 @@ from pymongo.collection import Collection
 from pymongo.cursor import Cursor
 from bson import ObjectId, json_util
 import numpy as np
-from math_llm_system.orchestration.monitoring.logger import get_logger
+from orchestration.monitoring.logger import get_logger
+from .query_keys import normalize_for_key
 
 logger = get_logger("database.query_optimizer")
 
@@ -769,16 +770,7 @@ class QueryOptimizer:
         Returns:
             Normalized object suitable for hashing
         """
-        if isinstance(obj, dict):
-            return {k: self._normalize_for_key(v) for k, v in sorted(obj.items())}
-        elif isinstance(obj, list):
-            return [self._normalize_for_key(item) for item in obj]
-        elif isinstance(obj, ObjectId):
-            return str(obj)
-        elif callable(obj):
-            return str(obj)
-        else:
-            return obj
+        return normalize_for_key(obj)
     
     def _stringify_for_storage(self, obj: Any) -> Any:
         """
@@ -6,9 +6,10 @@ This module handles database schema initialization, migrations, and validation.
 import logging
 import datetime
 from typing import Dict, Any, List, Optional
-from pymongo import MongoClient, ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
 
 from config.mongodb_config import get_mongo_config, get_collection_name
+from database.access.connection_pool import get_client
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +36,8 @@ class SchemaManager:
         if db_name:
             mongo_config["database"] = db_name
         
-        # Connect to database
-        self.client = MongoClient(mongo_config["uri"], **mongo_config.get("options", {}))
+        # Connect to database through the shared pool
+        self.client = get_client(mongo_config["uri"], **mongo_config.get("options", {}))
         self.db = self.client[mongo_config["database"]]
         
         # Define schema versions
@@ -188,7 +189,9 @@ class SchemaManager:
             ],
             "interactions": [
                 IndexModel([("conversation_id", ASCENDING)]),
-                IndexModel([("timestamp", DESCENDING)])
+                IndexModel([("timestamp", DESCENDING)]),
+                # Keyset pages of a conversation's interactions
+                IndexModel([("conversation_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)])
             ],
             "math_expressions": [
                 IndexModel([("conversation_id", ASCENDING)]),
@@ -202,7 +205,10 @@ class SchemaManager:
             ],
             "visualizations": [
                 IndexModel([("conversation_id", ASCENDING)]),
-                IndexModel([("created_at", DESCENDING)])
+                IndexModel([("created_at", DESCENDING)]),
+                # Keyset pages of all visualizations and of an interaction's visualizations
+                IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+                IndexModel([("interaction_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
             ],
             "math_knowledge": [
                 IndexModel([("domain", ASCENDING)]),
@@ -0,0 +1,111 @@
+"""
+Unit tests for the shared MongoDB connection pool and async repositories.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from database.access import connection_pool
+from database.access.connection_pool import AsyncRepository, get_client
+from database.access.mongodb_wrapper import MongoDBWrapper
+from orchestration.monitoring.profiling import start_request_profile, end_request_profile
+
+try:
+    import mongomock
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+URI = "mongodb://localhost:27017"
+
+
+@unittest.skipUnless(MONGOMOCK_AVAILABLE, "mongomock is not installed")
+class TestSharedPool(unittest.TestCase):
+    """Tests for process-wide client sharing."""
+
+    def setUp(self):
+        connection_pool.set_client_factory(mongomock.MongoClient)
+        self.addCleanup(connection_pool.close_clients)
+
+    def test_clients_are_shared(self):
+        """Test that the same URI and options reuse one client."""
+        self.assertIs(get_client(URI), get_client(URI))
+        self.assertIsNot(get_client(URI), get_client(URI, maxPoolSize=3))
+
+    def test_wrappers_share_pool(self):
+        """Test that wrappers use the shared client and closing one keeps it open."""
+        first = MongoDBWrapper(URI, database_name="pool_test")
+        second = MongoDBWrapper(URI, database_name="pool_test")
+        self.assertIs(first.get_client(), second.get_client())
+
+        first.insert_one("items", {"name": "a"})
+        first.close()
+        self.assertEqual(second.find_one("items", {"name": "a"})["name"], "a")
+
+
+@unittest.skipUnless(MONGOMOCK_AVAILABLE, "mongomock is not installed")
+class TestAsyncRepository(unittest.IsolatedAsyncioTestCase):
+    """Tests for the AsyncRepository class."""
+
+    def setUp(self):
+        connection_pool.set_client_factory(mongomock.MongoClient)
+        self.addCleanup(connection_pool.close_clients)
+        self.wrapper = MongoDBWrapper(URI, database_name="async_test")
+        self.repository = AsyncRepository(self.wrapper)
+
+    async def test_round_trip(self):
+        """Test that async methods return the synchronous results."""
+        await self.repository.insert_one("items", {"name": "x", "value": 1})
+        document = await self.repository.find_one("items", {"name": "x"})
+        self.assertEqual(document["value"], 1)
+        self.assertEqual(self.repository.database_name, "async_test")
+
+    async def test_runs_off_event_loop(self):
+        """Test that a slow call does not block other coroutines."""
+        loop_thread = threading.get_ident()
+        call_threads = []
+
+        def slow_call():
+            call_threads.append(threading.get_ident())
+            time.sleep(0.2)
+            return "done"
+
+        self.wrapper.slow_call = slow_call
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            self.assertEqual(await self.repository.slow_call(), "done")
+        finally:
+            ticking.cancel()
+
+        self.assertNotEqual(call_threads[0], loop_thread)
+        self.assertGreater(ticks, 5)
+
+    async def test_errors_and_context_propagate(self):
+        """Test that exceptions and the request profile reach the caller."""
+        profile, token = start_request_profile()
+        try:
+            await self.repository.find_one("items", {"name": "missing"})
+        finally:
+            end_request_profile(token)
+        self.assertIn("mongo_query", profile.to_dict()["sections"])
+
+        def failing():
+            raise ValueError("boom")
+
+        self.wrapper.failing = failing
+        with self.assertRaises(ValueError):
+            await self.repository.failing()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Unit tests for query sampling and the index advisor.
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from database.optimization.index_advisor import IndexAdvisor, QuerySampler, query_shape
+
+try:
+    import mongomock
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+
+def _event(request_id, command_name, command, duration_ms=0.0, database="db"):
+    return SimpleNamespace(
+        command_name=command_name,
+        command=command,
+        database_name=database,
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        duration_micros=int(duration_ms * 1000),
+    )
+
+
+class TestQuerySampler(unittest.TestCase):
+    """Tests for the QuerySampler class."""
+
+    def setUp(self):
+        self.sampler = QuerySampler(sample_rate=1.0, slow_ms=50)
+        self.request_id = 0
+
+    def run_command(self, command_name, command, duration_ms):
+        self.request_id += 1
+        self.sampler.started(_event(self.request_id, command_name, command))
+        self.sampler.succeeded(_event(self.request_id, command_name, command, duration_ms))
+
+    def test_query_shape(self):
+        """Test that values are erased but fields and operators kept."""
+        self.assertEqual(
+            query_shape({"b": 1, "a": {"$gt": 5}, "$or": [{"c": "x"}, {"d": {"e": 1}}]}),
+            {"$or": [{"c": "?"}, {"d": {"e": "?"}}], "a": {"$gt": "?"}, "b": "?"}
+        )
+
+    def test_aggregates_by_shape(self):
+        """Test that queries differing only in values share statistics."""
+        for i in range(30):
+            self.run_command("find", {"find": "items", "filter": {"user_id": str(i)}}, 80 if i % 2 else 10)
+        self.run_command("find", {"find": "items", "filter": {"name": "x"}}, 200)
+
+        (key, stats), = self.sampler.top_offenders(min_samples=20)
+        self.assertEqual(stats.shape, {"user_id": "?"})
+        self.assertEqual((stats.count, stats.slow_count), (30, 15))
+        self.assertEqual(self.sampler.slow_query_count(), 16)
+
+    def test_write_ratio(self):
+        """Test that writes are counted per document."""
+        self.run_command("insert", {"insert": "items", "documents": [{}, {}, {}]}, 1)
+        self.run_command("find", {"find": "items", "filter": {}}, 1)
+        self.assertAlmostEqual(self.sampler.write_ratio("db.items"), 0.75)
+        self.assertEqual(self.sampler.write_ratio("db.other"), 0.0)
+
+
+@unittest.skipUnless(MONGOMOCK_AVAILABLE, "mongomock is not installed")
+class TestIndexAdvisor(unittest.TestCase):
+    """Tests for the IndexAdvisor class."""
+
+    def setUp(self):
+        self.client = mongomock.MongoClient()
+        self.collection = self.client.db.items
+        self.sampler = QuerySampler(sample_rate=1.0, slow_ms=50)
+        self.shape = [("db.items", {"user_id": "?"}, {"user_id": "u1"}, [("created_at", -1)])]
+
+    def record(self, count, duration_ms):
+        for _ in range(count):
+            self.sampler.record(self.shape, duration_ms)
+
+    def test_dry_run_only_proposes(self):
+        """Test that dry-run mode leaves the collection unchanged."""
+        self.record(30, 120)
+        advisor = IndexAdvisor(self.client, self.sampler, min_samples=20)
+        proposals = advisor.run_once()
+
+        self.assertEqual(len(proposals), 1)
+        self.assertEqual(proposals[0]["status"], "proposed")
+        self.assertEqual(proposals[0]["keys"], [("user_id", 1), ("created_at", -1)])
+        self.assertLessEqual(set(self.collection.index_information()), {"_id_"})
+        self.assertEqual(len(advisor.report()["proposals"]), 1)
+
+    def test_apply_tracks_before_and_after(self):
+        """Test that an applied index is measured against the latency before it."""
+        self.record(30, 120)
+        advisor = IndexAdvisor(self.client, self.sampler, apply=True, min_samples=20)
+        change, = advisor.run_once()
+        self.assertEqual(change["status"], "applied")
+        self.assertIn(change["name"], self.collection.index_information())
+
+        # The shape is measured afresh after the change
+        self.record(25, 5)
+        report = advisor.report()
+        change, = report["changes"]
+        self.assertEqual(change["before"]["slow_count"], 30)
+        self.assertEqual(change["after"]["slow_count"], 0)
+        self.assertGreater(change["improvement"], 0.9)
+        self.assertEqual(advisor.run_once(), [])
+
+    def test_budgets(self):
+        """Test that write-heavy or fully indexed collections get no new index."""
+        self.record(30, 120)
+        self.collection.create_index("name")
+        self.collection.create_index("tags")
+        self.sampler._writes["db.items"] = 1000
+        self.sampler._reads["db.items"] = 100
+        advisor = IndexAdvisor(self.client, self.sampler, apply=True, min_samples=20)
+        change, = advisor.run_once()
+        self.assertEqual(change["status"], "over_budget")
+        self.assertIn("write amplification", change["detail"])
+        self.assertEqual(len(self.collection.index_information()), 3)
+
+        self.sampler._writes.clear()
+        advisor = IndexAdvisor(self.client, self.sampler, apply=True, min_samples=20,
+                               max_indexes_per_collection=2)
+        self.assertEqual(advisor.run_once()[0]["status"], "over_budget")
+
+
+if __name__ == "__main__":
+    unittest.main()
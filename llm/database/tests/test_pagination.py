@@ -0,0 +1,126 @@
+"""
+Unit tests for projected, keyset-paginated and streamed repository reads.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+
+from database.access.pagination import InvalidCursorError, decode_cursor, keyset_query
+
+try:
+    import mongomock
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+if MONGOMOCK_AVAILABLE:
+    from database.access import connection_pool
+    from database.access.connection_pool import AsyncRepository
+    from database.access.mongodb_wrapper import MongoDBWrapper
+    from database.access.conversation_repository import ConversationRepository
+    from database.access.visualization_repository import VisualizationRepository
+    from database.cache.query_cache import QueryCache
+
+
+class TestCursors(unittest.TestCase):
+    """Tests for cursor handling."""
+
+    def test_invalid_cursor(self):
+        """Test that malformed cursors raise InvalidCursorError."""
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor("not a cursor")
+        with self.assertRaises(InvalidCursorError):
+            keyset_query({}, "created_at", -1, "e30")
+
+    def test_first_page_query_is_unchanged(self):
+        """Test that no cursor leaves the query as it is."""
+        self.assertEqual(keyset_query({"a": 1}, "created_at", -1, None), {"a": 1})
+
+
+@unittest.skipUnless(MONGOMOCK_AVAILABLE, "mongomock is not installed")
+class TestPagedReads(unittest.TestCase):
+    """Tests for repository pages and streams."""
+
+    def setUp(self):
+        connection_pool.set_client_factory(mongomock.MongoClient)
+        self.addCleanup(connection_pool.close_clients)
+        self.repository = VisualizationRepository(query_cache=QueryCache())
+        self.collection = self.repository.visualizations
+
+        # Pairs of documents share a timestamp, so pages must break ties on _id
+        base = datetime(2024, 1, 1)
+        self.collection.insert_many([
+            {
+                "visualization_type": "function_2d",
+                "parameters": {"expression": f"x^{i}"},
+                "metadata": {"blob": "x" * 100},
+                "file_path": f"/tmp/missing-{i}.png",
+                "interaction_id": "i1" if i % 3 else "i2",
+                "created_at": base + timedelta(seconds=i // 2),
+            }
+            for i in range(25)
+        ])
+
+    def _all_pages(self, **kwargs):
+        items, cursor, pages = [], None, 0
+        while True:
+            page = self.repository.get_visualizations_page(cursor=cursor, **kwargs)
+            items.extend(page["items"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return items, pages
+
+    def test_pages_cover_every_document_once_in_order(self):
+        """Test that keyset pages return each document once, newest first."""
+        items, pages = self._all_pages(limit=4)
+        self.assertEqual(pages, 7)
+        self.assertEqual(len({item["_id"] for item in items}), 25)
+        keys = [(item["created_at"], item["_id"]) for item in items]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+        items, _ = self._all_pages(interaction_id="i2", limit=2)
+        self.assertEqual(len(items), 9)
+
+    def test_projection(self):
+        """Test that only the requested fields are read."""
+        page = self.repository.get_visualizations_page(limit=3, fields=["visualization_type"])
+        self.assertEqual(set(page["items"][0]), {"_id", "visualization_type", "created_at"})
+
+        recent = self.repository.get_recent_visualizations(2, fields=["file_path"])
+        self.assertNotIn("parameters", recent[0])
+        self.assertFalse(recent[0]["file_exists"])
+
+    def test_stream(self):
+        """Test that streaming through the async view yields every document."""
+        repository = AsyncRepository(self.repository)
+
+        async def collect():
+            return [
+                item["_id"] async for item in
+                repository.stream_visualizations(fields=["visualization_type"], batch_size=7)
+            ]
+
+        streamed = asyncio.run(collect())
+        self.assertEqual(len(set(streamed)), 25)
+        self.assertEqual(streamed, [item["_id"] for item in self._all_pages(limit=25)[0]])
+
+    def test_interaction_pages(self):
+        """Test paging a conversation's interactions."""
+        wrapper = MongoDBWrapper("mongodb://localhost:27017", database_name="pagination_test")
+        conversations = ConversationRepository(wrapper)
+        conversation_id = conversations.create_conversation("user")
+        for i in range(5):
+            conversations.add_interaction(conversation_id, {"text": str(i)}, {"text": "answer"})
+
+        first = conversations.get_interactions_page(conversation_id, limit=3, fields=["user_input"])
+        second = conversations.get_interactions_page(conversation_id, limit=3, cursor=first["next_cursor"])
+        self.assertEqual([len(first["items"]), len(second["items"])], [3, 2])
+        self.assertIsNone(second["next_cursor"])
+        self.assertNotIn("system_response", first["items"][0])
+        self.assertEqual(second["items"][0]["conversation_id"], conversation_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Unit tests for the read-through query cache.
+"""
+
+import time
+import unittest
+
+from bson import ObjectId
+
+from database.cache.query_cache import QueryCache
+
+try:
+    import mongomock
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+if MONGOMOCK_AVAILABLE:
+    from database.access import connection_pool
+    from database.access.visualization_repository import VisualizationRepository
+    from database.access.write_behind import WriteBehindBuffer
+
+
+class FakeCollection:
+    """Stand-in exposing the collection namespace used by the cache."""
+
+    def __init__(self, full_name: str):
+        self.full_name = full_name
+
+
+class TestQueryCache(unittest.TestCase):
+    """Tests for the QueryCache class."""
+
+    def setUp(self):
+        self.cache = QueryCache(max_entries=3, ttl=60)
+        self.items = FakeCollection("db.items")
+        self.loads = 0
+
+    def _load(self, value="result"):
+        def loader():
+            self.loads += 1
+            return {"value": value}
+        return loader
+
+    def test_keyed_on_normalized_query(self):
+        """Test that key order is ignored but projection, sort and limit are not."""
+        self.cache.get_or_load(self.items, {"a": 1, "b": 2}, self._load())
+        self.cache.get_or_load(self.items, {"b": 2, "a": 1}, self._load())
+        self.assertEqual(self.loads, 1)
+
+        self.cache.get_or_load(self.items, {"a": 1, "b": 2}, self._load(), projection={"a": 1})
+        self.cache.get_or_load(self.items, {"a": 1, "b": 2}, self._load(), sort=[("a", -1)])
+        self.cache.get_or_load(self.items, {"a": 1, "b": 2}, self._load(), limit=5)
+        self.assertEqual(self.loads, 4)
+
+        stats = self.cache.stats()["db.items"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 4))
+        self.assertAlmostEqual(stats["hit_rate"], 0.2)
+
+    def test_keys_keep_value_types(self):
+        """Test that an ObjectId and its string form are cached separately."""
+        object_id = ObjectId()
+        self.cache.get_or_load(self.items, {"_id": object_id}, self._load("document"))
+        result = self.cache.get_or_load(self.items, {"_id": str(object_id)}, self._load(None))
+
+        self.assertEqual(result, {"value": None})
+        self.assertEqual(self.loads, 2)
+        self.cache.get_or_load(self.items, {"_id": ObjectId(str(object_id))}, self._load())
+        self.assertEqual(self.loads, 2)
+
+    def test_results_are_copies(self):
+        """Test that callers cannot modify cached results."""
+        first = self.cache.get_or_load(self.items, {}, self._load())
+        first["value"] = "changed"
+        self.assertEqual(self.cache.get_or_load(self.items, {}, self._load())["value"], "result")
+
+    def test_ttl_and_size_bounds(self):
+        """Test that entries expire and the oldest are evicted."""
+        cache = QueryCache(max_entries=2, ttl=0.05)
+        for i in range(3):
+            cache.get_or_load(self.items, {"i": i}, self._load())
+        self.assertEqual(len(cache), 2)
+
+        time.sleep(0.06)
+        cache.get_or_load(self.items, {"i": 2}, self._load())
+        self.assertEqual(self.loads, 4)
+
+    def test_invalidation(self):
+        """Test that invalidating a collection drops only its entries."""
+        other = FakeCollection("db.other")
+        self.cache.get_or_load(self.items, {}, self._load())
+        self.cache.get_or_load(other, {}, self._load())
+
+        self.cache.invalidate(self.items)
+        self.cache.get_or_load(self.items, {}, self._load())
+        self.cache.get_or_load(other, {}, self._load())
+        self.assertEqual(self.loads, 3)
+
+    def test_load_racing_a_write_is_not_cached(self):
+        """Test that a result loaded across an invalidation is not stored."""
+        def loader():
+            self.cache.invalidate_namespace("db", "items")
+            return "stale"
+
+        self.assertEqual(self.cache.get_or_load(self.items, {}, loader), "stale")
+        self.assertEqual(len(self.cache), 0)
+
+
+@unittest.skipUnless(MONGOMOCK_AVAILABLE, "mongomock is not installed")
+class TestRepositoryCaching(unittest.TestCase):
+    """Tests for repository reads through the cache."""
+
+    def setUp(self):
+        connection_pool.set_client_factory(mongomock.MongoClient)
+        self.addCleanup(connection_pool.close_clients)
+        self.cache = QueryCache()
+
+    def test_writes_invalidate_reads(self):
+        """Test that storing a visualization invalidates cached listings."""
+        repository = VisualizationRepository(query_cache=self.cache)
+        self.assertEqual(repository.get_recent_visualizations(), [])
+
+        repository.store_visualization("function_2d", {}, "/tmp/missing.png")
+        self.assertEqual(len(repository.get_recent_visualizations()), 1)
+
+    def test_flushes_invalidate_reads(self):
+        """Test that buffered writes invalidate the cache when flushed."""
+        buffer = WriteBehindBuffer(flush_interval=60)
+        self.addCleanup(buffer.close)
+        repository = VisualizationRepository(write_buffer=buffer, query_cache=self.cache)
+
+        repository.store_visualization("function_2d", {}, "/tmp/missing.png", interaction_id="i1")
+        self.assertEqual(repository.get_visualizations_by_interaction("i1"), [])
+
+        buffer.flush()
+        self.assertEqual(len(repository.get_visualizations_by_interaction("i1")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
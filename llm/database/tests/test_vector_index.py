@@ -0,0 +1,164 @@
+"""
+Unit tests for expression fingerprints and the vector index.
+"""
+
+import tempfile
+import unittest
+
+import numpy as np
+
+from database.vector.fingerprint import fingerprint
+from database.vector.ivf_index import VectorIndex
+
+try:
+    import mongomock
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+if MONGOMOCK_AVAILABLE:
+    from database.access import connection_pool
+    from database.access.mongodb_wrapper import MongoDBWrapper
+    from database.access.expression_repository import ExpressionRepository
+
+
+def _clustered_vectors(count: int, dim: int = 32, clusters: int = 50, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=count)] + 0.3 * rng.normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+class TestFingerprint(unittest.TestCase):
+    """Tests for structural fingerprints."""
+
+    def test_variable_names_are_ignored(self):
+        """Test that renaming variables keeps the fingerprint."""
+        np.testing.assert_allclose(fingerprint(r"x^2 + 2x + 1"), fingerprint(r"t^2 + 2t + 1"))
+
+    def test_structure_drives_similarity(self):
+        """Test that structurally close expressions score higher."""
+        query = fingerprint(r"\int_0^1 x^2 \, dx")
+        close = fingerprint(r"\int_0^2 t^2 dt")
+        far = fingerprint(r"\frac{a}{b} + \sin(\theta)")
+        self.assertGreater(query @ close, query @ far)
+        self.assertAlmostEqual(float(np.linalg.norm(query)), 1.0, places=5)
+
+
+class TestVectorIndex(unittest.TestCase):
+    """Tests for the VectorIndex class."""
+
+    def test_exact_search_before_training(self):
+        """Test that an untrained index returns the exact nearest rows."""
+        vectors = _clustered_vectors(200)
+        index = VectorIndex(32, train_threshold=10000)
+        index.add([str(i) for i in range(200)], vectors)
+
+        results = index.search(vectors[7], k=5)
+        expected = np.argsort(-(vectors @ vectors[7]))[:5]
+        self.assertFalse(index.trained)
+        self.assertEqual([int(i) for i, _ in results], expected.tolist())
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+
+    def test_trained_search_recall(self):
+        """Test that cluster probing finds most of the true neighbours."""
+        vectors = _clustered_vectors(4000)
+        index = VectorIndex(32, n_lists=64, nprobe=8, train_threshold=2000)
+        for start in range(0, 4000, 500):
+            index.add([str(i) for i in range(start, start + 500)], vectors[start:start + 500])
+        self.assertTrue(index.trained)
+
+        found = expected = 0
+        for query in range(0, 4000, 100):
+            truth = set(np.argsort(-(vectors @ vectors[query]))[:10].tolist())
+            found += len(truth & {int(i) for i, _ in index.search(vectors[query], k=10)})
+            expected += len(truth)
+        self.assertGreater(found / expected, 0.9)
+
+    def test_persistence_and_incremental_inserts(self):
+        """Test that a reopened index keeps its rows and accepts new ones."""
+        vectors = _clustered_vectors(3000)
+        with tempfile.TemporaryDirectory() as path:
+            index = VectorIndex(32, path=path, n_lists=32, train_threshold=1000)
+            index.add([str(i) for i in range(2000)], vectors[:2000])
+            before = index.search(vectors[5], k=5)
+            index.close()
+
+            reopened = VectorIndex(32, path=path, n_lists=32, train_threshold=1000)
+            self.assertEqual(len(reopened), 2000)
+            self.assertTrue(reopened.trained)
+            self.assertEqual(reopened.search(vectors[5], k=5), before)
+
+            reopened.add([str(i) for i in range(2000, 3000)], vectors[2000:])
+            self.assertEqual(reopened.search(vectors[2500], k=1)[0][0], "2500")
+            reopened.close()
+
+            with self.assertRaises(ValueError):
+                VectorIndex(16, path=path)
+
+    def test_rows_are_flushed_without_close(self):
+        """Test that appended rows reach disk without an explicit flush."""
+        vectors = _clustered_vectors(10)
+        with tempfile.TemporaryDirectory() as path:
+            index = VectorIndex(32, path=path, flush_interval=0)
+            index.add([str(i) for i in range(5)], vectors[:5])
+            index.add_one("5", vectors[5])
+
+            # Reopened as after a crash, without close()
+            reopened = VectorIndex(32, path=path)
+            self.assertEqual(len(reopened), 6)
+            self.assertEqual(reopened.last_id(), "5")
+            self.assertEqual(reopened.ids_from("3"), {"3", "4", "5"})
+
+
+@unittest.skipUnless(MONGOMOCK_AVAILABLE, "mongomock is not installed")
+class TestIndexedSimilaritySearch(unittest.TestCase):
+    """Tests for similarity search through the expression repository."""
+
+    def setUp(self):
+        connection_pool.set_client_factory(mongomock.MongoClient)
+        self.addCleanup(connection_pool.close_clients)
+        wrapper = MongoDBWrapper("mongodb://localhost:27017", database_name="vector_index_test")
+        self.interaction_id = str(wrapper.get_collection("interactions").insert_one({}).inserted_id)
+        self.repository = ExpressionRepository(wrapper, vector_index=VectorIndex(128))
+
+    def test_find_similar_expressions(self):
+        """Test that stored expressions are ranked by structural similarity."""
+        for latex in (r"\frac{a}{b} + \sin(\theta)", r"\int_0^1 x^2 dx", r"\sum_{n=1}^{10} n"):
+            self.repository.store_expression(self.interaction_id, latex)
+
+        results = self.repository.find_similar_expressions(r"\int_0^3 y^2 dy", limit=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["latex_representation"], r"\int_0^1 x^2 dx")
+        self.assertEqual(results[0]["interaction_id"], self.interaction_id)
+        self.assertGreater(results[0]["similarity"], results[1]["similarity"])
+
+    def test_index_stored_expressions(self):
+        """Test that expressions stored before the index existed can be indexed."""
+        unindexed = ExpressionRepository(self.repository.mongodb)
+        for latex in (r"\frac{a}{b} + \sin(\theta)", r"\int_0^1 x^2 dx", r"\sum_{n=1}^{10} n"):
+            unindexed.store_expression(self.interaction_id, latex)
+        self.assertEqual(self.repository.find_similar_expressions(r"\int_0^3 y^2 dy"), [])
+
+        self.assertEqual(self.repository.index_expressions(batch_size=2), 3)
+
+        results = self.repository.find_similar_expressions(r"\int_0^3 y^2 dy", limit=1)
+        self.assertEqual(results[0]["latex_representation"], r"\int_0^1 x^2 dx")
+
+    def test_reconcile_index(self):
+        """Test that expressions missing after the last indexed one are added once."""
+        self.repository.store_expression(self.interaction_id, r"\frac{a}{b} + \sin(\theta)")
+        unindexed = ExpressionRepository(self.repository.mongodb)
+        for latex in (r"\int_0^1 x^2 dx", r"\sum_{n=1}^{10} n"):
+            unindexed.store_expression(self.interaction_id, latex)
+
+        self.assertEqual(self.repository.reconcile_index(), 2)
+        self.assertEqual(len(self.repository.vector_index), 3)
+        self.assertEqual(self.repository.reconcile_index(), 0)
+
+        results = self.repository.find_similar_expressions(r"\int_0^3 y^2 dy", limit=1)
+        self.assertEqual(results[0]["latex_representation"], r"\int_0^1 x^2 dx")
+
+
+if __name__ == "__main__":
+    unittest.main()
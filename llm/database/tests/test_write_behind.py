@@ -0,0 +1,153 @@
+"""
+Unit tests for write-behind persistence.
+"""
+
+import os
+import tempfile
+import unittest
+
+from pymongo import InsertOne, UpdateOne
+
+from database.access.write_behind import WriteBehindBuffer, _merge_updates
+
+try:
+    import mongomock
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+
+def _mongomock_bulk_updates() -> bool:
+    """Check whether the installed mongomock accepts this pymongo's UpdateOne in bulk_write."""
+    if not MONGOMOCK_AVAILABLE:
+        return False
+    try:
+        mongomock.MongoClient().db.probe.bulk_write([UpdateOne({}, {"$set": {"a": 1}})])
+        return True
+    except TypeError:
+        return False
+
+
+if MONGOMOCK_AVAILABLE:
+    from database.access import connection_pool
+    from database.access.mongodb_wrapper import MongoDBWrapper
+    from database.access.conversation_repository import ConversationRepository
+    from database.access.expression_repository import ExpressionRepository
+
+
+class TestMergeUpdates(unittest.TestCase):
+    """Tests for update coalescing."""
+
+    def test_merges_compatible_updates(self):
+        """Test that counters add up, sets keep the last value and arrays concatenate."""
+        merged = _merge_updates(
+            {"$inc": {"count": 1}, "$set": {"at": 1}, "$addToSet": {"tags": {"$each": ["a"]}}},
+            {"$inc": {"count": 2}, "$set": {"at": 2}, "$addToSet": {"tags": "b"}}
+        )
+        self.assertEqual(merged, {
+            "$inc": {"count": 3},
+            "$set": {"at": 2},
+            "$addToSet": {"tags": {"$each": ["a", "b"]}}
+        })
+
+    def test_refuses_conflicting_updates(self):
+        """Test that updates touching a field through different operators stay separate."""
+        self.assertIsNone(_merge_updates({"$set": {"count": 0}}, {"$inc": {"count": 1}}))
+        self.assertIsNone(_merge_updates({"$unset": {"a": ""}}, {"$set": {"b": 1}}))
+        self.assertIsNone(_merge_updates(
+            {"$push": {"items": {"$each": [1], "$slice": -5}}},
+            {"$push": {"items": 2}}
+        ))
+
+
+@unittest.skipUnless(MONGOMOCK_AVAILABLE, "mongomock is not installed")
+class TestWriteBehindBuffer(unittest.TestCase):
+    """Tests for the WriteBehindBuffer class."""
+
+    def setUp(self):
+        connection_pool.set_client_factory(mongomock.MongoClient)
+        self.addCleanup(connection_pool.close_clients)
+        self.wrapper = MongoDBWrapper("mongodb://localhost:27017", database_name="write_behind_test")
+        self.buffer = self._buffer()
+
+    def _buffer(self, **kwargs):
+        buffer = WriteBehindBuffer(flush_interval=60, client=self.wrapper.get_client(), **kwargs)
+        self.addCleanup(buffer.close)
+        return buffer
+
+    def test_insert_is_deferred(self):
+        """Test that inserts reach the database only when flushed."""
+        collection = self.wrapper.get_collection("items")
+        document_id = self.buffer.insert(collection, {"name": "a"})
+
+        self.assertIsNone(collection.find_one({"_id": document_id}))
+        self.assertEqual(self.buffer.pending_document(collection, document_id)["name"], "a")
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(collection.find_one({"_id": document_id})["name"], "a")
+        self.assertIsNone(self.buffer.pending_document(collection, document_id))
+
+    def test_requests_are_grouped_per_collection(self):
+        """Test that inserts precede updates and repeated updates are merged."""
+        items = self.wrapper.get_collection("items")
+        self.buffer.update(items, {"_id": 1}, {"$inc": {"n": 1}})
+        self.buffer.insert(items, {"_id": 1, "n": 0})
+        self.buffer.update(items, {"_id": 1}, {"$inc": {"n": 2}})
+
+        requests = self.buffer._build_requests(list(self.buffer._queue))
+        self.buffer._queue.clear()
+        batch = requests[("write_behind_test", "items")]
+        self.assertEqual(len(batch), 2)
+        self.assertIsInstance(batch[0], InsertOne)
+        self.assertEqual(batch[1], UpdateOne({"_id": 1}, {"$inc": {"n": 3}}, upsert=False))
+
+    @unittest.skipUnless(_mongomock_bulk_updates(), "mongomock does not support this pymongo's bulk updates")
+    def test_repositories_coalesce_writes(self):
+        """Test that interaction and expression writes are batched and merged."""
+        conversations = ConversationRepository(self.wrapper, write_buffer=self.buffer)
+        expressions = ExpressionRepository(self.wrapper, write_buffer=self.buffer)
+        conversation_id = conversations.create_conversation("user")
+
+        first = conversations.add_interaction(conversation_id, {"math_domains": ["algebra"]}, {})
+        conversations.add_interaction(conversation_id, {"math_domains": ["calculus"]}, {})
+        expression_id = expressions.store_expression(first, "x^2")
+        self.assertIsNotNone(expression_id)
+
+        self.buffer.flush()
+        self.assertEqual(self.buffer.stats["merged"], 1)
+
+        conversation = conversations.get_conversation(conversation_id)
+        self.assertEqual(conversation["interaction_count"], 2)
+        self.assertEqual(sorted(conversation["math_domains"]), ["algebra", "calculus"])
+        interaction = self.wrapper.get_collection("interactions").find_one({"math_expressions": {"$size": 1}})
+        self.assertEqual(str(interaction["_id"]), first)
+
+    def test_full_buffer_flushes_inline(self):
+        """Test that a full buffer writes its backlog on the caller's thread."""
+        buffer = self._buffer(max_pending=2)
+        collection = self.wrapper.get_collection("items")
+        for i in range(3):
+            buffer.insert(collection, {"i": i})
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(collection.count_documents({}), 2)
+
+    def test_spool_replay(self):
+        """Test that spooled writes survive a buffer that never flushed."""
+        collection = self.wrapper.get_collection("items")
+        with tempfile.TemporaryDirectory() as spool_dir:
+            crashed = WriteBehindBuffer(flush_interval=60, spool_dir=spool_dir)
+            document_id = crashed.insert(collection, {"name": "spooled"})
+            # Simulate a crash: the buffer is abandoned without flushing
+            crashed._closed = True
+
+            replayed = self._buffer(spool_dir=spool_dir)
+            self.assertEqual(replayed.stats["replayed"], 1)
+            replayed.flush()
+            self.assertEqual(collection.find_one({"_id": document_id})["name"], "spooled")
+
+            replayed.close()
+            self.assertEqual(os.listdir(spool_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
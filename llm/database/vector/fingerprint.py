@@ -0,0 +1,111 @@
+"""
+Structural fingerprints of mathematical expressions.
+
+A fingerprint is a fixed-size unit vector built by hashing structural
+features of an expression's LaTeX: tokens, token n-grams, and tokens paired
+with the commands that enclose them (``\\frac`` numerator, ``^`` exponent,
+``\\sqrt`` argument, ...), which approximates operator-tree n-grams without
+a full parse. Variables are renamed in order of first appearance, so
+``x^2 + 1`` and ``t^2 + 1`` share a fingerprint. Cosine similarity between
+fingerprints is their dot product.
+"""
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+DEFAULT_DIM = 128
+
+_TOKEN = re.compile(r"\\[a-zA-Z]+|\d+(?:\.\d+)?|[a-zA-Z]|\\.|[^\s]")
+
+# Commands that do not change the structure
+_IGNORED = {r"\left", r"\right", r"\displaystyle", r"\,", r"\;", r"\!", r"\quad", r"\qquad"}
+
+# Tokens that open a structural context when followed by a group
+_CONTEXT_OPENERS = {"^", "_"}
+
+# Feature weights
+_UNIGRAM, _BIGRAM, _TRIGRAM, _CONTEXT, _PATH = 1.0, 1.0, 0.75, 1.5, 1.0
+
+
+def latex_tokens(latex: str) -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    Tokenize LaTeX into normalized tokens with their enclosing contexts.
+
+    Returns:
+        List of (token, contexts from innermost outwards) pairs
+    """
+    variables = {}
+    tokens: List[Tuple[str, Tuple[str, ...]]] = []
+    stack: List[str] = []
+    pending = None
+
+    for raw in _TOKEN.findall(latex):
+        if raw in _IGNORED:
+            continue
+        if raw == "{":
+            stack.append(pending or "{}")
+            pending = None
+            continue
+        if raw == "}":
+            if stack:
+                stack.pop()
+            continue
+        if raw in "([":
+            stack.append("()")
+        elif raw in ")]" and stack and stack[-1] == "()":
+            stack.pop()
+
+        if len(raw) == 1 and raw.isalpha():
+            token = variables.setdefault(raw, f"v{len(variables)}")
+        elif raw[0].isdigit():
+            token = raw if len(raw) <= 2 else "NUM"
+        else:
+            token = raw
+
+        # A command or script marker names the groups that follow it
+        if raw.startswith("\\") or raw in _CONTEXT_OPENERS:
+            pending = raw
+        tokens.append((token, tuple(reversed(stack[-2:]))))
+    return tokens
+
+
+def _features(latex: str) -> List[Tuple[str, float]]:
+    tokens = latex_tokens(latex)
+    names = [token for token, _ in tokens]
+    features = []
+    for i, (token, contexts) in enumerate(tokens):
+        features.append((token, _UNIGRAM))
+        if i + 1 < len(names):
+            features.append((f"{token}|{names[i + 1]}", _BIGRAM))
+        if i + 2 < len(names):
+            features.append((f"{token}|{names[i + 1]}|{names[i + 2]}", _TRIGRAM))
+        if contexts:
+            features.append((f"{contexts[0]}>{token}", _CONTEXT))
+        if len(contexts) > 1:
+            features.append((f"{contexts[1]}>{contexts[0]}>{token}", _PATH))
+    return features
+
+
+def fingerprint(latex: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """
+    Compute the structural fingerprint of a LaTeX expression.
+
+    Args:
+        latex: LaTeX representation of the expression
+        dim: Vector dimension
+
+    Returns:
+        L2-normalized float32 vector (all zeros for an empty expression)
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in _features(latex):
+        # Signed feature hashing keeps collisions from biasing similarities upwards
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += weight if (h // dim) & 1 else -weight
+    vector = np.sign(vector) * np.sqrt(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
@@ -0,0 +1,321 @@
+"""
+Approximate nearest-neighbour index over unit vectors.
+
+An inverted-file (IVF) index: vectors are clustered around spherical k-means
+centroids and a query only scans the rows of the ``nprobe`` clusters closest
+to it. Vectors, ids and cluster assignments live in memory-mapped files that
+grow as rows are appended, so the index opens without loading its rows into
+memory and supports incremental inserts. Until enough rows exist to train the
+centroids, searches scan every row. Appended rows are flushed to disk at most
+``flush_interval`` seconds after they are added.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ID_WIDTH = 32
+_META = "meta.json"
+_INITIAL_CAPACITY = 1024
+
+
+class VectorIndex:
+    """
+    IVF index of fixed-dimension unit vectors keyed by string ids.
+
+    Args:
+        dim: Vector dimension
+        path: Directory holding the index files, or None for an in-memory index
+        n_lists: Maximum number of clusters
+        nprobe: Clusters scanned per query
+        train_threshold: Rows needed before the clusters are trained
+        flush_interval: Maximum seconds appended rows stay unflushed
+    """
+
+    def __init__(self, dim: int, path: Optional[str] = None, n_lists: int = 1024,
+                 nprobe: int = 16, train_threshold: int = 10000, flush_interval: float = 1.0):
+        self.dim = dim
+        self.path = path
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.flush_interval = flush_interval
+        self._flushed_at = time.monotonic()
+
+        self._lock = threading.RLock()
+        self._count = 0
+        self._capacity = 0
+        self._vectors = self._ids = self._assignments = None
+        self._centroids: Optional[np.ndarray] = None
+        # Per-cluster row numbers, plus rows appended since they were last merged
+        self._lists: List[np.ndarray] = []
+        self._pending: List[List[int]] = []
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            if os.path.exists(os.path.join(path, _META)):
+                self._load()
+                return
+        self._allocate(_INITIAL_CAPACITY)
+
+    # Storage
+
+    def _array(self, name: str, dtype, shape: Tuple[int, ...], old: Optional[np.ndarray]) -> np.ndarray:
+        if self.path is None:
+            array = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                array[:len(old)] = old
+            return array
+
+        # Growing the file in place keeps existing rows; the old mapping is released first
+        if old is not None:
+            old.flush()
+        filename = os.path.join(self.path, name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(filename, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(filename, dtype=dtype, mode="r+", shape=shape)
+
+    def _allocate(self, capacity: int):
+        self._vectors = self._array("vectors.f32", np.float32, (capacity, self.dim), self._vectors)
+        self._ids = self._array("ids.bin", f"S{ID_WIDTH}", (capacity,), self._ids)
+        self._assignments = self._array("lists.i32", np.int32, (capacity,), self._assignments)
+        self._capacity = capacity
+
+    def _load(self):
+        with open(os.path.join(self.path, _META), "r") as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Index at {self.path} has dimension {meta['dim']}, not {self.dim}")
+
+        self._count = meta["count"]
+        self._allocate(max(meta["capacity"], _INITIAL_CAPACITY))
+        centroids_file = os.path.join(self.path, "centroids.npy")
+        if meta["trained"] and os.path.exists(centroids_file):
+            self._centroids = np.load(centroids_file)
+            self._build_lists()
+
+    def flush(self):
+        """Write buffered rows and metadata to disk."""
+        if self.path is None:
+            return
+        with self._lock:
+            for array in (self._vectors, self._ids, self._assignments):
+                array.flush()
+            meta = {
+                "dim": self.dim,
+                "count": self._count,
+                "capacity": self._capacity,
+                "trained": self._centroids is not None,
+            }
+            # Metadata is replaced atomically, so a crash loses at most the unflushed rows
+            tmp = os.path.join(self.path, _META + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(self.path, _META))
+            self._flushed_at = time.monotonic()
+
+    def close(self):
+        """Flush the index."""
+        self.flush()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def last_id(self) -> Optional[str]:
+        """Id of the most recently appended row, or None if the index is empty."""
+        with self._lock:
+            if not self._count:
+                return None
+            return self._ids[self._count - 1].decode("utf-8")
+
+    def ids_from(self, lower: str) -> Set[str]:
+        """
+        Ids in the index that sort at or after ``lower``.
+
+        Args:
+            lower: Smallest id to return (compared as UTF-8 bytes)
+
+        Returns:
+            Set of matching ids
+        """
+        with self._lock:
+            ids = np.asarray(self._ids[:self._count])
+        return {i.decode("utf-8") for i in ids[ids >= lower.encode("utf-8")]}
+
+    @property
+    def trained(self) -> bool:
+        """Whether the clusters have been trained."""
+        return self._centroids is not None
+
+    # Inserts
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        """
+        Append vectors to the index.
+
+        Args:
+            ids: Id of each vector (at most ``ID_WIDTH`` bytes)
+            vectors: Array of shape (len(ids), dim)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        encoded = [str(i).encode("utf-8") for i in ids]
+        if any(len(i) > ID_WIDTH for i in encoded):
+            raise ValueError(f"Vector ids are limited to {ID_WIDTH} bytes")
+
+        with self._lock:
+            needed = self._count + len(vectors)
+            if needed > self._capacity:
+                capacity = self._capacity
+                while capacity < needed:
+                    capacity *= 2
+                self._allocate(capacity)
+
+            rows = np.arange(self._count, needed)
+            self._vectors[rows] = vectors
+            self._ids[rows] = encoded
+            if self._centroids is not None:
+                assignments = self._assign(vectors)
+                self._assignments[rows] = assignments
+                for row, cluster in zip(rows.tolist(), assignments.tolist()):
+                    self._pending[cluster].append(row)
+            self._count = needed
+
+            if self._centroids is None and self._count >= self.train_threshold:
+                self.train()
+            elif self.path is not None and time.monotonic() - self._flushed_at >= self.flush_interval:
+                self.flush()
+
+    def add_one(self, id: str, vector: np.ndarray):
+        """Append a single vector to the index."""
+        self.add([id], np.asarray(vector).reshape(1, -1))
+
+    # Clustering
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def train(self, iterations: int = 10, sample_size: int = 65536, seed: int = 0):
+        """
+        Train the clusters on a sample of the rows and reassign every row.
+
+        Runs automatically once ``train_threshold`` rows exist; call it again
+        after the index has grown well past that to rebalance the clusters.
+        """
+        with self._lock:
+            count = self._count
+            if count == 0:
+                return
+            rng = np.random.default_rng(seed)
+            n_lists = max(1, min(self.n_lists, count // 39))
+            sample_rows = np.sort(rng.choice(count, size=min(count, sample_size), replace=False))
+            sample = np.asarray(self._vectors[sample_rows])
+
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+            for _ in range(iterations):
+                assignments = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignments, sample)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Empty clusters keep their previous centroid
+                centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+            self._centroids = centroids.astype(np.float32)
+            for start in range(0, count, 65536):
+                stop = min(start + 65536, count)
+                self._assignments[start:stop] = self._assign(np.asarray(self._vectors[start:stop]))
+            self._build_lists()
+
+            if self.path is not None:
+                np.save(os.path.join(self.path, "centroids.npy"), self._centroids)
+                self.flush()
+            logger.info(f"Trained vector index: {count} rows in {n_lists} clusters")
+
+    def _build_lists(self):
+        assignments = np.asarray(self._assignments[:self._count])
+        order = np.argsort(assignments, kind="stable")
+        sizes = np.bincount(assignments, minlength=len(self._centroids))
+        self._lists = np.split(order, np.cumsum(sizes)[:-1])
+        self._pending = [[] for _ in range(len(self._centroids))]
+
+    def _rows_for(self, cluster: int) -> np.ndarray:
+        pending = self._pending[cluster]
+        if pending:
+            self._lists[cluster] = np.concatenate([self._lists[cluster], np.asarray(pending, dtype=np.int64)])
+            pending.clear()
+        return self._lists[cluster]
+
+    # Search
+
+    def search(self, vector: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the vectors most similar to a query.
+
+        Args:
+            vector: Query unit vector
+            k: Number of results
+
+        Returns:
+            List of (id, cosine similarity) pairs, most similar first
+        """
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            count = self._count
+            if count == 0 or k <= 0:
+                return []
+            if self._centroids is None:
+                rows = None
+                scores = np.asarray(self._vectors[:count]) @ query
+            else:
+                nprobe = min(self.nprobe, len(self._centroids))
+                closest = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                rows = np.concatenate([self._rows_for(int(c)) for c in closest])
+                if len(rows) == 0:
+                    return []
+                rows.sort()
+                scores = self._vectors[rows] @ query
+
+            top = min(k, len(scores))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            found = best if rows is None else rows[best]
+            return [
+                (self._ids[row].decode("utf-8"), float(score))
+                for row, score in zip(found.tolist(), scores[best].tolist())
+            ]
+
+
+# Process-wide expression fingerprint index
+_expression_index: Optional[VectorIndex] = None
+_expression_index_lock = threading.Lock()
+
+
+def get_expression_index() -> VectorIndex:
+    """
+    Get the process-wide expression fingerprint index, opening it on first use.
+
+    The index is stored under ``MATH_LLM_EXPRESSION_INDEX_DIR`` when set and
+    kept in memory otherwise.
+    """
+    global _expression_index
+    if _expression_index is None:
+        with _expression_index_lock:
+            if _expression_index is None:
+                from database.vector.fingerprint import DEFAULT_DIM
+                _expression_index = VectorIndex(
+                    DEFAULT_DIM,
+                    path=os.environ.get("MATH_LLM_EXPRESSION_INDEX_DIR"),
+                    nprobe=int(os.environ.get("MATH_LLM_EXPRESSION_INDEX_NPROBE", "16"))
+                )
+                atexit.register(_expression_index.close)
+    return _expression_index
@@ -0,0 +1,131 @@
+"""
+Encode/decode benchmark for MCP message codecs.
+
+Compares the original pydantic ``.json()`` / ``parse_raw`` path with the
+codecs in ``orchestration.message_bus.serialization`` for typical
+computation and OCR request messages.
+
+Usage:
+    python -m integration_tests.performance_tests.message_codec_benchmark --iterations 5000
+"""
+import argparse
+import base64
+import os
+import statistics
+import time
+from typing import Callable, Dict, Any, List
+
+from orchestration.message_bus.message_formats import (
+    Message,
+    MessageType,
+    OCRRequestBody,
+    create_computation_request,
+    create_message
+)
+from orchestration.message_bus.serialization import (
+    CONTENT_TYPE_JSON,
+    CONTENT_TYPE_MSGPACK,
+    MSGPACK_AVAILABLE,
+    JSONCodec,
+    MsgPackCodec
+)
+
+
+def build_messages(image_size: int) -> Dict[str, Dict[str, Message]]:
+    """
+    Build the benchmark messages.
+
+    Returns a mapping of message name to the legacy variant (images inline as
+    base64 strings) and the binary variant (images as raw bytes).
+    """
+    computation = create_computation_request(
+        sender="core_llm_agent",
+        expression=r"\int_0^{\pi} x^2 \sin(x) \, dx",
+        operation="integrate",
+        variables=["x"],
+        domain="calculus",
+        step_by_step=True
+    )
+
+    image_bytes = os.urandom(image_size)
+    ocr_legacy = create_message(
+        message_type=MessageType.OCR_REQUEST,
+        sender="input_agent",
+        recipient="ocr_agent",
+        body=OCRRequestBody(image_path=base64.b64encode(image_bytes).decode("ascii")).dict()
+    )
+    ocr_binary = create_message(
+        message_type=MessageType.OCR_REQUEST,
+        sender="input_agent",
+        recipient="ocr_agent",
+        body=OCRRequestBody(image_data=image_bytes).dict()
+    )
+
+    return {
+        "computation_request": {"legacy": computation, "binary": computation},
+        "ocr_request": {"legacy": ocr_legacy, "binary": ocr_binary},
+    }
+
+
+def time_call(func: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Time a callable, returning per-call statistics in microseconds."""
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": statistics.mean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def run_benchmark(iterations: int, image_size: int) -> List[Dict[str, Any]]:
+    """Run all codec benchmarks and return one result row per combination."""
+    codecs = {"pydantic": None, CONTENT_TYPE_JSON: JSONCodec()}
+    if MSGPACK_AVAILABLE:
+        codecs[CONTENT_TYPE_MSGPACK] = MsgPackCodec()
+
+    results = []
+    for name, variants in build_messages(image_size).items():
+        for codec_name, codec in codecs.items():
+            if codec is None:
+                message = variants["legacy"]
+                payload = message.json().encode()
+                encode = lambda: message.json().encode()
+                decode = lambda: Message.parse_raw(payload)
+            else:
+                message = variants["legacy"] if codec_name == CONTENT_TYPE_JSON else variants["binary"]
+                payload = codec.encode(message)
+                encode = lambda c=codec, m=message: c.encode(m)
+                decode = lambda c=codec, p=payload: c.decode(p)
+
+            results.append({
+                "message": name,
+                "codec": codec_name,
+                "size_bytes": len(payload),
+                "encode": time_call(encode, iterations),
+                "decode": time_call(decode, iterations),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP message codecs")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations per measurement")
+    parser.add_argument("--image-size", type=int, default=256 * 1024, help="OCR image size in bytes")
+    args = parser.parse_args()
+
+    print(f"{'message':<22}{'codec':<24}{'size':>10}{'enc p50':>10}{'enc p99':>10}{'dec p50':>10}{'dec p99':>10}")
+    for row in run_benchmark(args.iterations, args.image_size):
+        print(
+            f"{row['message']:<22}{row['codec']:<24}{row['size_bytes']:>10}"
+            f"{row['encode']['p50_us']:>10.1f}{row['encode']['p99_us']:>10.1f}"
+            f"{row['decode']['p50_us']:>10.1f}{row['decode']['p99_us']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
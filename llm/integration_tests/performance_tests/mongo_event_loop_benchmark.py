@@ -0,0 +1,132 @@
+"""
+Event loop latency benchmark for MongoDB access from async code.
+
+Runs concurrent ``find_one`` traffic through ``MongoDBWrapper`` from
+coroutines, once calling the driver directly on the event loop and once
+through ``AsyncRepository``, while a ticker task measures how late the loop
+wakes it up. Without ``--uri`` the benchmark uses mongomock with a simulated
+network round trip per query.
+
+Usage:
+    python -m integration_tests.performance_tests.mongo_event_loop_benchmark --tasks 50 --rtt-ms 2
+    python -m integration_tests.performance_tests.mongo_event_loop_benchmark --uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, Any, List
+
+from database.access import connection_pool
+from database.access.connection_pool import AsyncRepository
+from database.access.mongodb_wrapper import MongoDBWrapper
+
+try:
+    import mongomock
+    MONGOMOCK_AVAILABLE = True
+except ImportError:
+    MONGOMOCK_AVAILABLE = False
+
+COLLECTION = "benchmark_documents"
+TICK_SECONDS = 0.001
+
+
+class SimulatedLatencyWrapper(MongoDBWrapper):
+    """MongoDBWrapper adding a fixed blocking delay per query, like a network round trip."""
+
+    def __init__(self, rtt_seconds: float, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rtt_seconds = rtt_seconds
+
+    def find_one(self, collection_name, query):
+        time.sleep(self.rtt_seconds)
+        return super().find_one(collection_name, query)
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: List[float]):
+    """Record how late each short sleep wakes up, in milliseconds."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def run_mode(find_one: Callable, tasks: int, queries: int, offload: bool) -> Dict[str, Any]:
+    """Run concurrent query tasks and return loop lag and throughput."""
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(stop, lags))
+
+    async def worker(worker_id: int):
+        for i in range(queries):
+            query = {"key": (worker_id * queries + i) % 1000}
+            if offload:
+                await find_one(COLLECTION, query)
+            else:
+                find_one(COLLECTION, query)
+                await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(tasks)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lags.sort()
+    return {
+        "queries_per_second": tasks * queries / elapsed,
+        "lag_p50_ms": lags[len(lags) // 2] if lags else 0.0,
+        "lag_p99_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0,
+        "lag_max_ms": lags[-1] if lags else 0.0,
+        "lag_mean_ms": statistics.mean(lags) if lags else 0.0,
+    }
+
+
+async def run_benchmark(uri: str, tasks: int, queries: int, rtt_ms: float) -> Dict[str, Dict[str, Any]]:
+    """Run the blocking and offloaded modes against the same data."""
+    wrapper = SimulatedLatencyWrapper(rtt_ms / 1000, uri, database_name="math_llm_benchmark")
+    collection = wrapper.get_collection(COLLECTION)
+    collection.delete_many({})
+    collection.insert_many([{"key": i, "value": f"doc-{i}"} for i in range(1000)])
+
+    results = {
+        "blocking": await run_mode(wrapper.find_one, tasks, queries, offload=False),
+        "offloaded": await run_mode(AsyncRepository(wrapper).find_one, tasks, queries, offload=True),
+    }
+    collection.drop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event loop latency under MongoDB traffic")
+    parser.add_argument("--uri", default=None, help="MongoDB URI (mongomock when omitted)")
+    parser.add_argument("--tasks", type=int, default=50, help="Concurrent query tasks")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per task")
+    parser.add_argument("--rtt-ms", type=float, default=None,
+                        help="Simulated round trip per query (default 2 with mongomock, 0 otherwise)")
+    args = parser.parse_args()
+
+    uri = args.uri
+    rtt_ms = args.rtt_ms
+    if uri is None:
+        if not MONGOMOCK_AVAILABLE:
+            parser.error("mongomock is not installed; pass --uri for a real server")
+        connection_pool.set_client_factory(mongomock.MongoClient)
+        uri = "mongodb://localhost:27017"
+        if rtt_ms is None:
+            rtt_ms = 2.0
+    rtt_ms = rtt_ms or 0.0
+
+    results = asyncio.run(run_benchmark(uri, args.tasks, args.queries, rtt_ms))
+    connection_pool.close_clients()
+
+    print(f"{'mode':<12}{'queries/s':>12}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}")
+    for mode, row in results.items():
+        print(
+            f"{mode:<12}{row['queries_per_second']:>12.0f}{row['lag_p50_ms']:>10.2f}"
+            f"{row['lag_p99_ms']:>10.2f}{row['lag_max_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Similarity search benchmark for the expression fingerprint index.
+
+Generates random expressions, stores their fingerprints in a memory-mapped
+``VectorIndex``, then measures search latency and recall@k against an exact
+scan of the same vectors (a result counts as recalled when it scores at
+least as high as the exact k-th neighbour).
+
+Usage:
+    python -m integration_tests.performance_tests.vector_index_benchmark --count 100000
+    python -m integration_tests.performance_tests.vector_index_benchmark --count 1000000 --nprobe 32
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from database.vector.fingerprint import DEFAULT_DIM, fingerprint
+from database.vector.ivf_index import VectorIndex
+
+_ATOMS = ["x", "y", "t", "n", "a", "b", "1", "2", "3", r"\pi", "e"]
+_UNARY = [r"\sin({})", r"\cos({})", r"\ln({})", r"\sqrt{{{}}}", "({})^2", "e^{{{}}}"]
+_BINARY = ["{} + {}", "{} - {}", "{} {}", r"\frac{{{}}}{{{}}}", "{}^{{{}}}"]
+_WRAPPERS = ["{}", r"\int {} \, dx", r"\int_0^1 {} \, dx", r"\frac{{d}}{{dx}} {}",
+             r"\lim_{{x \to 0}} {}", r"\sum_{{n=1}}^{{\infty}} {}", "{} = 0"]
+
+
+def random_expression(rng: random.Random, depth: int = 3) -> str:
+    """Generate a random LaTeX expression."""
+    if depth == 0 or rng.random() < 0.25:
+        return rng.choice(_ATOMS)
+    if rng.random() < 0.4:
+        return rng.choice(_UNARY).format(random_expression(rng, depth - 1))
+    return rng.choice(_BINARY).format(random_expression(rng, depth - 1), random_expression(rng, depth - 1))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark expression similarity search")
+    parser.add_argument("--count", type=int, default=100000, help="Indexed expressions")
+    parser.add_argument("--queries", type=int, default=200, help="Search queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--nprobe", type=int, default=16, help="Clusters scanned per query")
+    parser.add_argument("--batch", type=int, default=10000, help="Expressions per insert batch")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(DEFAULT_DIM, path=path, nprobe=args.nprobe)
+
+        fingerprint_seconds = insert_seconds = 0.0
+        for start in range(0, args.count, args.batch):
+            size = min(args.batch, args.count - start)
+            began = time.perf_counter()
+            vectors = np.stack([
+                fingerprint(rng.choice(_WRAPPERS).format(random_expression(rng))) for _ in range(size)
+            ])
+            fingerprint_seconds += time.perf_counter() - began
+
+            began = time.perf_counter()
+            index.add([str(i) for i in range(start, start + size)], vectors)
+            insert_seconds += time.perf_counter() - began
+        index.flush()
+
+        queries = [fingerprint(rng.choice(_WRAPPERS).format(random_expression(rng))) for _ in range(args.queries)]
+        latencies = []
+        found = 0
+        all_vectors = np.asarray(index._vectors[:len(index)])
+        for query in queries:
+            began = time.perf_counter()
+            results = index.search(query, args.k)
+            latencies.append((time.perf_counter() - began) * 1000)
+            # Generated expressions repeat, so recall compares scores rather than ids
+            kth_score = np.sort(all_vectors @ query)[-args.k]
+            found += sum(1 for _, score in results if score >= kth_score - 1e-6)
+
+        print(f"indexed {len(index)} expressions in {'trained' if index.trained else 'untrained'} index")
+        print(f"fingerprints/s {args.count / fingerprint_seconds:>10.0f}")
+        print(f"inserts/s      {args.count / insert_seconds:>10.0f}")
+        print(f"search p50     {statistics.median(latencies):>10.2f} ms")
+        print(f"search p99     {percentile(latencies, 0.99):>10.2f} ms")
+        print(f"recall@{args.k:<7} {found / (args.k * len(queries)):>10.3f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
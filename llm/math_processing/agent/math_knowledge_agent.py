@@ -15,6 +15,7 @@ import json
 from math_processing.agent.math_agent import MathAgent
 from math_processing.knowledge.knowledge_base import MathKnowledgeBase
 from math_processing.classification.domain_classifier import MathDomainClassifier
+from orchestration.agents.registry import get_agent_registry
 
 
 class MathKnowledgeAgent(MathAgent):
@@ -36,8 +37,13 @@ class MathKnowledgeAgent(MathAgent):
         # Override the ID for this specialized agent
         self.id = f"math_knowledge_agent_{uuid.uuid4().hex[:8]}"
         
-        # Initialize the knowledge base
-        self.knowledge_base = MathKnowledgeBase(knowledge_base_path)
+        # Initialize the knowledge base, backed by the shared repository
+        # registered at startup unless a knowledge base file is given
+        repository = knowledge_base_path
+        if repository is None:
+            service_info = get_agent_registry().get_service_info("knowledge_repository")
+            repository = service_info.get("instance") if service_info else None
+        self.knowledge_base = MathKnowledgeBase(repository)
         
         # Initialize the domain classifier
         self.domain_classifier = MathDomainClassifier()
@@ -7,21 +7,51 @@ specialized processing and context-aware responses.
 """
 
 import re
+import copy
+from functools import lru_cache
 from typing import Dict, List, Optional, Union, Any, Tuple
 import logging
 import json
 import os
 
+from math_processing.classification.keyword_matcher import KeywordMatcher
+
+# Symbols and abbreviations replaced with their names before matching
+_REPLACEMENTS = {
+    "∫": " integrate ",
+    "∂": " partial derivative ",
+    "∑": " sum ",
+    "∏": " product ",
+    "√": " square root ",
+    "∞": " infinity ",
+    "≠": " not equal ",
+    "≤": " less than or equal ",
+    "≥": " greater than or equal ",
+    "→": " approaches ",
+    "∈": " element of ",
+    "∪": " union ",
+    "∩": " intersection ",
+    "⊂": " subset ",
+    "⊃": " superset ",
+    "d/dx": " derivative ",
+    "dy/dx": " derivative ",
+    "lim": " limit ",
+    "sin": " sine ",
+    "cos": " cosine ",
+    "tan": " tangent "
+}
+
 
 class MathDomainClassifier:
     """Classifier for mathematical domains."""
     
-    def __init__(self, custom_keywords_path: Optional[str] = None):
+    def __init__(self, custom_keywords_path: Optional[str] = None, cache_size: int = 1024):
         """
         Initialize the domain classifier.
         
         Args:
             custom_keywords_path: Path to custom keywords file (optional)
+            cache_size: Number of recent queries whose classification is cached
         """
         self.logger = logging.getLogger(__name__)
         
@@ -43,6 +73,10 @@ class MathDomainClassifier:
             "trigonometry": "Trigonometry studies relationships between side lengths and angles of triangles, including trigonometric functions and identities.",
             "discrete_math": "Discrete mathematics deals with mathematical structures that are fundamentally discrete rather than continuous, including combinatorics and graph theory."
         }
+        
+        # All keywords are matched in one pass; recent queries are memoized
+        self._matcher = KeywordMatcher(self.domain_keywords, whole_words=True)
+        self._classify_cached = lru_cache(maxsize=cache_size)(self._classify)
     
     def _load_domain_keywords(self) -> Dict[str, List[str]]:
         """
@@ -171,24 +205,19 @@ class MathDomainClassifier:
         Returns:
             Dictionary with classification results
         """
+        # Callers may modify the result, so hand out copies of cached entries
+        return copy.deepcopy(self._classify_cached(query, include_details))
+    
+    def _classify(self, query: str, include_details: bool) -> Dict[str, Any]:
+        """Classify a query; memoized per instance by classify_query."""
         try:
             # Clean and normalize the query
             normalized_query = self._preprocess_query(query)
             
-            # Count keyword matches for each domain
-            matches = {}
-            for domain, keywords in self.domain_keywords.items():
-                domain_matches = []
-                for keyword in keywords:
-                    # Look for word boundary matches to avoid partial matches
-                    # e.g. "integrate" should match "integrate" but not "integrated circuit"
-                    pattern = r'\b' + re.escape(keyword) + r'\b'
-                    matches_found = re.findall(pattern, normalized_query, re.IGNORECASE)
-                    if matches_found:
-                        domain_matches.extend(matches_found)
-                
-                # Store the number of unique matches
-                matches[domain] = len(set(domain_matches))
+            # Count the distinct keywords of each domain matched at word
+            # boundaries, e.g. "integrate" but not "integrated circuit"
+            keyword_counts = self._matcher.count(normalized_query)
+            matches = {domain: keyword_counts.get(domain, 0) for domain in self.domain_keywords}
             
             # Calculate confidence scores
             total_matches = sum(matches.values())
@@ -249,31 +278,7 @@ class MathDomainClassifier:
         text = query.lower()
         
         # Replace common mathematical symbols with their names to improve matching
-        replacements = {
-            "∫": " integrate ",
-            "∂": " partial derivative ",
-            "∑": " sum ",
-            "∏": " product ",
-            "√": " square root ",
-            "∞": " infinity ",
-            "≠": " not equal ",
-            "≤": " less than or equal ",
-            "≥": " greater than or equal ",
-            "→": " approaches ",
-            "∈": " element of ",
-            "∪": " union ",
-            "∩": " intersection ",
-            "⊂": " subset ",
-            "⊃": " superset ",
-            "d/dx": " derivative ",
-            "dy/dx": " derivative ",
-            "lim": " limit ",
-            "sin": " sine ",
-            "cos": " cosine ",
-            "tan": " tangent "
-        }
-        
-        for symbol, replacement in replacements.items():
+        for symbol, replacement in _REPLACEMENTS.items():
             text = text.replace(symbol, replacement)
         
         # Remove special characters that aren't relevant for classification
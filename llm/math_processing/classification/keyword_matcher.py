@@ -0,0 +1,127 @@
+"""
+Keyword Matcher - multi-keyword search in a single pass over the text.
+
+This module compiles labelled keyword lists (such as the keywords of each
+mathematical domain) into an Aho-Corasick automaton, so that every keyword
+occurrence, including overlapping ones, is found in time linear in the
+length of the text rather than once per keyword.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Set
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over labelled keywords."""
+
+    def __init__(self, keywords: Dict[Hashable, Iterable[str]], whole_words: bool = False):
+        """
+        Compile the keywords.
+
+        Args:
+            keywords: Dictionary mapping labels to their keywords; a keyword
+                may belong to several labels
+            whole_words: Only match keywords at word boundaries (like ``\\b``
+                around the keyword in a regular expression)
+        """
+        self.whole_words = whole_words
+
+        self._patterns: List[str] = []
+        self._pattern_ids: Dict[str, int] = {}
+        self._labels: List[List[Hashable]] = []
+        for label, label_keywords in keywords.items():
+            for keyword in dict.fromkeys(keyword.lower() for keyword in label_keywords):
+                if not keyword:
+                    continue
+                pattern_id = self._pattern_ids.get(keyword)
+                if pattern_id is None:
+                    pattern_id = self._pattern_ids[keyword] = len(self._patterns)
+                    self._patterns.append(keyword)
+                    self._labels.append([])
+                self._labels[pattern_id].append(label)
+
+        self._build()
+
+    def _build(self):
+        # Trie of the keywords
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self._patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(pattern_id)
+
+        # Failure links in breadth-first order; outputs include those of the
+        # longest proper suffix that is also a trie node
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _at_boundary(self, text: str, position: int) -> bool:
+        before = position > 0 and _is_word_char(text[position - 1])
+        after = position < len(text) and _is_word_char(text[position])
+        return before != after
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Find the keywords that occur in a text.
+
+        Args:
+            text: Text to search (matched case-insensitively)
+
+        Returns:
+            Set of lowercased keywords found
+        """
+        text = text.lower()
+        found: Set[int] = set()
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                if pattern_id in found:
+                    continue
+                if self.whole_words:
+                    start = end - len(self._patterns[pattern_id])
+                    if not (self._at_boundary(text, start) and self._at_boundary(text, end)):
+                        continue
+                found.add(pattern_id)
+        return {self._patterns[pattern_id] for pattern_id in found}
+
+    def count(self, text: str) -> Dict[Hashable, int]:
+        """
+        Count the distinct keywords of each label that occur in a text.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Dictionary mapping every label to its number of matched keywords
+        """
+        counts: Dict[Hashable, int] = {}
+        for labels in self._labels:
+            for label in labels:
+                counts.setdefault(label, 0)
+        for keyword in self.find(text):
+            for label in self._labels[self._pattern_ids[keyword]]:
+                counts[label] += 1
+        return counts
@@ -8,6 +8,8 @@ including algebra, calculus, and linear algebra.
 import sympy as sp
 from typing import Dict, List, Optional, Union, Any, Tuple
 
+from orchestration.monitoring.profiling import profiled
+
 
 class SymbolicProcessor:
     """Wrapper for SymPy providing symbolic mathematical operations."""
@@ -245,6 +247,7 @@ class SymbolicProcessor:
         
         return solution
     
+    @profiled("simplify")
     def simplify(self, expression: Union[sp.Expr, str]) -> sp.Expr:
         """
         Simplify a mathematical expression.
@@ -10,6 +10,8 @@ import sympy as sp
 from sympy.parsing.latex import parse_latex
 from typing import Dict, List, Optional, Tuple, Union, Any
 
+from orchestration.monitoring.profiling import profiled
+
 
 class LaTeXParser:
     """Parser for LaTeX mathematical expressions."""
@@ -30,6 +32,7 @@ class LaTeXParser:
         # Variables used throughout parsing
         self.variables = {}
         
+    @profiled("parse")
     def parse(self, latex_str: str) -> Dict[str, Any]:
         """
         Parse a LaTeX string into a SymPy expression.
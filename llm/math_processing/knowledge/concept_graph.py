@@ -0,0 +1,110 @@
+"""
+Concept Graph
+
+This module materializes the relationships between concepts, theorems and
+formulas as an adjacency-list graph over compact integer node ids, with
+bounded breadth-first traversal and memoized k-hop neighborhoods.
+"""
+
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# (kind, item_id); kinds are "concept", "theorem" and "formula"
+Key = Tuple[str, str]
+
+
+class ConceptGraph:
+    """
+    Directed graph of "related concept" edges.
+
+    Every entry is interned to an integer node id and its outgoing edges
+    are stored as an ``array`` of node ids. Nodes that are only known as
+    edge targets have no edge list until they are loaded. Neighborhoods are
+    memoized until the graph changes.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Key, int] = {}
+        self._keys: List[Key] = []
+        self._edges: List[Optional[array]] = []
+        self._memo: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        self.version = 0
+
+    def _intern(self, key: Key) -> int:
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._edges.append(None)
+        return node
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add_node(self, kind: str, item_id: str, related_concepts: Iterable[str]):
+        """
+        Add or replace an entry and its edges to related concepts.
+
+        Args:
+            kind: Entry kind ("concept", "theorem" or "formula")
+            item_id: Identifier of the entry
+            related_concepts: IDs of the concepts it relates to
+        """
+        node = self._intern((kind, item_id))
+        targets = [self._intern(("concept", concept_id)) for concept_id in dict.fromkeys(related_concepts)]
+        self._edges[node] = array("i", targets)
+        self.version += 1
+        self._memo.clear()
+
+    def is_loaded(self, kind: str, item_id: str) -> bool:
+        """Whether an entry's edges are known."""
+        node = self._ids.get((kind, item_id))
+        return node is not None and self._edges[node] is not None
+
+    def neighborhood(self, kind: str, item_id: str, depth: int = 1,
+                     load_missing: Optional[Callable[[List[str]], None]] = None) -> List[str]:
+        """
+        Get the concepts reachable from an entry in at most ``depth`` hops.
+
+        Args:
+            kind: Entry kind of the start node
+            item_id: Identifier of the start node
+            depth: Maximum number of hops
+            load_missing: Called with the IDs of concepts reached whose edges
+                are not loaded yet, once per hop, so they can be fetched in
+                a single batch (and added with ``add_node``)
+
+        Returns:
+            Concept IDs in breadth-first order, excluding the start node
+        """
+        start = self._ids.get((kind, item_id))
+        if start is None or depth < 1:
+            return []
+        memo_key = (start, depth)
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            return [self._keys[node][1] for node in cached]
+
+        visited = {start}
+        frontier = [start]
+        reached: List[int] = []
+        for hop in range(depth + 1):
+            unloaded = [node for node in frontier if self._edges[node] is None]
+            if unloaded and load_missing is not None:
+                load_missing([self._keys[node][1] for node in unloaded])
+            if hop == depth:
+                break
+
+            next_frontier = []
+            for node in frontier:
+                for target in self._edges[node] or ():
+                    if target not in visited:
+                        visited.add(target)
+                        next_frontier.append(target)
+            reached.extend(next_frontier)
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        self._memo[memo_key] = tuple(reached)
+        return [self._keys[node][1] for node in reached]
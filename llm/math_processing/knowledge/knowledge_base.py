@@ -1,4 +1,3 @@
-cat > math_processing/knowledge/knowledge_base.py << 'EOF'
 """
 Mathematical Knowledge Base
 
@@ -11,6 +10,8 @@ import logging
 from typing import Dict, List, Any, Optional, Set, Tuple, Union
 import sympy as sp
 from math_processing.knowledge.repository import KnowledgeRepository
+from math_processing.knowledge.knowledge_index import KnowledgeIndex
+from math_processing.knowledge.concept_graph import ConceptGraph
 
 logger = logging.getLogger(__name__)
 
@@ -300,10 +301,62 @@ class MathKnowledgeBase:
         self._theorem_cache = {}
         self._formula_cache = {}
         
+        # Name, domain and related-concept indexes over the caches
+        self._index = KnowledgeIndex()
+        
+        # Relationship graph; concepts the repository does not have are remembered
+        # so traversals do not look them up again
+        self._graph = ConceptGraph()
+        self._missing_concepts: Set[str] = set()
+        
+        # Solution contexts by (domain, operation, expression type)
+        self._context_cache: Dict[Tuple[str, str, str], Dict[str, List]] = {}
+        
         # Initialize with core mathematical knowledge if repository is not provided
         if not repository:
             self._initialize_core_knowledge()
     
+    def _cache_concept(self, concept: MathematicalConcept):
+        """Add a concept to the cache and the indexes."""
+        self._concept_cache[concept.concept_id] = concept
+        self._index.add("concept", concept.concept_id, concept.name, concept.domain,
+                        concept.related_concepts)
+        self._graph.add_node("concept", concept.concept_id, concept.related_concepts)
+        self._context_cache.clear()
+        self._missing_concepts.discard(concept.concept_id)
+    
+    def _cache_theorem(self, theorem: MathematicalTheorem):
+        """Add a theorem to the cache and the indexes."""
+        self._theorem_cache[theorem.theorem_id] = theorem
+        self._index.add("theorem", theorem.theorem_id, theorem.name, theorem.domain,
+                        theorem.related_concepts)
+        self._graph.add_node("theorem", theorem.theorem_id, theorem.related_concepts)
+        self._context_cache.clear()
+    
+    def _cache_formula(self, formula: MathematicalFormula):
+        """Add a formula to the cache and the indexes."""
+        self._formula_cache[formula.formula_id] = formula
+        self._index.add("formula", formula.formula_id, formula.name, formula.domain,
+                        formula.related_concepts)
+        self._graph.add_node("formula", formula.formula_id, formula.related_concepts)
+        self._context_cache.clear()
+    
+    def _load_concepts(self, concept_ids: List[str]):
+        """Fetch concepts missing from the cache in one repository lookup."""
+        missing = [
+            concept_id for concept_id in concept_ids
+            if concept_id not in self._concept_cache and concept_id not in self._missing_concepts
+        ]
+        if not missing:
+            return
+        
+        if self.repository:
+            for concept_data in self.repository.get_concepts(missing):
+                self._cache_concept(MathematicalConcept.from_dict(concept_data))
+        self._missing_concepts.update(
+            concept_id for concept_id in missing if concept_id not in self._concept_cache
+        )
+    
     def _initialize_core_knowledge(self):
         """Initialize the knowledge base with core mathematical knowledge."""
         # Add basic concepts
@@ -386,7 +439,7 @@ class MathKnowledgeBase:
         # Add all concepts to the cache
         all_concepts = algebra_concepts + calculus_concepts + linear_algebra_concepts
         for concept in all_concepts:
-            self._concept_cache[concept.concept_id] = concept
+            self._cache_concept(concept)
     
     def _add_core_theorems(self):
 
@@ -485,7 +538,7 @@ class MathKnowledgeBase:
         # Add all theorems to the cache
         all_theorems = algebra_theorems + calculus_theorems + linear_algebra_theorems
         for theorem in all_theorems:
-            self._theorem_cache[theorem.theorem_id] = theorem
+            self._cache_theorem(theorem)
     
     def _add_core_formulas(self):
         """Add core mathematical formulas to the knowledge base."""
@@ -600,7 +653,7 @@ class MathKnowledgeBase:
         # Add all formulas to the cache
         all_formulas = algebra_formulas + calculus_formulas + linear_algebra_formulas
         for formula in all_formulas:
-            self._formula_cache[formula.formula_id] = formula
+            self._cache_formula(formula)
     
     def get_concept(self, concept_id: str) -> Optional[MathematicalConcept]:
         """
@@ -621,7 +674,7 @@ class MathKnowledgeBase:
             concept_data = self.repository.get_concept(concept_id)
             if concept_data:
                 concept = MathematicalConcept.from_dict(concept_data)
-                self._concept_cache[concept_id] = concept
+                self._cache_concept(concept)
                 return concept
         
         return None
@@ -645,7 +698,7 @@ class MathKnowledgeBase:
             theorem_data = self.repository.get_theorem(theorem_id)
             if theorem_data:
                 theorem = MathematicalTheorem.from_dict(theorem_data)
-                self._theorem_cache[theorem_id] = theorem
+                self._cache_theorem(theorem)
                 return theorem
         
         return None
@@ -669,11 +722,26 @@ class MathKnowledgeBase:
             formula_data = self.repository.get_formula(formula_id)
             if formula_data:
                 formula = MathematicalFormula.from_dict(formula_data)
-                self._formula_cache[formula_id] = formula
+                self._cache_formula(formula)
                 return formula
         
         return None
     
+    def _merge_repository_results(self, result: List, documents: List[Dict[str, Any]],
+                                  id_field: str, factory, cache) -> List:
+        """Append repository documents missing from ``result``, caching them."""
+        seen = {getattr(item, id_field) for item in result}
+        for data in documents:
+            # Skip items we already have in the result
+            if data[id_field] in seen:
+                continue
+            
+            item = factory.from_dict(data)
+            cache(item)
+            seen.add(data[id_field])
+            result.append(item)
+        return result
+    
     def search_concepts_by_domain(self, domain: str) -> List[MathematicalConcept]:
         """
         Search for concepts in a specific domain.
@@ -684,24 +752,15 @@ class MathKnowledgeBase:
         Returns:
             List of concepts in the specified domain
         """
-        result = []
-        
         # First check the cache
-        for concept in self._concept_cache.values():
-            if concept.domain == domain:
-                result.append(concept)
+        result = [self._concept_cache[concept_id] for concept_id in self._index.by_domain("concept", domain)]
         
         # If we have a repository, search in it as well
         if self.repository:
-            concept_data_list = self.repository.search_concepts({"domain": domain})
-            for concept_data in concept_data_list:
-                # Skip concepts we already have in the result
-                if concept_data["concept_id"] in [c.concept_id for c in result]:
-                    continue
-                
-                concept = MathematicalConcept.from_dict(concept_data)
-                self._concept_cache[concept.concept_id] = concept
-                result.append(concept)
+            self._merge_repository_results(
+                result, self.repository.search_concepts({"domain": domain}),
+                "concept_id", MathematicalConcept, self._cache_concept
+            )
         
         return result
     
@@ -715,24 +774,15 @@ class MathKnowledgeBase:
         Returns:
             List of theorems in the specified domain
         """
-        result = []
-        
         # First check the cache
-        for theorem in self._theorem_cache.values():
-            if theorem.domain == domain:
-                result.append(theorem)
+        result = [self._theorem_cache[theorem_id] for theorem_id in self._index.by_domain("theorem", domain)]
         
         # If we have a repository, search in it as well
         if self.repository:
-            theorem_data_list = self.repository.search_theorems({"domain": domain})
-            for theorem_data in theorem_data_list:
-                # Skip theorems we already have in the result
-                if theorem_data["theorem_id"] in [t.theorem_id for t in result]:
-                    continue
-                
-                theorem = MathematicalTheorem.from_dict(theorem_data)
-                self._theorem_cache[theorem.theorem_id] = theorem
-                result.append(theorem)
+            self._merge_repository_results(
+                result, self.repository.search_theorems({"domain": domain}),
+                "theorem_id", MathematicalTheorem, self._cache_theorem
+            )
         
         return result
     
@@ -746,24 +796,15 @@ class MathKnowledgeBase:
         Returns:
             List of formulas in the specified domain
         """
-        result = []
-        
         # First check the cache
-        for formula in self._formula_cache.values():
-            if formula.domain == domain:
-                result.append(formula)
+        result = [self._formula_cache[formula_id] for formula_id in self._index.by_domain("formula", domain)]
         
         # If we have a repository, search in it as well
         if self.repository:
-            formula_data_list = self.repository.search_formulas({"domain": domain})
-            for formula_data in formula_data_list:
-                # Skip formulas we already have in the result
-                if formula_data["formula_id"] in [f.formula_id for f in result]:
-                    continue
-                
-                formula = MathematicalFormula.from_dict(formula_data)
-                self._formula_cache[formula.formula_id] = formula
-                result.append(formula)
+            self._merge_repository_results(
+                result, self.repository.search_formulas({"domain": domain}),
+                "formula_id", MathematicalFormula, self._cache_formula
+            )
         
         return result
     
@@ -771,6 +812,9 @@ class MathKnowledgeBase:
         """
         Search for mathematical knowledge by name.
         
+        Every word of the search must match a word of an item's name or ID;
+        the last word may be partial.
+        
         Args:
             name: Name or partial name to search for
             
@@ -784,54 +828,32 @@ class MathKnowledgeBase:
         }
         
         # First check the cache
-        name_lower = name.lower()
-        
-        for concept in self._concept_cache.values():
-            if name_lower in concept.name.lower():
-                result["concepts"].append(concept)
-        
-        for theorem in self._theorem_cache.values():
-            if name_lower in theorem.name.lower():
-                result["theorems"].append(theorem)
-        
-        for formula in self._formula_cache.values():
-            if name_lower in formula.name.lower():
-                result["formulas"].append(formula)
+        caches = {
+            "concept": (self._concept_cache, result["concepts"]),
+            "theorem": (self._theorem_cache, result["theorems"]),
+            "formula": (self._formula_cache, result["formulas"])
+        }
+        for kind, item_id in self._index.search(name):
+            cache, items = caches[kind]
+            items.append(cache[item_id])
         
         # If we have a repository, search in it as well
         if self.repository:
             # This is a simplified implementation - in practice, we'd need a more sophisticated search
             search_criteria = {"name_contains": name}
             
-            concept_data_list = self.repository.search_concepts(search_criteria)
-            for concept_data in concept_data_list:
-                # Skip concepts we already have in the result
-                if concept_data["concept_id"] in [c.concept_id for c in result["concepts"]]:
-                    continue
-                
-                concept = MathematicalConcept.from_dict(concept_data)
-                self._concept_cache[concept.concept_id] = concept
-                result["concepts"].append(concept)
-            
-            theorem_data_list = self.repository.search_theorems(search_criteria)
-            for theorem_data in theorem_data_list:
-                # Skip theorems we already have in the result
-                if theorem_data["theorem_id"] in [t.theorem_id for t in result["theorems"]]:
-                    continue
-                
-                theorem = MathematicalTheorem.from_dict(theorem_data)
-                self._theorem_cache[theorem.theorem_id] = theorem
-                result["theorems"].append(theorem)
-            
-            formula_data_list = self.repository.search_formulas(search_criteria)
-            for formula_data in formula_data_list:
-                # Skip formulas we already have in the result
-                if formula_data["formula_id"] in [f.formula_id for f in result["formulas"]]:
-                    continue
-                
-                formula = MathematicalFormula.from_dict(formula_data)
-                self._formula_cache[formula.formula_id] = formula
-                result["formulas"].append(formula)
+            self._merge_repository_results(
+                result["concepts"], self.repository.search_concepts(search_criteria),
+                "concept_id", MathematicalConcept, self._cache_concept
+            )
+            self._merge_repository_results(
+                result["theorems"], self.repository.search_theorems(search_criteria),
+                "theorem_id", MathematicalTheorem, self._cache_theorem
+            )
+            self._merge_repository_results(
+                result["formulas"], self.repository.search_formulas(search_criteria),
+                "formula_id", MathematicalFormula, self._cache_formula
+            )
         
         return result
     
@@ -844,38 +866,20 @@ class MathKnowledgeBase:
             depth: Depth of relationship traversal (default is 1, direct relationships only)
             
         Returns:
-            List of related concepts
+            List of related concepts, nearest first
         """
-        result = []
-        visited_ids = set()
-        
         # Get the initial concept
         concept = self.get_concept(concept_id)
         if not concept:
-            return result
-        
-        # Add the concept itself to the visited set
-        visited_ids.add(concept_id)
-        
-        # Process the related concepts
-        related_ids = concept.related_concepts
-        for related_id in related_ids:
-            if related_id not in visited_ids:
-                related_concept = self.get_concept(related_id)
-                if related_concept:
-                    result.append(related_concept)
-                    visited_ids.add(related_id)
-        
-        # If depth is greater than 1, recursively get related concepts
-        if depth > 1:
-            for related_id in related_ids:
-                next_level_related = self.get_related_concepts(related_id, depth - 1)
-                for next_concept in next_level_related:
-                    if next_concept.concept_id not in visited_ids:
-                        result.append(next_concept)
-                        visited_ids.add(next_concept.concept_id)
-        
-        return result
+            return []
+        
+        # Concepts reached but not cached are fetched in one batch per level
+        related_ids = self._graph.neighborhood("concept", concept_id, depth, self._load_concepts)
+        return [
+            self._concept_cache[related_id]
+            for related_id in related_ids
+            if related_id in self._concept_cache
+        ]
     
     def get_applicable_theorems(self, domain: str, expression_type: str) -> List[MathematicalTheorem]:
         """
@@ -888,20 +892,15 @@ class MathKnowledgeBase:
         Returns:
             List of applicable theorems
         """
-        result = []
-        
-        # First get all theorems in the domain
-        domain_theorems = self.search_theorems_by_domain(domain)
-        
-        # Filter based on expression type - this is a simple implementation
-        # In practice, we'd need more sophisticated matching based on the properties
-        # of the expression
-        for theorem in domain_theorems:
-            # Check if any related concept matches the expression type
-            if expression_type in theorem.related_concepts:
-                result.append(theorem)
+        # Load the domain's theorems from the repository into the cache
+        if self.repository:
+            self.search_theorems_by_domain(domain)
         
-        return result
+        # A theorem applies when the expression type is one of its related concepts
+        return [
+            self._theorem_cache[theorem_id]
+            for theorem_id in self._index.by_related("theorem", expression_type, domain)
+        ]
     
     def get_applicable_formulas(self, domain: str, expression_type: str) -> List[MathematicalFormula]:
         """
@@ -914,23 +913,22 @@ class MathKnowledgeBase:
         Returns:
             List of applicable formulas
         """
-        result = []
-        
-        # First get all formulas in the domain
-        domain_formulas = self.search_formulas_by_domain(domain)
-        
-        # Filter based on expression type
-        for formula in domain_formulas:
-            # Check if any related concept matches the expression type
-            if expression_type in formula.related_concepts:
-                result.append(formula)
+        # Load the domain's formulas from the repository into the cache
+        if self.repository:
+            self.search_formulas_by_domain(domain)
         
-        return result
+        # A formula applies when the expression type is one of its related concepts
+        return [
+            self._formula_cache[formula_id]
+            for formula_id in self._index.by_related("formula", expression_type, domain)
+        ]
     
     def get_context_for_solution(self, domain: str, operation: str, expression_type: str) -> Dict[str, Any]:
         """
         Get contextual information for a solution step.
         
+        Contexts are memoized until the knowledge base changes.
+        
         Args:
             domain: Mathematical domain (e.g., algebra, calculus)
             operation: Operation being performed (e.g., solve, differentiate)
@@ -939,6 +937,17 @@ class MathKnowledgeBase:
         Returns:
             Dictionary with relevant concepts, theorems, and formulas
         """
+        key = (domain, operation, expression_type)
+        context = self._context_cache.get(key)
+        if context is None:
+            context = self._build_context_for_solution(domain, operation, expression_type)
+            self._context_cache[key] = context
+        
+        # Callers may extend the lists
+        return {name: list(items) for name, items in context.items()}
+    
+    def _build_context_for_solution(self, domain: str, operation: str, expression_type: str) -> Dict[str, Any]:
+        """Assemble the context for a solution step."""
         context = {
             "concepts": [],
             "theorems": [],
@@ -1005,7 +1014,7 @@ class MathKnowledgeBase:
             True if the concept was added successfully, False otherwise
         """
         # Add to the cache
-        self._concept_cache[concept.concept_id] = concept
+        self._cache_concept(concept)
         
         # If we have a repository, add to it as well
         if self.repository:
@@ -1024,7 +1033,7 @@ class MathKnowledgeBase:
             True if the theorem was added successfully, False otherwise
         """
         # Add to the cache
-        self._theorem_cache[theorem.theorem_id] = theorem
+        self._cache_theorem(theorem)
         
         # If we have a repository, add to it as well
         if self.repository:
@@ -1043,11 +1052,10 @@ class MathKnowledgeBase:
             True if the formula was added successfully, False otherwise
         """
         # Add to the cache
-        self._formula_cache[formula.formula_id] = formula
+        self._cache_formula(formula)
         
         # If we have a repository, add to it as well
         if self.repository:
             return self.repository.add_formula(formula.to_dict())
         
         return True
-EOF
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Knowledge Index
+
+This module provides in-memory indexes over the knowledge base: a token
+inverted index with a prefix trie for name search, and posting lists by
+domain and by related concept, so lookups cost the size of their result
+rather than the size of the knowledge base.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# (kind, item_id); kinds are "concept", "theorem" and "formula"
+Key = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class PrefixTrie:
+    """Trie of tokens supporting prefix completion."""
+
+    def __init__(self):
+        self._root: Dict[str, dict] = {}
+        # Marks a node that ends a token
+        self._end = "$"
+
+    def insert(self, token: str):
+        """Add a token to the trie."""
+        node = self._root
+        for char in token:
+            node = node.setdefault(char, {})
+        node[self._end] = True
+
+    def remove(self, token: str):
+        """Remove a token from the trie, pruning empty branches."""
+        path = []
+        node = self._root
+        for char in token:
+            if char not in node:
+                return
+            path.append((node, char))
+            node = node[char]
+        node.pop(self._end, None)
+        for parent, char in reversed(path):
+            if parent[char]:
+                break
+            del parent[char]
+
+    def complete(self, prefix: str) -> Iterator[str]:
+        """Iterate over the tokens starting with a prefix."""
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return
+        stack = [(node, prefix)]
+        while stack:
+            node, token = stack.pop()
+            for char, child in node.items():
+                if char == self._end:
+                    yield token
+                else:
+                    stack.append((child, token + char))
+
+
+class KnowledgeIndex:
+    """
+    Inverted indexes over knowledge base entries.
+
+    Entries are indexed by the tokens of their name and identifier, by
+    domain, and by related concept (which is how theorems and formulas are
+    matched to expression types). Results keep the order entries were added.
+    """
+
+    def __init__(self):
+        self._sequence: Dict[Key, int] = {}
+        self._entries: Dict[Key, Tuple[Set[str], str, Tuple[str, ...]]] = {}
+        self._tokens: Dict[str, Set[Key]] = {}
+        self._trie = PrefixTrie()
+        self._domains: Dict[Tuple[str, str], Dict[str, None]] = {}
+        self._related: Dict[Tuple[str, str], Dict[str, None]] = {}
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._entries
+
+    def add(self, kind: str, item_id: str, name: str, domain: str,
+            related: Iterable[str] = (), aliases: Iterable[str] = ()):
+        """
+        Index an entry, replacing any previous version of it.
+
+        Args:
+            kind: Entry kind ("concept", "theorem" or "formula")
+            item_id: Identifier of the entry
+            name: Display name
+            domain: Mathematical domain
+            related: Related concept IDs
+            aliases: Other names the entry is found by
+        """
+        key = (kind, item_id)
+        if key in self._entries:
+            self.remove(kind, item_id)
+        else:
+            self._sequence[key] = self._next
+            self._next += 1
+
+        tokens = set(tokenize(name)) | set(tokenize(item_id))
+        for alias in aliases:
+            tokens.update(tokenize(alias))
+        for token in tokens:
+            postings = self._tokens.get(token)
+            if postings is None:
+                postings = self._tokens[token] = set()
+                self._trie.insert(token)
+            postings.add(key)
+
+        related = tuple(related)
+        self._domains.setdefault((kind, domain), {})[item_id] = None
+        for concept_id in related:
+            self._related.setdefault((kind, concept_id), {})[item_id] = None
+        self._entries[key] = (tokens, domain, related)
+
+    def remove(self, kind: str, item_id: str):
+        """Remove an entry from the index."""
+        key = (kind, item_id)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        tokens, domain, related = entry
+        for token in tokens:
+            postings = self._tokens[token]
+            postings.discard(key)
+            if not postings:
+                del self._tokens[token]
+                self._trie.remove(token)
+        self._domains.get((kind, domain), {}).pop(item_id, None)
+        for concept_id in related:
+            self._related.get((kind, concept_id), {}).pop(item_id, None)
+
+    def _ordered(self, keys: Iterable[Key]) -> List[Key]:
+        return sorted(keys, key=self._sequence.__getitem__)
+
+    def search(self, text: str, kind: Optional[str] = None) -> List[Key]:
+        """
+        Find entries whose names match a query.
+
+        Every query token must match a token of the entry; the last one may
+        match as a prefix, so partial names find their entries while the
+        user is still typing.
+
+        Args:
+            text: Query text
+            kind: Only return entries of this kind
+
+        Returns:
+            Matching (kind, item_id) keys in insertion order
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+
+        *exact, last = tokens
+        # Intersect the rarest postings first
+        postings = sorted((self._tokens.get(token, set()) for token in exact), key=len)
+        prefixed: Set[Key] = set()
+        for token in self._trie.complete(last):
+            prefixed.update(self._tokens[token])
+        postings.append(prefixed)
+        postings.sort(key=len)
+
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches &= posting
+        if kind is not None:
+            matches = {key for key in matches if key[0] == kind}
+        return self._ordered(matches)
+
+    def by_domain(self, kind: str, domain: str) -> List[str]:
+        """Get the IDs of entries in a domain."""
+        return list(self._domains.get((kind, domain), ()))
+
+    def by_related(self, kind: str, concept_id: str, domain: Optional[str] = None) -> List[str]:
+        """
+        Get the IDs of entries related to a concept.
+
+        Args:
+            kind: Entry kind
+            concept_id: Related concept ID (such as an expression type)
+            domain: Only return entries in this domain
+        """
+        related = self._related.get((kind, concept_id), {})
+        if domain is None:
+            return list(related)
+        in_domain = self._domains.get((kind, domain), {})
+        return [item_id for item_id in related if item_id in in_domain]
@@ -10,6 +10,8 @@ from typing import Dict, List, Any, Optional
 import json
 import os
 
+from database.cache.query_cache import read_through, invalidate
+
 logger = logging.getLogger(__name__)
 
 class KnowledgeRepository:
@@ -24,7 +26,8 @@ class KnowledgeRepository:
         self,
         mongodb_uri: Optional[str] = None,
         use_local_storage: bool = True,
-        local_storage_path: Optional[str] = None
+        local_storage_path: Optional[str] = None,
+        query_cache=None
     ):
         """
         Initialize the knowledge repository.
@@ -33,9 +36,11 @@ class KnowledgeRepository:
             mongodb_uri: MongoDB connection URI
             use_local_storage: Whether to use local file storage
             local_storage_path: Path for local storage files
+            query_cache: Optional QueryCache for MongoDB lookups
         """
         self.mongodb_uri = mongodb_uri
         self.use_local_storage = use_local_storage
+        self.query_cache = query_cache
         self.local_storage_path = local_storage_path or os.path.join(
             os.path.dirname(os.path.abspath(__file__)), 
             "data"
@@ -50,8 +55,8 @@ class KnowledgeRepository:
         # Initialize MongoDB connection if URI is provided
         if mongodb_uri:
             try:
-                from pymongo import MongoClient
-                client = MongoClient(mongodb_uri)
+                from database.access.connection_pool import get_client
+                client = get_client(mongodb_uri)
                 self.db = client.get_database("math_knowledge")
                 self.concepts_collection = self.db.concepts
                 self.theorems_collection = self.db.theorems
@@ -86,8 +91,11 @@ class KnowledgeRepository:
             Concept data or None if not found
         """
         # Try MongoDB first if available
-        if self.concepts_collection:
-            concept = self.concepts_collection.find_one({"concept_id": concept_id})
+        if self.concepts_collection is not None:
+            query = {"concept_id": concept_id}
+            concept = read_through(
+                self.query_cache, self.concepts_collection, query, lambda: self.concepts_collection.find_one(query)
+            )
             if concept:
                 # Convert ObjectId to string for JSON compatibility
                 concept["_id"] = str(concept["_id"])
@@ -108,6 +116,49 @@ class KnowledgeRepository:
         
         return None
     
+    def get_concepts(self, concept_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get several concepts in one lookup.
+        
+        Args:
+            concept_ids: Identifiers of the concepts
+            
+        Returns:
+            Data of the concepts found, in no particular order
+        """
+        if not concept_ids:
+            return []
+        results = []
+        
+        # Try MongoDB first if available
+        if self.concepts_collection is not None:
+            try:
+                query = {"concept_id": {"$in": sorted(set(concept_ids))}}
+                documents = read_through(
+                    self.query_cache, self.concepts_collection, query,
+                    lambda: list(self.concepts_collection.find(query))
+                )
+                for concept in documents:
+                    # Convert ObjectId to string for JSON compatibility
+                    concept["_id"] = str(concept["_id"])
+                    results.append(concept)
+            except Exception as e:
+                logger.error(f"Error getting concepts from MongoDB: {e}")
+        
+        # Fall back to local storage for concepts MongoDB did not have
+        missing = set(concept_ids) - {concept.get("concept_id") for concept in results}
+        if self.use_local_storage and missing:
+            try:
+                file_path = os.path.join(self.local_storage_path, "concepts.json")
+                with open(file_path, "r") as f:
+                    concepts = json.load(f)
+                
+                results.extend(concept for concept in concepts if concept.get("concept_id") in missing)
+            except Exception as e:
+                logger.error(f"Error reading from local storage: {e}")
+        
+        return results
+    
     def get_theorem(self, theorem_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a theorem by its ID.
@@ -119,8 +170,11 @@ class KnowledgeRepository:
             Theorem data or None if not found
         """
         # Try MongoDB first if available
-        if self.theorems_collection:
-            theorem = self.theorems_collection.find_one({"theorem_id": theorem_id})
+        if self.theorems_collection is not None:
+            query = {"theorem_id": theorem_id}
+            theorem = read_through(
+                self.query_cache, self.theorems_collection, query, lambda: self.theorems_collection.find_one(query)
+            )
             if theorem:
                 # Convert ObjectId to string for JSON compatibility
                 theorem["_id"] = str(theorem["_id"])
@@ -152,8 +206,11 @@ class KnowledgeRepository:
             Formula data or None if not found
         """
         # Try MongoDB first if available
-        if self.formulas_collection:
-            formula = self.formulas_collection.find_one({"formula_id": formula_id})
+        if self.formulas_collection is not None:
+            query = {"formula_id": formula_id}
+            formula = read_through(
+                self.query_cache, self.formulas_collection, query, lambda: self.formulas_collection.find_one(query)
+            )
             if formula:
                 # Convert ObjectId to string for JSON compatibility
                 formula["_id"] = str(formula["_id"])
@@ -191,7 +248,7 @@ class KnowledgeRepository:
         
         # Try MongoDB first if available
         success = False
-        if self.concepts_collection:
+        if self.concepts_collection is not None:
             try:
                 # Check if concept already exists
                 existing = self.concepts_collection.find_one({"concept_id": concept["concept_id"]})
@@ -204,6 +261,7 @@ class KnowledgeRepository:
                 else:
                     # Insert new concept
                     self.concepts_collection.insert_one(concept)
+                invalidate(self.query_cache, self.concepts_collection)
                 success = True
             except Exception as e:
                 logger.error(f"Error adding concept to MongoDB: {e}")
@@ -256,7 +314,7 @@ class KnowledgeRepository:
         
         # Try MongoDB first if available
         success = False
-        if self.theorems_collection:
+        if self.theorems_collection is not None:
             try:
                 # Check if theorem already exists
                 existing = self.theorems_collection.find_one({"theorem_id": theorem["theorem_id"]})
@@ -269,6 +327,7 @@ class KnowledgeRepository:
                 else:
                     # Insert new theorem
                     self.theorems_collection.insert_one(theorem)
+                invalidate(self.query_cache, self.theorems_collection)
                 success = True
             except Exception as e:
                 logger.error(f"Error adding theorem to MongoDB: {e}")
@@ -321,7 +380,7 @@ class KnowledgeRepository:
         
         # Try MongoDB first if available
         success = False
-        if self.formulas_collection:
+        if self.formulas_collection is not None:
             try:
                 # Check if formula already exists
                 existing = self.formulas_collection.find_one({"formula_id": formula["formula_id"]})
@@ -334,6 +393,7 @@ class KnowledgeRepository:
                 else:
                     # Insert new formula
                     self.formulas_collection.insert_one(formula)
+                invalidate(self.query_cache, self.formulas_collection)
                 success = True
             except Exception as e:
                 logger.error(f"Error adding formula to MongoDB: {e}")
@@ -382,16 +442,19 @@ class KnowledgeRepository:
         results = []
         
         # Try MongoDB first if available
-        if self.concepts_collection:
+        if self.concepts_collection is not None:
             try:
                 # Convert search criteria to MongoDB query
                 query = self._convert_criteria_to_query(criteria)
                 
-                # Execute the query
-                cursor = self.concepts_collection.find(query)
+                # Execute the query (cached results are materialized lists)
+                documents = read_through(
+                    self.query_cache, self.concepts_collection, query,
+                    lambda: list(self.concepts_collection.find(query))
+                )
                 
                 # Process results
-                for concept in cursor:
+                for concept in documents:
                     # Convert ObjectId to string for JSON compatibility
                     concept["_id"] = str(concept["_id"])
                     results.append(concept)
@@ -427,16 +490,19 @@ class KnowledgeRepository:
         results = []
         
         # Try MongoDB first if available
-        if self.theorems_collection:
+        if self.theorems_collection is not None:
             try:
                 # Convert search criteria to MongoDB query
                 query = self._convert_criteria_to_query(criteria)
                 
-                # Execute the query
-                cursor = self.theorems_collection.find(query)
+                # Execute the query (cached results are materialized lists)
+                documents = read_through(
+                    self.query_cache, self.theorems_collection, query,
+                    lambda: list(self.theorems_collection.find(query))
+                )
                 
                 # Process results
-                for theorem in cursor:
+                for theorem in documents:
                     # Convert ObjectId to string for JSON compatibility
                     theorem["_id"] = str(theorem["_id"])
                     results.append(theorem)
@@ -472,16 +538,19 @@ class KnowledgeRepository:
         results = []
         
         # Try MongoDB first if available
-        if self.formulas_collection:
+        if self.formulas_collection is not None:
             try:
                 # Convert search criteria to MongoDB query
                 query = self._convert_criteria_to_query(criteria)
                 
-                # Execute the query
-                cursor = self.formulas_collection.find(query)
+                # Execute the query (cached results are materialized lists)
+                documents = read_through(
+                    self.query_cache, self.formulas_collection, query,
+                    lambda: list(self.formulas_collection.find(query))
+                )
                 
                 # Process results
-                for formula in cursor:
+                for formula in documents:
                     # Convert ObjectId to string for JSON compatibility
                     formula["_id"] = str(formula["_id"])
                     results.append(formula)
@@ -0,0 +1,100 @@
+"""
+Tests for the concept relationship graph.
+"""
+
+from math_processing.knowledge.concept_graph import ConceptGraph
+from math_processing.knowledge.knowledge_base import MathKnowledgeBase, MathematicalConcept
+
+
+def _concept(concept_id, related):
+    return MathematicalConcept(concept_id, concept_id.title(), "calculus", concept_id, related_concepts=related)
+
+
+class FakeRepository:
+    """Repository double that records batch lookups."""
+
+    def __init__(self, concepts):
+        self.concepts = {concept.concept_id: concept.to_dict() for concept in concepts}
+        self.batches = []
+
+    def get_concept(self, concept_id):
+        return self.concepts.get(concept_id)
+
+    def get_concepts(self, concept_ids):
+        self.batches.append(sorted(concept_ids))
+        return [self.concepts[concept_id] for concept_id in concept_ids if concept_id in self.concepts]
+
+    def add_concept(self, concept_data):
+        self.concepts[concept_data["concept_id"]] = concept_data
+        return True
+
+
+class TestConceptGraph:
+    """Test bounded traversal and memoization."""
+
+    def test_neighborhood_is_bounded_and_breadth_first(self):
+        """Test that traversal stops at the requested depth and skips cycles."""
+        graph = ConceptGraph()
+        graph.add_node("concept", "a", ["b", "c"])
+        graph.add_node("concept", "b", ["d", "a"])
+        graph.add_node("concept", "c", ["d"])
+        graph.add_node("concept", "d", ["e"])
+
+        assert graph.neighborhood("concept", "a", 1) == ["b", "c"]
+        assert graph.neighborhood("concept", "a", 2) == ["b", "c", "d"]
+        assert graph.neighborhood("concept", "a", 5) == ["b", "c", "d", "e"]
+        assert graph.neighborhood("concept", "missing", 2) == []
+
+    def test_memo_is_invalidated_by_changes(self):
+        """Test that adding a node drops memoized neighborhoods."""
+        graph = ConceptGraph()
+        graph.add_node("concept", "a", ["b"])
+        assert graph.neighborhood("concept", "a", 2) == ["b"]
+
+        graph.add_node("concept", "b", ["c"])
+        assert graph.neighborhood("concept", "a", 2) == ["b", "c"]
+
+    def test_knowledge_base_related_concepts(self):
+        """Test depth traversal and invalidation through the knowledge base."""
+        kb = MathKnowledgeBase()
+        kb.add_concept(_concept("limit", ["continuity"]))
+        kb.add_concept(_concept("continuity", ["function"]))
+
+        related = kb.get_related_concepts("derivative", depth=2)
+        assert [concept.concept_id for concept in related] == ["limit", "continuity"]
+
+        kb.add_concept(_concept("differentiation_rules", []))
+        related = kb.get_related_concepts("derivative")
+        assert [concept.concept_id for concept in related] == ["limit", "differentiation_rules"]
+
+    def test_missing_concepts_are_fetched_in_batches(self):
+        """Test that each level is prefetched in one repository call."""
+        repository = FakeRepository([
+            _concept("root", ["a", "b", "ghost"]),
+            _concept("a", ["c"]),
+            _concept("b", ["c", "d"]),
+            _concept("c", []),
+            _concept("d", []),
+        ])
+        kb = MathKnowledgeBase(repository)
+
+        related = kb.get_related_concepts("root", depth=2)
+        assert [concept.concept_id for concept in related] == ["a", "b", "c", "d"]
+        assert repository.batches == [["a", "b", "ghost"], ["c", "d"]]
+
+        # Memoized, and unknown concepts are not looked up again
+        kb.get_related_concepts("root", depth=2)
+        kb.get_related_concepts("a", depth=1)
+        assert len(repository.batches) == 2
+
+    def test_solution_context_is_memoized(self):
+        """Test that contexts are reused and rebuilt after changes."""
+        kb = MathKnowledgeBase()
+        first = kb.get_context_for_solution("calculus", "differentiate", "polynomial")
+        first["concepts"].append("scratch")
+
+        second = kb.get_context_for_solution("calculus", "differentiate", "polynomial")
+        assert "scratch" not in second["concepts"]
+
+        kb.add_concept(_concept("taylor_series", []))
+        assert kb._context_cache == {}
@@ -0,0 +1,58 @@
+"""
+Tests for the compiled keyword matcher and the domain classifiers using it.
+"""
+
+from math_processing.classification.domain_classifier import MathDomainClassifier
+from math_processing.classification.keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher:
+    """Test single-pass keyword matching."""
+
+    def test_finds_overlapping_keywords(self):
+        """Test that keywords nested in or overlapping others are all found."""
+        matcher = KeywordMatcher({"a": ["linear equation", "equation", "near"], "b": ["quation"]})
+
+        assert matcher.find("Solve the LINEAR equation") == {"linear equation", "equation", "near", "quation"}
+        assert matcher.count("solve the linear equation") == {"a": 3, "b": 1}
+        assert matcher.count("nothing here") == {"a": 0, "b": 0}
+
+    def test_whole_words(self):
+        """Test that word-boundary matching rejects partial words."""
+        matcher = KeywordMatcher({"calculus": ["integrate", "limit"], "stats": ["p-value"]}, whole_words=True)
+
+        assert matcher.find("integrated circuit with no limits") == set()
+        assert matcher.find("integrate to the limit") == {"integrate", "limit"}
+        assert matcher.find("report the p-value") == {"p-value"}
+
+    def test_shared_keywords_count_for_each_label(self):
+        """Test that a keyword listed under several labels counts for each."""
+        matcher = KeywordMatcher({"algebra": ["factor", "factor"], "number_theory": ["factor", "prime"]})
+
+        assert matcher.count("factor 12 into primes") == {"algebra": 1, "number_theory": 2}
+
+
+class TestDomainClassification:
+    """Test classifiers built on the matcher."""
+
+    def test_classification_is_memoized(self):
+        """Test that repeated queries hit the cache and results are copies."""
+        classifier = MathDomainClassifier()
+        query = "Find the derivative of x^2 using the chain rule"
+
+        first = classifier.classify_query(query, include_details=True)
+        first["secondary_domains"].append("mutated")
+        second = classifier.classify_query(query, include_details=True)
+
+        assert second["primary_domain"] == "calculus"
+        assert "mutated" not in second["secondary_domains"]
+        assert classifier._classify_cached.cache_info().hits == 1
+
+    def test_prompting_classifier(self):
+        """Test the prompt builder's substring classifier."""
+        from core.prompting.domain_classifier import classify_domain, get_detailed_classification
+
+        assert classify_domain("Find the eigenvalue of this matrix") == "linear_algebra"
+        detailed = get_detailed_classification("hello there")
+        assert detailed["domain"] == "general"
+        assert detailed["confidence"] == 0
@@ -0,0 +1,85 @@
+"""
+Tests for the knowledge base indexes.
+"""
+
+import time
+
+from math_processing.knowledge.knowledge_base import MathKnowledgeBase, MathematicalTheorem
+from math_processing.knowledge.knowledge_index import KnowledgeIndex, PrefixTrie
+
+
+class TestKnowledgeIndex:
+    """Test the inverted index and prefix trie."""
+
+    def test_prefix_trie(self):
+        """Test prefix completion and pruning on removal."""
+        trie = PrefixTrie()
+        for token in ["derivative", "derive", "determinant"]:
+            trie.insert(token)
+
+        assert sorted(trie.complete("deriv")) == ["derivative", "derive"]
+        trie.remove("derive")
+        assert list(trie.complete("deriv")) == ["derivative"]
+        assert list(trie.complete("x")) == []
+
+    def test_search_matches_words_and_prefixes(self):
+        """Test that all words must match and the last may be partial."""
+        index = KnowledgeIndex()
+        index.add("theorem", "chain_rule", "Chain Rule", "calculus", ["derivative"])
+        index.add("formula", "power_rule_differentiation", "Power Rule for Differentiation", "calculus")
+        index.add("concept", "matrix", "Matrix", "linear_algebra")
+
+        assert index.search("rule") == [("theorem", "chain_rule"), ("formula", "power_rule_differentiation")]
+        assert index.search("power diff") == [("formula", "power_rule_differentiation")]
+        assert index.search("chain power") == []
+        assert index.search("rule", kind="theorem") == [("theorem", "chain_rule")]
+        assert index.search("  ") == []
+
+    def test_reindexing_replaces_postings(self):
+        """Test that re-adding an entry drops its old tokens and domain."""
+        index = KnowledgeIndex()
+        index.add("concept", "c1", "Old Name", "algebra", ["x"])
+        index.add("concept", "c1", "New Name", "calculus", ["y"])
+
+        assert index.search("old") == []
+        assert index.search("new") == [("concept", "c1")]
+        assert index.by_domain("concept", "algebra") == []
+        assert index.by_related("concept", "y", "calculus") == ["c1"]
+        assert index.by_related("concept", "x") == []
+
+
+class TestKnowledgeBaseSearch:
+    """Test knowledge base lookups through the indexes."""
+
+    def test_core_knowledge_lookups(self):
+        """Test name, domain and applicability lookups on the core knowledge."""
+        kb = MathKnowledgeBase()
+
+        assert [t.theorem_id for t in kb.search_by_name("quadratic form")["theorems"]] == ["quadratic_formula"]
+        assert {c.concept_id for c in kb.search_concepts_by_domain("calculus")} == {"derivative", "integral"}
+        assert [t.theorem_id for t in kb.get_applicable_theorems("algebra", "quadratic_equation")] == [
+            "quadratic_formula"
+        ]
+
+    def test_lookups_scale(self):
+        """Test that lookups stay fast with tens of thousands of entries."""
+        kb = MathKnowledgeBase()
+        for i in range(20000):
+            kb.add_theorem(MathematicalTheorem(
+                theorem_id=f"theorem_{i}",
+                name=f"Generated Theorem {i} on topic{i % 500}",
+                domain=f"domain_{i % 50}",
+                statement="",
+                latex_representation="",
+                related_concepts=[f"type_{i % 200}"]
+            ))
+
+        start = time.perf_counter()
+        for _ in range(100):
+            matches = kb.search_by_name("topic42 theorem")["theorems"]
+            applicable = kb.get_applicable_theorems("domain_7", "type_7")
+        elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+
+        assert len(matches) == 40
+        assert len(applicable) == 100
+        assert elapsed_ms < 5
@@ -14,6 +14,7 @@ from ..ocr.advanced_symbol_detector import detect_symbols as advanced_detect_sym
 from ..image_processing.diagram_detector import detect_diagrams
 from ..image_processing.coordinate_detector import detect_coordinate_system
 from ..image_processing.format_handler import detect_format, convert_format
+from ..image_processing.image_buffer import load_image
 
 logger = logging.getLogger(__name__)
 
@@ -54,23 +55,31 @@ class AdvancedOCRAgent:
             # Extract necessary data
             image_data = input_data.get("preprocessed_image", input_data)
             image_path = image_data.get("image_path", None)
+            image = image_data.get("image", None)
             
-            if not image_path or not os.path.exists(image_path):
+            if image is not None:
+                # Already decoded (or raw bytes) in memory
+                format_info = {"format": "standard"}
+            elif not image_path or not os.path.exists(image_path):
                 return {
                     "success": False,
                     "error": "No image path provided or file does not exist"
                 }
-            
-            # Detect and handle format
-            format_info = detect_format(image_path)
-            
-            # If not standard image format, convert
-            if format_info.get("format") != "standard":
-                conversion_result = convert_format(image_path, format_info)
-                if conversion_result.get("success", False):
-                    image_path = conversion_result.get("converted_path")
-                else:
-                    logger.warning(f"Format conversion failed: {conversion_result.get('error')}")
+            else:
+                # Detect and handle format
+                format_info = detect_format(image_path)
+                
+                # If not standard image format, convert
+                if format_info.get("format") != "standard":
+                    conversion_result = convert_format(image_path, format_info)
+                    if conversion_result.get("success", False):
+                        image_path = conversion_result.get("converted_path")
+                    else:
+                        logger.warning(f"Format conversion failed: {conversion_result.get('error')}")
+                image = image_path
+            
+            # Decode once; every detector below shares the buffer and its views
+            image = load_image(image)
             
             # Initialize results dictionary
             results = {
@@ -82,20 +91,20 @@ class AdvancedOCRAgent:
             
             # Check for diagrams if enabled
             if self.process_diagrams:
-                diagram_result = detect_diagrams(image_path)
+                diagram_result = detect_diagrams(image)
                 if diagram_result.get("has_diagrams", False):
                     results["diagrams"] = diagram_result.get("diagrams", [])
                     results["content_types"].append("diagram")
             
             # Check for coordinate systems if enabled
             if self.process_coordinates:
-                coordinate_result = detect_coordinate_system(image_path)
+                coordinate_result = detect_coordinate_system(image)
                 if coordinate_result.get("has_coordinates", False):
                     results["coordinates"] = coordinate_result
                     results["content_types"].append("coordinates")
             
             # Use advanced symbol detection
-            symbols = advanced_detect_symbols(image_path)
+            symbols = advanced_detect_symbols(image)
             results["symbols"] = symbols
             
             # If we have mathematical expressions, add to content types
@@ -107,6 +116,7 @@ class AdvancedOCRAgent:
                 # Prepare input for OCR agent
                 ocr_input = {
                     "image_path": image_path,
+                    "image": image,
                     "symbols": symbols
                 }
                 
@@ -14,6 +14,7 @@ from datetime import datetime
 
 from core.agent.llm_agent import CoreLLMAgent
 from multimodal.unified_pipeline.content_router import ContentRouter
+from multimodal.agent.local_router import DEFAULT_CONFIDENCE_THRESHOLD
 from multimodal.context.context_manager import get_context_manager
 from orchestration.manager.orchestration_manager import get_orchestration_manager
 from orchestration.agents.registry import get_agent_registry
@@ -110,6 +111,12 @@ Please follow these steps:
 """
         }
         
+        # Routing confidence above which templated agents get template
+        # instructions instead of LLM-generated ones
+        self.template_instruction_threshold = self.config.get(
+            "template_instruction_threshold", DEFAULT_CONFIDENCE_THRESHOLD
+        )
+        
         logger.info("Initialized Central Input Agent")
     
     async def process_request(self, 
@@ -213,7 +220,8 @@ Please follow these steps:
             agent_instructions = await self._generate_agent_instructions(
                 target_agent_type,
                 processed_request,
-                context_data
+                context_data,
+                routing_result.get("confidence")
             )
             
             # Step 7: Prepare the full workflow data
@@ -349,18 +357,27 @@ Please follow these steps:
     async def _generate_agent_instructions(self, 
                                          agent_type: str,
                                          request_data: Dict[str, Any],
-                                         context_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                                         context_data: Optional[Dict[str, Any]] = None,
+                                         routing_confidence: Optional[float] = None) -> Dict[str, Any]:
         """
         Generate detailed instructions for the target agent using LLM.
         
+        Confidently routed requests for agents with an instruction template
+        get template instructions without an LLM call.
+        
         Args:
             agent_type: The type of agent that will handle the request
             request_data: The processed request data
             context_data: Optional context data
+            routing_confidence: Confidence of the routing decision
             
         Returns:
             Detailed instructions for the agent
         """
+        if (agent_type in self.agent_instruction_templates and routing_confidence is not None
+                and routing_confidence >= self.template_instruction_threshold):
+            return self._create_template_instructions(agent_type, request_data)
+        
         # Create a prompt for the LLM to generate detailed instructions
         prompt = self._create_instruction_prompt(agent_type, request_data, context_data)
         
@@ -607,6 +624,24 @@ Return your response in JSON format with the following structure:
                 "expected_output": "Solution with steps in LaTeX format"
             }
             
+        elif agent_type == "search":
+            content = request_data.get("text", request_data.get("content", ""))
+            
+            template = self.agent_instruction_templates["search"]
+            filled_template = template.format(
+                search_query=content
+            )
+            
+            return {
+                "title": "Search for information",
+                "description": f"Search for: {content}",
+                "parameters": {
+                    "query": content
+                },
+                "step_by_step": filled_template.strip().split('\n'),
+                "expected_output": "Concise answer with supporting references"
+            }
+            
         else:
             # Generic template for other agent types
             return {
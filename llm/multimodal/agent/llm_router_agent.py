@@ -3,7 +3,11 @@ LLM Router Agent for intelligent multimodal request routing.
 
 This agent uses the Core LLM to intelligently route requests to the appropriate 
 specialized agents based on content analysis and understanding of the request.
+Requests that a local routing model classifies confidently are routed without
+an LLM call.
 """
+import os
+import time
 import logging
 from typing import Dict, Any, List, Optional, Union
 import json
@@ -11,6 +15,7 @@ import uuid
 
 from core.agent.llm_agent import CoreLLMAgent
 from core.mistral.inference import InferenceEngine
+from multimodal.agent.local_router import create_local_router, log_decision
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +50,18 @@ class LLMRouterAgent:
             "core_llm": ["question_answering", "explanation", "reasoning", "instruction_following"]
         }
         
+        # Local routing model answering confident decisions without the LLM
+        self.local_router = None
+        if self.config.get("use_local_router", True):
+            self.local_router = create_local_router(
+                self.config.get("local_router_model"),
+                self.config.get("local_router_threshold"),
+                self.agent_capability_map
+            )
+        
+        # LLM decisions are logged here to train the local routing model
+        self.routing_log_path = self.config.get("routing_log_path", os.environ.get("MATH_LLM_ROUTING_LOG"))
+        
         logger.info("Initialized LLM Router Agent")
     
     def route_request(self, processed_input: Dict[str, Any], 
@@ -59,6 +76,21 @@ class LLMRouterAgent:
         Returns:
             Dictionary containing routing decision and analysis
         """
+        # Route locally when the local model is confident
+        if self.local_router is not None:
+            start_time = time.perf_counter()
+            routing_decision = self.local_router.predict(processed_input)
+            if routing_decision is not None:
+                return {
+                    "success": True,
+                    "input_type": processed_input.get("input_type", "unknown"),
+                    "routing_id": str(uuid.uuid4()),
+                    "routing_decision": routing_decision,
+                    "routed_locally": True,
+                    "processing_time_ms": round((time.perf_counter() - start_time) * 1000, 3),
+                    "original_input": processed_input
+                }
+        
         # Create a prompt for the LLM to analyze the request
         prompt = self._create_routing_prompt(processed_input, context_data)
         
@@ -76,6 +108,9 @@ class LLMRouterAgent:
         # Parse routing decision from LLM output
         try:
             routing_decision = self._parse_routing_decision(analysis_result["response"])
+            # Parsing fallbacks are not decisions worth learning from
+            if self.routing_log_path and not routing_decision.get("reasoning", "").startswith("Fallback"):
+                log_decision(self.routing_log_path, processed_input, routing_decision)
         except Exception as e:
             logger.error(f"Failed to parse routing decision: {str(e)}")
             routing_decision = {
@@ -91,6 +126,7 @@ class LLMRouterAgent:
             "input_type": processed_input.get("input_type", "unknown"),
             "routing_id": str(uuid.uuid4()),
             "routing_decision": routing_decision,
+            "routed_locally": False,
             "processing_time_ms": analysis_result.get("processing_time_ms", 0),
             "original_input": processed_input
         }
@@ -0,0 +1,453 @@
+"""
+Local routing model for multimodal requests.
+
+Most routing decisions can be read off the request itself: "plot" goes to
+visualization, "solve" or an equation to math computation. This module keeps a
+small naive Bayes model over keyword and structural features of a request that
+answers those decisions in microseconds, so the LLM router is only consulted
+when the model is not confident.
+
+The model starts from seed keywords for each agent and is trained offline on
+the routing decisions the LLM router logs:
+
+    python -m multimodal.agent.local_router routing_log.jsonl router_model.json
+"""
+import os
+import re
+import json
+import math
+import logging
+import argparse
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.85
+
+# Seed keywords count as this many observations of their agent, so that a
+# single unambiguous keyword is enough for a confident decision. Seeds may
+# also name structural features such as "__equation".
+SEED_WEIGHT = 50
+
+SEED_KEYWORDS = {
+    "math_computation": [
+        "solve", "calculate", "compute", "simplify", "evaluate", "derivative",
+        "differentiate", "integral", "integrate", "equation", "factor", "expand",
+        "roots", "determinant", "eigenvalue", "eigenvalues", "limit", "sum",
+        "__equation"
+    ],
+    "visualization": [
+        "plot", "chart", "visualize", "visualization", "draw", "sketch",
+        "histogram", "heatmap", "scatter"
+    ],
+    "search": [
+        "search", "papers", "paper", "article", "articles", "reference",
+        "references", "sources", "literature", "cite"
+    ],
+    "ocr": [
+        "handwritten", "handwriting", "scan", "scanned", "photo", "picture",
+        "transcribe", "__type_image"
+    ],
+    "text_processing": [
+        "summarize", "summary", "translate", "rephrase", "paraphrase", "grammar"
+    ],
+    "core_llm": [
+        "explain", "why", "prove", "proof", "intuition", "describe", "meaning",
+        "difference", "understand"
+    ]
+}
+
+_WORD_PATTERN = re.compile(r"[a-z]{2,}")
+_LATEX_COMMAND = re.compile(r"\\[A-Za-z]+")
+
+
+def routing_text(processed_input: Dict[str, Any]) -> str:
+    """
+    Get the text of a request that routing decisions are based on.
+
+    Args:
+        processed_input: Processed input data
+
+    Returns:
+        The request text, recognized LaTeX included
+    """
+    if processed_input.get("input_type") == "multipart":
+        return "\n".join(routing_text(part) for part in processed_input.get("parts", {}).values())
+
+    pieces = [
+        processed_input.get("text") or processed_input.get("content") or "",
+        processed_input.get("recognized_latex") or ""
+    ]
+    return "\n".join(piece for piece in pieces if isinstance(piece, str) and piece)
+
+
+def routing_features(processed_input: Dict[str, Any]) -> List[str]:
+    """
+    Extract the routing features of a request.
+
+    Features are the distinct words of the request plus markers for its input
+    type, LaTeX commands, equations and numbers.
+
+    Args:
+        processed_input: Processed input data
+
+    Returns:
+        List of feature names
+    """
+    text = routing_text(processed_input)
+    features = dict.fromkeys(_WORD_PATTERN.findall(text.lower()))
+
+    input_type = processed_input.get("input_type", "unknown")
+    features[f"__type_{input_type}"] = None
+    if input_type == "multipart":
+        for part in processed_input.get("parts", {}).values():
+            features[f"__part_{part.get('input_type', 'unknown')}"] = None
+    if _LATEX_COMMAND.search(text):
+        features["__latex"] = None
+    if "=" in text:
+        features["__equation"] = None
+    if any(char.isdigit() for char in text):
+        features["__number"] = None
+
+    return list(features)
+
+
+class LocalRouter:
+    """
+    Naive Bayes routing model with a confidence threshold.
+
+    Features the model has never seen are ignored, so a request made only of
+    unknown words gets the prior distribution and is left to the LLM.
+    """
+
+    def __init__(self,
+                 threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+                 default_capabilities: Optional[Dict[str, List[str]]] = None,
+                 smoothing: float = 1.0):
+        """
+        Initialize an untrained router.
+
+        Args:
+            threshold: Minimum confidence for a local decision
+            default_capabilities: Capabilities of each agent, used when no
+                logged decisions say which capabilities an agent needs
+            smoothing: Additive smoothing of the feature counts
+        """
+        self.threshold = threshold
+        self.default_capabilities = default_capabilities or {}
+        self.smoothing = smoothing
+
+        self._label_counts: Counter = Counter()
+        self._feature_counts: Dict[str, Counter] = {}
+        self._capability_counts: Dict[str, Counter] = {}
+        self._decision_counts: Counter = Counter()
+
+        self._lock = threading.Lock()
+        self._labels: List[str] = []
+        self._log_prior: List[float] = []
+        self._log_likelihood: Dict[str, List[float]] = {}
+
+    @classmethod
+    def seeded(cls,
+               keywords: Optional[Dict[str, Iterable[str]]] = None,
+               **kwargs) -> "LocalRouter":
+        """
+        Create a router trained only on seed keywords.
+
+        Args:
+            keywords: Keywords of each agent (defaults to SEED_KEYWORDS)
+            **kwargs: Arguments for the router
+
+        Returns:
+            The seeded router
+        """
+        router = cls(**kwargs)
+        for label, label_keywords in (keywords or SEED_KEYWORDS).items():
+            router._add(list(label_keywords), label, SEED_WEIGHT)
+        router._compile()
+        return router
+
+    @property
+    def labels(self) -> List[str]:
+        """Agent types the router can choose."""
+        return list(self._labels)
+
+    def _add(self, features: List[str], label: str, weight: int = 1) -> None:
+        self._label_counts[label] += weight
+        counts = self._feature_counts.setdefault(label, Counter())
+        for feature in features:
+            counts[feature] += weight
+
+    def _compile(self) -> None:
+        # Precompute log probabilities so that prediction is a sum of lookups
+        labels = sorted(self._label_counts)
+        vocabulary = set()
+        for counts in self._feature_counts.values():
+            vocabulary.update(counts)
+
+        total = sum(self._label_counts.values())
+        log_prior = [math.log(self._label_counts[label] / total) for label in labels]
+
+        denominators = []
+        for label in labels:
+            counts = self._feature_counts.get(label, Counter())
+            denominators.append(sum(counts.values()) + self.smoothing * len(vocabulary))
+
+        log_likelihood = {}
+        for feature in vocabulary:
+            log_likelihood[feature] = [
+                math.log((self._feature_counts.get(label, Counter())[feature] + self.smoothing) / denominator)
+                for label, denominator in zip(labels, denominators)
+            ]
+
+        with self._lock:
+            self._labels = labels
+            self._log_prior = log_prior
+            self._log_likelihood = log_likelihood
+
+    def train(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Train on logged routing decisions.
+
+        Args:
+            records: Logged decisions as written by log_decision
+
+        Returns:
+            Number of records used
+        """
+        used = 0
+        for record in records:
+            label = record.get("primary_agent")
+            if not label:
+                continue
+            features = record.get("features") or routing_features({
+                "input_type": record.get("input_type", "unknown"),
+                "text": record.get("text", "")
+            })
+            self._add(features, label)
+
+            self._decision_counts[label] += 1
+            capabilities = self._capability_counts.setdefault(label, Counter())
+            capabilities.update(dict.fromkeys(record.get("capabilities_needed", []), 1))
+            used += 1
+
+        if used:
+            self._compile()
+        return used
+
+    def train_from_log(self, path: str) -> int:
+        """
+        Train on a routing decision log.
+
+        Args:
+            path: Path of a JSON lines log written by log_decision
+
+        Returns:
+            Number of records used
+        """
+        def read():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping malformed routing log line in {path}")
+
+        return self.train(read())
+
+    def classify(self, processed_input: Dict[str, Any]) -> Tuple[Optional[str], float, List[str]]:
+        """
+        Classify a request.
+
+        Args:
+            processed_input: Processed input data
+
+        Returns:
+            Tuple of the most likely agent type, its probability and the
+            known features the decision was based on
+        """
+        with self._lock:
+            labels, log_prior, log_likelihood = self._labels, self._log_prior, self._log_likelihood
+        if not labels:
+            return None, 0.0, []
+
+        scores = list(log_prior)
+        evidence = []
+        for feature in routing_features(processed_input):
+            weights = log_likelihood.get(feature)
+            if weights is None:
+                continue
+            evidence.append(feature)
+            for i, weight in enumerate(weights):
+                scores[i] += weight
+
+        best = max(range(len(labels)), key=scores.__getitem__)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores)
+        return labels[best], 1.0 / normalizer, evidence
+
+    def predict(self, processed_input: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Route a request locally if the model is confident.
+
+        Args:
+            processed_input: Processed input data
+
+        Returns:
+            Routing decision in the LLM router's format, or None if the
+            request should be routed by the LLM
+        """
+        label, confidence, evidence = self.classify(processed_input)
+        if label is None or confidence < self.threshold:
+            return None
+
+        return {
+            "primary_agent": label,
+            "confidence": round(confidence, 4),
+            "capabilities_needed": self._capabilities_for(label),
+            "reasoning": f"Local routing model matched: {', '.join(evidence[:5])}"
+        }
+
+    def _capabilities_for(self, label: str) -> List[str]:
+        # Capabilities requested in at least half of the logged decisions
+        decisions = self._decision_counts[label]
+        if decisions:
+            capabilities = [
+                capability
+                for capability, count in self._capability_counts[label].most_common()
+                if count * 2 >= decisions
+            ]
+            if capabilities:
+                return capabilities
+        return self.default_capabilities.get(label, [])[:2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the model to a dictionary."""
+        return {
+            "label_counts": dict(self._label_counts),
+            "feature_counts": {label: dict(counts) for label, counts in self._feature_counts.items()},
+            "capability_counts": {label: dict(counts) for label, counts in self._capability_counts.items()},
+            "decision_counts": dict(self._decision_counts),
+            "smoothing": self.smoothing
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> "LocalRouter":
+        """
+        Create a router from its dictionary form.
+
+        Args:
+            data: Dictionary form of the model
+            **kwargs: Arguments for the router
+
+        Returns:
+            The router
+        """
+        kwargs.setdefault("smoothing", data.get("smoothing", 1.0))
+        router = cls(**kwargs)
+        router._label_counts = Counter(data.get("label_counts", {}))
+        router._feature_counts = {
+            label: Counter(counts) for label, counts in data.get("feature_counts", {}).items()
+        }
+        router._capability_counts = {
+            label: Counter(counts) for label, counts in data.get("capability_counts", {}).items()
+        }
+        router._decision_counts = Counter(data.get("decision_counts", {}))
+        if router._label_counts:
+            router._compile()
+        return router
+
+    def save(self, path: str) -> None:
+        """Write the model to a JSON file."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "LocalRouter":
+        """Read a model written by save."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), **kwargs)
+
+
+_log_lock = threading.Lock()
+
+
+def log_decision(path: str,
+                 processed_input: Dict[str, Any],
+                 decision: Dict[str, Any]) -> None:
+    """
+    Append a routing decision to a JSON lines log for offline training.
+
+    Args:
+        path: Path of the log
+        processed_input: Processed input data the decision was made for
+        decision: Routing decision
+    """
+    record = {
+        "input_type": processed_input.get("input_type", "unknown"),
+        "text": routing_text(processed_input)[:500],
+        "features": routing_features(processed_input),
+        "primary_agent": decision.get("primary_agent"),
+        "capabilities_needed": decision.get("capabilities_needed", []),
+        "confidence": decision.get("confidence")
+    }
+    try:
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to log routing decision: {e}")
+
+
+def create_local_router(model_path: Optional[str] = None,
+                        threshold: Optional[float] = None,
+                        default_capabilities: Optional[Dict[str, List[str]]] = None) -> LocalRouter:
+    """
+    Create the local router from a trained model or the seed keywords.
+
+    Args:
+        model_path: Path of a trained model (defaults to MATH_LLM_ROUTER_MODEL)
+        threshold: Minimum confidence for a local decision (defaults to
+            MATH_LLM_ROUTER_THRESHOLD or DEFAULT_CONFIDENCE_THRESHOLD)
+        default_capabilities: Capabilities of each agent
+
+    Returns:
+        The local router
+    """
+    model_path = model_path or os.environ.get("MATH_LLM_ROUTER_MODEL")
+    if threshold is None:
+        threshold = float(os.environ.get("MATH_LLM_ROUTER_THRESHOLD", DEFAULT_CONFIDENCE_THRESHOLD))
+
+    if model_path and os.path.exists(model_path):
+        try:
+            router = LocalRouter.load(model_path, threshold=threshold,
+                                      default_capabilities=default_capabilities)
+            logger.info(f"Loaded local routing model from {model_path}")
+            return router
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load local routing model from {model_path}: {e}")
+
+    return LocalRouter.seeded(threshold=threshold, default_capabilities=default_capabilities)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Train a local routing model from routing decision logs."""
+    parser = argparse.ArgumentParser(description="Train the local routing model from logged decisions")
+    parser.add_argument("logs", nargs="+", help="JSON lines routing decision logs")
+    parser.add_argument("model", help="Path to write the trained model to")
+    parser.add_argument("--no-seed", action="store_true", help="Do not start from the seed keywords")
+    args = parser.parse_args(argv)
+
+    router = LocalRouter() if args.no_seed else LocalRouter.seeded()
+    used = sum(router.train_from_log(path) for path in args.logs)
+    router.save(args.model)
+    print(f"Trained on {used} routing decisions; model written to {args.model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -49,12 +49,16 @@ class OCRAgent:
             # If we don't have preprocessed symbols, detect them
             symbols = image_data.get("symbols", None)
             if not symbols:
-                if not image_path or not os.path.exists(image_path):
-                    return {
-                        "success": False,
-                        "error": "No image path provided or file does not exist"
-                    }
-                symbols = detect_symbols(image_path)
+                # Prefer an image already decoded in memory over the file
+                image = image_data.get("image", None)
+                if image is None:
+                    if not image_path or not os.path.exists(image_path):
+                        return {
+                            "success": False,
+                            "error": "No image path provided or file does not exist"
+                        }
+                    image = image_path
+                symbols = detect_symbols(image)
             
             # Filter low-confidence symbols
             filtered_symbols = [
@@ -9,6 +9,8 @@ import logging
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 
+from multimodal.context.context_store import ContextStore, FileContextBackend
+
 logger = logging.getLogger(__name__)
 
 class CrossModalContext:
@@ -29,8 +31,12 @@ class CrossModalContext:
         self.updated_at = self.created_at
         self.entities = {}  # Dictionary of entities by ID
         self.references = {}  # Cross-references between entities
-        self.modalities = {}  # Entities by modality
+        self.modalities = {}  # Modality -> ordered set (dict keys) of entity IDs
         self.previous_contexts = []  # List of previous context IDs in conversation
+        
+        # Reference IDs by source and by target entity
+        self._outgoing = {}
+        self._incoming = {}
     
     def add_entity(self, entity_id: str, entity_data: Dict[str, Any], 
                   modality: str) -> str:
@@ -50,9 +56,9 @@ class CrossModalContext:
         
         # Add to modality index
         if modality not in self.modalities:
-            self.modalities[modality] = []
+            self.modalities[modality] = {}
         
-        self.modalities[modality].append(entity_id)
+        self.modalities[modality][entity_id] = None
         
         # Update timestamp
         self.updated_at = datetime.now()
@@ -83,13 +89,25 @@ class CrossModalContext:
         }
         
         reference_id = f"{source_id}_{target_id}_{ref_type}"
-        self.references[reference_id] = reference
+        self.put_reference(reference_id, reference)
         
         # Update timestamp
         self.updated_at = datetime.now()
         
         return reference
     
+    def put_reference(self, reference_id: str, reference: Dict[str, Any]) -> None:
+        """
+        Store a reference and index it by source and target.
+        
+        Args:
+            reference_id: Reference ID
+            reference: Reference object with source_id, target_id and type
+        """
+        self.references[reference_id] = reference
+        self._outgoing.setdefault(reference["source_id"], {})[reference_id] = None
+        self._incoming.setdefault(reference["target_id"], {})[reference_id] = None
+    
     def get_entity(self, entity_id: str) -> Optional[Dict[str, Any]]:
         """
         Get an entity by ID.
@@ -127,11 +145,13 @@ class CrossModalContext:
         Returns:
             List of reference objects
         """
-        references = []
+        reference_ids = dict(self._outgoing.get(entity_id, {}))
+        reference_ids.update(self._incoming.get(entity_id, {}))
         
-        for ref in self.references.values():
-            if (ref["source_id"] == entity_id or ref["target_id"] == entity_id) and \
-               (ref_type is None or ref["type"] == ref_type):
+        references = []
+        for reference_id in reference_ids:
+            ref = self.references[reference_id]
+            if ref_type is None or ref["type"] == ref_type:
                 references.append(ref)
         
         return references
@@ -143,15 +163,20 @@ class CrossModalContext:
         Returns:
             Dictionary representation of the context
         """
-        return {
+        data = {
             "context_id": self.context_id,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
             "entities": self.entities,
             "references": self.references,
-            "modalities": self.modalities,
+            "modalities": {modality: list(ids) for modality, ids in self.modalities.items()},
             "previous_contexts": self.previous_contexts
         }
+        
+        if getattr(self, "conversation_id", None):
+            data["conversation_id"] = self.conversation_id
+        
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CrossModalContext':
@@ -172,10 +197,18 @@ class CrossModalContext:
         
         # Load data
         context.entities = data.get("entities", {})
-        context.references = data.get("references", {})
-        context.modalities = data.get("modalities", {})
+        context.modalities = {
+            modality: dict.fromkeys(ids) for modality, ids in data.get("modalities", {}).items()
+        }
         context.previous_contexts = data.get("previous_contexts", [])
         
+        if data.get("conversation_id"):
+            context.conversation_id = data["conversation_id"]
+        
+        # Rebuild the reference indexes
+        for reference_id, reference in data.get("references", {}).items():
+            context.put_reference(reference_id, reference)
+        
         return context
 
 
@@ -189,11 +222,32 @@ class ContextManager:
         """
         Initialize the context manager.
         
+        Contexts are kept in a bounded store: at most ``max_active_contexts``
+        stay in memory, and contexts idle for ``context_ttl_seconds`` are
+        evicted. Evicted contexts are spilled to ``context_backend`` (files
+        under ``context_spill_dir`` by default) and reloaded on demand;
+        spilled files older than ``context_retention_seconds`` are deleted.
+        
         Args:
             config: Optional configuration dictionary
         """
         self.config = config or {}
-        self.active_contexts = {}  # Context ID -> CrossModalContext
+        
+        if "context_backend" in self.config:
+            backend = self.config["context_backend"]
+        else:
+            backend = FileContextBackend(
+                self.config.get("context_spill_dir"),
+                retention_seconds=self.config.get("context_retention_seconds", 86400)
+            )
+        
+        # Context ID -> CrossModalContext
+        self.active_contexts = ContextStore(
+            max_active=self.config.get("max_active_contexts", 1000),
+            ttl_seconds=self.config.get("context_ttl_seconds", 3600),
+            backend=backend,
+            loader=CrossModalContext.from_dict
+        )
         logger.info("Initialized cross-modal context manager")
     
     def create_context(self, conversation_id: Optional[str] = None,
@@ -215,24 +269,21 @@ class ContextManager:
             context.conversation_id = conversation_id
         
         # Link to previous context if provided
-        if previous_context_id and previous_context_id in self.active_contexts:
+        prev_context = self.get_context(previous_context_id) if previous_context_id else None
+        if prev_context:
             context.previous_contexts.append(previous_context_id)
             
-            # Copy relevant entities and references from previous context
-            prev_context = self.active_contexts[previous_context_id]
-            
             # Copy certain entity types that should persist
             for entity_id, entity_data in prev_context.entities.items():
                 entity_type = entity_data.get("type", "")
                 if entity_type in ["variable", "expression", "theorem", "concept"]:
                     context.entities[entity_id] = entity_data
-                    
-                    # Also copy modality entries
-                    for modality, ids in prev_context.modalities.items():
-                        if entity_id in ids:
-                            if modality not in context.modalities:
-                                context.modalities[modality] = []
-                            context.modalities[modality].append(entity_id)
+            
+            # Also copy modality entries
+            for modality, ids in prev_context.modalities.items():
+                copied = {entity_id: None for entity_id in ids if entity_id in context.entities}
+                if copied:
+                    context.modalities[modality] = copied
         
         # Store in active contexts
         self.active_contexts[context.context_id] = context
@@ -250,10 +301,11 @@ class ContextManager:
         Returns:
             CrossModalContext or None if not found
         """
-        if context_id in self.active_contexts:
-            return self.active_contexts[context_id]
+        # Evicted contexts are reloaded from the backend
+        context = self.active_contexts.get(context_id)
+        if context is not None:
+            return context
         
-        # In a real implementation, this would attempt to load from storage
         logger.warning(f"Context not found: {context_id}")
         return None
     
@@ -265,9 +317,8 @@ class ContextManager:
             context: The context to update
         """
         context.updated_at = datetime.now()
-        self.active_contexts[context.context_id] = context
+        self.active_contexts.put(context.context_id, context)
         
-        # In a real implementation, this would persist to storage
         logger.info(f"Updated context: {context.context_id}")
     
     def add_entity_to_context(self, context_id: str, entity_data: Dict[str, Any],
@@ -0,0 +1,277 @@
+"""
+Bounded storage for cross-modal contexts.
+
+Active contexts are kept in memory in least-recently-used order. Contexts that
+are evicted, either because the store is full or because they have not been
+used within the TTL, are spilled to a backend (files or a MongoDB collection)
+and reloaded lazily the next time they are requested. Spilled files are kept
+for a retention period and then deleted.
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+class FileContextBackend:
+    """Stores spilled contexts as one JSON file per context."""
+
+    # Minimum time between sweeps of the directory for expired files
+    PRUNE_INTERVAL_SECONDS = 600
+
+    def __init__(self, directory: Optional[str] = None,
+                 retention_seconds: Optional[float] = 86400):
+        """
+        Initialize the file backend.
+
+        Args:
+            directory: Directory for spilled contexts (defaults to
+                MATH_LLM_CONTEXT_SPILL_DIR or a directory under the system temp dir)
+            retention_seconds: Age after which a spilled context is deleted
+                instead of reloaded (None to keep files forever)
+        """
+        self.directory = directory or os.environ.get(
+            "MATH_LLM_CONTEXT_SPILL_DIR",
+            os.path.join(tempfile.gettempdir(), "math_llm_contexts")
+        )
+        self.retention_seconds = retention_seconds
+        self._next_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def _path(self, context_id: str) -> str:
+        # Context IDs are UUIDs; keep anything else from escaping the directory
+        safe_id = "".join(c for c in context_id if c.isalnum() or c in "-_")
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def _expired(self, path: str, now: float) -> bool:
+        return self.retention_seconds is not None and now - os.path.getmtime(path) > self.retention_seconds
+
+    def prune(self) -> int:
+        """
+        Delete spilled contexts older than the retention period.
+
+        Returns:
+            Number of files deleted
+        """
+        if self.retention_seconds is None:
+            return 0
+        now = time.time()
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            # Left-over ".tmp" files of interrupted writes expire too
+            if not name.endswith((".json", ".json.tmp")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if self._expired(path, now):
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            logger.info(f"Pruned {removed} expired spilled contexts from {self.directory}")
+        return removed
+
+    def _maybe_prune(self) -> None:
+        # Sweeps run from save() rather than a timer thread, at most once
+        # per interval, so files left by earlier runs are cleaned up too
+        now = time.monotonic()
+        if now < self._next_prune or not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_prune = now + self.PRUNE_INTERVAL_SECONDS
+            self.prune()
+        except Exception as e:
+            logger.error(f"Failed to prune spilled contexts: {e}")
+        finally:
+            self._prune_lock.release()
+
+    def save(self, context_id: str, data: Dict[str, Any]) -> None:
+        """Write a context, replacing any previous copy."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(context_id)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=_json_default)
+        os.replace(temp_path, path)
+        self._maybe_prune()
+
+    def load(self, context_id: str) -> Optional[Dict[str, Any]]:
+        """Read a context, or None if it was never spilled or has expired."""
+        path = self._path(context_id)
+        try:
+            if self._expired(path, time.time()):
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, context_id: str) -> None:
+        """Remove a spilled context."""
+        try:
+            os.remove(self._path(context_id))
+        except FileNotFoundError:
+            pass
+
+
+class MongoContextBackend:
+    """Stores spilled contexts as documents in a MongoDB collection."""
+
+    def __init__(self, collection):
+        """
+        Initialize the MongoDB backend.
+
+        Args:
+            collection: pymongo collection for spilled contexts
+        """
+        self.collection = collection
+
+    def save(self, context_id: str, data: Dict[str, Any]) -> None:
+        """Write a context, replacing any previous copy."""
+        # Round-trip through JSON so the document only holds BSON-safe values
+        document = json.loads(json.dumps(data, default=_json_default))
+        document["_id"] = context_id
+        self.collection.replace_one({"_id": context_id}, document, upsert=True)
+
+    def load(self, context_id: str) -> Optional[Dict[str, Any]]:
+        """Read a context, or None if it was never spilled."""
+        document = self.collection.find_one({"_id": context_id})
+        if document is not None:
+            document.pop("_id", None)
+        return document
+
+    def delete(self, context_id: str) -> None:
+        """Remove a spilled context."""
+        self.collection.delete_one({"_id": context_id})
+
+
+class ContextStore:
+    """
+    LRU/TTL-bounded mapping of context ID to context.
+
+    Behaves like a dictionary of contexts; lookups of evicted contexts are
+    served from the backend and the context becomes active again.
+    """
+
+    def __init__(self, max_active: int = 1000, ttl_seconds: Optional[float] = 3600,
+                 backend=None, loader=None):
+        """
+        Initialize the context store.
+
+        Args:
+            max_active: Maximum number of contexts kept in memory
+            ttl_seconds: Idle time after which a context is evicted (None to disable)
+            backend: Backend for evicted contexts; without one they are dropped
+            loader: Function building a context from its dictionary form
+        """
+        self.max_active = max_active
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self.loader = loader
+
+        self._active = OrderedDict()  # context_id -> (context, last access time)
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __contains__(self, context_id: str) -> bool:
+        return self.get(context_id) is not None
+
+    def __getitem__(self, context_id: str):
+        context = self.get(context_id)
+        if context is None:
+            raise KeyError(context_id)
+        return context
+
+    def __setitem__(self, context_id: str, context) -> None:
+        self.put(context_id, context)
+
+    def put(self, context_id: str, context) -> None:
+        """Store a context as the most recently used."""
+        with self._lock:
+            self._active[context_id] = (context, time.monotonic())
+            self._active.move_to_end(context_id)
+            self._evict()
+
+    def get(self, context_id: str):
+        """
+        Get a context, reloading it from the backend if it was evicted.
+
+        Args:
+            context_id: The context ID
+
+        Returns:
+            The context or None if it is unknown
+        """
+        with self._lock:
+            entry = self._active.get(context_id)
+            if entry is not None:
+                self._active[context_id] = (entry[0], time.monotonic())
+                self._active.move_to_end(context_id)
+                self._evict()
+                return entry[0]
+
+            if self.backend is None or self.loader is None:
+                return None
+
+            try:
+                data = self.backend.load(context_id)
+            except Exception as e:
+                logger.error(f"Failed to reload context {context_id}: {e}")
+                return None
+            if data is None:
+                return None
+
+            context = self.loader(data)
+            self.reloads += 1
+            self.put(context_id, context)
+            return context
+
+    def pop(self, context_id: str, default=None):
+        """Remove a context from memory and the backend."""
+        with self._lock:
+            entry = self._active.pop(context_id, None)
+            if self.backend is not None:
+                self.backend.delete(context_id)
+            return entry[0] if entry is not None else default
+
+    def _evict(self) -> None:
+        # Least recently used contexts are at the front
+        now = time.monotonic()
+        while self._active:
+            context_id, (context, last_access) = next(iter(self._active.items()))
+            expired = self.ttl_seconds is not None and now - last_access > self.ttl_seconds
+            if len(self._active) <= self.max_active and not expired:
+                break
+
+            del self._active[context_id]
+            self.evictions += 1
+            if self.backend is not None:
+                try:
+                    self.backend.save(context_id, context.to_dict())
+                except Exception as e:
+                    logger.error(f"Failed to spill context {context_id}: {e}")
@@ -132,7 +132,7 @@ class ReferenceResolver:
                     # Add to context
                     reference_id = f"{text_id}_{image_id}_equivalent"
                     if reference_id not in context.references:
-                        context.references[reference_id] = link
+                        context.put_reference(reference_id, link)
                         new_links.append(link)
         
         return new_links
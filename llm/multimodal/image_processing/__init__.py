@@ -1,9 +1,12 @@
+from multimodal.image_processing.image_buffer import ImageBuffer, load_image
 from multimodal.image_processing.preprocessor import ImagePreprocessor, preprocess_image
 from multimodal.image_processing.format_handler import detect_format, convert_format
 from multimodal.image_processing.diagram_detector import detect_diagrams
 from multimodal.image_processing.coordinate_detector import detect_coordinate_system
 
 __all__ = [
+    'ImageBuffer',
+    'load_image',
     'ImagePreprocessor',
     'preprocess_image',
     'detect_format',
@@ -10,39 +10,42 @@ import os
 import numpy as np
 import cv2
 
+from .image_buffer import ImageSource, load_image, describe_image
+
 logger = logging.getLogger(__name__)
 
-def detect_diagrams(image_path: str) -> Dict[str, Any]:
+def detect_diagrams(image: ImageSource) -> Dict[str, Any]:
     """
     Detect diagrams in an image.
     
     Args:
-        image_path: Path to the image file
+        image: Image buffer, or anything load_image accepts (path, bytes, array)
         
     Returns:
         Dictionary containing detected diagrams
     """
     try:
-        # Read the image
-        image = cv2.imread(image_path)
-        if image is None:
+        try:
+            buffer = load_image(image)
+        except ValueError:
             return {
                 "success": False,
-                "error": f"Failed to read image: {image_path}",
+                "error": f"Failed to read image: {describe_image(image)}",
                 "has_diagrams": False
             }
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply edge detection
-        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+        # Grayscale and edge views are shared with the other stages
+        gray = buffer.gray
+        edges = buffer.edges(50, 150, aperture_size=3)
         
         # Detect lines using Hough transform
         lines = cv2.HoughLinesP(
             edges, 1, np.pi/180, threshold=50, 
             minLineLength=50, maxLineGap=10
         )
+        if lines is not None:
+            # OpenCV 5 returns (N, 4) rather than (N, 1, 4)
+            lines = lines.reshape(-1, 1, 4)
         
         # Detect circles using Hough transform
         circles = cv2.HoughCircles(
@@ -0,0 +1,166 @@
+"""
+Decoded image shared across the OCR and diagram pipeline.
+
+An image is decoded once, from a file or directly from uploaded bytes, and
+passed to every stage as an ImageBuffer. Derived views that several stages
+need (grayscale, Otsu binarization, Canny edges) are computed on first use
+and cached on the buffer. The pixel data and the views are read-only, so a
+stage cannot alter what the other stages see.
+"""
+import logging
+from typing import Dict, Any, Optional, Union, Callable, Hashable
+
+import numpy as np
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class ImageBuffer:
+    """A decoded BGR or grayscale image with cached derived views."""
+
+    def __init__(self, image: np.ndarray, source: Optional[str] = None):
+        """
+        Wrap a decoded image.
+
+        Args:
+            image: Image as a numpy array (BGR or grayscale)
+            source: Path the image was read from, if any
+        """
+        self._image = _read_only(image)
+        self.source = source
+        self._views: Dict[Hashable, np.ndarray] = {}
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview],
+                   source: Optional[str] = None) -> "ImageBuffer":
+        """
+        Decode an encoded image (PNG, JPEG, ...) from memory.
+
+        Args:
+            data: Encoded image bytes
+            source: Optional description of where the bytes came from
+
+        Returns:
+            The decoded image
+
+        Raises:
+            ValueError: If the bytes are not a decodable image
+        """
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Failed to decode image data")
+        return cls(image, source)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ImageBuffer":
+        """
+        Read and decode an image file.
+
+        Args:
+            path: Path to the image file
+
+        Returns:
+            The decoded image
+
+        Raises:
+            ValueError: If the file cannot be read as an image
+        """
+        image = cv2.imread(path)
+        if image is None:
+            raise ValueError(f"Failed to read image from {path}")
+        return cls(image, path)
+
+    @property
+    def image(self) -> np.ndarray:
+        """The decoded image."""
+        return self._image
+
+    @property
+    def shape(self):
+        """Shape of the decoded image."""
+        return self._image.shape
+
+    def _cached(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = _read_only(compute())
+        return view
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Grayscale view of the image."""
+        if self._image.ndim == 2:
+            return self._image
+        return self._cached("gray", lambda: cv2.cvtColor(self._image, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def binary_inv(self) -> np.ndarray:
+        """Inverted Otsu binarization of the grayscale view (ink is white)."""
+        return self._cached(
+            "binary_inv",
+            lambda: cv2.threshold(self.gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+        )
+
+    def edges(self, low: int = 50, high: int = 150, aperture_size: int = 3) -> np.ndarray:
+        """
+        Canny edges of the grayscale view.
+
+        Args:
+            low: Lower hysteresis threshold
+            high: Upper hysteresis threshold
+            aperture_size: Sobel aperture size
+
+        Returns:
+            Edge map
+        """
+        return self._cached(
+            ("edges", low, high, aperture_size),
+            lambda: cv2.Canny(self.gray, low, high, apertureSize=aperture_size)
+        )
+
+
+ImageSource = Union[str, bytes, np.ndarray, ImageBuffer, Dict[str, Any]]
+
+
+def load_image(image: ImageSource) -> ImageBuffer:
+    """
+    Get an ImageBuffer for any supported image source.
+
+    Args:
+        image: An ImageBuffer (returned as is), a decoded numpy array, encoded
+            image bytes, a path to an image file, or a preprocess_image
+            result (its processed image is used)
+
+    Returns:
+        The image buffer
+
+    Raises:
+        ValueError: If the image cannot be read or decoded
+    """
+    if isinstance(image, ImageBuffer):
+        return image
+    if isinstance(image, np.ndarray):
+        return ImageBuffer(image)
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return ImageBuffer.from_bytes(image)
+    if isinstance(image, dict) and "processed_image" in image:
+        return ImageBuffer(image["processed_image"], image.get("metadata", {}).get("original_path"))
+    if isinstance(image, str):
+        return ImageBuffer.from_file(image)
+    raise ValueError(f"Unsupported image source: {type(image).__name__}")
+
+
+def describe_image(image: ImageSource) -> str:
+    """Short description of an image source for log messages."""
+    if isinstance(image, str):
+        return image
+    if isinstance(image, ImageBuffer) and image.source:
+        return image.source
+    return f"<{type(image).__name__}>"
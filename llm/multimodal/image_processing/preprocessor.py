@@ -11,6 +11,8 @@ import numpy as np
 from typing import Dict, Any, Tuple, Optional, List
 import logging
 
+from .image_buffer import ImageSource, load_image, describe_image
+
 logger = logging.getLogger(__name__)
 
 class ImagePreprocessor:
@@ -286,33 +288,30 @@ class ImagePreprocessor:
             value=0 if np.mean(image) > 127 else 255
         )
 
-def preprocess_image(image_path: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def preprocess_image(image: ImageSource, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
-    Preprocess an image from a file path.
+    Preprocess an image.
     
     Args:
-        image_path: Path to the image file
+        image: Image buffer, or anything load_image accepts (path, bytes, array)
         config: Configuration parameters for preprocessing
         
     Returns:
         Dictionary with processed image and metadata
     """
     try:
-        # Read the image
-        image = cv2.imread(image_path)
-        
-        if image is None:
-            raise ValueError(f"Failed to read image from {image_path}")
+        buffer = load_image(image)
         
-        # Create preprocessor and apply preprocessing
+        # Create preprocessor and apply preprocessing (it works on a copy)
         preprocessor = ImagePreprocessor(config)
-        result = preprocessor.preprocess(image)
+        result = preprocessor.preprocess(buffer.image)
         
         # Add the original path to the metadata
-        result["metadata"]["original_path"] = image_path
+        if buffer.source:
+            result["metadata"]["original_path"] = buffer.source
         
         return result
         
     except Exception as e:
-        logger.error(f"Error preprocessing image {image_path}: {e}")
+        logger.error(f"Error preprocessing image {describe_image(image)}: {e}")
         raise
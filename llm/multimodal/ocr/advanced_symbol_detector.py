@@ -12,6 +12,7 @@ import cv2
 import json
 
 from .symbol_detector import detect_symbols as basic_detect_symbols
+from ..image_processing.image_buffer import ImageSource, load_image, describe_image
 
 logger = logging.getLogger(__name__)
 
@@ -28,31 +29,32 @@ if os.path.exists(ADVANCED_SYMBOL_MAP_PATH):
 else:
     logger.warning(f"Advanced symbol map not found at {ADVANCED_SYMBOL_MAP_PATH}")
 
-def detect_symbols(image_path: str) -> List[Dict[str, Any]]:
+def detect_symbols(image: ImageSource) -> List[Dict[str, Any]]:
     """
     Detect mathematical symbols in an image with advanced techniques.
     
     Args:
-        image_path: Path to the image file
+        image: Image buffer, or anything load_image accepts (path, bytes, array)
         
     Returns:
         List of detected symbols with positions and confidence scores
     """
     try:
-        # Get base symbols from basic detector
-        base_symbols = basic_detect_symbols(image_path)
+        # Decode once and share the buffer with the basic detector
+        try:
+            buffer = load_image(image)
+        except ValueError as e:
+            logger.error(f"Failed to read image {describe_image(image)}: {e}")
+            return []
         
-        # Read the image for advanced processing
-        image = cv2.imread(image_path)
-        if image is None:
-            logger.error(f"Failed to read image: {image_path}")
-            return base_symbols
+        # Get base symbols from basic detector
+        base_symbols = basic_detect_symbols(buffer)
         
         # Enhance symbols with advanced processing
-        enhanced_symbols = enhance_symbol_detection(image, base_symbols)
+        enhanced_symbols = enhance_symbol_detection(buffer.image, base_symbols)
         
         # Detect special groupings (fractions, superscripts, etc.)
-        enhanced_symbols = detect_special_groupings(image, enhanced_symbols)
+        enhanced_symbols = detect_special_groupings(buffer, enhanced_symbols)
         
         return enhanced_symbols
         
@@ -96,7 +98,7 @@ def detect_special_groupings(image, symbols):
     Detect special groupings like fractions, superscripts, etc.
     
     Args:
-        image: Image data
+        image: Image buffer, or anything load_image accepts
         symbols: Basic detected symbols
         
     Returns:
@@ -143,12 +145,14 @@ def detect_special_groupings(image, symbols):
             next_symbol["related_to"] = i
     
     # Detect horizontal lines that might be fraction bars
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    edges = load_image(image).edges(50, 150, aperture_size=3)
     lines = cv2.HoughLinesP(
         edges, 1, np.pi/180, threshold=50, 
         minLineLength=20, maxLineGap=10
     )
+    if lines is not None:
+        # OpenCV 5 returns (N, 4) rather than (N, 1, 4)
+        lines = lines.reshape(-1, 1, 4)
     
     if lines is not None:
         for line in lines:
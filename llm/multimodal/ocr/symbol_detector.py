@@ -11,6 +11,8 @@ import numpy as np
 import cv2
 import json
 
+from ..image_processing.image_buffer import ImageSource, load_image, describe_image
+
 logger = logging.getLogger(__name__)
 
 # Load symbol map if available
@@ -26,28 +28,25 @@ if os.path.exists(SYMBOL_MAP_PATH):
 else:
     logger.warning(f"Symbol map not found at {SYMBOL_MAP_PATH}")
 
-def detect_symbols(image_path: str) -> List[Dict[str, Any]]:
+def detect_symbols(image: ImageSource) -> List[Dict[str, Any]]:
     """
     Detect mathematical symbols in an image.
     
     Args:
-        image_path: Path to the image file
+        image: Image buffer, or anything load_image accepts (path, bytes, array)
         
     Returns:
         List of detected symbols with positions and confidence scores
     """
     try:
-        # Read the image
-        image = cv2.imread(image_path)
-        if image is None:
-            logger.error(f"Failed to read image: {image_path}")
+        try:
+            buffer = load_image(image)
+        except ValueError as e:
+            logger.error(f"Failed to read image {describe_image(image)}: {e}")
             return []
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply threshold to separate text from background
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        # Threshold separating text from background (shared with other stages)
+        binary = buffer.binary_inv
         
         # Find contours
         contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
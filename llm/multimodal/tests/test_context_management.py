@@ -6,6 +6,8 @@ implemented for Sprint 12.
 """
 import os
 import sys
+import tempfile
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -13,6 +15,7 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from multimodal.context.context_manager import ContextManager, CrossModalContext
+from multimodal.context.context_store import ContextStore, FileContextBackend, MongoContextBackend
 from multimodal.context.reference_resolver import ReferenceResolver
 
 
@@ -228,6 +231,97 @@ class TestContextManager(unittest.TestCase):
         self.assertEqual(refs[0]["target_id"], entity2_id)
 
 
+class TestContextStore(unittest.TestCase):
+    """Tests for bounded context storage."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.spill_dir = tempfile.TemporaryDirectory()
+        self.manager = ContextManager({
+            "max_active_contexts": 2,
+            "context_spill_dir": self.spill_dir.name
+        })
+    
+    def tearDown(self):
+        """Clean up spilled contexts."""
+        self.spill_dir.cleanup()
+    
+    def test_evicted_context_is_reloaded(self):
+        """Test that least recently used contexts spill and reload lazily."""
+        first = self.manager.create_context(conversation_id="conv1")
+        self.manager.add_entity_to_context(first.context_id, {"type": "expression"}, "text", "e1")
+        self.manager.add_entity_to_context(first.context_id, {"type": "expression"}, "image", "e2")
+        self.manager.add_reference_to_context(first.context_id, "e1", "e2", "equivalent")
+        
+        self.manager.create_context()
+        self.manager.create_context()
+        
+        self.assertEqual(len(self.manager.active_contexts), 2)
+        self.assertEqual(self.manager.active_contexts.evictions, 1)
+        
+        reloaded = self.manager.get_context(first.context_id)
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(reloaded.conversation_id, "conv1")
+        self.assertIn("e2", reloaded.modalities["image"])
+        self.assertEqual(reloaded.find_references("e2")[0]["source_id"], "e1")
+        self.assertEqual(self.manager.active_contexts.reloads, 1)
+        
+        # Entities persist into a follow-up context of the reloaded one
+        follow_up = self.manager.create_context(previous_context_id=first.context_id)
+        self.assertEqual(list(follow_up.modalities["text"]), ["e1"])
+    
+    def test_idle_contexts_expire(self):
+        """Test that contexts idle beyond the TTL are evicted."""
+        clock = [1000.0]
+        store = ContextStore(max_active=10, ttl_seconds=60, backend=None)
+        
+        with patch("multimodal.context.context_store.time.monotonic", lambda: clock[0]):
+            store.put("old", CrossModalContext("old"))
+            clock[0] += 30
+            store.put("recent", CrossModalContext("recent"))
+            clock[0] += 45
+            store.get("recent")
+        
+        self.assertNotIn("old", store)
+        self.assertIn("recent", store)
+    
+    def test_spilled_files_expire(self):
+        """Test that spilled contexts past the retention period are deleted."""
+        backend = FileContextBackend(self.spill_dir.name, retention_seconds=60)
+        for context_id in ("old", "stale", "recent"):
+            backend.save(context_id, CrossModalContext(context_id).to_dict())
+        past = time.time() - 120
+        for context_id in ("old", "stale"):
+            os.utime(backend._path(context_id), (past, past))
+        
+        self.assertIsNone(backend.load("old"))
+        self.assertFalse(os.path.exists(backend._path("old")))
+        self.assertEqual(backend.prune(), 1)
+        self.assertEqual(os.listdir(self.spill_dir.name), ["recent.json"])
+        self.assertEqual(backend.load("recent")["context_id"], "recent")
+    
+    def test_mongo_backend_round_trip(self):
+        """Test spilling contexts to a MongoDB collection."""
+        try:
+            import mongomock
+        except ImportError:
+            self.skipTest("mongomock not available")
+        
+        backend = MongoContextBackend(mongomock.MongoClient().db.contexts)
+        store = ContextStore(max_active=1, backend=backend, loader=CrossModalContext.from_dict)
+        
+        context = CrossModalContext("ctx1")
+        context.add_entity("e1", {"type": "variable"}, "text")
+        store.put("ctx1", context)
+        store.put("ctx2", CrossModalContext("ctx2"))
+        
+        self.assertEqual(backend.collection.count_documents({}), 1)
+        self.assertIn("e1", store.get("ctx1").entities)
+        
+        store.pop("ctx1")
+        self.assertIsNone(backend.load("ctx1"))
+
+
 class TestReferenceResolver(unittest.TestCase):
     """Tests for the reference resolver."""
     
@@ -0,0 +1,103 @@
+"""
+Unit tests for the shared image buffer.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+from multimodal.image_processing.image_buffer import ImageBuffer, load_image
+from multimodal.image_processing.diagram_detector import detect_diagrams
+from multimodal.ocr.advanced_symbol_detector import detect_symbols
+from multimodal.unified_pipeline.input_processor import InputProcessor
+
+
+def _encoded_image() -> bytes:
+    image = np.full((120, 300, 3), 255, dtype=np.uint8)
+    cv2.putText(image, "1+1=2", (40, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    cv2.rectangle(image, (220, 20), (290, 100), (0, 0, 0), 2)
+    return cv2.imencode(".png", image)[1].tobytes()
+
+
+class TestImageBuffer(unittest.TestCase):
+    """Tests for ImageBuffer."""
+
+    def setUp(self):
+        self.data = _encoded_image()
+
+    def test_views_are_cached_and_read_only(self):
+        """Test that derived views are computed once and cannot be modified."""
+        buffer = ImageBuffer.from_bytes(self.data)
+
+        self.assertIs(buffer.gray, buffer.gray)
+        self.assertIs(buffer.binary_inv, buffer.binary_inv)
+        self.assertIs(buffer.edges(), buffer.edges(50, 150, 3))
+        self.assertIsNot(buffer.edges(), buffer.edges(100, 200))
+        self.assertEqual(buffer.gray.shape, (120, 300))
+        with self.assertRaises(ValueError):
+            buffer.image[0, 0] = 0
+
+    def test_load_image_sources(self):
+        """Test that every supported source gives the same pixels."""
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+            f.write(self.data)
+        try:
+            from_file = load_image(f.name)
+        finally:
+            os.remove(f.name)
+        from_bytes = load_image(self.data)
+
+        self.assertEqual(from_file.source, f.name)
+        self.assertTrue(np.array_equal(from_file.image, from_bytes.image))
+        self.assertIs(load_image(from_bytes), from_bytes)
+        self.assertTrue(np.array_equal(load_image(from_bytes.image.copy()).image, from_bytes.image))
+        with self.assertRaises(ValueError):
+            load_image(b"not an image")
+
+    def test_stages_share_one_decode(self):
+        """Test that detectors reuse the buffer instead of re-reading the image."""
+        buffer = ImageBuffer.from_bytes(self.data)
+
+        with patch("cv2.imread") as imread, patch("cv2.imdecode") as imdecode:
+            symbols = detect_symbols(buffer)
+            diagrams = detect_diagrams(buffer)
+
+        imread.assert_not_called()
+        imdecode.assert_not_called()
+        self.assertGreater(len(symbols), 0)
+        self.assertTrue(diagrams["success"])
+        self.assertIn("binary_inv", buffer._views)
+
+    def test_input_processor_uses_no_temp_files(self):
+        """Test that uploaded image bytes are processed in memory."""
+        processor = InputProcessor()
+
+        with patch("tempfile.NamedTemporaryFile") as named_temp_file, \
+                patch("cv2.imread") as imread:
+            result = processor.process_input(self.data, "image/png")
+
+        named_temp_file.assert_not_called()
+        imread.assert_not_called()
+        self.assertTrue(result["success"])
+        self.assertGreater(len(result["symbols"]), 0)
+
+    def test_input_processor_accepts_byte_buffers(self):
+        """Test that bytearray and memoryview uploads are decoded like bytes."""
+        processor = InputProcessor()
+        expected = processor.process_input(self.data, "image/png")
+
+        for data in (bytearray(self.data), memoryview(self.data)):
+            with patch("tempfile.NamedTemporaryFile") as named_temp_file:
+                result = processor.process_input(data)
+
+            named_temp_file.assert_not_called()
+            self.assertTrue(result["success"], type(data).__name__)
+            self.assertEqual(result["image_type"], "image/png")
+            self.assertEqual(result["recognized_latex"], expected["recognized_latex"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for the local routing model.
+"""
+import os
+import tempfile
+import unittest
+
+from multimodal.agent.local_router import LocalRouter, log_decision, routing_features
+
+
+def _text(text):
+    return {"input_type": "text", "text": text}
+
+
+class TestLocalRouter(unittest.TestCase):
+    """Tests for LocalRouter."""
+
+    def setUp(self):
+        self.router = LocalRouter.seeded(default_capabilities={
+            "math_computation": ["algebraic_expression", "calculus", "equation_solving"],
+            "visualization": ["plot_generation", "graph_creation"]
+        })
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_routing_features(self):
+        """Test that words and structural markers are extracted."""
+        features = routing_features({"input_type": "image", "recognized_latex": "\\frac{x}{2} = 1"})
+
+        self.assertIn("frac", features)
+        self.assertIn("__type_image", features)
+        self.assertIn("__latex", features)
+        self.assertIn("__equation", features)
+        self.assertIn("__number", features)
+
+    def test_confident_requests_are_routed_locally(self):
+        """Test that unambiguous requests get a local decision."""
+        decision = self.router.predict(_text("Solve x^2 - 4 = 0"))
+
+        self.assertEqual(decision["primary_agent"], "math_computation")
+        self.assertGreaterEqual(decision["confidence"], self.router.threshold)
+        self.assertEqual(decision["capabilities_needed"], ["algebraic_expression", "calculus"])
+        self.assertEqual(self.router.predict(_text("Plot sin(x) from 0 to pi"))["primary_agent"], "visualization")
+
+    def test_uncertain_requests_are_left_to_the_llm(self):
+        """Test that unknown or conflicting requests are not routed locally."""
+        self.assertIsNone(self.router.predict(_text("hello there")))
+        self.assertIsNone(self.router.predict(_text("Summarize this proof")))
+
+    def test_training_from_logged_decisions(self):
+        """Test that logged decisions teach the model new keywords and capabilities."""
+        log_path = os.path.join(self.temp_dir.name, "routing.jsonl")
+        request = _text("Bar graph of the population table")
+        self.assertIsNone(self.router.predict(request))
+
+        for i in range(20):
+            log_decision(log_path, _text(f"Bar graph of the sales table {i}"), {
+                "primary_agent": "visualization",
+                "capabilities_needed": ["graph_creation"],
+                "confidence": 0.9
+            })
+        self.assertEqual(self.router.train_from_log(log_path), 20)
+
+        decision = self.router.predict(request)
+        self.assertEqual(decision["primary_agent"], "visualization")
+        self.assertEqual(decision["capabilities_needed"], ["graph_creation"])
+
+    def test_save_and_load(self):
+        """Test that a saved model makes the same decisions."""
+        model_path = os.path.join(self.temp_dir.name, "router.json")
+        self.router.train([{"input_type": "text", "text": "tabulate values", "primary_agent": "math_computation"}])
+        self.router.save(model_path)
+
+        loaded = LocalRouter.load(model_path)
+
+        for text in ("Solve x = 2", "tabulate values", "Why is this true?", "hello"):
+            self.assertEqual(loaded.classify(_text(text)), self.router.classify(_text(text)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Unit tests for parallel PDF processing.
+"""
+import asyncio
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+
+from multimodal.unified_pipeline.pdf_processor import PDFProcessor
+from multimodal.utils.pdf_utils import PYMUPDF_AVAILABLE, pdf_page_hashes
+
+if PYMUPDF_AVAILABLE:
+    import fitz
+
+
+def _render_page(document, page_num, dpi):
+    image = np.full((150, 400, 3), 255, dtype=np.uint8)
+    cv2.putText(image, f"{page_num}+1=2", (40, 90), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 4)
+    return image
+
+
+class TestPDFProcessor(unittest.TestCase):
+    """Tests for PDFProcessor with the PDF library patched out."""
+
+    def setUp(self):
+        document = MagicMock()
+        document.load_page.return_value.get_text.return_value = "Problem"
+        self.hashes = ["a", "b", "c", "d"]
+
+        patches = [
+            patch("multimodal.unified_pipeline.pdf_processor.PYMUPDF_AVAILABLE", True),
+            patch("multimodal.unified_pipeline.pdf_processor.open_pdf", return_value=document),
+            patch("multimodal.unified_pipeline.pdf_processor.pdf_page_hashes", side_effect=lambda source: self.hashes),
+            patch("multimodal.unified_pipeline.pdf_processor.render_pdf_page", side_effect=_render_page),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.processor = PDFProcessor(max_workers=2, executor_class=ThreadPoolExecutor)
+        self.addCleanup(self.processor.close)
+
+    def test_process_returns_pages_in_order(self):
+        """Test that every page is rendered, recognized and ordered."""
+        result = self.processor.process(b"%PDF")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["page_count"], 4)
+        self.assertEqual([page["page"] for page in result["pages"]], [1, 2, 3, 4])
+        for page in result["pages"]:
+            self.assertTrue(page["success"])
+            self.assertEqual(page["text"], "Problem")
+            self.assertGreater(len(page["symbols"]), 0)
+            self.assertFalse(page["cached"])
+
+    def test_pages_are_cached_by_content_hash(self):
+        """Test that pages with known hashes are not processed again."""
+        list(self.processor.iter_pages(b"%PDF"))
+        self.hashes = ["c", "e", "a"]
+
+        with patch("multimodal.unified_pipeline.pdf_processor.render_pdf_page", side_effect=_render_page) as render:
+            pages = list(self.processor.iter_pages(b"%PDF"))
+
+        # Cached pages are yielded first, before any rendering
+        self.assertEqual([(page["page"], page["cached"]) for page in pages], [(1, True), (3, True), (2, False)])
+        render.assert_called_once()
+        self.assertEqual(self.processor.cache_hits, 2)
+
+    def test_stream_pages(self):
+        """Test that the async stream yields every page."""
+        async def collect():
+            return [page async for page in self.processor.stream_pages(b"%PDF")]
+
+        pages = asyncio.run(collect())
+
+        self.assertEqual(sorted(page["page"] for page in pages), [1, 2, 3, 4])
+        self.assertTrue(all(page["success"] for page in pages))
+
+    def test_failed_page_does_not_stop_the_document(self):
+        """Test that a page failing to render is reported and not cached."""
+        def render(document, page_num, dpi):
+            if page_num == 1:
+                raise RuntimeError("corrupt page")
+            return _render_page(document, page_num, dpi)
+
+        with patch("multimodal.unified_pipeline.pdf_processor.render_pdf_page", side_effect=render):
+            result = self.processor.process(b"%PDF")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["pages"][1]["error"], "corrupt page")
+        self.assertEqual(len(self.processor._cache), 3)
+
+    def test_worker_pool_is_reused(self):
+        """Test that one pool serves every document and opens each document once per worker."""
+        with patch("multimodal.unified_pipeline.pdf_processor.open_pdf") as open_document:
+            open_document.return_value.load_page.return_value.get_text.return_value = "Problem"
+            self.processor.process(b"%PDF-1")
+            executor = self.processor._executor
+            self.hashes = ["e", "f", "g", "h"]
+            self.processor.process(b"%PDF-2")
+
+        self.assertIs(self.processor._executor, executor)
+        # Two documents, opened at most once by each of the two workers
+        self.assertLessEqual(open_document.call_count, 4)
+
+    def test_broken_pool_fails_only_affected_pages(self):
+        """Test that a dead worker is reported per page and the pool is replaced."""
+        class BreakingExecutor(ThreadPoolExecutor):
+            def submit(self, fn, path, page_num, dpi):
+                if page_num == 2:
+                    future = Future()
+                    future.set_exception(BrokenProcessPool("worker died"))
+                    return future
+                return super().submit(fn, path, page_num, dpi)
+
+        processor = PDFProcessor(max_workers=2, executor_class=BreakingExecutor)
+        self.addCleanup(processor.close)
+
+        result = processor.process(b"%PDF")
+
+        self.assertTrue(result["success"])
+        self.assertEqual([page["success"] for page in result["pages"]], [True, True, False, True])
+        self.assertEqual(result["pages"][2]["error"], "worker died")
+        self.assertIsNone(processor._executor)
+
+
+
+@unittest.skipUnless(PYMUPDF_AVAILABLE, "PyMuPDF not available")
+class TestPDFPageHashes(unittest.TestCase):
+    """Tests for pdf_page_hashes on real documents."""
+
+    def _imported_pages(self, texts):
+        # Pages that each draw an imported page as a form XObject, so they
+        # all share the same content stream ("q /fzFrm0 Do Q")
+        source = fitz.open()
+        for text in texts:
+            page = source.new_page(width=300, height=200)
+            page.insert_text((50, 100), text, fontsize=20)
+
+        document = fitz.open()
+        for page_num in range(len(texts)):
+            page = document.new_page(width=300, height=200)
+            page.show_pdf_page(page.rect, source, page_num)
+        return document.tobytes()
+
+    def test_pages_with_different_xobjects_differ(self):
+        """Test that pages sharing a content stream but drawing different XObjects differ."""
+        data = self._imported_pages(["x + 1 = 2", "y - 3 = 7"])
+        document = fitz.open(stream=data, filetype="pdf")
+        self.assertEqual(document[0].read_contents(), document[1].read_contents())
+
+        first, second = pdf_page_hashes(data)
+
+        self.assertNotEqual(first, second)
+
+    def test_identical_pages_match_across_documents(self):
+        """Test that the same page hashes alike wherever it appears."""
+        hashes = pdf_page_hashes(self._imported_pages(["x + 1 = 2", "y - 3 = 7"]))
+        other = pdf_page_hashes(self._imported_pages(["z = 4", "y - 3 = 7"]))
+
+        self.assertEqual(hashes[1], other[1])
+        self.assertNotEqual(hashes[0], other[0])
+
+    def test_processor_does_not_reuse_results_for_different_xobjects(self):
+        """Test that the page cache tells pages with different XObjects apart."""
+        processor = PDFProcessor(max_workers=1, executor_class=ThreadPoolExecutor)
+        self.addCleanup(processor.close)
+        processor.process(self._imported_pages(["x + 1 = 2"]))
+
+        result = processor.process(self._imported_pages(["y - 3 = 7"]))
+
+        self.assertEqual(processor.cache_hits, 0)
+        self.assertFalse(result["pages"][0]["cached"])
+        self.assertIn("y", result["pages"][0]["text"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -78,6 +78,9 @@ class ContentRouter:
         """
         Use LLM to intelligently route content.
         
+        The router agent answers confident decisions with its local routing
+        model and only asks the LLM about the rest.
+        
         Args:
             processed_input: Dictionary containing processed input data
             context_data: Optional context data
@@ -108,7 +111,8 @@ class ContentRouter:
         confidence = routing_decision.get("confidence", 0.7)
         reasoning = routing_decision.get("reasoning", "")
         
-        logger.info(f"LLM routing decision: {primary_agent} (confidence: {confidence})")
+        source = "Local" if routing_result.get("routed_locally") else "LLM"
+        logger.info(f"{source} routing decision: {primary_agent} (confidence: {confidence})")
         logger.debug(f"Routing reasoning: {reasoning}")
         
         # Perform specific agent processing based on the routing decision
@@ -11,6 +11,7 @@ from typing import Dict, Any, List, Optional, Union, Tuple
 import logging
 
 from ..image_processing.preprocessor import preprocess_image
+from ..image_processing.image_buffer import ImageBuffer
 from ..image_processing.format_handler import detect_format, convert_format
 from ..ocr.advanced_symbol_detector import detect_symbols
 from ..structure.layout_analyzer import analyze_layout
@@ -86,15 +87,16 @@ class InputProcessor:
             else:
                 # Assume it's plain text
                 return 'text/plain'
-        elif isinstance(input_data, bytes):
+        elif isinstance(input_data, (bytes, bytearray, memoryview)):
             # Try to detect file type from bytes
             # This is a simplified approach - in a real implementation,
             # you'd use more sophisticated file type detection
-            if input_data.startswith(b'%PDF'):
+            header = bytes(input_data[:8])
+            if header.startswith(b'%PDF'):
                 return 'application/pdf'
-            elif input_data.startswith(b'\x89PNG\r\n\x1a\n'):
+            elif header.startswith(b'\x89PNG\r\n\x1a\n'):
                 return 'image/png'
-            elif input_data.startswith(b'\xff\xd8'):
+            elif header.startswith(b'\xff\xd8'):
                 return 'image/jpeg'
             else:
                 return 'application/octet-stream'
@@ -109,34 +111,28 @@ class InputProcessor:
         else:
             return 'unknown/unknown'
     
-    def _process_image_input(self, image_data: Union[str, bytes], 
+    def _process_image_input(self, image_data: Union[str, bytes, bytearray, memoryview, ImageBuffer], 
                             image_type: str) -> Dict[str, Any]:
         """
         Process image input data.
         
         Args:
-            image_data: Path to image file or image binary data
+            image_data: Path to image file, image binary data or a decoded ImageBuffer
             image_type: The mime type of the image
             
         Returns:
             Dictionary containing processed results
         """
         try:
-            # Load and preprocess the image
-            if isinstance(image_data, str):
-                # It's a file path
-                image_path = image_data
-            else:
-                # Save binary data to a temporary file
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix=self._get_extension(image_type)) as temp:
-                    temp.write(image_data)
-                    image_path = temp.name
+            # Binary data is decoded in memory; a file path is read by the
+            # preprocessor. Either way the image is decoded only once.
+            if isinstance(image_data, (bytes, bytearray, memoryview)):
+                image_data = ImageBuffer.from_bytes(image_data)
             
             # Preprocess the image
-            preprocessed_image = preprocess_image(image_path)
+            preprocessed_image = preprocess_image(image_data)
             
-            # Detect symbols in the image
+            # Detect symbols in the preprocessed image
             symbols = detect_symbols(preprocessed_image)
             
             # Analyze the layout structure
@@ -145,10 +141,6 @@ class InputProcessor:
             # Generate LaTeX from the structure
             latex = generate_latex(structure)
             
-            # Cleanup temporary file if created
-            if isinstance(image_data, bytes) and os.path.exists(image_path):
-                os.remove(image_path)
-            
             return {
                 "success": True,
                 "input_type": "image",
@@ -0,0 +1,333 @@
+"""
+Parallel PDF ingestion for the unified multimodal pipeline.
+
+Pages are rendered to in-memory images and recognized in a persistent pool
+of worker processes, which keep the documents they are working on open.
+Each page's result is yielded as soon as it is ready, so the first pages of
+a long document are available while the rest are still being processed.
+Results are cached by page content hash, so pages seen before (the same
+worksheet uploaded twice, a shared cover page) are not processed again.
+"""
+import os
+import time
+import atexit
+import asyncio
+import tempfile
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Union, Iterator, AsyncIterator, Tuple, Type
+
+from ..image_processing.image_buffer import ImageBuffer
+from ..utils.pdf_utils import PYMUPDF_AVAILABLE, open_pdf, render_pdf_page, pdf_page_hashes
+from .input_processor import InputProcessor
+
+logger = logging.getLogger(__name__)
+
+# Open documents kept by each page worker
+WORKER_DOCUMENT_CACHE_SIZE = 4
+
+# State of each page worker (one per process, or per thread in tests)
+_worker = threading.local()
+
+
+def _init_page_worker() -> None:
+    # The input processor is created once per worker, not once per document
+    _worker.processor = InputProcessor()
+    _worker.documents = OrderedDict()
+
+
+def _worker_document(path: str):
+    # Documents are opened once per worker and kept while pages of them
+    # are being processed; the key changes if the file is replaced
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    document = _worker.documents.get(key)
+    if document is None:
+        document = _worker.documents[key] = open_pdf(path)
+        while len(_worker.documents) > WORKER_DOCUMENT_CACHE_SIZE:
+            _, evicted = _worker.documents.popitem(last=False)
+            evicted.close()
+    _worker.documents.move_to_end(key)
+    return document
+
+
+def _process_page(path: str, page_num: int, dpi: int) -> Dict[str, Any]:
+    """Render and recognize one page in a worker."""
+    start_time = time.time()
+    try:
+        document = _worker_document(path)
+        image = render_pdf_page(document, page_num, dpi)
+        text = document.load_page(page_num).get_text()
+
+        result = _worker.processor.process_input(ImageBuffer(image), "application/pdf")
+        result["text"] = text
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+
+    result["page"] = page_num + 1
+    result["processing_time_ms"] = round((time.time() - start_time) * 1000, 2)
+    return result
+
+
+class PDFProcessor:
+    """Processes the pages of PDF documents in parallel."""
+
+    def __init__(self,
+                 dpi: int = 200,
+                 max_workers: Optional[int] = None,
+                 cache_size: int = 1024,
+                 executor_class: Type[Executor] = ProcessPoolExecutor):
+        """
+        Initialize the PDF processor.
+
+        Args:
+            dpi: Resolution pages are rendered at
+            max_workers: Maximum number of worker processes (defaults to the CPU count)
+            cache_size: Maximum number of page results kept in the cache
+            executor_class: Executor running the page workers
+        """
+        self.dpi = dpi
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.executor_class = executor_class
+
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self.cache_hits = 0
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return dict(result)
+
+    def _cache_put(self, key: str, result: Dict[str, Any]) -> None:
+        if not result.get("success", False):
+            return
+        with self._lock:
+            self._cache[key] = dict(result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _plan(self, source: Union[str, bytes]) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+        # Split the pages into cached results and pages to process
+        if not PYMUPDF_AVAILABLE:
+            raise RuntimeError("PyMuPDF not available. Cannot process PDF.")
+
+        cached = []
+        pending = {}
+        for page_num, page_hash in enumerate(pdf_page_hashes(source)):
+            key = f"{page_hash}:{self.dpi}"
+            result = self._cache_get(key)
+            if result is not None:
+                result.update({"page": page_num + 1, "cached": True, "processing_time_ms": 0})
+                cached.append(result)
+            else:
+                pending[page_num] = key
+        return cached, pending
+
+    def _get_executor(self) -> Executor:
+        # One pool serves every document for the life of the processor
+        with self._lock:
+            if self._executor is None:
+                self._executor = self.executor_class(
+                    max_workers=self.max_workers,
+                    initializer=_init_page_worker
+                )
+            return self._executor
+
+    def _reset_executor(self, executor: Executor) -> None:
+        # Replace a pool that can no longer run tasks (a worker died); its
+        # outstanding tasks fail on their own and are reported per page
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _document_path(self, source: Union[str, bytes]) -> Tuple[str, bool]:
+        # Workers open documents from a path, so the PDF is written once
+        # rather than pickled to every task
+        if isinstance(source, str):
+            return source, False
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(source)
+        return f.name, True
+
+    def _submit(self, path: str, pending: Dict[int, str]) -> Tuple[Executor, Dict[Future, int]]:
+        # Submitted in page order so that the first pages finish first
+        executor = self._get_executor()
+        try:
+            return executor, {
+                executor.submit(_process_page, path, page_num, self.dpi): page_num
+                for page_num in sorted(pending)
+            }
+        except BrokenExecutor:
+            self._reset_executor(executor)
+            executor = self._get_executor()
+            return executor, {
+                executor.submit(_process_page, path, page_num, self.dpi): page_num
+                for page_num in sorted(pending)
+            }
+
+    def _outcome(self, executor: Executor, pending: Dict[int, str],
+                 page_num: int, future) -> Dict[str, Any]:
+        # Errors of the pool itself fail only the affected pages
+        try:
+            result = future.result()
+        except Exception as e:
+            if isinstance(e, BrokenExecutor):
+                self._reset_executor(executor)
+            logger.error(f"Error processing PDF page {page_num + 1}: {str(e)}")
+            return {
+                "success": False,
+                "page": page_num + 1,
+                "error": str(e) or type(e).__name__,
+                "cached": False
+            }
+
+        self._cache_put(pending[page_num], result)
+        result["cached"] = False
+        return result
+
+    def _release(self, futures: Dict[Future, int], path: str, temporary: bool) -> None:
+        for future in futures:
+            future.cancel()
+        if temporary:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def iter_pages(self, source: Union[str, bytes]) -> Iterator[Dict[str, Any]]:
+        """
+        Process the pages of a PDF, yielding each page's result when ready.
+
+        Cached pages come first, then the other pages in completion order;
+        every result has its 1-based "page" number.
+
+        Args:
+            source: Path to the PDF file or the PDF file content
+
+        Returns:
+            Iterator over page results
+        """
+        cached, pending = self._plan(source)
+        yield from cached
+        if not pending:
+            return
+
+        path, temporary = self._document_path(source)
+        futures = {}
+        try:
+            executor, futures = self._submit(path, pending)
+            for future in as_completed(futures):
+                yield self._outcome(executor, pending, futures[future], future)
+        finally:
+            self._release(futures, path, temporary)
+
+    async def stream_pages(self, source: Union[str, bytes]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Asynchronously process the pages of a PDF, yielding each page's result when ready.
+
+        Args:
+            source: Path to the PDF file or the PDF file content
+
+        Returns:
+            Async iterator over page results, in the same order as iter_pages
+        """
+        loop = asyncio.get_running_loop()
+        cached, pending = await loop.run_in_executor(None, self._plan, source)
+        for result in cached:
+            yield result
+        if not pending:
+            return
+
+        path, temporary = await loop.run_in_executor(None, self._document_path, source)
+        futures = {}
+        try:
+            executor, futures = await loop.run_in_executor(None, self._submit, path, pending)
+            waiting = {asyncio.wrap_future(future): page_num for future, page_num in futures.items()}
+            while waiting:
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield self._outcome(executor, pending, waiting.pop(future), future)
+        finally:
+            self._release(futures, path, temporary)
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def process(self, source: Union[str, bytes]) -> Dict[str, Any]:
+        """
+        Process all pages of a PDF.
+
+        Args:
+            source: Path to the PDF file or the PDF file content
+
+        Returns:
+            Dictionary containing the page results in page order
+        """
+        start_time = time.time()
+        try:
+            pages = list(self.iter_pages(source))
+        except Exception as e:
+            logger.error(f"Error processing PDF: {str(e)}")
+            return {"success": False, "input_type": "pdf", "error": str(e)}
+
+        result = combine_page_results(pages)
+        result["processing_time_ms"] = round((time.time() - start_time) * 1000, 2)
+        return result
+
+
+def combine_page_results(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine page results into the processed input for the whole document.
+
+    Args:
+        pages: Page results in any order
+
+    Returns:
+        Dictionary containing the page results in page order and the
+        document's recognized LaTeX and text
+    """
+    pages = sorted(pages, key=lambda result: result["page"])
+    return {
+        "success": any(page.get("success", False) for page in pages),
+        "input_type": "pdf",
+        "page_count": len(pages),
+        "pages": pages,
+        "recognized_latex": "\n\n".join(page.get("recognized_latex", "") for page in pages),
+        "text": "\n\n".join(page.get("text", "") for page in pages)
+    }
+
+
+# Singleton instance shared by the API routes
+_pdf_processor_instance = None
+
+
+def get_pdf_processor() -> PDFProcessor:
+    """
+    Get the shared PDF processor.
+
+    Rendering resolution and worker count come from MATH_LLM_PDF_DPI and
+    MATH_LLM_PDF_WORKERS.
+    """
+    global _pdf_processor_instance
+    if _pdf_processor_instance is None:
+        _pdf_processor_instance = PDFProcessor(
+            dpi=int(os.environ.get("MATH_LLM_PDF_DPI", "200")),
+            max_workers=int(os.environ.get("MATH_LLM_PDF_WORKERS", "0")) or None
+        )
+        atexit.register(_pdf_processor_instance.close)
+    return _pdf_processor_instance
@@ -6,7 +6,13 @@ when PyMuPDF is not available.
 """
 import logging
 import os
-from typing import Dict, List, Tuple, Any, Optional
+import re
+import hashlib
+from collections import deque
+from typing import Dict, List, Tuple, Any, Optional, Union
+
+import numpy as np
+import cv2
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +24,10 @@ try:
 except ImportError:
     logger.warning("PyMuPDF not available. PDF handling will be limited.")
 
+# Indirect object references, and the ones leading back up to the page tree
+_INDIRECT_REFERENCE = re.compile(r"(\d+)\s+\d+\s+R\b")
+_BACK_REFERENCE = re.compile(r"/(?:Parent|P)\s+\d+\s+\d+\s+R\b")
+
 def extract_pdf_text(pdf_path: str) -> List[str]:
     """
     Extract text from a PDF file.
@@ -119,4 +129,116 @@ def get_pdf_metadata(pdf_path: str) -> Dict[str, Any]:
         return metadata
     except Exception as e:
         logger.error(f"Error extracting metadata from PDF: {e}")
-        return {"error": str(e)} 
\ No newline at end of file
+        return {"error": str(e)} 
+
+def open_pdf(source: Union[str, bytes]):
+    """
+    Open a PDF document from a path or from its bytes.
+    
+    Args:
+        source: Path to the PDF file or the PDF file content
+        
+    Returns:
+        The PyMuPDF document
+    """
+    if not PYMUPDF_AVAILABLE:
+        raise RuntimeError("PyMuPDF not available. Cannot open PDF.")
+    
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    return fitz.open(source)
+
+def render_pdf_page(pdf_document, page_num: int, dpi: int = 200) -> np.ndarray:
+    """
+    Render a PDF page to an in-memory image.
+    
+    Args:
+        pdf_document: Document returned by open_pdf
+        page_num: Zero-based page number
+        dpi: Rendering resolution
+        
+    Returns:
+        The page as a BGR image array
+    """
+    page = pdf_document.load_page(page_num)
+    pixmap = page.get_pixmap(dpi=dpi, alpha=False)
+    image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, pixmap.n)
+    
+    if pixmap.n == 1:
+        return image[:, :, 0]
+    return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+def _inherited_key(pdf_document, xref: int, key: str) -> Tuple[str, str]:
+    # Page attributes such as /Resources may be inherited from the page tree
+    while True:
+        kind, value = pdf_document.xref_get_key(xref, key)
+        if kind != "null":
+            return kind, value
+        kind, parent = pdf_document.xref_get_key(xref, "Parent")
+        if kind != "xref":
+            return "null", "null"
+        xref = int(parent.split()[0])
+
+def _hash_object_closure(pdf_document, values: List[str], digest) -> None:
+    """
+    Hash PDF object values and every object they reference, recursively.
+    
+    References are hashed by the order they are first reached rather than
+    by xref number, so the same objects hash alike in different documents.
+    Links back up to the page tree are not followed.
+    """
+    visited: Dict[int, int] = {}
+    queue = deque()
+    
+    def add(text: str):
+        text = _BACK_REFERENCE.sub("", text)
+        digest.update(_INDIRECT_REFERENCE.sub("R", text).encode())
+        for match in _INDIRECT_REFERENCE.finditer(text):
+            xref = int(match.group(1))
+            if xref not in visited:
+                visited[xref] = len(visited)
+                queue.append(xref)
+            digest.update(f"#{visited[xref]}".encode())
+    
+    for value in values:
+        add(value)
+    
+    while queue:
+        xref = queue.popleft()
+        add(pdf_document.xref_object(xref, compressed=True))
+        if pdf_document.xref_is_stream(xref):
+            digest.update(pdf_document.xref_stream_raw(xref) or b"")
+
+def pdf_page_hashes(source: Union[str, bytes]) -> List[str]:
+    """
+    Hash the content of each page of a PDF without rendering it.
+    
+    A page's hash covers its content stream, its geometry and everything
+    reachable from its resources and annotations (form XObjects, images,
+    fonts), so identical pages have the same hash even across different
+    documents while pages drawing different objects do not.
+    
+    Args:
+        source: Path to the PDF file or the PDF file content
+        
+    Returns:
+        List of hex digests by page
+    """
+    pdf_document = open_pdf(source)
+    hashes = []
+    
+    for page_num in range(len(pdf_document)):
+        page = pdf_document.load_page(page_num)
+        digest = hashlib.sha256(page.read_contents())
+        digest.update(repr((tuple(page.rect), page.rotation)).encode())
+        
+        values = []
+        for key in ("Resources", "Annots"):
+            kind, value = _inherited_key(pdf_document, page.xref, key)
+            if kind != "null":
+                values.append(f"/{key} {value}")
+        _hash_object_closure(pdf_document, values, digest)
+        
+        hashes.append(digest.hexdigest())
+    
+    return hashes
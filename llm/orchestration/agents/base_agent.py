@@ -233,9 +233,13 @@ class BaseAgent:
         # Log message receipt
         logger.debug(f"Agent {self.agent_id} received {message_type} message from {sender}")
         
-        # Track message processing
+        # Track message processing, continuing the sender's trace
+        trace = message.header.trace
         with self.tracer.span(
             f"agent_message_processing.{message_type}",
+            trace_id=trace.trace_id,
+            parent_span_id=trace.parent_span_id,
+            sampled=trace.sampled,
             metadata={
                 "agent_id": self.agent_id,
                 "message_type": message_type,
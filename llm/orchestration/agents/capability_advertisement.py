@@ -87,24 +87,11 @@ class CapabilityAdvertisement:
             # Update existing agent
             logger.info(f"Updating agent {agent_id} capabilities: {capabilities}")
             
-            # Get current registration
-            current_registration = self.agent_registry.get_agent(agent_id)
-            
-            # Update capabilities
-            self.agent_registry.agents[agent_id]["capabilities"] = capabilities
+            # Update capabilities and capability mappings
+            self.agent_registry.update_agent_capabilities(agent_id, capabilities)
             
             # Update metadata
             self.agent_registry.agents[agent_id]["metadata"].update(metadata)
-            
-            # Update capability mappings
-            for capability in self.agent_registry.capabilities:
-                if agent_id in self.agent_registry.capabilities[capability]:
-                    self.agent_registry.capabilities[capability].remove(agent_id)
-                    
-            for capability in capabilities:
-                if capability not in self.agent_registry.capabilities:
-                    self.agent_registry.capabilities[capability] = set()
-                self.agent_registry.capabilities[capability].add(agent_id)
                 
         # Update status
         self.agent_registry.update_agent_status(agent_id, status, metadata)
@@ -146,8 +133,7 @@ class CapabilityAdvertisement:
         self.agent_registry.update_agent_status(agent_id, status, metadata)
         
         # Update agent load if available
-        if agent_id in self.agent_registry.agents:
-            self.agent_registry.agents[agent_id]["load"] = load
+        self.agent_registry.update_agent_load(agent_id, load)
             
     async def _handle_heartbeat(self, message: Message):
         """
@@ -165,10 +151,8 @@ class CapabilityAdvertisement:
             
         load = body.get("load", 0.0)
         
-        # Update the registry with last seen timestamp
-        if agent_id in self.agent_registry.agents:
-            self.agent_registry.agents[agent_id]["last_seen"] = datetime.datetime.now().isoformat()
-            self.agent_registry.agents[agent_id]["load"] = load
+        # Update the registry with last seen timestamp and load
+        self.agent_registry.update_agent_load(agent_id, load)
             
     async def advertise_agent(
         self,
@@ -18,6 +18,7 @@ from ..message_bus.rabbitmq_wrapper import get_message_bus
 from ..monitoring.logger import get_logger
 from ..monitoring.tracing import get_tracer, Span
 from ..monitoring.metrics import get_registry, record_processing_time
+from .latency_tracker import get_latency_tracker
 
 logger = get_logger(__name__)
 
@@ -42,6 +43,7 @@ class AgentCommunication:
         self.message_bus = get_message_bus()
         self.tracer = get_tracer()
         self.metrics = get_registry()
+        self.latency_tracker = get_latency_tracker()
         
         # Pending requests and their futures
         self.pending_requests: Dict[str, asyncio.Future] = {}
@@ -107,26 +109,30 @@ class AgentCommunication:
                 labels={"agent_id": self.agent_id, "request_type": str(request_type)}
             ).increment()
             
-            # Send the request
+            # Send the request; the tracker's in-flight count is released
+            # exactly once, whatever happens (including cancellation)
             start_time = datetime.datetime.now()
-            sent = await self.message_bus.send_message(request_message)
-            
-            if not sent:
-                span.add_metadata("error", "Failed to send request message")
-                del self.pending_requests[correlation_id]
-                logger.error(f"Failed to send request to {recipient}")
-                
-                # Record failure in metrics
-                self.metrics.counter(
-                    "agent.requests.failed",
-                    labels={"agent_id": self.agent_id, "reason": "send_failure"}
-                ).increment()
-                
-                return False, None
-                
-            # Wait for the response
+            tracking_start = None
+            success = False
             try:
+                tracking_start = self.latency_tracker.start_request(recipient)
+                sent = await self.message_bus.send_message(request_message)
+                
+                if not sent:
+                    span.add_metadata("error", "Failed to send request message")
+                    logger.error(f"Failed to send request to {recipient}")
+                    
+                    # Record failure in metrics
+                    self.metrics.counter(
+                        "agent.requests.failed",
+                        labels={"agent_id": self.agent_id, "reason": "send_failure"}
+                    ).increment()
+                    
+                    return False, None
+                    
+                # Wait for the response
                 response = await asyncio.wait_for(response_future, timeout=timeout)
+                success = response.header.message_type != MessageType.ERROR
                 
                 # Calculate and record latency
                 end_time = datetime.datetime.now()
@@ -149,7 +155,6 @@ class AgentCommunication:
                 
             except asyncio.TimeoutError:
                 span.add_metadata("error", "Request timed out")
-                del self.pending_requests[correlation_id]
                 logger.warning(f"Request to {recipient} timed out after {timeout} seconds")
                 
                 # Record timeout in metrics
@@ -162,8 +167,6 @@ class AgentCommunication:
                 
             except Exception as e:
                 span.add_metadata("error", str(e))
-                if correlation_id in self.pending_requests:
-                    del self.pending_requests[correlation_id]
                 logger.error(f"Error waiting for response from {recipient}: {str(e)}")
                 
                 # Record error in metrics
@@ -174,6 +177,11 @@ class AgentCommunication:
                 
                 return False, None
                 
+            finally:
+                if tracking_start is not None:
+                    self.latency_tracker.end_request(recipient, tracking_start, success=success)
+                self.pending_requests.pop(correlation_id, None)
+                
     async def broadcast(
         self,
         message_type: MessageType,
@@ -0,0 +1,298 @@
+"""
+Observed latency tracking for the Mathematical Multimodal LLM System.
+
+This module records the latency and number of in-flight requests for each
+agent as seen from the request/response path, so load balancing can react to
+how agents actually perform instead of only to the load they self-report in
+heartbeats.
+"""
+import math
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Iterable
+
+from ..monitoring.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class AgentLatencyStats:
+    """Latency statistics for a single agent."""
+    agent_id: str
+    ewma_ms: float = 0.0
+    in_flight: int = 0
+    samples: int = 0
+    last_update: float = 0.0
+    consecutive_failures: int = 0
+    ejection_count: int = 0
+    ejected_until: float = 0.0
+    # Samples observed since the last ejection ended
+    recent_samples: int = 0
+    # Group latency the EWMA recovers towards after an outlier ejection
+    baseline_ms: Optional[float] = None
+
+    def is_ejected(self, now: float) -> bool:
+        """Check whether the agent is currently ejected from selection."""
+        return now < self.ejected_until
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation."""
+        now = time.monotonic()
+        return {
+            "agent_id": self.agent_id,
+            "ewma_ms": self.ewma_ms,
+            "in_flight": self.in_flight,
+            "samples": self.samples,
+            "consecutive_failures": self.consecutive_failures,
+            "ejection_count": self.ejection_count,
+            "ejected": self.is_ejected(now),
+            "ejected_for_s": max(0.0, self.ejected_until - now)
+        }
+
+
+class LatencyTracker:
+    """
+    Tracks per-agent peak-EWMA latency and outstanding requests.
+
+    Latency is smoothed with a time-decayed EWMA whose decay constant is
+    ``decay_seconds``. Following the peak-EWMA approach, a sample above the
+    current average replaces it immediately, so a degrading agent is
+    penalised at once and only recovers gradually.
+
+    Agents are ejected from selection for ``base_ejection_seconds`` (growing
+    with each repeated ejection) after ``max_consecutive_failures`` failed
+    requests in a row, or when their latency is an outlier compared to the
+    other candidates for the same capability.
+
+    An ejected agent receives no traffic, so its EWMA cannot recover from
+    samples. Instead it decays towards the group median while the agent is
+    ejected and is replaced by the first sample after the ejection, and the
+    agent must serve ``outlier_min_samples`` fresh requests before it can be
+    judged an outlier again. The repeated-ejection count is forgotten after
+    ``ejection_reset_seconds`` without an ejection.
+    """
+
+    def __init__(
+        self,
+        decay_seconds: float = 10.0,
+        max_consecutive_failures: int = 5,
+        outlier_factor: float = 3.0,
+        outlier_min_latency_ms: float = 100.0,
+        outlier_min_samples: int = 5,
+        outlier_check_interval: float = 1.0,
+        base_ejection_seconds: float = 30.0,
+        max_ejection_seconds: float = 300.0,
+        max_ejected_fraction: float = 0.5,
+        ejection_reset_seconds: float = 300.0
+    ):
+        self.decay_seconds = decay_seconds
+        self.max_consecutive_failures = max_consecutive_failures
+        self.outlier_factor = outlier_factor
+        self.outlier_min_latency_ms = outlier_min_latency_ms
+        self.outlier_min_samples = outlier_min_samples
+        self.outlier_check_interval = outlier_check_interval
+        self.base_ejection_seconds = base_ejection_seconds
+        self.max_ejection_seconds = max_ejection_seconds
+        self.max_ejected_fraction = max_ejected_fraction
+        self.ejection_reset_seconds = ejection_reset_seconds
+
+        self.stats: Dict[str, AgentLatencyStats] = {}
+        self._last_outlier_check: Dict[str, float] = {}
+
+    def _get_stats(self, agent_id: str) -> AgentLatencyStats:
+        stats = self.stats.get(agent_id)
+        if stats is None:
+            stats = AgentLatencyStats(agent_id=agent_id)
+            self.stats[agent_id] = stats
+        return stats
+
+    def start_request(self, agent_id: str) -> float:
+        """
+        Record that a request to an agent has started.
+
+        Returns:
+            Monotonic start time to pass to ``end_request``
+        """
+        self._get_stats(agent_id).in_flight += 1
+        return time.monotonic()
+
+    def end_request(self, agent_id: str, start_time: float, success: bool = True):
+        """
+        Record that a request to an agent has finished.
+
+        Args:
+            agent_id: Agent that handled the request
+            start_time: Value returned by ``start_request``
+            success: False for timeouts and errors; the elapsed time still
+                counts as a latency sample so slow failures are penalised
+        """
+        now = time.monotonic()
+        stats = self._get_stats(agent_id)
+        stats.in_flight = max(0, stats.in_flight - 1)
+        self._recover(stats, now)
+        self._observe(stats, (now - start_time) * 1000, now)
+
+        if success:
+            stats.consecutive_failures = 0
+            return
+
+        stats.consecutive_failures += 1
+        if stats.consecutive_failures >= self.max_consecutive_failures and not stats.is_ejected(now):
+            self._eject(stats, now, f"{stats.consecutive_failures} consecutive failures")
+
+    def _observe(self, stats: AgentLatencyStats, latency_ms: float, now: float):
+        # The first sample after an ejection replaces the stale average
+        if stats.recent_samples == 0 or latency_ms > stats.ewma_ms:
+            stats.ewma_ms = latency_ms
+        else:
+            elapsed = max(0.0, now - stats.last_update)
+            weight = math.exp(-elapsed / self.decay_seconds)
+            stats.ewma_ms = stats.ewma_ms * weight + latency_ms * (1.0 - weight)
+        stats.samples += 1
+        stats.recent_samples += 1
+        stats.last_update = now
+
+    def _recover(self, stats: AgentLatencyStats, now: float):
+        # Apply what happened while the agent was ejected or healthy
+        if stats.is_ejected(now) or not stats.ejected_until:
+            return
+
+        if stats.baseline_ms is not None:
+            # Decay towards the group baseline for the time spent ejected
+            elapsed = max(0.0, now - stats.last_update)
+            weight = math.exp(-elapsed / self.decay_seconds)
+            stats.ewma_ms = stats.baseline_ms + (stats.ewma_ms - stats.baseline_ms) * weight
+            stats.baseline_ms = None
+            stats.last_update = now
+
+        if stats.ejection_count and now - stats.ejected_until >= self.ejection_reset_seconds:
+            stats.ejection_count = 0
+
+    def _eject(self, stats: AgentLatencyStats, now: float, reason: str,
+               baseline_ms: Optional[float] = None):
+        stats.ejection_count += 1
+        duration = min(
+            self.max_ejection_seconds,
+            self.base_ejection_seconds * stats.ejection_count
+        )
+        stats.ejected_until = now + duration
+        stats.recent_samples = 0
+        stats.baseline_ms = baseline_ms
+        logger.warning(f"Ejecting agent {stats.agent_id} from load balancing for {duration:.0f}s: {reason}")
+
+    def ewma_latency(self, agent_id: str) -> float:
+        """Get the smoothed latency of an agent in milliseconds."""
+        stats = self.stats.get(agent_id)
+        return stats.ewma_ms if stats else 0.0
+
+    def in_flight(self, agent_id: str) -> int:
+        """Get the number of outstanding requests to an agent."""
+        stats = self.stats.get(agent_id)
+        return stats.in_flight if stats else 0
+
+    def peak_ewma_cost(self, agent_id: str) -> float:
+        """
+        Get the peak-EWMA cost of an agent (lower is better).
+
+        The cost is the expected latency scaled by the queue the next request
+        would join. Agents without samples cost nothing, so new agents get
+        traffic and a measurement quickly.
+        """
+        stats = self.stats.get(agent_id)
+        if stats is None or stats.samples == 0:
+            return 0.0
+        return stats.ewma_ms * (stats.in_flight + 1)
+
+    def is_available(self, agent_id: str) -> bool:
+        """Check whether an agent is not currently ejected."""
+        stats = self.stats.get(agent_id)
+        if stats is None:
+            return True
+        now = time.monotonic()
+        self._recover(stats, now)
+        return not stats.is_ejected(now)
+
+    def filter_available(self, agent_ids: Iterable[str]) -> List[str]:
+        """
+        Remove ejected agents from a candidate list.
+
+        If every candidate is ejected, all of them are returned: serving from
+        a slow agent is better than failing the request outright.
+        """
+        agent_ids = list(agent_ids)
+        available = [agent_id for agent_id in agent_ids if self.is_available(agent_id)]
+        return available or agent_ids
+
+    def outlier_check_due(self, group: str) -> bool:
+        """Check whether ``check_outliers`` would run for a group now."""
+        return time.monotonic() - self._last_outlier_check.get(group, 0.0) >= self.outlier_check_interval
+
+    def check_outliers(self, group: str, agent_ids: List[str]) -> List[str]:
+        """
+        Eject agents whose latency is an outlier within a group of peers.
+
+        Runs at most once per ``outlier_check_interval`` per group, so it can
+        be called on every selection.
+
+        Args:
+            group: Name of the peer group, usually the capability
+            agent_ids: Agents that serve the same capability
+
+        Returns:
+            List of newly ejected agent IDs
+        """
+        now = time.monotonic()
+        if now - self._last_outlier_check.get(group, 0.0) < self.outlier_check_interval:
+            return []
+        self._last_outlier_check[group] = now
+
+        # Agents need fresh samples since their last ejection to be judged
+        measured = []
+        for agent_id in agent_ids:
+            stats = self.stats.get(agent_id)
+            if stats is None:
+                continue
+            self._recover(stats, now)
+            if stats.recent_samples >= self.outlier_min_samples or stats.is_ejected(now):
+                measured.append(stats)
+        if len(measured) < 2:
+            return []
+
+        median_ms = statistics.median(stats.ewma_ms for stats in measured)
+        threshold_ms = max(self.outlier_min_latency_ms, median_ms * self.outlier_factor)
+
+        # Never eject more than a fraction of the group
+        already_ejected = sum(1 for stats in measured if stats.is_ejected(now))
+        budget = int(len(measured) * self.max_ejected_fraction) - already_ejected
+
+        ejected = []
+        for stats in sorted(measured, key=lambda s: s.ewma_ms, reverse=True):
+            if budget <= 0 or stats.ewma_ms <= threshold_ms:
+                break
+            if stats.is_ejected(now):
+                continue
+            self._eject(
+                stats, now,
+                f"latency {stats.ewma_ms:.0f}ms exceeds {threshold_ms:.0f}ms ({group})",
+                baseline_ms=median_ms
+            )
+            ejected.append(stats.agent_id)
+            budget -= 1
+        return ejected
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get statistics for all tracked agents."""
+        return {agent_id: stats.to_dict() for agent_id, stats in self.stats.items()}
+
+
+# Create singleton instance
+_latency_tracker = None
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get the latency tracker singleton."""
+    global _latency_tracker
+    if _latency_tracker is None:
+        _latency_tracker = LatencyTracker()
+    return _latency_tracker
@@ -16,6 +16,7 @@ from ..message_bus.message_formats import (
 )
 from ..monitoring.logger import get_logger
 from .registry import get_agent_registry
+from .latency_tracker import get_latency_tracker
 
 logger = get_logger(__name__)
 
@@ -28,11 +29,26 @@ class LoadBalancer:
     their capabilities and current load.
     """
     
-    def __init__(self):
-        """Initialize the load balancer."""
+    STRATEGY_LEAST_LOADED = "least_loaded"
+    STRATEGY_POWER_OF_TWO = "power_of_two"
+    STRATEGY_LEAST_OUTSTANDING = "least_outstanding"
+    STRATEGY_PEAK_EWMA = "peak_ewma"
+    
+    def __init__(self, selection_strategy: str = STRATEGY_PEAK_EWMA):
+        """
+        Initialize the load balancer.
+        
+        Args:
+            selection_strategy: How load-aware selection picks an agent.
+                'least_loaded' and 'power_of_two' use the load agents report
+                in heartbeats; 'least_outstanding' and 'peak_ewma' use the
+                in-flight requests and latency observed by the requesting side
+        """
         self.agent_registry = get_agent_registry()
+        self.latency_tracker = get_latency_tracker()
         self.priority_weights: Dict[str, float] = {}
         self.capability_weights: Dict[str, float] = {}
+        self.selection_strategy = selection_strategy
         
     def select_agent(
         self,
@@ -51,12 +67,21 @@ class LoadBalancer:
         Returns:
             Selected agent ID or None if no suitable agent found
         """
+        if consider_load:
+            if self.selection_strategy in (self.STRATEGY_LEAST_OUTSTANDING, self.STRATEGY_PEAK_EWMA):
+                return self._select_by_observed_latency(capability, exclude_agents)
+                
+            # The routing index keeps available agents ordered by
+            # load / priority; the capability weight scales every candidate
+            # equally, so it does not change the ordering
+            index = self.agent_registry.routing_index
+            if self.selection_strategy == self.STRATEGY_POWER_OF_TWO:
+                return index.power_of_two(capability, exclude_agents)
+            return index.least_loaded(capability, exclude_agents)
+            
         # Get all agents with the capability
         agents = self.agent_registry.find_agents_by_capability(capability)
         
-        if not agents:
-            return None
-            
         # Filter out excluded agents
         if exclude_agents:
             agents = [a for a in agents if a not in exclude_agents]
@@ -64,74 +89,81 @@ class LoadBalancer:
         if not agents:
             return None
             
-        if not consider_load:
-            # If load is not a factor, choose randomly with capability weight bias
-            if capability in self.capability_weights:
-                # Higher weight = higher priority for the capability
-                # Apply weighted random selection
-                weighted_agents = []
-                base_weight = 1.0
-                capability_factor = self.capability_weights.get(capability, 1.0)
+        # If load is not a factor, choose randomly with capability weight bias
+        if capability in self.capability_weights:
+            # Higher weight = higher priority for the capability
+            # Apply weighted random selection
+            weighted_agents = []
+            base_weight = 1.0
+            capability_factor = self.capability_weights.get(capability, 1.0)
+            
+            for agent_id in agents:
+                # Higher weights make the agent more likely to be selected
+                agent_priority = self.priority_weights.get(agent_id, 1.0)
+                weight = base_weight * agent_priority * capability_factor
+                weighted_agents.append((agent_id, weight))
                 
-                for agent_id in agents:
-                    # Higher weights make the agent more likely to be selected
-                    agent_priority = self.priority_weights.get(agent_id, 1.0)
-                    weight = base_weight * agent_priority * capability_factor
-                    weighted_agents.append((agent_id, weight))
+            # Perform weighted random selection
+            total_weight = sum(w for _, w in weighted_agents)
+            selection = random.uniform(0, total_weight)
+            current = 0
+            
+            for agent_id, weight in weighted_agents:
+                current += weight
+                if current >= selection:
+                    return agent_id
                     
-                # Perform weighted random selection
-                total_weight = sum(w for _, w in weighted_agents)
-                selection = random.uniform(0, total_weight)
-                current = 0
-                
-                for agent_id, weight in weighted_agents:
-                    current += weight
-                    if current >= selection:
-                        return agent_id
-                        
-                # If we get here, return the last agent (should not happen)
-                return weighted_agents[-1][0]
-            else:
-                # No weights, just random selection
-                return random.choice(agents)
-                
-        # Consider load in the selection
-        candidates = []
-        for agent_id in agents:
-            agent_info = self.agent_registry.get_agent(agent_id)
-            if not agent_info:
-                continue
-                
-            # Check if agent is in a suitable status
-            if agent_info.get("status") not in ["active", "ready", "registered"]:
-                continue
-                
-            # Get agent load
-            load = agent_info.get("load", 0.0)
-            
-            # Get agent priority
-            priority = self.priority_weights.get(agent_id, 1.0)
-            
-            # Get capability-specific priority
-            capability_priority = self.capability_weights.get(capability, 1.0)
+            # If we get here, return the last agent (should not happen)
+            return weighted_agents[-1][0]
+        else:
+            # No weights, just random selection
+            return random.choice(agents)
             
-            # Compute selection score (lower is better)
-            # Formula: load / (priority * capability_priority)
-            # This means higher load = worse score
-            # Higher priority = better score
-            score = load / (priority * capability_priority)
+    def _select_by_observed_latency(
+        self,
+        capability: str,
+        exclude_agents: List[str] = None
+    ) -> Optional[str]:
+        """
+        Select an agent using request-path observations.
+        
+        Slow outliers are ejected first, then two available candidates are
+        sampled straight from the routing index and the one with fewer
+        outstanding requests (or lower peak-EWMA cost) is chosen. Priority
+        weights divide the cost as they divide load, and ties (e.g. before
+        any requests were observed) fall back to the heartbeat load score.
+        """
+        index = self.agent_registry.routing_index
+        tracker = self.latency_tracker
+        excluded = set(exclude_agents) if exclude_agents else None
+        
+        # The full candidate list is only needed when outliers are checked
+        if tracker.outlier_check_due(capability):
+            tracker.check_outliers(capability, index.agents(capability))
             
-            # Add to candidates
-            candidates.append((score, agent_id))
+        def allowed(agent_id: str) -> bool:
+            return not excluded or agent_id not in excluded
             
+        candidates = index.sample(
+            capability, 2, lambda agent_id: allowed(agent_id) and tracker.is_available(agent_id)
+        )
+        if not candidates:
+            # Serving from an ejected agent is better than failing the request
+            candidates = index.sample(capability, 2, allowed if excluded else None)
         if not candidates:
             return None
-            
-        # Sort by score (lowest first)
-        candidates.sort()
-        
-        # Return the agent with the lowest score
-        return candidates[0][1]
+        if len(candidates) == 1:
+            return candidates[0]
+            
+        if self.selection_strategy == self.STRATEGY_LEAST_OUTSTANDING:
+            cost = self.latency_tracker.in_flight
+        else:
+            cost = self.latency_tracker.peak_ewma_cost
+            
+        first, second = candidates
+        first_cost = (cost(first) / self.priority_weights.get(first, 1.0), index.score(first))
+        second_cost = (cost(second) / self.priority_weights.get(second, 1.0), index.score(second))
+        return first if first_cost <= second_cost else second
         
     def set_agent_priority(self, agent_id: str, priority: float):
         """
@@ -142,6 +174,7 @@ class LoadBalancer:
             priority: Priority weight (higher = more preferred)
         """
         self.priority_weights[agent_id] = max(0.1, priority)  # Ensure positive weight
+        self.agent_registry.routing_index.set_priority(agent_id, self.priority_weights[agent_id])
         
     def set_capability_priority(self, capability: str, priority: float):
         """
@@ -8,6 +8,7 @@ import datetime
 import json
 import logging
 from ..monitoring.logger import get_logger
+from .routing_index import CapabilityIndex
 
 logger = get_logger(__name__)
 
@@ -15,10 +16,14 @@ logger = get_logger(__name__)
 class AgentRegistry:
     """Registry for agents and their capabilities."""
     
+    # Statuses in which an agent can be selected to receive work
+    AVAILABLE_STATUSES = ("registered", "active", "ready")
+    
     def __init__(self):
         self.agents: Dict[str, Dict[str, Any]] = {}
         self.capabilities: Dict[str, Set[str]] = {}
         self.services: Dict[str, Dict[str, Any]] = {}
+        self.routing_index = CapabilityIndex()
         
     def register_agent(
         self,
@@ -37,6 +42,7 @@ class AgentRegistry:
             "endpoint": endpoint,
             "metadata": metadata or {},
             "status": "registered",
+            "load": 0.0,
             "registered_at": datetime.datetime.now().isoformat(),
             "last_seen": datetime.datetime.now().isoformat()
         }
@@ -46,6 +52,7 @@ class AgentRegistry:
             if capability not in self.capabilities:
                 self.capabilities[capability] = set()
             self.capabilities[capability].add(agent_id)
+        self.routing_index.add_agent(agent_id, capabilities)
             
         logger.info(f"Registered agent {agent_id} of type {agent_type} with capabilities: {capabilities}")
         
@@ -105,6 +112,7 @@ class AgentRegistry:
                     
         # Remove agent record
         del self.agents[agent_id]
+        self.routing_index.remove_agent(agent_id)
         
         logger.info(f"Deregistered agent {agent_id}")
         return True
@@ -127,6 +135,38 @@ class AgentRegistry:
         if metadata:
             self.agents[agent_id]["metadata"].update(metadata)
             
+        self.routing_index.set_eligible(agent_id, status in self.AVAILABLE_STATUSES)
+        return True
+        
+    def update_agent_load(self, agent_id: str, load: float):
+        """Record the load reported by an agent in a heartbeat or status update."""
+        if agent_id not in self.agents:
+            return False
+            
+        self.agents[agent_id]["load"] = load
+        self.agents[agent_id]["last_seen"] = datetime.datetime.now().isoformat()
+        self.routing_index.update_load(agent_id, load)
+        return True
+        
+    def update_agent_capabilities(self, agent_id: str, capabilities: List[str]):
+        """Replace the capabilities of a registered agent."""
+        if agent_id not in self.agents:
+            return False
+            
+        old_capabilities = set(self.agents[agent_id]["capabilities"])
+        new_capabilities = set(capabilities)
+        
+        for capability in old_capabilities - new_capabilities:
+            if capability in self.capabilities:
+                self.capabilities[capability].discard(agent_id)
+                if not self.capabilities[capability]:
+                    del self.capabilities[capability]
+                    
+        for capability in new_capabilities - old_capabilities:
+            self.capabilities.setdefault(capability, set()).add(agent_id)
+            
+        self.agents[agent_id]["capabilities"] = list(capabilities)
+        self.routing_index.set_capabilities(agent_id, capabilities)
         return True
         
     def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
@@ -135,17 +175,8 @@ class AgentRegistry:
         
 
     def find_agents_by_capability(self, capability: str) -> List[str]:
-        """Find agents that support a specific capability."""
-        if capability not in self.capabilities:
-            return []
-            
-        # Filter for active agents only
-        active_agents = []
-        for agent_id in self.capabilities[capability]:
-            if agent_id in self.agents and self.agents[agent_id]["status"] in ["registered", "active", "ready"]:
-                active_agents.append(agent_id)
-                
-        return active_agents
+        """Find available agents that support a specific capability."""
+        return self.routing_index.agents(capability)
         
     def find_agents_by_type(self, agent_type: str) -> List[str]:
         """Find agents of a specific type."""
@@ -167,15 +198,7 @@ class AgentRegistry:
         
     def has_capability(self, capability: str) -> bool:
         """Check if a capability is supported by any active agent."""
-        if capability not in self.capabilities:
-            return False
-            
-        # Check if any agent with this capability is active
-        for agent_id in self.capabilities[capability]:
-            if agent_id in self.agents and self.agents[agent_id]["status"] in ["registered", "active", "ready"]:
-                return True
-                
-        return False
+        return self.routing_index.has_capability(capability)
         
     def get_agent_capabilities(self, agent_id: str) -> List[str]:
         """Get the capabilities of a specific agent."""
@@ -188,11 +211,9 @@ class AgentRegistry:
         """
         Get the optimal agent for a capability.
         
-        Currently selects the first active agent with the capability.
-        Could be extended to consider load, performance metrics, etc.
+        Selects the available agent with the lowest load score.
         """
-        agents = self.find_agents_by_capability(capability)
-        return agents[0] if agents else None
+        return self.routing_index.least_loaded(capability)
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert registry to dictionary representation."""
@@ -220,6 +241,16 @@ class AgentRegistry:
         # Load services (instances must be added separately)
         for service_id, service_info in data.get("services", {}).items():
             self.services[service_id] = service_info.copy()
+            
+        # Rebuild the routing index
+        self.routing_index = CapabilityIndex()
+        for agent_id, agent_info in self.agents.items():
+            self.routing_index.add_agent(
+                agent_id,
+                agent_info.get("capabilities", []),
+                load=agent_info.get("load", 0.0),
+                eligible=agent_info.get("status") in self.AVAILABLE_STATUSES
+            )
 
 
 # Create a singleton instance
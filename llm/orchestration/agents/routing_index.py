@@ -0,0 +1,261 @@
+"""
+Capability routing index for the Mathematical Multimodal LLM System.
+
+This module maintains, for every capability, the set of agents that can
+currently serve it and a heap ordered by their live load score. The index is
+updated incrementally from registrations, heartbeats and status updates, so
+selecting an agent does not require scanning or sorting all agents.
+"""
+import heapq
+import random
+from typing import Dict, List, Optional, Set, Tuple, Iterable, Callable
+
+
+class CapabilityIndex:
+    """
+    Index from capability to eligible agents ordered by load score.
+
+    The score of an agent is ``load / priority`` (lower is better). Heaps use
+    lazy deletion: updating an agent pushes a new entry tagged with a version
+    number, and stale entries are discarded when they reach the top. Each
+    capability also keeps a dense member list so random sampling for
+    power-of-two-choices selection is O(1).
+    """
+
+    # Rebuild a heap when it holds this many times more entries than members
+    COMPACTION_FACTOR = 4
+
+    # Random draws made by sample() before filtering the members in full
+    SAMPLE_ATTEMPTS = 8
+
+    def __init__(self):
+        self._heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        self._members: Dict[str, List[str]] = {}
+        self._positions: Dict[str, Dict[str, int]] = {}
+
+        self._agent_capabilities: Dict[str, Set[str]] = {}
+        self._load: Dict[str, float] = {}
+        self._priority: Dict[str, float] = {}
+        self._eligible: Dict[str, bool] = {}
+        self._version: Dict[str, int] = {}
+
+    def score(self, agent_id: str) -> float:
+        """Get the current load score of an agent (lower is better)."""
+        return self._load.get(agent_id, 0.0) / self._priority.get(agent_id, 1.0)
+
+    def add_agent(
+        self,
+        agent_id: str,
+        capabilities: Iterable[str],
+        load: float = 0.0,
+        eligible: bool = True
+    ):
+        """Add an agent to the index, replacing any previous entry."""
+        if agent_id in self._agent_capabilities:
+            self.remove_agent(agent_id)
+
+        self._agent_capabilities[agent_id] = set(capabilities)
+        self._load[agent_id] = load
+        self._priority.setdefault(agent_id, 1.0)
+        self._eligible[agent_id] = eligible
+        self._version[agent_id] = self._version.get(agent_id, 0) + 1
+
+        if eligible:
+            for capability in self._agent_capabilities[agent_id]:
+                self._add_member(capability, agent_id)
+
+    def remove_agent(self, agent_id: str):
+        """Remove an agent from the index."""
+        if agent_id not in self._agent_capabilities:
+            return
+
+        if self._eligible.get(agent_id):
+            for capability in self._agent_capabilities[agent_id]:
+                self._remove_member(capability, agent_id)
+
+        del self._agent_capabilities[agent_id]
+        self._load.pop(agent_id, None)
+        self._eligible.pop(agent_id, None)
+        # Bump the version so any heap entries left behind are stale
+        self._version[agent_id] = self._version.get(agent_id, 0) + 1
+
+    def update_load(self, agent_id: str, load: float):
+        """Update the load reported by an agent."""
+        if agent_id not in self._agent_capabilities or self._load.get(agent_id) == load:
+            return
+        self._load[agent_id] = load
+        self._reindex(agent_id)
+
+    def set_priority(self, agent_id: str, priority: float):
+        """Set the priority weight of an agent (higher is preferred)."""
+        self._priority[agent_id] = priority
+        if agent_id in self._agent_capabilities:
+            self._reindex(agent_id)
+
+    def set_eligible(self, agent_id: str, eligible: bool):
+        """Mark an agent as able or unable to receive work."""
+        if agent_id not in self._agent_capabilities or self._eligible[agent_id] == eligible:
+            return
+
+        self._eligible[agent_id] = eligible
+        self._version[agent_id] += 1
+        for capability in self._agent_capabilities[agent_id]:
+            if eligible:
+                self._add_member(capability, agent_id)
+            else:
+                self._remove_member(capability, agent_id)
+
+    def set_capabilities(self, agent_id: str, capabilities: Iterable[str]):
+        """Replace the capabilities of an agent, touching only those that changed."""
+        if agent_id not in self._agent_capabilities:
+            return
+
+        old = self._agent_capabilities[agent_id]
+        new = set(capabilities)
+        if self._eligible[agent_id]:
+            for capability in old - new:
+                self._remove_member(capability, agent_id)
+            for capability in new - old:
+                self._add_member(capability, agent_id)
+        self._agent_capabilities[agent_id] = new
+
+    def agents(self, capability: str) -> List[str]:
+        """Get the eligible agents for a capability."""
+        return list(self._members.get(capability, ()))
+
+    def has_capability(self, capability: str) -> bool:
+        """Check whether any eligible agent provides a capability."""
+        return bool(self._members.get(capability))
+
+    def capabilities(self) -> List[str]:
+        """Get all capabilities with at least one eligible agent."""
+        return [capability for capability, members in self._members.items() if members]
+
+    def least_loaded(self, capability: str, exclude: Iterable[str] = None) -> Optional[str]:
+        """
+        Get the eligible agent with the lowest score for a capability.
+
+        Excluded agents are popped temporarily and pushed back, so the cost is
+        proportional to the number of exclusions rather than the agent count.
+        """
+        heap = self._heaps.get(capability)
+        if not heap:
+            return None
+
+        excluded = set(exclude) if exclude else None
+        skipped = []
+        selected = None
+        while heap:
+            entry = heap[0]
+            _, version, agent_id = entry
+            if version != self._version.get(agent_id) or agent_id not in self._positions[capability]:
+                heapq.heappop(heap)
+                continue
+            if excluded and agent_id in excluded:
+                skipped.append(heapq.heappop(heap))
+                continue
+            selected = agent_id
+            break
+
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return selected
+
+    def sample(
+        self,
+        capability: str,
+        count: int = 2,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[str]:
+        """
+        Sample distinct eligible agents for a capability at random.
+
+        Agents rejected by ``accept`` (exclusions, ejections) are skipped by
+        redrawing, so the cost does not depend on the agent count unless most
+        agents are rejected; only then are the members filtered in full.
+
+        Args:
+            capability: Required capability
+            count: Number of agents to sample
+            accept: Optional predicate an agent must satisfy
+
+        Returns:
+            Up to ``count`` agent IDs
+        """
+        members = self._members.get(capability)
+        if not members:
+            return []
+        if accept is None:
+            return random.sample(members, min(count, len(members)))
+
+        if len(members) > self.SAMPLE_ATTEMPTS:
+            selected = []
+            for _ in range(self.SAMPLE_ATTEMPTS):
+                agent_id = members[random.randrange(len(members))]
+                if agent_id not in selected and accept(agent_id):
+                    selected.append(agent_id)
+                    if len(selected) == count:
+                        return selected
+
+        # Small capabilities, or most agents rejected
+        accepted = [agent_id for agent_id in members if accept(agent_id)]
+        return random.sample(accepted, min(count, len(accepted)))
+
+    def power_of_two(self, capability: str, exclude: Iterable[str] = None) -> Optional[str]:
+        """
+        Select an agent using power-of-two-choices.
+
+        Two eligible agents are sampled at random and the one with the lower
+        score wins. This avoids every router herding onto the same
+        least-loaded agent between heartbeats.
+        """
+        excluded = set(exclude) if exclude else None
+        candidates = self.sample(
+            capability, 2, (lambda agent_id: agent_id not in excluded) if excluded else None
+        )
+        if not candidates:
+            return None
+        return min(candidates, key=self.score)
+
+    def _reindex(self, agent_id: str):
+        """Push fresh heap entries for an agent after its score changed."""
+        self._version[agent_id] += 1
+        if not self._eligible[agent_id]:
+            return
+        for capability in self._agent_capabilities[agent_id]:
+            self._push(capability, agent_id)
+
+    def _push(self, capability: str, agent_id: str):
+        heap = self._heaps.setdefault(capability, [])
+        heapq.heappush(heap, (self.score(agent_id), self._version[agent_id], agent_id))
+
+        members = self._members.get(capability, ())
+        if len(heap) > self.COMPACTION_FACTOR * len(members) + 16:
+            self._heaps[capability] = [
+                (self.score(a), self._version[a], a) for a in members
+            ]
+            heapq.heapify(self._heaps[capability])
+
+    def _add_member(self, capability: str, agent_id: str):
+        positions = self._positions.setdefault(capability, {})
+        if agent_id in positions:
+            return
+        members = self._members.setdefault(capability, [])
+        positions[agent_id] = len(members)
+        members.append(agent_id)
+        self._push(capability, agent_id)
+
+    def _remove_member(self, capability: str, agent_id: str):
+        positions = self._positions.get(capability)
+        if not positions or agent_id not in positions:
+            return
+
+        # Swap with the last member for O(1) removal
+        members = self._members[capability]
+        index = positions.pop(agent_id)
+        last = members.pop()
+        if last != agent_id:
+            members[index] = last
+            positions[last] = index
+
+        # Heap entries for this agent become stale via the membership check
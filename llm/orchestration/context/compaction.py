@@ -0,0 +1,274 @@
+"""
+Background context compaction for the Mathematical Multimodal LLM System.
+
+This module summarizes old conversation turns on a worker thread, so that
+summarization cost stays off the request path. Summaries are produced by an
+LLM summarizer when one is configured, or extracted from the tracked
+mathematical entities and the user's questions, and are swapped into the
+conversation atomically.
+"""
+
+import queue
+import re
+import threading
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from orchestration.monitoring.logger import get_logger
+from orchestration.context.conversation_state import ConversationState, Message
+from orchestration.context.entity_tracker import EntityTracker
+from orchestration.context.token_counter import get_token_counter
+
+logger = get_logger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.?!])\s")
+
+
+def _first_sentence(text: str, max_chars: int = 120) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), 1)[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rstrip() + "..."
+    return sentence
+
+
+def _describe_entity(entity: Dict[str, Any]) -> str:
+    value = entity.get("value", "")
+    if entity.get("entity_type") == "expression":
+        return f"${entity.get('latex_form') or value}$"
+    display_form = entity.get("display_form")
+    if display_form and display_form not in value:
+        return f"{display_form} = {value}"
+    return value
+
+
+def extractive_summary(messages: List[Message],
+                       entity_tracker: Optional[EntityTracker] = None,
+                       max_tokens: int = 256) -> str:
+    """
+    Summarize messages from their tracked entities and questions.
+
+    Earlier summaries are carried forward, followed by the mathematical
+    entities defined in the messages (with their current values when the
+    tracker has them) and the opening sentence of each user question.
+
+    Args:
+        messages: Messages to summarize, in conversation order
+        entity_tracker: Entity tracker of the conversation
+        max_tokens: Token budget for the summary
+
+    Returns:
+        Summary text
+    """
+    previous = []
+    definitions: Dict[str, None] = {}
+    questions: Dict[str, None] = {}
+
+    for message in messages:
+        if message.metadata.get("is_summary"):
+            previous.append(message.metadata.get("summary", message.content))
+            continue
+
+        for extracted in message.metadata.get("entities", []):
+            entity = None
+            if entity_tracker is not None:
+                entity = entity_tracker.get_entity(extracted.get("entity_id"))
+            definitions[_describe_entity(entity or extracted)] = None
+
+        if message.role == "user" and message.content.strip():
+            questions[_first_sentence(message.content)] = None
+
+    # Add parts in order of usefulness; definitions may take only part of
+    # what is left so that the questions are represented too
+    counter = get_token_counter()
+    parts = []
+    used = 0
+    sections = (("", previous, 1.0), ("Defined: ", definitions, 0.6), ("Asked: ", questions, 1.0))
+    for prefix, items, share in sections:
+        limit = used + int((max_tokens - used) * share)
+        kept = []
+        for item in items:
+            tokens = counter.count(item) + 1
+            if used + tokens > limit:
+                break
+            kept.append(item)
+            used += tokens
+        if kept:
+            parts.append(prefix + "; ".join(kept))
+
+    return "\n".join(parts)
+
+
+class ContextCompactor:
+    """
+    Compacts conversation history on a background worker.
+
+    Once a conversation grows past the trigger threshold, its oldest turns
+    (other than the most recent ones) are replaced with a single summary
+    message bringing it back to the target size.
+    """
+
+    def __init__(self,
+                max_tokens: int = 4096,
+                trigger_ratio: float = 0.75,
+                target_ratio: float = 0.5,
+                preserve_last_n_turns: int = 2,
+                llm_summarizer: Optional[Callable[[str], str]] = None):
+        """
+        Initialize the compactor.
+
+        Args:
+            max_tokens: Maximum token budget of a conversation
+            trigger_ratio: Token usage ratio at which compaction is scheduled
+            target_ratio: Token usage ratio to compact down to
+            preserve_last_n_turns: Number of most recent turns never compacted
+            llm_summarizer: LLM-based summarizer function; extractive summaries
+                are used without one or when it fails
+        """
+        self.max_tokens = max_tokens
+        self.trigger_tokens = int(max_tokens * trigger_ratio)
+        self.target_tokens = int(max_tokens * target_ratio)
+        self.preserve_last_n_turns = preserve_last_n_turns
+        self.llm_summarizer = llm_summarizer
+
+        self.compactions = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, ConversationState, Optional[EntityTracker]]]]" = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def needs_compaction(self, state: ConversationState) -> bool:
+        """Whether a conversation has grown past the trigger threshold."""
+        return state.estimate_token_count() > self.trigger_tokens
+
+    def schedule(self,
+                conversation_id: str,
+                state: ConversationState,
+                entity_tracker: Optional[EntityTracker] = None) -> bool:
+        """
+        Queue a conversation for compaction.
+
+        Args:
+            conversation_id: ID of the conversation
+            state: Conversation state to compact
+            entity_tracker: Entity tracker of the conversation
+
+        Returns:
+            True if queued, False if it was already pending
+        """
+        with self._lock:
+            if conversation_id in self._pending:
+                return False
+            self._pending.add(conversation_id)
+
+        self.start()
+        self._queue.put((conversation_id, state, entity_tracker))
+        return True
+
+    def compact(self,
+               state: ConversationState,
+               entity_tracker: Optional[EntityTracker] = None) -> bool:
+        """
+        Compact a conversation now.
+
+        Args:
+            state: Conversation state to compact
+            entity_tracker: Entity tracker of the conversation
+
+        Returns:
+            True if messages were replaced with a summary
+        """
+        messages = state.snapshot_messages()
+        excess = state.estimate_token_count() - self.target_tokens
+        if excess <= 0:
+            return False
+
+        # Never compact the most recent turns
+        cut = len(messages)
+        turns = 0
+        while cut > 0 and turns < self.preserve_last_n_turns:
+            cut -= 1
+            if messages[cut].role == "user":
+                turns += 1
+
+        # Take the oldest messages until enough tokens would be freed
+        selected = []
+        freed = 0
+        for message in messages[:cut]:
+            selected.append(message)
+            freed += message.estimate_token_count()
+            if freed >= excess + self.target_tokens // 4:
+                break
+
+        if not selected or (len(selected) == 1 and selected[0].metadata.get("is_summary")):
+            return False
+
+        summary = self._summarize(selected, entity_tracker)
+        summarized = sum(message.metadata.get("summarized_messages", 1) for message in selected)
+        summary_id = state.compact_messages(
+            [message.message_id for message in selected],
+            f"[Summary of previous conversation: {summary}]",
+            metadata={"is_summary": True, "summary": summary, "summarized_messages": summarized}
+        )
+        if summary_id is None:
+            logger.debug(f"Skipped compaction of conversation {state.conversation_id}: history changed")
+            return False
+
+        self.compactions += 1
+        logger.info(f"Compacted {len(selected)} messages of conversation {state.conversation_id} "
+                  f"into a summary, now {state.estimate_token_count()} tokens")
+        return True
+
+    def _summarize(self,
+                  messages: List[Message],
+                  entity_tracker: Optional[EntityTracker]) -> str:
+        # The summary must stay well within the tokens it frees
+        max_summary_tokens = max(self.target_tokens // 4, 32)
+
+        if self.llm_summarizer is not None:
+            text = ""
+            for message in messages:
+                text += f"{message.role.capitalize()}: {message.content}\n"
+            try:
+                summary = self.llm_summarizer(text)
+                if summary and get_token_counter().count(summary) <= max_summary_tokens:
+                    return summary
+            except Exception as e:
+                logger.warning(f"LLM summarization failed, using extractive summary: {e}")
+
+        return extractive_summary(messages, entity_tracker, max_summary_tokens)
+
+    def start(self):
+        """Start the worker thread if it is not running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="context-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the worker thread after the queued compactions."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def wait_idle(self):
+        """Block until every queued compaction has run."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                conversation_id, state, entity_tracker = job
+                with self._lock:
+                    self._pending.discard(conversation_id)
+                try:
+                    self.compact(state, entity_tracker)
+                except Exception as e:
+                    logger.error(f"Compaction of conversation {conversation_id} failed: {e}")
+            finally:
+                self._queue.task_done()
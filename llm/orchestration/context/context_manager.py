@@ -6,6 +6,7 @@ conversation state tracking, entity management, reference resolution, and
 context pruning strategies.
 """
 
+import os
 import time
 import logging
 import json
@@ -16,6 +17,7 @@ from orchestration.monitoring.logger import get_logger
 from orchestration.context.conversation_state import ConversationState
 from orchestration.context.entity_tracker import EntityTracker
 from orchestration.context.pruning_strategy import PruningStrategy, TokenBudgetStrategy
+from orchestration.context.compaction import ContextCompactor
 
 logger = get_logger(__name__)
 
@@ -32,7 +34,8 @@ class ContextManager:
     def __init__(self, 
                  max_context_tokens: int = 4096,
                  entity_tracking_enabled: bool = True,
-                 pruning_strategy: Optional[PruningStrategy] = None):
+                 pruning_strategy: Optional[PruningStrategy] = None,
+                 compactor: Optional[ContextCompactor] = None):
         """
         Initialize the context manager.
         
@@ -40,10 +43,13 @@ class ContextManager:
             max_context_tokens: Maximum number of tokens in the context window
             entity_tracking_enabled: Whether to enable mathematical entity tracking
             pruning_strategy: Strategy for pruning context when it exceeds limits
+            compactor: Background compactor; when given, long conversations are
+                summarized off the request path instead of pruned inline
         """
         self.max_context_tokens = max_context_tokens
         self.entity_tracking_enabled = entity_tracking_enabled
         self.pruning_strategy = pruning_strategy or TokenBudgetStrategy(max_context_tokens)
+        self.compactor = compactor
         
         # Initialize components
         self.conversation_states = {}  # conversation_id -> ConversationState
@@ -181,13 +187,17 @@ class ContextManager:
         # Get conversation state
         state = self._get_conversation_state(conversation_id)
         
+        # While a compaction is pending, read only the most recent messages
+        # that fit the budget
+        max_tokens = self.max_context_tokens if self.compactor else None
+        
         # Get context in the requested format
         if format == "text":
-            return state.get_context_text(include_metadata=include_metadata)
+            return state.get_context_text(include_metadata=include_metadata, max_tokens=max_tokens)
         elif format == "dict":
-            return state.get_context_dict(include_metadata=include_metadata)
+            return state.get_context_dict(include_metadata=include_metadata, max_tokens=max_tokens)
         elif format == "json":
-            context_dict = state.get_context_dict(include_metadata=include_metadata)
+            context_dict = state.get_context_dict(include_metadata=include_metadata, max_tokens=max_tokens)
             return json.dumps(context_dict)
         else:
             raise ValueError(f"Unsupported format: {format}")
@@ -414,15 +424,25 @@ class ContextManager:
         """
         Apply pruning strategy if the context exceeds limits.
         
+        With a compactor, the conversation is queued for background
+        compaction instead and is not modified here.
+        
         Args:
             conversation_id: ID of the conversation
             
         Returns:
-            True if pruning was applied, False otherwise
+            True if pruning was applied or compaction scheduled, False otherwise
         """
         # Get conversation state
         state = self._get_conversation_state(conversation_id)
         
+        if self.compactor:
+            if not self.compactor.needs_compaction(state):
+                return False
+            
+            entity_tracker = self.entity_trackers.get(conversation_id)
+            return self.compactor.schedule(conversation_id, state, entity_tracker)
+        
         # Check if pruning is needed
         current_tokens = state.estimate_token_count()
         
@@ -455,5 +475,9 @@ def get_context_manager() -> ContextManager:
     """
     global _context_manager
     if _context_manager is None:
-        _context_manager = ContextManager()
+        # Compact in the background unless MATH_LLM_CONTEXT_COMPACTION=inline
+        compactor = None
+        if os.environ.get("MATH_LLM_CONTEXT_COMPACTION", "background") == "background":
+            compactor = ContextCompactor()
+        _context_manager = ContextManager(compactor=compactor)
     return _context_manager
@@ -8,13 +8,21 @@ timing information, and token usage.
 import time
 import uuid
 import json
+import threading
 from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 
 from orchestration.monitoring.logger import get_logger
+from orchestration.context.token_counter import get_token_counter
 
 logger = get_logger(__name__)
 
+# Tokens added per message for role markers and separators
+MESSAGE_OVERHEAD_TOKENS = 5
+
+# Tokens added per conversation for its structure
+CONVERSATION_OVERHEAD_TOKENS = 10
+
 
 class Message:
     """Represents a single message in a conversation."""
@@ -40,6 +48,8 @@ class Message:
         self.content = content
         self.timestamp = timestamp
         self.metadata = metadata or {}
+        self._token_count = None
+        self._counted_content = None
     
     def to_dict(self, include_metadata: bool = True) -> Dict[str, Any]:
         """
@@ -66,16 +76,18 @@ class Message:
     
     def estimate_token_count(self) -> int:
         """
-        Estimate the number of tokens in the message.
+        Get the number of tokens in the message.
         
-        This is a simple approximation. For more accurate counts,
-        you would use a proper tokenizer.
+        Content is counted with the model tokenizer once and the count is
+        stored on the message; it is recounted only if the content changes.
         
         Returns:
-            Estimated token count
+            Token count including message overhead
         """
-        # Simple approximation: 1 token ≈ 4 characters for English text
-        return len(self.content) // 4 + 5  # Add 5 tokens for message overhead
+        if self._token_count is None or self._counted_content is not self.content:
+            self._token_count = get_token_counter().count(self.content) + MESSAGE_OVERHEAD_TOKENS
+            self._counted_content = self.content
+        return self._token_count
     
     def update_metadata(self, updates: Dict[str, Any]) -> None:
         """
@@ -114,6 +126,10 @@ class ConversationState:
         self.message_map = {}  # message_id -> Message object
         self.created_at = time.time()
         self.updated_at = self.created_at
+        self._message_tokens = 0  # Running total of message token counts
+        
+        # Guards the message list against background compaction
+        self._lock = threading.RLock()
     
     def add_user_message(self, 
                         content: str,
@@ -132,8 +148,7 @@ class ConversationState:
         timestamp = time.time()
         
         message = Message(message_id, "user", content, timestamp, metadata)
-        self.messages.append(message)
-        self.message_map[message_id] = message
+        self._append_message(message)
         
         self.updated_at = timestamp
         
@@ -156,13 +171,25 @@ class ConversationState:
         timestamp = time.time()
         
         message = Message(message_id, "system", content, timestamp, metadata)
-        self.messages.append(message)
-        self.message_map[message_id] = message
+        self._append_message(message)
         
         self.updated_at = timestamp
         
         return message_id
     
+    def _append_message(self, message: Message) -> None:
+        """
+        Append a message and add its tokens to the running total.
+        
+        Args:
+            message: Message to append
+        """
+        tokens = message.estimate_token_count()
+        with self._lock:
+            self.messages.append(message)
+            self.message_map[message.message_id] = message
+            self._message_tokens += tokens
+    
     def get_message(self, message_id: str) -> Optional[Message]:
         """
         Get a message by ID.
@@ -259,18 +286,15 @@ class ConversationState:
     
     def estimate_token_count(self) -> int:
         """
-        Estimate the total token count for the conversation.
+        Get the total token count for the conversation.
+        
+        The message total is maintained as messages are added and removed,
+        so this does not recount the history.
         
         Returns:
-            Estimated token count
+            Token count including conversation overhead
         """
-        # Sum token counts for all messages
-        message_tokens = sum(message.estimate_token_count() for message in self.messages)
-        
-        # Add overhead for conversation structure
-        overhead_tokens = 10  # Approximate overhead
-        
-        return message_tokens + overhead_tokens
+        return self._message_tokens + CONVERSATION_OVERHEAD_TOKENS
     
     def get_message_count(self) -> int:
         """
@@ -291,12 +315,14 @@ class ConversationState:
         Returns:
             True if successful, False otherwise
         """
-        message = self.message_map.get(message_id)
-        if not message:
-            return False
-        
-        self.messages.remove(message)
-        del self.message_map[message_id]
+        with self._lock:
+            message = self.message_map.get(message_id)
+            if not message:
+                return False
+            
+            self.messages.remove(message)
+            del self.message_map[message_id]
+            self._message_tokens -= message.estimate_token_count()
         
         return True
     
@@ -310,13 +336,73 @@ class ConversationState:
         Returns:
             Number of messages successfully removed
         """
-        removed_count = 0
+        with self._lock:
+            to_remove = {message_id for message_id in message_ids if message_id in self.message_map}
+            if not to_remove:
+                return 0
+            
+            # Rebuild the list once rather than removing messages one at a time
+            for message_id in to_remove:
+                message = self.message_map.pop(message_id)
+                self._message_tokens -= message.estimate_token_count()
+            self.messages = [message for message in self.messages if message.message_id not in to_remove]
         
-        for message_id in message_ids:
-            if self.remove_message(message_id):
-                removed_count += 1
+        return len(to_remove)
+    
+    def snapshot_messages(self) -> List[Message]:
+        """
+        Get a consistent copy of the message list.
+        
+        Returns:
+            List of messages in conversation order
+        """
+        with self._lock:
+            return list(self.messages)
+    
+    def compact_messages(self, 
+                        message_ids: List[str],
+                        summary: str,
+                        metadata: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Atomically replace messages with a summary message.
+        
+        The summary takes the place of the earliest replaced message. Nothing
+        changes if any of the messages has been removed in the meantime.
         
-        return removed_count
+        Args:
+            message_ids: IDs of the messages to replace
+            summary: Content of the summary message
+            metadata: Optional summary message metadata
+            
+        Returns:
+            ID of the summary message, or None if the messages changed
+        """
+        to_replace = set(message_ids)
+        if not to_replace:
+            return None
+        
+        with self._lock:
+            if not all(message_id in self.message_map for message_id in to_replace):
+                return None
+            
+            messages = []
+            summary_message = None
+            for message in self.messages:
+                if message.message_id not in to_replace:
+                    messages.append(message)
+                elif summary_message is None:
+                    summary_message = Message(
+                        str(uuid.uuid4()), "system", summary, message.timestamp, metadata)
+                    messages.append(summary_message)
+            
+            # Readers iterating the old list keep a consistent view
+            self.messages = messages
+            for message_id in to_replace:
+                self._message_tokens -= self.message_map.pop(message_id).estimate_token_count()
+            self.message_map[summary_message.message_id] = summary_message
+            self._message_tokens += summary_message.estimate_token_count()
+        
+        return summary_message.message_id
     
     def _get_messages_within_token_budget(self, max_tokens: int) -> List[Message]:
         """
@@ -326,7 +412,7 @@ class ConversationState:
             max_tokens: Maximum number of tokens
             
         Returns:
-            List of messages within the token budget, most recent first
+            List of messages within the token budget, in conversation order
         """
         if max_tokens <= 0:
             return []
@@ -341,10 +427,12 @@ class ConversationState:
             
             # Check if adding this message would exceed the budget
             if tokens_used + message_tokens <= max_tokens:
-                messages_included.insert(0, message)  # Insert at beginning to maintain order
+                messages_included.append(message)
                 tokens_used += message_tokens
             else:
                 # Can't include more messages
                 break
         
+        # Restore conversation order
+        messages_included.reverse()
         return messages_included
@@ -9,6 +9,8 @@ entities.
 import re
 import uuid
 import time
+import heapq
+from collections import Counter
 from typing import Dict, List, Any, Optional, Set, Tuple, Union
 import json
 
@@ -124,6 +126,36 @@ class EntityTracker:
                 r"matrix (\w+)"
             ]
         }
+        
+        # Inverted index over value tokens: token -> set of entity_ids
+        self._token_index: Dict[str, Set[str]] = {}
+        self._entity_tokens: Dict[str, Set[str]] = {}  # entity_id -> value tokens
+        
+        self._compile_reference_patterns()
+    
+    def _compile_reference_patterns(self) -> None:
+        """
+        Combine the reference patterns into a single alternation.
+        
+        Each pattern becomes a named group so a match can be traced back to
+        its entity type and to the position of its own capture groups.
+        """
+        alternatives = []
+        self._reference_groups = {}  # group name -> (entity type, index of first inner group)
+        group_index = 0
+        for entity_type, patterns in self.reference_patterns.items():
+            for position, pattern in enumerate(patterns):
+                name = f"{entity_type}_{position}"
+                inner_groups = re.compile(pattern).groups
+                group_index += 1
+                self._reference_groups[name] = (
+                    entity_type,
+                    group_index + 1 if inner_groups else None
+                )
+                group_index += inner_groups
+                alternatives.append(f"(?P<{name}>{pattern})")
+        
+        self._reference_regex = re.compile("|".join(alternatives), re.IGNORECASE)
     
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -221,42 +253,40 @@ class EntityTracker:
         resolved_query = query
         referenced_entities = {}
         
-        # Check for references using patterns
-        for entity_type, patterns in self.reference_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, query, re.IGNORECASE)
+        # Check for references using the combined pattern
+        for match in self._reference_regex.finditer(query):
+            entity_type, ref_group = self._reference_groups[match.lastgroup]
+            
+            # Skip types with no tracked entities
+            if not self.entities_by_type.get(entity_type):
+                continue
+            
+            # Handle different reference types
+            reference = match.group(0)
+            if "previous" in reference or "last" in reference or "above" in reference:
+                # Get the most recently created entity of this type
+                entity = self._get_most_recent_entity(entity_type)
+            elif reference.startswith(entity_type) and ref_group is not None:
+                # Reference by name or number
+                ref_id = match.group(ref_group)
+                entity = self._get_entity_by_reference(entity_type, ref_id)
+            else:
+                # Generic reference, get most recently referenced entity
+                entity = self._get_most_recently_referenced_entity(entity_type)
+            
+            if entity:
+                # Replace the reference in the query
+                replacement = entity.display_form
+                if entity.latex_form:
+                    replacement = entity.latex_form
                 
-                for match in matches:
-                    # Get relevant entities of this type
-                    relevant_entities = self._get_entities_by_type(entity_type)
-                    if not relevant_entities:
-                        continue
-                    
-                    # Handle different reference types
-                    if "previous" in match.group(0) or "last" in match.group(0) or "above" in match.group(0):
-                        # Get the most recently created entity of this type
-                        entity = self._get_most_recent_entity(entity_type)
-                    elif match.group(0).startswith(entity_type) and len(match.groups()) > 0:
-                        # Reference by name or number
-                        ref_id = match.group(1)
-                        entity = self._get_entity_by_reference(entity_type, ref_id)
-                    else:
-                        # Generic reference, get most recently referenced entity
-                        entity = self._get_most_recently_referenced_entity(entity_type)
-                    
-                    if entity:
-                        # Replace the reference in the query
-                        replacement = entity.display_form
-                        if entity.latex_form:
-                            replacement = entity.latex_form
-                        
-                        resolved_query = resolved_query.replace(match.group(0), replacement)
-                        
-                        # Record the reference
-                        entity.record_reference()
-                        
-                        # Add to referenced entities
-                        referenced_entities[entity.entity_id] = entity.to_dict()
+                resolved_query = resolved_query.replace(reference, replacement)
+                
+                # Record the reference
+                entity.record_reference()
+                
+                # Add to referenced entities
+                referenced_entities[entity.entity_id] = entity.to_dict()
         
         # Also check for direct references to named entities
         for name, entity_id in self.named_entities.items():
@@ -287,18 +317,24 @@ class EntityTracker:
         if not self.entities:
             return []
         
-        # Calculate relevance scores for each entity
-        scored_entities = []
-        for entity_id, entity in self.entities.items():
-            score = self._calculate_relevance_score(entity, query)
-            scored_entities.append((entity, score))
-        
-        # Sort by relevance score (descending)
-        scored_entities.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return the top entities
-        top_entities = [entity.to_dict() for entity, _ in scored_entities[:max_entities]]
-        return top_entities
+        # Work out the query-dependent parts of the score once
+        overlaps = self._token_overlaps(query)
+        type_mentions = {entity_type: entity_type in query for entity_type in self.entities_by_type}
+        now = time.time()
+        
+        # Keep only the top entities rather than sorting all of them
+        top_entities = heapq.nlargest(
+            max_entities,
+            self.entities.values(),
+            key=lambda entity: self._score_entity(
+                entity,
+                query,
+                overlaps.get(entity.entity_id, 0),
+                type_mentions.get(entity.entity_type, False),
+                now
+            )
+        )
+        return [entity.to_dict() for entity in top_entities]
     
     def update_entity(self, entity_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -321,6 +357,7 @@ class EntityTracker:
         
         if "value" in updates:
             entity.value = updates["value"]
+            self._index_tokens(entity)
         
         if "display_form" in updates:
             entity.display_form = updates["display_form"]
@@ -400,8 +437,45 @@ class EntityTracker:
             self.entities_by_type[entity_type] = set()
         self.entities_by_type[entity_type].add(entity_id)
         
+        # Add to token index
+        self._index_tokens(entity)
+        
         return entity_id
     
+    def _index_tokens(self, entity: MathematicalEntity) -> None:
+        """
+        (Re)index an entity's value tokens.
+        
+        Args:
+            entity: Entity whose value was set or changed
+        """
+        for token in self._entity_tokens.get(entity.entity_id, ()):
+            entity_ids = self._token_index.get(token)
+            if entity_ids is not None:
+                entity_ids.discard(entity.entity_id)
+                if not entity_ids:
+                    del self._token_index[token]
+        
+        tokens = set(entity.value.lower().split())
+        self._entity_tokens[entity.entity_id] = tokens
+        for token in tokens:
+            self._token_index.setdefault(token, set()).add(entity.entity_id)
+    
+    def _token_overlaps(self, query: str) -> Dict[str, int]:
+        """
+        Count the query tokens each entity's value shares.
+        
+        Args:
+            query: Query text
+            
+        Returns:
+            Dictionary of entity_id -> number of shared tokens
+        """
+        overlaps = Counter()
+        for token in set(query.lower().split()):
+            overlaps.update(self._token_index.get(token, ()))
+        return overlaps
+    
     def _extract_latex_expressions(self, text: str) -> List[str]:
         """
         Extract LaTeX expressions from text.
@@ -618,6 +692,34 @@ class EntityTracker:
             entity: Entity to score
             query: Query text
             
+        Returns:
+            Relevance score (higher is more relevant)
+        """
+        overlaps = self._token_overlaps(query)
+        return self._score_entity(
+            entity,
+            query,
+            overlaps.get(entity.entity_id, 0),
+            entity.entity_type in query,
+            time.time()
+        )
+    
+    def _score_entity(self,
+                      entity: MathematicalEntity,
+                      query: str,
+                      token_overlap: int,
+                      type_mentioned: bool,
+                      now: float) -> float:
+        """
+        Score an entity from precomputed query features.
+        
+        Args:
+            entity: Entity to score
+            query: Query text
+            token_overlap: Number of query tokens shared with the entity value
+            type_mentioned: Whether the entity type is mentioned in the query
+            now: Current time
+            
         Returns:
             Relevance score (higher is more relevant)
         """
@@ -628,18 +730,15 @@ class EntityTracker:
             score += 1.0
         
         # Check if entity type is mentioned in query
-        if entity.entity_type in query:
+        if type_mentioned:
             score += 0.5
         
         # Check for value overlap
-        query_tokens = set(query.lower().split())
-        value_tokens = set(entity.value.lower().split())
-        token_overlap = len(query_tokens.intersection(value_tokens))
         if token_overlap > 0:
             score += 0.1 * token_overlap
         
         # Consider recency and reference count
-        time_factor = 1.0 / (1.0 + (time.time() - entity.last_referenced_at) / 3600)  # Decay over hours
+        time_factor = 1.0 / (1.0 + (now - entity.last_referenced_at) / 3600)  # Decay over hours
         score += 0.3 * time_factor
         
         ref_count_factor = min(entity.reference_count / 5.0, 1.0)  # Cap at 5 references
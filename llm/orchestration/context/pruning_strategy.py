@@ -83,7 +83,7 @@ class TokenBudgetStrategy(PruningStrategy):
             return
         
         # Determine how many messages to keep
-        current_tokens = conversation_state.estimate_token_count()
+        initial_tokens = current_tokens
         target_tokens = self.target_tokens
         
         # Always preserve the last N turns (1 turn = user message + system message)
@@ -125,22 +125,20 @@ class TokenBudgetStrategy(PruningStrategy):
         # Sort removable messages by timestamp (oldest first)
         removable_messages.sort(key=lambda x: x[1].timestamp)
         
-        # Remove messages until we're under the target token count
+        # Remove messages until we're under the target token count; the
+        # conversation keeps a running total, so checking it is cheap
         removed_count = 0
         for _, message in removable_messages:
-            message_tokens = message.estimate_token_count()
-            message_id = message.message_id
-            
             # Remove the message
-            if conversation_state.remove_message(message_id):
-                current_tokens -= message_tokens
+            if conversation_state.remove_message(message.message_id):
+                current_tokens = conversation_state.estimate_token_count()
                 removed_count += 1
                 
                 if current_tokens <= target_tokens:
                     break
         
         logger.info(f"TokenBudgetStrategy removed {removed_count} messages, "
-                  f"reducing token count from {current_tokens + message_tokens * removed_count} "
+                  f"reducing token count from {initial_tokens} "
                   f"to {current_tokens}")
     
     def get_name(self) -> str:
@@ -232,21 +230,19 @@ class RelevancePruningStrategy(PruningStrategy):
         scores.sort(key=lambda x: x[2])
         
         # Remove messages until we're under the target token count
+        initial_tokens = current_tokens
         removed_count = 0
         for _, message, score in scores:
-            message_tokens = message.estimate_token_count()
-            message_id = message.message_id
-            
             # Remove the message
-            if conversation_state.remove_message(message_id):
-                current_tokens -= message_tokens
+            if conversation_state.remove_message(message.message_id):
+                current_tokens = conversation_state.estimate_token_count()
                 removed_count += 1
                 
                 if current_tokens <= self.target_tokens:
                     break
         
         logger.info(f"RelevancePruningStrategy removed {removed_count} messages, "
-                  f"reducing token count from {current_tokens + message_tokens * removed_count} "
+                  f"reducing token count from {initial_tokens} "
                   f"to {current_tokens}")
     
     def _calculate_relevance_score(self, message, current_message) -> float:
@@ -0,0 +1,97 @@
+"""
+Unit tests for background context compaction.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from orchestration.context.compaction import ContextCompactor, extractive_summary
+from orchestration.context.context_manager import ContextManager
+from orchestration.context.conversation_state import ConversationState
+from orchestration.context.entity_tracker import EntityTracker
+
+
+def _fill(state, turns, filler="Please explain the next step of this problem in detail."):
+    for i in range(turns):
+        state.add_user_message(f"Question {i}: {filler}")
+        state.add_system_message(f"Answer {i}: {filler} {filler}")
+
+
+class TestContextCompaction(unittest.TestCase):
+    """Tests for ContextCompactor."""
+
+    def setUp(self):
+        self.state = ConversationState("test_conversation", "test_user")
+        self.compactor = ContextCompactor(max_tokens=400, preserve_last_n_turns=2)
+
+    def tearDown(self):
+        self.compactor.stop()
+
+    def test_extractive_summary_uses_entities(self):
+        """Test that summaries keep defined entities and questions."""
+        tracker = EntityTracker()
+        message_id = self.state.add_user_message("Let a = 5. What is a squared?")
+        entities = tracker.extract_entities("Let a = 5. What is a squared?")
+        self.state.update_message_metadata(message_id, {"entities": entities})
+        tracker.update_entity(entities[0]["entity_id"], {"value": "7"})
+
+        summary = extractive_summary(self.state.messages, tracker)
+
+        self.assertIn("Defined: a = 7", summary)
+        self.assertIn("Asked: Let a = 5.", summary)
+
+    def test_compact_replaces_oldest_messages(self):
+        """Test that old turns become one summary and recent turns are kept."""
+        _fill(self.state, 10)
+        recent = [message.message_id for message in self.state.messages[-4:]]
+
+        self.assertTrue(self.compactor.compact(self.state))
+
+        first = self.state.messages[0]
+        self.assertTrue(first.metadata["is_summary"])
+        self.assertEqual([message.message_id for message in self.state.messages[-4:]], recent)
+        self.assertLessEqual(self.state.estimate_token_count(), self.compactor.target_tokens)
+        total = sum(message.estimate_token_count() for message in self.state.messages) + 10
+        self.assertEqual(self.state.estimate_token_count(), total)
+
+    def test_compaction_skipped_when_history_changed(self):
+        """Test that the swap is abandoned if a message disappeared."""
+        _fill(self.state, 3)
+        ids = [message.message_id for message in self.state.messages[:2]]
+        self.state.remove_message(ids[0])
+
+        self.assertIsNone(self.state.compact_messages(ids, "summary"))
+        self.assertEqual(self.state.get_message_count(), 5)
+
+    def test_failed_llm_summarizer_falls_back(self):
+        """Test that a failing summarizer does not block compaction."""
+        self.compactor.llm_summarizer = MagicMock(side_effect=RuntimeError("offline"))
+        _fill(self.state, 10)
+
+        self.assertTrue(self.compactor.compact(self.state))
+        self.assertIn("Asked: Question 0", self.state.messages[0].content)
+
+    def test_context_manager_compacts_in_background(self):
+        """Test that long conversations are compacted off the request path."""
+        context_manager = ContextManager(max_context_tokens=400, compactor=self.compactor)
+        context_manager.pruning_strategy = MagicMock()
+        conversation_id = context_manager.create_conversation("test_user")
+
+        for i in range(15):
+            context_manager.add_user_message(conversation_id, f"Question {i}: explain the next step in detail.")
+            context_manager.add_system_message(conversation_id, f"Answer {i}: here is the next step in detail.")
+            # Reads stay within budget even before compaction has run
+            context = context_manager.get_conversation_context(conversation_id, format="dict")
+            self.assertLessEqual(sum(len(m["content"]) for m in context["messages"]), 400 * 4)
+
+        self.compactor.wait_idle()
+        state = context_manager.conversation_states[conversation_id]
+
+        context_manager.pruning_strategy.apply.assert_not_called()
+        self.assertGreater(self.compactor.compactions, 0)
+        self.assertTrue(state.messages[0].metadata.get("is_summary"))
+        self.assertLessEqual(state.estimate_token_count(), context_manager.max_context_tokens)
+
+
+if __name__ == "__main__":
+    unittest.main()
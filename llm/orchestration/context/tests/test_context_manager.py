@@ -5,11 +5,13 @@ Unit tests for the context manager.
 import unittest
 from unittest.mock import MagicMock, patch
 import time
+import threading
 
 from orchestration.context.context_manager import ContextManager
 from orchestration.context.conversation_state import ConversationState, Message
 from orchestration.context.entity_tracker import EntityTracker
 from orchestration.context.pruning_strategy import TokenBudgetStrategy
+from orchestration.context.token_counter import TokenCounter, approximate_token_count
 
 
 class TestContextManager(unittest.TestCase):
@@ -358,6 +360,81 @@ class TestConversationState(unittest.TestCase):
         message_count = limited_context.count("USER:")
         self.assertLess(message_count, 10)
 
+    def test_running_token_total(self):
+        """Test that the token total follows additions and removals."""
+        ids = [self.state.add_user_message(f"Compute $\\int_0^{i} x^2 dx$") for i in range(6)]
+        self.state.add_system_message("Done")
+
+        def recount():
+            return sum(m.estimate_token_count() for m in self.state.messages) + 10
+
+        self.assertEqual(self.state.estimate_token_count(), recount())
+        self.state.remove_message(ids[0])
+        self.assertEqual(self.state.estimate_token_count(), recount())
+        self.assertEqual(self.state.remove_messages([ids[1], ids[2], ids[2], "missing"]), 2)
+        self.assertEqual(self.state.estimate_token_count(), recount())
+        self.assertEqual(self.state.get_message_count(), 4)
+
+    def test_message_token_count_is_cached(self):
+        """Test that a message is counted once unless its content changes."""
+        message = Message("m1", "user", "Solve x^2 = 4", time.time())
+        with patch("orchestration.context.conversation_state.get_token_counter") as get_counter:
+            get_counter.return_value.count.return_value = 7
+            self.assertEqual(message.estimate_token_count(), 12)
+            self.assertEqual(message.estimate_token_count(), 12)
+            self.assertEqual(get_counter.return_value.count.call_count, 1)
+
+            message.content = "Solve x^2 = 9"
+            message.estimate_token_count()
+            self.assertEqual(get_counter.return_value.count.call_count, 2)
+
+
+class TestTokenCounter(unittest.TestCase):
+    """Tests for the token counter."""
+
+    def test_counts_with_tokenizer_and_caches(self):
+        """Test that the tokenizer is used and its results are cached."""
+        tokenizer = MagicMock()
+        tokenizer.encode.side_effect = lambda text, add_special_tokens: text.split()
+        counter = TokenCounter(tokenizer=tokenizer)
+
+        self.assertTrue(counter.exact)
+        self.assertEqual(counter.count("a b c"), 3)
+        self.assertEqual(counter.count("a b c"), 3)
+        self.assertEqual(counter.count(""), 0)
+        self.assertEqual(tokenizer.encode.call_count, 1)
+
+    def test_tokenizer_loads_in_background(self):
+        """Test that counting does not wait for the tokenizer to load."""
+        release = threading.Event()
+        tokenizer = MagicMock()
+        tokenizer.encode.side_effect = lambda text, add_special_tokens: text.split()
+
+        def from_pretrained(name):
+            release.wait(5)
+            return tokenizer
+
+        with patch("orchestration.context.token_counter.TRANSFORMERS_AVAILABLE", True), \
+                patch("orchestration.context.token_counter.AutoTokenizer", create=True) as auto_tokenizer:
+            auto_tokenizer.from_pretrained.side_effect = from_pretrained
+            counter = TokenCounter()
+
+            self.assertEqual(counter.count("x + 12"), approximate_token_count("x + 12"))
+            self.assertFalse(counter.exact)
+
+            release.set()
+            self.assertTrue(counter.wait_until_loaded(5))
+
+        self.assertTrue(counter.exact)
+        self.assertEqual(counter.count("x + 12"), 3)
+        auto_tokenizer.from_pretrained.assert_called_once()
+
+    def test_approximation_counts_latex_symbols(self):
+        """Test that the fallback counts symbols and digits individually."""
+        self.assertEqual(approximate_token_count("derivative"), 3)
+        self.assertEqual(approximate_token_count("\\frac{12}{x}"), 9)
+        self.assertGreater(approximate_token_count("\\frac{12}{x}"), len("\\frac{12}{x}") // 4)
+
 
 class TestEntityTracker(unittest.TestCase):
     """Tests for the EntityTracker class."""
@@ -435,6 +512,32 @@ class TestEntityTracker(unittest.TestCase):
         self.assertEqual(entity_dict["value"], "10")
         self.assertEqual(entity_dict["display_form"], "x_new")
 
+    def test_resolve_numbered_reference(self):
+        """Test that capture groups resolve through the combined pattern."""
+        self.tracker._add_entity("expression", "x + 1", latex_form="x + 1")
+        second_id = self.tracker._add_entity("expression", "x^2", latex_form="x^2")
+        self.tracker.entities[second_id].created_at += 1
+
+        resolved_query, referenced_entities = self.tracker.resolve_references("Simplify expression 2")
+
+        self.assertEqual(resolved_query, "Simplify x^2")
+        self.assertEqual(list(referenced_entities), [second_id])
+
+    def test_relevant_entities_follow_value_updates(self):
+        """Test that the token index is kept in step with entity values."""
+        for i in range(200):
+            self.tracker._add_entity("expression", f"term{i} + c")
+        entity_id = self.tracker._add_entity("variable", "alpha beta", display_form="k")
+
+        relevant = self.tracker.get_relevant_entities("alpha beta gamma", max_entities=3)
+        self.assertEqual(len(relevant), 3)
+        self.assertEqual(relevant[0]["entity_id"], entity_id)
+
+        self.tracker.update_entity(entity_id, {"value": "delta"})
+        relevant = self.tracker.get_relevant_entities("term7 gamma", max_entities=1)
+        self.assertEqual(relevant[0]["value"], "term7 + c")
+        self.assertNotIn("alpha", self.tracker._token_index)
+
 
 class TestPruningStrategies(unittest.TestCase):
     """Tests for pruning strategies."""
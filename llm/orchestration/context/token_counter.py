@@ -0,0 +1,164 @@
+"""
+Token counting for the Mathematical Multimodal LLM System.
+
+This module counts tokens with the deployed model's tokenizer so that context
+budgets match what the model actually receives. Counts are cached per text;
+when the tokenizer cannot be loaded, a LaTeX-aware approximation is used.
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Optional
+
+from orchestration.monitoring.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Try to import the Hugging Face tokenizer
+try:
+    from transformers import AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+# Tokenizer of the model served through LMStudio
+DEFAULT_TOKENIZER = "mistralai/Mistral-7B-Instruct-v0.3"
+
+# Fallback approximation: letters in runs of up to four, every digit and
+# every symbol on its own (close to how the model splits LaTeX and numbers)
+_APPROXIMATE_TOKEN = re.compile(r"[A-Za-z]{1,4}|\d|[^\sA-Za-z\d]")
+
+
+def approximate_token_count(text: str) -> int:
+    """
+    Approximate the token count of text without a tokenizer.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Approximate token count
+    """
+    return sum(1 for _ in _APPROXIMATE_TOKEN.finditer(text))
+
+
+class TokenCounter:
+    """
+    Counts tokens with the model tokenizer and caches the results.
+
+    The tokenizer is loaded on a background thread, started at server startup
+    or on first use, so a slow or failing download never blocks a request.
+    Until it is ready, or if it is unavailable, counts fall back to
+    ``approximate_token_count``. Only exact counts are cached.
+    """
+
+    def __init__(self,
+                tokenizer_name: Optional[str] = None,
+                cache_size: int = 8192,
+                tokenizer: Any = None):
+        """
+        Initialize the token counter.
+
+        Args:
+            tokenizer_name: Tokenizer name or path (defaults to MATH_LLM_TOKENIZER
+                or the deployed model)
+            cache_size: Number of texts whose counts are cached
+            tokenizer: Preloaded tokenizer to use instead of loading one
+        """
+        self.tokenizer_name = tokenizer_name or os.environ.get("MATH_LLM_TOKENIZER", DEFAULT_TOKENIZER)
+        self._tokenizer = tokenizer
+        self._loaded = threading.Event()
+        if tokenizer is not None:
+            self._loaded.set()
+        self._loader: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._exact_count = lru_cache(maxsize=cache_size)(self._encode)
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts currently come from the model tokenizer."""
+        return self._get_tokenizer() is not None
+
+    def start_loading(self) -> None:
+        """Start loading the tokenizer in the background, if not already started."""
+        with self._lock:
+            if self._loader is not None or self._loaded.is_set():
+                return
+            self._loader = threading.Thread(
+                target=self._load_tokenizer,
+                name="tokenizer-loader",
+                daemon=True
+            )
+            self._loader.start()
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the tokenizer load to finish, starting it if needed.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if loading finished (whether or not a tokenizer was found)
+        """
+        self.start_loading()
+        return self._loaded.wait(timeout)
+
+    def _load_tokenizer(self) -> None:
+        """Load the tokenizer, leaving it as None if it is unavailable."""
+        if TRANSFORMERS_AVAILABLE:
+            try:
+                self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name)
+                logger.info(f"Counting tokens with {self.tokenizer_name} tokenizer")
+            except Exception as e:
+                logger.warning(f"Failed to load tokenizer {self.tokenizer_name}, "
+                               f"approximating token counts: {e}")
+        else:
+            logger.warning("transformers not available, approximating token counts")
+        self._loaded.set()
+
+    def _get_tokenizer(self) -> Any:
+        """Get the tokenizer if it is loaded, starting the load otherwise."""
+        if not self._loaded.is_set():
+            self.start_loading()
+        return self._tokenizer
+
+    def _encode(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False))
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens in text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Token count, excluding special tokens (approximate while the
+            tokenizer is not loaded)
+        """
+        if not text:
+            return 0
+
+        if self._get_tokenizer() is None:
+            return approximate_token_count(text)
+
+        return self._exact_count(text)
+
+
+# Singleton instance
+_token_counter = None
+
+def get_token_counter() -> TokenCounter:
+    """
+    Get the singleton instance of the token counter.
+
+    Returns:
+        The token counter instance
+    """
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = TokenCounter()
+    return _token_counter
@@ -10,6 +10,8 @@ from pydantic import BaseModel, Field
 import datetime
 import uuid
 
+from ..monitoring.tracing import current_trace_context
+
 
 class MessagePriority(str, Enum):
     """Priority levels for messages."""
@@ -58,9 +60,10 @@ class Route(BaseModel):
 
 class Trace(BaseModel):
     """Tracing information for debugging and monitoring."""
-    trace_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    span_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    trace_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    span_id: str = Field(default_factory=lambda: uuid.uuid4().hex[:16])
     parent_span_id: Optional[str] = None
+    sampled: Optional[bool] = None
     start_time: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
     agent_hops: List[Dict[str, str]] = Field(default_factory=list)
 
@@ -98,7 +101,8 @@ class ComputationRequestBody(BaseModel):
 
 class OCRRequestBody(BaseModel):
     """Body for OCR request messages."""
-    image_path: str
+    image_path: Optional[str] = None
+    image_data: Optional[bytes] = None  # Raw image bytes, sent out of band by binary codecs
     image_type: str = "handwritten_math"
     confidence_threshold: float = 0.7
     detect_diagrams: bool = True
@@ -128,7 +132,12 @@ def create_message(
     parent_trace_id: Optional[str] = None,
     parent_span_id: Optional[str] = None,
 ) -> Message:
-    """Create a standardized message."""
+    """
+    Create a standardized message.
+
+    When no parent trace is given, the message continues the trace of the
+    span active in the current context, if any.
+    """
     route = Route(
         sender=sender,
         recipient=recipient,
@@ -141,6 +150,10 @@ def create_message(
     if parent_trace_id:
         trace.trace_id = parent_trace_id
         trace.parent_span_id = parent_span_id
+    else:
+        trace_context = current_trace_context()
+        if trace_context:
+            trace.trace_id, trace.parent_span_id, trace.sampled = trace_context
     
     header = MessageHeader(
         message_type=message_type,
@@ -4,16 +4,22 @@ Message handler for the Multi-agent Communication Protocol (MCP).
 This module provides functionality for routing, processing, and tracking messages
 between agents in the system.
 """
-from typing import Dict, Any, Optional, List, Callable, Set
+from typing import Dict, Any, Optional, List, Callable, Set, Deque, Tuple
+from collections import defaultdict, deque
 import logging
 import time
 import datetime
 import asyncio
 from .message_formats import Message, MessageType, MessagePriority, create_error_response
 from ..monitoring.logger import get_logger
+from ..monitoring.metrics import get_registry
+from ..agents.routing_index import CapabilityIndex
 
 logger = get_logger(__name__)
 
+# Queued message: (enqueue_time, sequence, message)
+QueueEntry = Tuple[float, int, Message]
+
 
 class MessageRouter:
     """
@@ -24,6 +30,7 @@ class MessageRouter:
         self.agent_status: Dict[str, Dict[str, Any]] = {}
         self.route_handlers: Dict[str, List[Callable]] = {}
         self.broadcast_handlers: Dict[MessageType, List[Callable]] = {}
+        self.capability_index = CapabilityIndex()
         
     def register_agent(self, agent_id: str, capabilities: List[str], metadata: Dict[str, Any] = None):
         """Register an agent and its capabilities."""
@@ -35,6 +42,7 @@ class MessageRouter:
             "metadata": metadata or {},
             "registered_at": datetime.datetime.now().isoformat()
         }
+        self.capability_index.add_agent(agent_id, capabilities)
         logger.info(f"Agent {agent_id} registered with capabilities: {capabilities}")
     
     def deregister_agent(self, agent_id: str):
@@ -43,6 +51,7 @@ class MessageRouter:
             del self.agent_capabilities[agent_id]
         if agent_id in self.agent_status:
             del self.agent_status[agent_id]
+        self.capability_index.remove_agent(agent_id)
         logger.info(f"Agent {agent_id} deregistered")
     
     def update_agent_status(self, agent_id: str, status: str, load: float = None, metadata: Dict[str, Any] = None):
@@ -55,27 +64,20 @@ class MessageRouter:
         
         if load is not None:
             self.agent_status[agent_id]["load"] = load
+            self.capability_index.update_load(agent_id, load)
             
         if metadata:
             self.agent_status[agent_id]["metadata"].update(metadata)
+            
+        self.capability_index.set_eligible(agent_id, status == "active")
     
     def find_agent_by_capability(self, capability: str) -> List[str]:
-        """Find agents that have a specific capability."""
-        matching_agents = []
-        for agent_id, capabilities in self.agent_capabilities.items():
-            if capability in capabilities and self.agent_status[agent_id]["status"] == "active":
-                matching_agents.append(agent_id)
-        return matching_agents
+        """Find active agents that have a specific capability."""
+        return self.capability_index.agents(capability)
     
     def get_optimal_agent(self, capability: str) -> Optional[str]:
         """Get the optimal agent for a capability based on load and status."""
-        matching_agents = self.find_agent_by_capability(capability)
-        if not matching_agents:
-            return None
-            
-        # Sort by load (lower is better)
-        matching_agents.sort(key=lambda agent_id: self.agent_status[agent_id]["load"])
-        return matching_agents[0] if matching_agents else None
+        return self.capability_index.least_loaded(capability)
     
     def register_route_handler(self, route_key: str, handler: Callable):
         """Register a handler for a specific route."""
@@ -150,25 +152,103 @@ class MessageRouter:
 class MessageProcessor:
     """
     Processes incoming messages with validation, prioritization, and error handling.
+    
+    Messages are held in one queue per priority level and dispatched to a
+    shared pool of worker coroutines. Two dispatch policies are supported:
+    
+    * ``weighted_fair`` - non-empty priority levels are served in proportion
+      to their weights (smooth weighted round-robin), so higher priorities get
+      most of the capacity without starving lower ones.
+    * ``strict`` - the highest non-empty priority level is always served first.
+    
+    With either policy, a message that has waited longer than
+    ``aging_threshold`` seconds is dispatched ahead of everything else, and
+    ``type_concurrency_limits`` caps how many messages of a given type may be
+    in flight at once (e.g. so heartbeats can never occupy every worker).
     """
-    def __init__(self, router: MessageRouter):
+    POLICY_WEIGHTED_FAIR = "weighted_fair"
+    POLICY_STRICT = "strict"
+    
+    DEFAULT_PRIORITY_WEIGHTS = {
+        MessagePriority.CRITICAL: 8,
+        MessagePriority.HIGH: 4,
+        MessagePriority.NORMAL: 2,
+        MessagePriority.LOW: 1
+    }
+    
+    DEFAULT_TYPE_CONCURRENCY_LIMITS = {
+        MessageType.HEARTBEAT: 1,
+        MessageType.LOG: 1,
+        MessageType.METRICS: 1
+    }
+    
+    # Highest priority first; used for strict ordering and tie-breaking
+    PRIORITY_ORDER = [
+        MessagePriority.CRITICAL,
+        MessagePriority.HIGH,
+        MessagePriority.NORMAL,
+        MessagePriority.LOW
+    ]
+    
+    def __init__(
+        self,
+        router: MessageRouter,
+        num_workers: int = 4,
+        policy: str = POLICY_WEIGHTED_FAIR,
+        priority_weights: Dict[MessagePriority, int] = None,
+        aging_threshold: float = 5.0,
+        type_concurrency_limits: Dict[MessageType, int] = None
+    ):
+        if policy not in (self.POLICY_WEIGHTED_FAIR, self.POLICY_STRICT):
+            raise ValueError(f"Unknown dispatch policy: {policy}")
+        
         self.router = router
-        self.priority_queues: Dict[MessagePriority, asyncio.Queue] = {
-            priority: asyncio.Queue() for priority in MessagePriority
+        self.num_workers = max(1, num_workers)
+        self.policy = policy
+        self.priority_weights = dict(self.DEFAULT_PRIORITY_WEIGHTS)
+        if priority_weights:
+            self.priority_weights.update(priority_weights)
+        self.aging_threshold = aging_threshold
+        self.type_concurrency_limits = dict(self.DEFAULT_TYPE_CONCURRENCY_LIMITS)
+        if type_concurrency_limits is not None:
+            self.type_concurrency_limits.update(type_concurrency_limits)
+        
+        # Each priority level keeps one FIFO queue per eligibility class: one
+        # per concurrency-limited message type and one (None) for all other
+        # types, so dispatch only looks at queue heads; the entry sequence
+        # numbers keep dispatch FIFO across the queues of a level
+        self.priority_queues: Dict[MessagePriority, Dict[Optional[MessageType], Deque[QueueEntry]]] = {
+            priority: defaultdict(deque) for priority in MessagePriority
+        }
+        self._depths: Dict[MessagePriority, int] = {priority: 0 for priority in MessagePriority}
+        self._sequence = 0
+        self.in_flight: Dict[MessageType, int] = defaultdict(int)
+        self._current_weights: Dict[MessagePriority, int] = {
+            priority: 0 for priority in MessagePriority
+        }
+        self._work_available: Optional[asyncio.Condition] = None
+        self._pending = 0
+        
+        self.stats = {
+            "dispatched": {priority.value: 0 for priority in MessagePriority},
+            "aged_dispatches": 0,
+            "max_wait_ms": {priority.value: 0.0 for priority in MessagePriority}
         }
+        
         self.processing_tasks = []
         self.running = False
         
     async def start(self):
         """Start processing messages."""
         self.running = True
+        if self._work_available is None:
+            self._work_available = asyncio.Condition()
         
-        # Create a processing task for each priority level
-        for priority in MessagePriority:
-            task = asyncio.create_task(self._process_queue(priority))
+        for worker_id in range(self.num_workers):
+            task = asyncio.create_task(self._worker(worker_id))
             self.processing_tasks.append(task)
             
-        logger.info("Message processor started")
+        logger.info(f"Message processor started with {self.num_workers} workers ({self.policy} dispatch)")
         
     async def stop(self):
         """Stop processing messages."""
@@ -179,36 +259,176 @@ class MessageProcessor:
             task.cancel()
             
         await asyncio.gather(*self.processing_tasks, return_exceptions=True)
+        self.processing_tasks = []
         logger.info("Message processor stopped")
         
     async def enqueue_message(self, message: Message):
         """Enqueue a message for processing based on its priority."""
-        priority = message.header.priority
-        await self.priority_queues[priority].put(message)
+        if self._work_available is None:
+            self._work_available = asyncio.Condition()
+        
+        priority = MessagePriority(message.header.priority)
+        eligibility_class = self._eligibility_class(message.header.message_type)
+        async with self._work_available:
+            self._sequence += 1
+            self.priority_queues[priority][eligibility_class].append(
+                (time.monotonic(), self._sequence, message)
+            )
+            self._depths[priority] += 1
+            self._pending += 1
+            self._work_available.notify()
+            
+        get_registry().gauge(
+            "message_bus.queue.depth",
+            labels={"priority": priority.value}
+        ).set(self._depths[priority])
         logger.debug(f"Message {message.header.message_id} enqueued with priority {priority}")
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get queue depth, in-flight and wait-time statistics."""
+        now = time.monotonic()
+        depths = {}
+        oldest_wait_ms = {}
+        for priority, queues in self.priority_queues.items():
+            depths[priority.value] = self._depths[priority]
+            oldest = min((queue[0][0] for queue in queues.values() if queue), default=None)
+            oldest_wait_ms[priority.value] = (now - oldest) * 1000 if oldest is not None else 0.0
+            
+        return {
+            "policy": self.policy,
+            "workers": self.num_workers,
+            "queue_depth": depths,
+            "oldest_wait_ms": oldest_wait_ms,
+            "in_flight": {str(k.value if isinstance(k, MessageType) else k): v
+                          for k, v in self.in_flight.items() if v},
+            **self.stats
+        }
+    
+    def _has_capacity(self, message_type: MessageType) -> bool:
+        """Check whether another message of this type may start processing."""
+        limit = self.type_concurrency_limits.get(message_type)
+        return limit is None or self.in_flight[message_type] < limit
+    
+    def _eligibility_class(self, message_type: MessageType) -> Optional[MessageType]:
+        """Queue class of a message type: itself if concurrency-limited, else None."""
+        return message_type if message_type in self.type_concurrency_limits else None
+    
+    def _first_eligible(self, priority: MessagePriority) -> Optional[Deque[QueueEntry]]:
+        """The queue holding the oldest message of a priority level whose type has capacity."""
+        first = None
+        for eligibility_class, queue in self.priority_queues[priority].items():
+            if not queue or (eligibility_class is not None and not self._has_capacity(eligibility_class)):
+                continue
+            if first is None or queue[0][1] < first[0][1]:
+                first = queue
+        return first
+    
+    def _select_next(self) -> Optional[Tuple[MessagePriority, Deque[QueueEntry], bool]]:
+        """
+        Choose the next message to dispatch.
+        
+        Returns (priority, queue whose head to dispatch, aged) or None if
+        nothing can run. Must be called with the condition lock held.
+        """
+        eligible: Dict[MessagePriority, Deque[QueueEntry]] = {}
+        for priority in self.PRIORITY_ORDER:
+            queue = self._first_eligible(priority)
+            if queue is not None:
+                eligible[priority] = queue
+                
+        if not eligible:
+            return None
+        
+        # Anti-starvation: the longest-waiting message past the aging
+        # threshold goes first, regardless of policy
+        now = time.monotonic()
+        aged = None
+        for priority, queue in eligible.items():
+            waited = now - queue[0][0]
+            if waited >= self.aging_threshold and (aged is None or waited > aged[1]):
+                aged = (priority, waited)
+        if aged is not None:
+            return aged[0], eligible[aged[0]], True
+        
+        if self.policy == self.POLICY_STRICT:
+            priority = next(iter(eligible))
+            return priority, eligible[priority], False
         
-    async def _process_queue(self, priority: MessagePriority):
-        """Process messages from a specific priority queue."""
-        queue = self.priority_queues[priority]
+        # Smooth weighted round-robin over the eligible levels
+        total = 0
+        best = None
+        for priority in eligible:
+            weight = self.priority_weights.get(priority, 1)
+            self._current_weights[priority] += weight
+            total += weight
+            if best is None or self._current_weights[priority] > self._current_weights[best]:
+                best = priority
+        self._current_weights[best] -= total
+        return best, eligible[best], False
+    
+    async def _next_message(self) -> Tuple[MessagePriority, float, Message]:
+        """Wait until a message can be dispatched and take it off its queue."""
+        async with self._work_available:
+            while True:
+                selection = self._select_next() if self._pending else None
+                if selection is not None:
+                    break
+                await self._work_available.wait()
+                
+            priority, queue, aged = selection
+            enqueued_at, _, message = queue.popleft()
+            self._depths[priority] -= 1
+            self._pending -= 1
+            self.in_flight[message.header.message_type] += 1
+            
+        if aged:
+            self.stats["aged_dispatches"] += 1
+        return priority, enqueued_at, message
+    
+    async def _release(self, message_type: MessageType):
+        """Release a concurrency slot and wake workers that may be waiting on it."""
+        async with self._work_available:
+            self.in_flight[message_type] -= 1
+            if self._pending:
+                self._work_available.notify()
+    
+    async def _worker(self, worker_id: int):
+        """Worker coroutine that processes messages from all priority queues."""
+        registry = get_registry()
         
         while self.running:
             try:
-                # Get a message from the queue
-                message = await queue.get()
+                priority, enqueued_at, message = await self._next_message()
+            except asyncio.CancelledError:
+                break
                 
+            wait_ms = (time.monotonic() - enqueued_at) * 1000
+            self.stats["dispatched"][priority.value] += 1
+            if wait_ms > self.stats["max_wait_ms"][priority.value]:
+                self.stats["max_wait_ms"][priority.value] = wait_ms
+            registry.histogram(
+                "message_bus.queue.wait_time",
+                labels={"priority": priority.value}
+            ).observe(wait_ms)
+            registry.gauge(
+                "message_bus.queue.depth",
+                labels={"priority": priority.value}
+            ).set(self._depths[priority])
+            
+            try:
                 # Process the message
                 success = await self._process_message(message)
                 
-                # Mark the task as done
-                queue.task_done()
-                
                 if not success:
                     logger.warning(f"Failed to process message {message.header.message_id}")
                     
             except asyncio.CancelledError:
+                await self._release(message.header.message_type)
                 break
             except Exception as e:
-                logger.error(f"Error processing message from {priority} queue: {str(e)}")
+                logger.error(f"Error processing message in worker {worker_id}: {str(e)}")
+                
+            await self._release(message.header.message_type)
                 
     async def _process_message(self, message: Message) -> bool:
         """
@@ -14,6 +14,10 @@ import ssl
 from pydantic import ValidationError
 from .message_formats import Message, MessageType, MessagePriority, create_error_response
 from .message_handler import MessageRouter, MessageProcessor
+from .serialization import (
+    CONTENT_TYPE_MSGPACK, CodecError, encode_message, decode_message,
+    negotiate_content_type, supported_content_types
+)
 from ..monitoring.logger import get_logger
 from ..monitoring.metrics import record_message_metrics
 
@@ -35,7 +39,9 @@ class RabbitMQBus:
         ssl_options: Dict[str, Any] = None,
         connection_attempts: int = 3,
         retry_delay: int = 5,
-        heartbeat: int = 60
+        heartbeat: int = 60,
+        content_type: str = CONTENT_TYPE_MSGPACK,
+        processor_config: Dict[str, Any] = None
     ):
         self.host = host
         self.port = port
@@ -47,6 +53,7 @@ class RabbitMQBus:
         self.connection_attempts = connection_attempts
         self.retry_delay = retry_delay
         self.heartbeat = heartbeat
+        self.content_type = content_type
         
         self.connection = None
         self.channel = None
@@ -54,7 +61,7 @@ class RabbitMQBus:
         self.exchange_type = "topic"
         
         self.router = MessageRouter()
-        self.processor = MessageProcessor(self.router)
+        self.processor = MessageProcessor(self.router, **(processor_config or {}))
         
         self.response_handlers: Dict[str, asyncio.Future] = {}
         self.message_listeners: Dict[str, List[Callable]] = {}
@@ -142,13 +149,17 @@ class RabbitMQBus:
                 message, routing_key, future = await self.message_queue.get()
                 
                 try:
-                    # Serialize the message
-                    message_json = message.json()
+                    # Serialize the message in a format the recipient understands
+                    payload, content_type = encode_message(
+                        message,
+                        self._content_type_for(message)
+                    )
                     
                     # Send the message
                     await self.channel.default_exchange.publish(
                         aio_pika.Message(
-                            body=message_json.encode(),
+                            body=payload,
+                            content_type=content_type,
                             delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
                             message_id=message.header.message_id,
                             correlation_id=message.header.correlation_id,
@@ -163,7 +174,7 @@ class RabbitMQBus:
                         message_type=message.header.message_type,
                         sender=message.header.route.sender,
                         recipient=message.header.route.recipient,
-                        size=len(message_json)
+                        size=len(payload)
                     )
                     
                     if future:
@@ -194,6 +205,23 @@ class RabbitMQBus:
             MessagePriority.CRITICAL: 9
         }
         return priority_map.get(priority, 5)
+    
+    def _content_type_for(self, message: Message) -> str:
+        """
+        Choose the content type for an outgoing message.
+        
+        Broadcasts and capability-routed messages may reach consumers that
+        never advertised their formats, so they always use JSON. Direct
+        messages use the preferred binary format when the recipient
+        registered support for it.
+        """
+        route = message.header.route
+        if route.broadcast or route.recipient.startswith("capability."):
+            return negotiate_content_type(None)
+        
+        status = self.router.agent_status.get(route.recipient)
+        accepted = status["metadata"].get("content_types") if status else None
+        return negotiate_content_type(accepted, self.content_type)
                 
     async def declare_queue(self, queue_name: str, durable: bool = True, exclusive: bool = False):
         """Declare a queue and bind it to the exchange."""
@@ -221,8 +249,12 @@ class RabbitMQBus:
         for capability in capabilities:
             await self.bind_queue(f"agent.{agent_id}", f"capability.{capability}")
             
-        # Register agent with router
-        self.router.register_agent(agent_id, capabilities)
+        # Register agent with router, advertising the formats we can decode
+        self.router.register_agent(
+            agent_id,
+            capabilities,
+            metadata={"content_types": supported_content_types()}
+        )
         
         return main_queue
         
@@ -233,14 +265,13 @@ class RabbitMQBus:
         async def _message_handler(message: aio_pika.IncomingMessage):
             async with message.process():
                 try:
-                    # Parse the message
-                    message_json = message.body.decode()
-                    parsed_message = Message.parse_raw(message_json)
+                    # Parse the message according to its content type
+                    parsed_message = decode_message(message.body, message.content_type)
                     
                     # Process with user callback
                     await callback(parsed_message)
                     
-                except ValidationError as e:
+                except (ValidationError, CodecError) as e:
                     logger.error(f"Invalid message format: {str(e)}")
                 except Exception as e:
                     logger.error(f"Error processing message: {str(e)}")
@@ -0,0 +1,319 @@
+"""
+Wire serialization for the Multi-agent Communication Protocol (MCP).
+
+This module provides the codecs used to put MCP messages on the bus. Two
+content types are supported:
+
+* ``application/json`` - the original format. Output is a plain ``Message``
+  JSON document, so existing consumers that call ``Message.parse_raw`` keep
+  working. ``orjson`` is used when installed.
+* ``application/x-msgpack`` - a compact binary envelope. Binary values in the
+  message body (e.g. image bytes in OCR requests) are moved out of band into
+  an attachment list instead of being base64-encoded.
+
+The content type travels in the AMQP ``content_type`` property so receivers
+can pick the right decoder; messages without one are treated as JSON.
+"""
+import base64
+import json
+from typing import Dict, Any, Optional, List, Tuple
+
+from .message_formats import (
+    Message, MessageHeader, Route, Trace, MessageType, MessagePriority
+)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_MSGPACK = "application/x-msgpack"
+
+# Header metadata key listing the body paths that were base64-encoded by the
+# JSON codec, so a codec-aware receiver can restore them to bytes.
+ATTACHMENTS_METADATA_KEY = "binary_fields"
+
+# Marker used in msgpack envelopes to reference an out-of-band attachment
+_ATTACHMENT_REF = "__mcp_attachment__"
+
+_ENVELOPE_VERSION = 1
+
+
+class CodecError(Exception):
+    """Raised when a message cannot be encoded or decoded."""
+    pass
+
+
+def _route_to_dict(route: Route) -> Dict[str, Any]:
+    return {
+        "sender": route.sender,
+        "recipient": route.recipient,
+        "flow_id": route.flow_id,
+        "reply_to": route.reply_to,
+        "broadcast": route.broadcast,
+        "hop_count": route.hop_count,
+        "max_hops": route.max_hops,
+        "ttl": route.ttl,
+    }
+
+
+def _trace_to_dict(trace: Trace) -> Dict[str, Any]:
+    return {
+        "trace_id": trace.trace_id,
+        "span_id": trace.span_id,
+        "parent_span_id": trace.parent_span_id,
+        "sampled": trace.sampled,
+        "start_time": trace.start_time,
+        "agent_hops": list(trace.agent_hops),
+    }
+
+
+def message_to_dict(message: Message) -> Dict[str, Any]:
+    """
+    Convert a message to plain Python types.
+
+    This is a schema-aware replacement for ``message.dict()``: the header
+    layout is known up front, so it is copied field by field instead of going
+    through pydantic's generic serializer. The body is returned as-is.
+    """
+    header = message.header
+    return {
+        "header": {
+            "message_id": header.message_id,
+            "conversation_id": header.conversation_id,
+            "timestamp": header.timestamp,
+            "message_type": MessageType(header.message_type).value,
+            "priority": MessagePriority(header.priority).value,
+            "route": _route_to_dict(header.route),
+            "trace": _trace_to_dict(header.trace),
+            "correlation_id": header.correlation_id,
+            "version": header.version,
+            "metadata": dict(header.metadata),
+        },
+        "body": message.body,
+    }
+
+
+def message_from_dict(data: Dict[str, Any], validate: bool = True) -> Message:
+    """
+    Build a message from plain Python types.
+
+    Args:
+        data: Dictionary produced by ``message_to_dict``
+        validate: Run full pydantic validation. Disable only for payloads
+            produced by a trusted codec, where the schema is already known
+            to be correct.
+    """
+    if validate:
+        return Message.parse_obj(data)
+
+    header = dict(data["header"])
+    header["message_type"] = MessageType(header["message_type"])
+    header["priority"] = MessagePriority(header.get("priority", MessagePriority.NORMAL))
+    header["route"] = Route.construct(**header["route"])
+    header["trace"] = Trace.construct(**header["trace"])
+    return Message.construct(
+        header=MessageHeader.construct(**header),
+        body=data.get("body") or {}
+    )
+
+
+def _extract_binary(value: Any, path: Tuple, found: List[Tuple[Tuple, bytes]]) -> Any:
+    """Replace bytes values in a nested structure, collecting them with their paths."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        found.append((path, bytes(value)))
+        return {_ATTACHMENT_REF: len(found) - 1}
+    if isinstance(value, dict):
+        return {k: _extract_binary(v, path + (k,), found) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_extract_binary(v, path + (i,), found) for i, v in enumerate(value)]
+    return value
+
+
+def _restore_binary(value: Any, attachments: List[bytes]) -> Any:
+    """Replace attachment references with the referenced bytes."""
+    if isinstance(value, dict):
+        if len(value) == 1 and _ATTACHMENT_REF in value:
+            return attachments[value[_ATTACHMENT_REF]]
+        return {k: _restore_binary(v, attachments) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore_binary(v, attachments) for v in value]
+    return value
+
+
+def _set_path(container: Any, path: List[Any], value: Any):
+    for key in path[:-1]:
+        container = container[key]
+    container[path[-1]] = value
+
+
+class MessageCodec:
+    """Base class for message codecs."""
+    content_type: str = ""
+
+    def encode(self, message: Message) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, payload: bytes) -> Message:
+        raise NotImplementedError
+
+
+class JSONCodec(MessageCodec):
+    """
+    JSON codec compatible with the original ``message.json()`` format.
+
+    Binary body values are base64-encoded inline and their paths are listed in
+    the header metadata, so codec-aware receivers get bytes back while legacy
+    receivers still see valid JSON strings.
+    """
+    content_type = CONTENT_TYPE_JSON
+
+    def __init__(self, validate: bool = True):
+        self.validate = validate
+
+    def encode(self, message: Message) -> bytes:
+        data = message_to_dict(message)
+        found: List[Tuple[Tuple, bytes]] = []
+        body = _extract_binary(data["body"], (), found)
+
+        if found:
+            for path, blob in found:
+                _set_path(body, list(path), base64.b64encode(blob).decode("ascii"))
+            data["header"]["metadata"][ATTACHMENTS_METADATA_KEY] = [list(p) for p, _ in found]
+        data["body"] = body
+
+        try:
+            if ORJSON_AVAILABLE:
+                return orjson.dumps(data)
+            return json.dumps(data, separators=(",", ":")).encode()
+        except TypeError as e:
+            raise CodecError(f"Message {message.header.message_id} is not JSON serializable: {str(e)}")
+
+    def decode(self, payload: bytes) -> Message:
+        try:
+            data = orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
+        except ValueError as e:
+            raise CodecError(f"Invalid JSON message: {str(e)}")
+
+        binary_fields = data.get("header", {}).get("metadata", {}).pop(ATTACHMENTS_METADATA_KEY, None)
+        if binary_fields:
+            body = data.get("body", {})
+            for path in binary_fields:
+                container = body
+                for key in path[:-1]:
+                    container = container[key]
+                container[path[-1]] = base64.b64decode(container[path[-1]])
+
+        return message_from_dict(data, validate=self.validate)
+
+
+class MsgPackCodec(MessageCodec):
+    """
+    Binary codec based on msgpack.
+
+    The frame is a msgpack array ``[version, message, attachments]``. Body
+    values of type ``bytes`` are stored in ``attachments`` and replaced in the
+    message by a reference, so large payloads are neither base64-encoded nor
+    walked by the decoder more than once.
+    """
+    content_type = CONTENT_TYPE_MSGPACK
+
+    def __init__(self, validate: bool = True):
+        if not MSGPACK_AVAILABLE:
+            raise CodecError("msgpack is not installed")
+        self.validate = validate
+
+    def encode(self, message: Message) -> bytes:
+        data = message_to_dict(message)
+        found: List[Tuple[Tuple, bytes]] = []
+        data["body"] = _extract_binary(data["body"], (), found)
+        try:
+            return msgpack.packb(
+                [_ENVELOPE_VERSION, data, [blob for _, blob in found]],
+                use_bin_type=True
+            )
+        except TypeError as e:
+            raise CodecError(f"Message {message.header.message_id} is not msgpack serializable: {str(e)}")
+
+    def decode(self, payload: bytes) -> Message:
+        try:
+            version, data, attachments = msgpack.unpackb(payload, raw=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise CodecError(f"Invalid msgpack message: {str(e)}")
+
+        if version != _ENVELOPE_VERSION:
+            raise CodecError(f"Unsupported msgpack envelope version: {version}")
+
+        if attachments:
+            data["body"] = _restore_binary(data["body"], attachments)
+        return message_from_dict(data, validate=self.validate)
+
+
+_codecs: Dict[str, MessageCodec] = {}
+
+
+def get_codec(content_type: Optional[str] = None) -> MessageCodec:
+    """
+    Get the codec for a content type.
+
+    Unknown or missing content types fall back to JSON, which is what every
+    consumer understood before content negotiation existed.
+    """
+    if content_type == CONTENT_TYPE_MSGPACK and MSGPACK_AVAILABLE:
+        key = CONTENT_TYPE_MSGPACK
+    else:
+        key = CONTENT_TYPE_JSON
+
+    if key not in _codecs:
+        _codecs[key] = MsgPackCodec() if key == CONTENT_TYPE_MSGPACK else JSONCodec()
+    return _codecs[key]
+
+
+def supported_content_types() -> List[str]:
+    """Content types this process can decode, in order of preference."""
+    if MSGPACK_AVAILABLE:
+        return [CONTENT_TYPE_MSGPACK, CONTENT_TYPE_JSON]
+    return [CONTENT_TYPE_JSON]
+
+
+def negotiate_content_type(
+    accepted: Optional[List[str]],
+    preferred: str = CONTENT_TYPE_MSGPACK
+) -> str:
+    """
+    Pick the content type to use when sending to a recipient.
+
+    Args:
+        accepted: Content types advertised by the recipient, or None if it
+            never advertised any (treated as a JSON-only consumer)
+        preferred: Content type the sender would like to use
+    """
+    if not accepted:
+        return CONTENT_TYPE_JSON
+    local = supported_content_types()
+    if preferred in accepted and preferred in local:
+        return preferred
+    for content_type in local:
+        if content_type in accepted:
+            return content_type
+    return CONTENT_TYPE_JSON
+
+
+def encode_message(message: Message, content_type: str = CONTENT_TYPE_JSON) -> Tuple[bytes, str]:
+    """Encode a message, returning the payload and the content type actually used."""
+    codec = get_codec(content_type)
+    return codec.encode(message), codec.content_type
+
+
+def decode_message(payload: bytes, content_type: Optional[str] = None) -> Message:
+    """Decode a message payload according to its content type."""
+    return get_codec(content_type).decode(payload)
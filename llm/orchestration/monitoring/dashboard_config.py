@@ -3,7 +3,10 @@ Performance monitoring dashboard configuration.
 Defines Grafana dashboard panels and metrics for system monitoring.
 """
 import json
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional
+
+from .metrics import MetricsRegistry, get_registry, prometheus_name
 
 # Grafana dashboard configuration
 DASHBOARD_CONFIG = {
@@ -763,19 +766,24 @@ DASHBOARD_CONFIG = {
             },
             "targets": [
                 {
-                    "expr": "message_delivery_time_seconds{quantile='0.5'}",
-                    "legendFormat": "Message Delivery (Median)",
+                    "expr": "message_bus_latency_processing{quantile='0.5'}",
+                    "legendFormat": "Message Processing (Median)",
                     "refId": "A"
                 },
                 {
-                    "expr": "message_processing_time_seconds{quantile='0.5'}",
-                    "legendFormat": "Message Processing (Median)",
+                    "expr": "message_bus_latency_processing{quantile='0.99'}",
+                    "legendFormat": "Message Processing (99th Percentile)",
                     "refId": "B"
+                },
+                {
+                    "expr": "rate(message_bus_messages_total[1m])",
+                    "legendFormat": "Messages per Second",
+                    "refId": "C"
                 }
             ],
             "yaxes": [
                 {
-                    "format": "s",
+                    "format": "ms",
                     "min": 0
                 },
                 {
@@ -1118,8 +1126,10 @@ METRICS_SPECS = {
         "search_processing_time_seconds"
     ],
     "messaging": [
-        "message_delivery_time_seconds",
-        "message_processing_time_seconds"
+        "message_bus_messages_total",
+        "message_bus_latency_processing",
+        "message_bus_queue_depth",
+        "message_bus_queue_wait_time"
     ],
     "workflow": [
         "workflow_time_seconds",
@@ -1135,3 +1145,86 @@ METRICS_SPECS = {
         "optimization_impact_score"
     ]
 }
+
+# Simple PromQL subset understood by evaluate_expr: an optional rate(...)
+# around a metric name with equality label matchers
+_EXPR_PATTERN = re.compile(
+    r"^(?P<rate>rate\()?(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)"
+    r"(?:\{(?P<labels>[^}]*)\})?(?:\[(?P<window>\d+)(?P<unit>[smh])\])?\)?$"
+)
+_LABEL_PATTERN = re.compile(r"(\w+)\s*=\s*['\"]([^'\"]*)['\"]")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600}
+
+def evaluate_expr(expr: str, registry: Optional[MetricsRegistry] = None) -> List[Dict[str, Any]]:
+    """
+    Evaluate a panel expression against the in-process metrics registry.
+
+    Supports instant selectors such as ``name{label='value',quantile='0.99'}``
+    and ``rate(name[1m])``, which covers the expressions used by the panels
+    above. Values are read from metric snapshots, so evaluation never blocks
+    code that is recording metrics.
+
+    Args:
+        expr: Panel target expression
+        registry: Registry to read from (defaults to the global registry)
+
+    Returns:
+        List of series with their labels and current value
+    """
+    match = _EXPR_PATTERN.match(expr.strip())
+    if not match:
+        return []
+
+    registry = registry or get_registry()
+    name = match.group("name")
+    matchers = dict(_LABEL_PATTERN.findall(match.group("labels") or ""))
+    quantile = matchers.pop("quantile", None)
+
+    def selected(metric) -> bool:
+        return all(str(metric.labels.get(k)) == v for k, v in matchers.items())
+
+    series = []
+    if match.group("rate"):
+        window = int(match.group("window") or 60) * _UNIT_SECONDS[match.group("unit") or "s"]
+        for counter in list(registry.counters.values()):
+            prom_name = prometheus_name(counter.name)
+            if name in (prom_name, prom_name + "_total") and selected(counter):
+                series.append({"labels": counter.labels, "value": counter.rate(window)})
+        return series
+
+    if quantile is not None:
+        for histogram in list(registry.histograms.values()):
+            if prometheus_name(histogram.name) == name and selected(histogram):
+                series.append({
+                    "labels": dict(histogram.labels, quantile=quantile),
+                    "value": histogram.quantile(float(quantile))
+                })
+        return series
+
+    for counter in list(registry.counters.values()):
+        prom_name = prometheus_name(counter.name)
+        if name in (prom_name, prom_name + "_total") and selected(counter):
+            series.append({"labels": counter.labels, "value": counter.value})
+    for gauge in list(registry.gauges.values()):
+        if prometheus_name(gauge.name) == name and selected(gauge):
+            series.append({"labels": gauge.labels, "value": gauge.value})
+    return series
+
+def get_panel_values(panel_id: int, registry: Optional[MetricsRegistry] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get the current values of every target of a panel from the metrics registry.
+
+    Args:
+        panel_id: Panel ID
+        registry: Registry to read from (defaults to the global registry)
+
+    Returns:
+        Dictionary mapping each target's legend to its series
+    """
+    panel = get_panel_config(panel_id)
+    if not panel:
+        return {}
+    return {
+        target.get("legendFormat", target["expr"]): evaluate_expr(target["expr"], registry)
+        for target in panel.get("targets", [])
+    }
@@ -2,12 +2,21 @@
 Logging configuration for the Mathematical Multimodal LLM System.
 
 This module provides a standardized logging setup for all components.
+
+By default the root logger writes through an AsyncLogHandler: the calling
+thread only appends the unformatted record to a queue, and a background
+thread applies rate limiting and deduplication, formats the records and
+writes them to the real handlers in batches. Set MATH_LLM_ASYNC_LOGGING=false
+to write synchronously instead.
 """
+import atexit
 import logging
 import os
 import sys
 import json
-from typing import Dict, Any, Optional
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple
 import datetime
 import threading
 
@@ -17,21 +26,11 @@ LOG_LEVEL = os.environ.get("MATH_LLM_LOG_LEVEL", "INFO")
 # Log format with timestamp, level, component, and message
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 
-# Configure basic logging
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format=LOG_FORMAT,
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+JSON_LOGGING = os.environ.get("MATH_LLM_JSON_LOGGING", "").lower() == "true"
+ASYNC_LOGGING = os.environ.get("MATH_LLM_ASYNC_LOGGING", "true").lower() == "true"
 
 # Create a file handler if log file path is specified
 LOG_FILE = os.environ.get("MATH_LLM_LOG_FILE")
-if LOG_FILE:
-    file_handler = logging.FileHandler(LOG_FILE)
-    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-    logging.getLogger().addHandler(file_handler)
 
 # Thread-local storage for correlation IDs
 _thread_local = threading.local()
@@ -99,17 +98,6 @@ def get_logger(name: str) -> logging.Logger:
     """
     logger = logging.getLogger(name)
     
-    # Configure JSON logging if enabled
-    if os.environ.get("MATH_LLM_JSON_LOGGING", "").lower() == "true":
-        # Remove existing handlers
-        for handler in logger.handlers[:]:
-            logger.removeHandler(handler)
-            
-        # Add JSON handler
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(JSONFormatter())
-        logger.addHandler(handler)
-        
     # Add correlation ID filter if not already added
     for log_filter in logger.filters:
         if isinstance(log_filter, CorrelationFilter):
@@ -133,16 +121,19 @@ def log_function_call(logger: logging.Logger, level=logging.DEBUG):
     """
     def decorator(func):
         def wrapper(*args, **kwargs):
-            # Log function call
-            func_args = ", ".join([repr(a) for a in args] + [f"{k}={repr(v)}" for k, v in kwargs.items()])
-            logger.log(level, f"Calling {func.__name__}({func_args})")
+            # Skip building argument reprs when the level is disabled
+            enabled = logger.isEnabledFor(level)
+            if enabled:
+                func_args = ", ".join([repr(a) for a in args] + [f"{k}={repr(v)}" for k, v in kwargs.items()])
+                logger.log(level, "Calling %s(%s)", func.__name__, func_args)
             
             try:
                 # Call the function
                 result = func(*args, **kwargs)
                 
                 # Log result
-                logger.log(level, f"{func.__name__} returned: {repr(result)}")
+                if enabled:
+                    logger.log(level, "%s returned: %r", func.__name__, result)
                 return result
                 
             except Exception as e:
@@ -152,3 +143,273 @@ def log_function_call(logger: logging.Logger, level=logging.DEBUG):
                 
         return wrapper
     return decorator
+
+
+class _RateLimiter:
+    """
+    Limits how many records each call site may emit per window.
+
+    Records over the limit are dropped and counted; once the window has
+    passed, a single summary record reports how many were suppressed.
+    """
+
+    def __init__(self, max_records: int, window: float):
+        self.max_records = max_records
+        self.window = window
+        # (logger name, path, line) -> [window start, count, suppressed, level]
+        self._sites: Dict[Tuple[str, str, int], list] = {}
+
+    def allow(self, record: logging.LogRecord, summaries: List[logging.LogRecord]) -> bool:
+        key = (record.name, record.pathname, record.lineno)
+        site = self._sites.get(key)
+        if site is None or record.created - site[0] >= self.window:
+            if site is not None and site[2]:
+                summaries.append(self._summary(key, site))
+            self._sites[key] = [record.created, 1, 0, record.levelno]
+            return True
+        site[1] += 1
+        if site[1] <= self.max_records:
+            return True
+        site[2] += 1
+        return False
+
+    def expire(self, now: float, summaries: List[logging.LogRecord]):
+        """Report and forget call sites whose window has passed."""
+        for key, site in list(self._sites.items()):
+            if now - site[0] >= self.window:
+                if site[2]:
+                    summaries.append(self._summary(key, site))
+                del self._sites[key]
+
+    def _summary(self, key: Tuple[str, str, int], site: list) -> logging.LogRecord:
+        name, pathname, lineno = key
+        return logging.makeLogRecord({
+            "name": name,
+            "levelno": site[3],
+            "levelname": logging.getLevelName(site[3]),
+            "pathname": pathname,
+            "lineno": lineno,
+            "msg": "Suppressed %d similar messages from %s:%d in the last %.0fs",
+            "args": (site[2], os.path.basename(pathname), lineno, self.window)
+        })
+
+
+class AsyncLogHandler(logging.Handler):
+    """
+    Logging handler that moves formatting and I/O off the calling thread.
+
+    ``emit`` only appends the record to a bounded queue; message arguments
+    are not formatted until the writer thread handles the record, so they
+    should not be mutated after logging. The writer thread wakes every
+    ``flush_interval`` seconds (or at once for errors), drops records over
+    the per-call-site rate limit, collapses consecutive repeats of the same
+    message and writes each batch to the target handlers with one write and
+    flush per stream. Repeats are reported at most once per ``rate_window``.
+    When the queue is full the oldest records are dropped.
+
+    Args:
+        handlers: Handlers that receive the records
+        capacity: Maximum number of queued records
+        flush_interval: Seconds between writer thread runs
+        rate_limit: Records allowed per call site per ``rate_window``
+            (0 disables rate limiting)
+        rate_window: Rate limiting window in seconds
+    """
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        capacity: int = 10000,
+        flush_interval: float = 0.05,
+        rate_limit: int = 50,
+        rate_window: float = 1.0
+    ):
+        super().__init__()
+        self.handlers = list(handlers)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.rate_limiter = _RateLimiter(rate_limit, rate_window) if rate_limit > 0 else None
+        self.dropped = 0
+
+        self._queue: deque = deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self.rate_window = rate_window
+        # Last written message and how often it has repeated since
+        self._last: Optional[Tuple[Tuple[str, int, int], str]] = None
+        self._repeats = 0
+        self._repeats_since = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="async-log-writer", daemon=True)
+        self._thread.start()
+
+    def handle(self, record: logging.LogRecord):
+        """Filter and enqueue a record without taking the handler lock."""
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord):
+        """Enqueue a record for the writer thread."""
+        queue = self._queue
+        if len(queue) >= self.capacity:
+            self.dropped += 1
+        queue.append(record)
+        if record.levelno >= logging.ERROR:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Never let the writer thread die
+                pass
+
+    def flush(self):
+        """Write all queued records to the target handlers."""
+        with self._write_lock:
+            queue = self._queue
+            batch = []
+            while True:
+                try:
+                    record = queue.popleft()
+                except IndexError:
+                    break
+                batch.extend(self._process(record))
+
+            now = time.time()
+            if self.rate_limiter is not None:
+                self.rate_limiter.expire(now, batch)
+            if self._repeats and now - self._repeats_since >= self.rate_window:
+                batch.extend(self._flush_repeats())
+
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                batch.append(logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "Log queue full, dropped %d records",
+                    "args": (dropped,)
+                }))
+
+            if batch:
+                self._write(batch)
+
+    def _process(self, record: logging.LogRecord) -> List[logging.LogRecord]:
+        """Apply rate limiting and deduplication to one record."""
+        output: List[logging.LogRecord] = []
+        if self.rate_limiter is not None and not self.rate_limiter.allow(record, output):
+            return output
+
+        try:
+            message = record.getMessage()
+        except Exception:
+            return output + [record]
+        # Store the formatted message so handlers do not format it again
+        record.msg = message
+        record.args = None
+
+        key = ((record.name, record.lineno, record.levelno), message)
+        if key == self._last and record.exc_info is None:
+            if not self._repeats:
+                self._repeats_since = record.created
+            self._repeats += 1
+            return output
+
+        output.extend(self._flush_repeats())
+        self._last = key
+        output.append(record)
+        return output
+
+    def _flush_repeats(self) -> List[logging.LogRecord]:
+        if not self._repeats:
+            return []
+        (name, _, levelno), _ = self._last
+        summary = logging.makeLogRecord({
+            "name": name,
+            "levelno": levelno,
+            "levelname": logging.getLevelName(levelno),
+            "msg": "Last message repeated %d times",
+            "args": (self._repeats,)
+        })
+        self._repeats = 0
+        return [summary]
+
+    def _write(self, batch: List[logging.LogRecord]):
+        for handler in self.handlers:
+            records = [r for r in batch if r.levelno >= handler.level and handler.filter(r)]
+            if not records:
+                continue
+
+            if not isinstance(handler, logging.StreamHandler):
+                for record in records:
+                    handler.handle(record)
+                continue
+
+            # Batch stream writes: one write and one flush per batch
+            lines = []
+            for record in records:
+                try:
+                    lines.append(handler.format(record))
+                except Exception:
+                    handler.handleError(record)
+            if not lines:
+                continue
+            handler.acquire()
+            try:
+                handler.stream.write(handler.terminator.join(lines) + handler.terminator)
+                handler.flush()
+            except Exception:
+                handler.handleError(records[-1])
+            finally:
+                handler.release()
+
+    def close(self):
+        """Stop the writer thread, write remaining records and close the targets."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self.flush()
+        remaining = self._flush_repeats()
+        if self.rate_limiter is not None:
+            self.rate_limiter.expire(float("inf"), remaining)
+        if remaining:
+            self._write(remaining)
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+
+def _create_output_handlers() -> List[logging.Handler]:
+    """Create the handlers that write log output."""
+    formatter = JSONFormatter() if JSON_LOGGING else logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if LOG_FILE:
+        handlers.append(logging.FileHandler(LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def configure_logging():
+    """Configure the root logger, asynchronously unless disabled."""
+    handlers = _create_output_handlers()
+    if ASYNC_LOGGING:
+        handler = AsyncLogHandler(handlers)
+        # Capture the correlation ID on the calling thread
+        handler.addFilter(CorrelationFilter())
+        handlers = [handler]
+        atexit.register(handler.close)
+
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL), handlers=handlers)
+
+
+# Configure basic logging
+configure_logging()
@@ -3,100 +3,370 @@ Metrics collection for the Mathematical Multimodal LLM System.
 
 This module provides utilities for collecting and reporting various metrics
 about the system's performance and behavior.
+
+Counters and histograms are sharded per thread: each thread updates its own
+shard without taking a lock, and readers merge the shards. Histograms use
+log-linear (HDR-style) buckets, so quantiles are accurate to within a fixed
+relative error over any range of values. Counters also keep per-second
+buckets for sliding-window rates. Metrics can be exported as JSON or in the
+Prometheus text exposition format.
 """
 import time
-from typing import Dict, Any, List, Optional
-import asyncio
-import logging
+import math
+import re
 import json
-from collections import defaultdict
-from dataclasses import dataclass, field
 import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Tuple
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Number of one-second slots kept for sliding-window rates
+RATE_WINDOW_SLOTS = 300
+
+# Histogram resolution: 2**SUB_BUCKET_BITS buckets per power of two, which
+# bounds the relative error of reported quantiles to about 0.8%
+SUB_BUCKET_BITS = 6
+_SUB_BUCKET_SCALE = 2 << SUB_BUCKET_BITS
+_ZERO_INDEX = -(1 << 30)
+
+# Quantiles reported in snapshots and Prometheus summaries
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Unit of histograms that record latencies
+LATENCY_UNIT = "ms"
+
+_frexp = math.frexp
+_monotonic = time.monotonic
+
+
+class _CounterShard:
+    """Per-thread counter state, written only by its owning thread."""
+    __slots__ = ("total", "seconds", "counts", "thread")
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.total = 0
+        self.seconds = [0] * RATE_WINDOW_SLOTS
+        self.counts = [0] * RATE_WINDOW_SLOTS
+        self.thread = thread
+
 
-@dataclass
 class MetricCounter:
     """A counter metric with increment/decrement functionality."""
-    name: str
-    value: int = 0
-    description: str = ""
-    labels: Dict[str, str] = field(default_factory=dict)
-    
+
+    def __init__(self, name: str, value: int = 0, description: str = "", labels: Dict[str, str] = None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[_CounterShard] = []
+        # Holds the initial value and the totals of threads that have exited
+        self._retired = _CounterShard(None)
+        self._retired.total = value
+
+    def _new_shard(self) -> _CounterShard:
+        shard = _CounterShard(threading.current_thread())
+        with self._lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
     def increment(self, amount: int = 1):
         """Increment the counter."""
-        self.value += amount
-        
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+        shard.total += amount
+
+        now = int(_monotonic())
+        slot = now % RATE_WINDOW_SLOTS
+        if shard.seconds[slot] == now:
+            shard.counts[slot] += amount
+        else:
+            shard.seconds[slot] = now
+            shard.counts[slot] = amount
+
     def decrement(self, amount: int = 1):
         """Decrement the counter."""
-        self.value -= amount
-        
+        self.increment(-amount)
+
+    def _live_shards(self) -> List[_CounterShard]:
+        """Get all shards, folding those of exited threads into the retired shard."""
+        shards = list(self._shards)
+        if any(not shard.thread.is_alive() for shard in shards):
+            with self._lock:
+                retired = self._retired
+                for shard in [s for s in self._shards if not s.thread.is_alive()]:
+                    retired.total += shard.total
+                    for slot in range(RATE_WINDOW_SLOTS):
+                        if shard.seconds[slot] == retired.seconds[slot]:
+                            retired.counts[slot] += shard.counts[slot]
+                        elif shard.seconds[slot] > retired.seconds[slot]:
+                            retired.seconds[slot] = shard.seconds[slot]
+                            retired.counts[slot] = shard.counts[slot]
+                    self._shards.remove(shard)
+                shards = list(self._shards)
+        shards.append(self._retired)
+        return shards
+
+    @property
+    def value(self) -> int:
+        """Current value of the counter."""
+        return sum(shard.total for shard in self._live_shards())
+
+    def rate(self, window_seconds: float = 60.0) -> float:
+        """
+        Get the average increase per second over a sliding window.
+
+        Args:
+            window_seconds: Window length, at most RATE_WINDOW_SLOTS seconds
+        """
+        window = max(1, min(int(window_seconds), RATE_WINDOW_SLOTS))
+        now = int(_monotonic())
+        oldest = now - window
+        total = 0
+        for shard in self._live_shards():
+            seconds = shard.seconds
+            counts = shard.counts
+            for slot in range(RATE_WINDOW_SLOTS):
+                if oldest < seconds[slot] <= now:
+                    total += counts[slot]
+        return total / window
+
     def reset(self):
-        """Reset the counter to zero."""
-        self.value = 0
+        """
+        Reset the counter to zero.
+
+        Increments racing with a reset from another thread may be lost.
+        """
+        with self._lock:
+            for shard in self._shards + [self._retired]:
+                shard.total = 0
+                shard.counts = [0] * RATE_WINDOW_SLOTS
 
 
-@dataclass
 class MetricGauge:
     """A gauge metric that can go up or down."""
-    name: str
-    value: float = 0.0
-    description: str = ""
-    labels: Dict[str, str] = field(default_factory=dict)
-    
+
+    def __init__(self, name: str, value: float = 0.0, description: str = "", labels: Dict[str, str] = None):
+        self.name = name
+        self.value = value
+        self.description = description
+        self.labels = labels or {}
+        self._lock = threading.Lock()
+
     def set(self, value: float):
         """Set the gauge to a specific value."""
         self.value = value
-        
+
     def increment(self, amount: float = 1.0):
         """Increment the gauge."""
-        self.value += amount
-        
+        with self._lock:
+            self.value += amount
+
     def decrement(self, amount: float = 1.0):
         """Decrement the gauge."""
-        self.value -= amount
+        with self._lock:
+            self.value -= amount
+
+
+class _HistogramShard:
+    """Per-thread histogram state, written only by its owning thread."""
+    __slots__ = ("count", "sum", "min", "max", "buckets", "thread")
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets: Dict[int, int] = {}
+        self.thread = thread
+
+
+def _bucket_bounds(index: int) -> Tuple[float, float]:
+    """Get the lower and upper bound of a log-linear bucket."""
+    if index == _ZERO_INDEX:
+        return 0.0, 0.0
+    exponent, sub_bucket = divmod(index, 1 << SUB_BUCKET_BITS)
+    lower = math.ldexp(0.5 + sub_bucket / _SUB_BUCKET_SCALE, exponent)
+    upper = math.ldexp(0.5 + (sub_bucket + 1) / _SUB_BUCKET_SCALE, exponent)
+    return lower, upper
+
+
+class HistogramSnapshot:
+    """Merged, immutable view of a histogram at one point in time."""
+
+    def __init__(self, count: int, total: float, minimum: float, maximum: float, buckets: Dict[int, int]):
+        self.count = count
+        self.sum = total
+        self.min = minimum if count else 0.0
+        self.max = maximum if count else 0.0
+        self.indices = sorted(buckets)
+        self.cumulative = []
+        running = 0
+        for index in self.indices:
+            running += buckets[index]
+            self.cumulative.append(running)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Get the value at quantile ``q`` (0 to 1)."""
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = max(1, math.ceil(q * self.count))
+        position = bisect_left(self.cumulative, rank)
+        lower, upper = _bucket_bounds(self.indices[position])
+        value = (lower + upper) / 2
+        return min(max(value, self.min), self.max)
+
+    def count_at_or_below(self, bounds: List[float]) -> List[int]:
+        """
+        Get the cumulative count of observations at or below each bound.
+
+        A bucket straddling a bound is counted below it, so observations
+        exactly on a bound are always counted correctly.
+        """
+        lowers = [_bucket_bounds(index)[0] for index in self.indices]
+        result = []
+        for bound in bounds:
+            position = bisect_right(lowers, bound)
+            result.append(self.cumulative[position - 1] if position else 0)
+        return result
 
 
-@dataclass
 class MetricHistogram:
-    """A histogram metric for tracking distributions."""
-    name: str
-    description: str = ""
-    buckets: List[float] = field(default_factory=list)
-    counts: List[int] = field(default_factory=list)
-    sum: float = 0.0
-    count: int = 0
-    labels: Dict[str, str] = field(default_factory=dict)
-    
-    def __post_init__(self):
-        """Initialize bucket counts if not provided."""
-        if not self.buckets:
-            # Default buckets for latency in milliseconds
-            self.buckets = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
-        if not self.counts:
-            self.counts = [0] * (len(self.buckets) + 1)
-            
+    """
+    A histogram metric for tracking distributions.
+
+    Observations go into log-linear buckets: each power of two is split into
+    2**SUB_BUCKET_BITS equal sub-buckets, located in constant time from the
+    float's exponent and mantissa. ``buckets`` only controls the fixed
+    boundaries reported by ``counts`` and ``get_all_metrics``. ``unit`` tells
+    latency histograms (milliseconds) apart from other distributions such as
+    message sizes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: List[float] = None,
+        labels: Dict[str, str] = None,
+        unit: str = LATENCY_UNIT
+    ):
+        self.name = name
+        self.description = description
+        self.unit = unit
+        # Default buckets for latency in milliseconds
+        self.buckets = sorted(buckets) if buckets else [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+        self.labels = labels or {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[_HistogramShard] = []
+        self._retired = _HistogramShard(None)
+
+    def _new_shard(self) -> _HistogramShard:
+        shard = _HistogramShard(threading.current_thread())
+        with self._lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
     def observe(self, value: float):
         """Record an observation."""
-        self.sum += value
-        self.count += 1
-        
-        # Find the appropriate bucket
-        for i, bucket in enumerate(self.buckets):
-            if value <= bucket:
-                self.counts[i] += 1
-                return
-                
-        # If we get here, it belongs in the last bucket
-        self.counts[-1] += 1
-        
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+
+        if value > 0:
+            mantissa, exponent = _frexp(value)
+            index = (exponent << SUB_BUCKET_BITS) + int((mantissa - 0.5) * _SUB_BUCKET_SCALE)
+        else:
+            index = _ZERO_INDEX
+        buckets = shard.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+
+        shard.count += 1
+        shard.sum += value
+        if value < shard.min:
+            shard.min = value
+        if value > shard.max:
+            shard.max = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Merge all shards into a snapshot without blocking writers."""
+        shards = list(self._shards)
+        if any(not shard.thread.is_alive() for shard in shards):
+            with self._lock:
+                retired = self._retired
+                for shard in [s for s in self._shards if not s.thread.is_alive()]:
+                    self._merge_into(retired, shard)
+                    self._shards.remove(shard)
+                shards = list(self._shards)
+        shards.append(self._retired)
+
+        merged = _HistogramShard(None)
+        for shard in shards:
+            self._merge_into(merged, shard)
+        return HistogramSnapshot(merged.count, merged.sum, merged.min, merged.max, merged.buckets)
+
+    @staticmethod
+    def _merge_into(target: _HistogramShard, shard: _HistogramShard):
+        # dict() copies atomically, so the owner may keep writing meanwhile
+        for index, count in dict(shard.buckets).items():
+            target.buckets[index] = target.buckets.get(index, 0) + count
+        target.count += shard.count
+        target.sum += shard.sum
+        target.min = min(target.min, shard.min)
+        target.max = max(target.max, shard.max)
+
+    @property
+    def count(self) -> int:
+        return self.snapshot().count
+
+    @property
+    def sum(self) -> float:
+        return self.snapshot().sum
+
+    @property
+    def counts(self) -> List[int]:
+        """Observation counts per fixed bucket, with the overflow bucket last."""
+        snapshot = self.snapshot()
+        cumulative = snapshot.count_at_or_below(self.buckets)
+        counts = [cumulative[0]] if cumulative else []
+        counts.extend(b - a for a, b in zip(cumulative, cumulative[1:]))
+        counts.append(snapshot.count - (cumulative[-1] if cumulative else 0))
+        return counts
+
+    def quantile(self, q: float) -> float:
+        """Get the value at quantile ``q`` (0 to 1)."""
+        return self.snapshot().quantile(q)
+
     def reset(self):
-        """Reset the histogram."""
-        self.counts = [0] * (len(self.buckets) + 1)
-        self.sum = 0.0
-        self.count = 0
+        """
+        Reset the histogram.
+
+        Observations racing with a reset from another thread may be lost.
+        """
+        with self._lock:
+            for shard in self._shards + [self._retired]:
+                shard.buckets = {}
+                shard.count = 0
+                shard.sum = 0.0
+                shard.min = math.inf
+                shard.max = -math.inf
 
 
 class MetricsRegistry:
@@ -106,56 +376,66 @@ class MetricsRegistry:
         self.gauges: Dict[str, MetricGauge] = {}
         self.histograms: Dict[str, MetricHistogram] = {}
         self._lock = threading.Lock()
-        
+
     def counter(self, name: str, description: str = "", labels: Dict[str, str] = None) -> MetricCounter:
         """Get or create a counter metric."""
         key = self._get_key(name, labels)
+        metric = self.counters.get(key)
+        if metric is not None:
+            return metric
         with self._lock:
             if key not in self.counters:
                 self.counters[key] = MetricCounter(name, 0, description, labels or {})
             return self.counters[key]
-            
+
     def gauge(self, name: str, description: str = "", labels: Dict[str, str] = None) -> MetricGauge:
         """Get or create a gauge metric."""
         key = self._get_key(name, labels)
+        metric = self.gauges.get(key)
+        if metric is not None:
+            return metric
         with self._lock:
             if key not in self.gauges:
                 self.gauges[key] = MetricGauge(name, 0.0, description, labels or {})
             return self.gauges[key]
-            
+
     def histogram(
         self,
         name: str,
         description: str = "",
         buckets: List[float] = None,
-        labels: Dict[str, str] = None
+        labels: Dict[str, str] = None,
+        unit: str = LATENCY_UNIT
     ) -> MetricHistogram:
         """Get or create a histogram metric."""
         key = self._get_key(name, labels)
+        metric = self.histograms.get(key)
+        if metric is not None:
+            return metric
         with self._lock:
             if key not in self.histograms:
-                self.histograms[key] = MetricHistogram(name, description, buckets or [], [], 0.0, 0, labels or {})
+                self.histograms[key] = MetricHistogram(name, description, buckets, labels or {}, unit)
             return self.histograms[key]
-            
+
     def _get_key(self, name: str, labels: Dict[str, str] = None) -> str:
         """Get a unique key for a metric based on name and labels."""
         if not labels:
             return name
-            
+
         # Sort labels by key to ensure consistent keys
         sorted_labels = sorted(labels.items())
         label_str = ",".join(f"{k}={v}" for k, v in sorted_labels)
         return f"{name}[{label_str}]"
-        
+
     def get_all_metrics(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get all metrics as a dictionary."""
         result = {
-            "counters": [self._format_metric(c) for c in self.counters.values()],
-            "gauges": [self._format_metric(g) for g in self.gauges.values()],
-            "histograms": [self._format_histogram(h) for h in self.histograms.values()]
+            "counters": [self._format_counter(c) for c in list(self.counters.values())],
+            "gauges": [self._format_metric(g) for g in list(self.gauges.values())],
+            "histograms": [self._format_histogram(h) for h in list(self.histograms.values())]
         }
         return result
-        
+
     def _format_metric(self, metric) -> Dict[str, Any]:
         """Format a counter or gauge metric for output."""
         return {
@@ -164,36 +444,170 @@ class MetricsRegistry:
             "description": metric.description,
             "labels": metric.labels
         }
-        
-    def _format_histogram(self, histogram) -> Dict[str, Any]:
+
+    def _format_counter(self, counter: MetricCounter) -> Dict[str, Any]:
+        """Format a counter metric, including its recent rate, for output."""
+        result = self._format_metric(counter)
+        result["rate_1m"] = counter.rate(60)
+        return result
+
+    def _format_histogram(self, histogram: MetricHistogram) -> Dict[str, Any]:
         """Format a histogram metric for output."""
+        snapshot = histogram.snapshot()
+        cumulative = snapshot.count_at_or_below(histogram.buckets)
+
         buckets = []
-        for i, bucket in enumerate(histogram.buckets):
+        previous = 0
+        for bound, running in zip(histogram.buckets, cumulative):
             buckets.append({
-                "le": bucket,
-                "count": histogram.counts[i]
+                "le": bound,
+                "count": running - previous
             })
+            previous = running
         buckets.append({
             "le": "Inf",
-            "count": histogram.counts[-1]
+            "count": snapshot.count - previous
         })
-        
+
         return {
             "name": histogram.name,
             "description": histogram.description,
             "buckets": buckets,
-            "sum": histogram.sum,
-            "count": histogram.count,
+            "sum": snapshot.sum,
+            "count": snapshot.count,
+            "min": snapshot.min,
+            "max": snapshot.max,
+            "quantiles": {str(q): snapshot.quantile(q) for q in DEFAULT_QUANTILES},
             "labels": histogram.labels
         }
-        
+
     def export_metrics(self, format: str = "json") -> str:
-        """Export metrics in the specified format."""
+        """Export metrics in the specified format ("json" or "prometheus")."""
+        if format.lower() == "prometheus":
+            return self.export_prometheus()
         metrics = self.get_all_metrics()
-        if format.lower() == "json":
-            return json.dumps(metrics, indent=2)
-        else:
-            return json.dumps(metrics, indent=2)  # Default to JSON for now
+        return json.dumps(metrics, indent=2)
+
+    def export_prometheus(self) -> str:
+        """
+        Export metrics in the Prometheus text exposition format.
+
+        Counters get a ``_total`` suffix and histograms are exposed as
+        summaries with the quantiles in DEFAULT_QUANTILES.
+        """
+        lines: List[str] = []
+
+        def family(metrics, metric_type: str, suffix: str = ""):
+            by_name: Dict[str, list] = {}
+            for metric in metrics:
+                name = prometheus_name(metric.name)
+                if not name.endswith(suffix):
+                    name += suffix
+                by_name.setdefault(name, []).append(metric)
+            for name in sorted(by_name):
+                group = by_name[name]
+                description = next((m.description for m in group if m.description), "")
+                if description:
+                    lines.append(f"# HELP {name} {_escape_help(description)}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                yield name, group
+
+        for name, group in family(list(self.counters.values()), "counter", "_total"):
+            for counter in group:
+                lines.append(f"{name}{_format_labels(counter.labels)} {_format_value(counter.value)}")
+
+        for name, group in family(list(self.gauges.values()), "gauge"):
+            for gauge in group:
+                lines.append(f"{name}{_format_labels(gauge.labels)} {_format_value(gauge.value)}")
+
+        for name, group in family(list(self.histograms.values()), "summary"):
+            for histogram in group:
+                snapshot = histogram.snapshot()
+                for q in DEFAULT_QUANTILES:
+                    labels = dict(histogram.labels, quantile=str(q))
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(snapshot.quantile(q))}")
+                labels = _format_labels(histogram.labels)
+                lines.append(f"{name}_sum{labels} {_format_value(snapshot.sum)}")
+                lines.append(f"{name}_count{labels} {snapshot.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def prometheus_name(name: str) -> str:
+    """Convert a dotted metric name to a valid Prometheus metric name."""
+    name = _INVALID_NAME_CHARS.sub("_", name)
+    if name[:1].isdigit():
+        name = "_" + name
+    return name
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f"{_INVALID_NAME_CHARS.sub('_', key)}=\"{value}\"")
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class MetricsCollector:
+    """Read-only view of the metrics registry for dashboards and reports."""
+
+    def __init__(self, registry: MetricsRegistry = None):
+        self.registry = registry or get_registry()
+
+    def get_all_metrics(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get all metrics as a dictionary."""
+        return self.registry.get_all_metrics()
+
+    def get_latency_metrics(self, endpoint: Optional[str] = None,
+                            since: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Get count, mean and quantiles for every latency histogram.
+
+        Args:
+            endpoint: Only include histograms whose key contains this string
+            since: Accepted for compatibility; histograms are cumulative since start
+        """
+        result = {}
+        for key, histogram in list(self.registry.histograms.items()):
+            if histogram.unit != LATENCY_UNIT or (endpoint and endpoint not in key):
+                continue
+            snapshot = histogram.snapshot()
+            stats = {
+                "count": snapshot.count,
+                "mean": snapshot.mean,
+                "min": snapshot.min,
+                "max": snapshot.max
+            }
+            for q in DEFAULT_QUANTILES:
+                stats[f"p{q * 100:g}"] = snapshot.quantile(q)
+            result[key] = stats
+        return result
+
+    def get_rates(self, window_seconds: float = 60.0) -> Dict[str, float]:
+        """Get the per-second rate of every counter over a sliding window."""
+        return {
+            key: counter.rate(window_seconds)
+            for key, counter in list(self.registry.counters.items())
+        }
 
 
 # Create a global registry
@@ -208,15 +622,15 @@ def get_registry() -> MetricsRegistry:
 def setup_message_bus_metrics():
     """Set up default metrics for the message bus."""
     registry = get_registry()
-    
+
     # Message counters
     registry.counter("message_bus.messages.total", "Total number of messages processed")
     registry.counter("message_bus.messages.errors", "Number of message processing errors")
-    
+
     # Queue gauges
     registry.gauge("message_bus.queue.size", "Current size of the message queue")
     registry.gauge("message_bus.active_agents", "Number of active agents")
-    
+
     # Latency histograms
     registry.histogram("message_bus.latency.processing", "Message processing latency (ms)")
     registry.histogram("message_bus.latency.routing", "Message routing latency (ms)")
@@ -231,20 +645,21 @@ def record_message_metrics(
 ):
     """Record metrics for a message."""
     registry = get_registry()
-    
+
     # Increment total messages
     registry.counter("message_bus.messages.total").increment()
-    
+
     # Increment message type counter
     registry.counter(
         "message_bus.messages.by_type",
         labels={"type": message_type}
     ).increment()
-    
+
     # Track message size
     registry.histogram(
         "message_bus.message_size",
-        buckets=[100, 500, 1000, 5000, 10000, 50000, 100000]
+        buckets=[100, 500, 1000, 5000, 10000, 50000, 100000],
+        unit="bytes"
     ).observe(size)
 
 
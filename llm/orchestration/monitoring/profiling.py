@@ -0,0 +1,329 @@
+"""
+Profiling hooks for the Mathematical Multimodal LLM System.
+
+This module provides timers for named hot paths (parsing, simplification,
+lambdify, rendering, LLM calls and database queries), a per-request timing
+breakdown that the API can attach to responses, and a sampling profiler that
+captures stacks from a live process for a limited time.
+"""
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import contextvars
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from .metrics import get_registry, MetricHistogram
+
+# Hot path names used by the instrumented modules
+HOT_PATHS = ("parse", "simplify", "lambdify", "render", "llm_call", "mongo_query")
+
+SECTION_METRIC = "profiling.section.duration"
+
+_request_profile: contextvars.ContextVar = contextvars.ContextVar("request_profile", default=None)
+_section_histograms: Dict[str, MetricHistogram] = {}
+
+
+class RequestProfile:
+    """Timing breakdown of the hot paths hit while serving one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # Section name -> [total milliseconds, call count]
+        self.sections: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed_ms: float):
+        """Add the time spent in one section call."""
+        with self._lock:
+            entry = self.sections.get(name)
+            if entry is None:
+                self.sections[name] = [elapsed_ms, 1]
+            else:
+                entry[0] += elapsed_ms
+                entry[1] += 1
+
+    def total_ms(self) -> float:
+        """Get the time since the request started in milliseconds."""
+        return (time.perf_counter() - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the breakdown to a dictionary."""
+        with self._lock:
+            sections = {
+                name: {"total_ms": round(total, 3), "calls": int(calls)}
+                for name, (total, calls) in self.sections.items()
+            }
+        return {"total_ms": round(self.total_ms(), 3), "sections": sections}
+
+    def server_timing(self) -> str:
+        """Format the breakdown as a Server-Timing header value."""
+        with self._lock:
+            entries = [
+                f'{name};dur={total:.3f};desc="{int(calls)} calls"'
+                for name, (total, calls) in self.sections.items()
+            ]
+        entries.append(f"total;dur={self.total_ms():.3f}")
+        return ", ".join(entries)
+
+
+def start_request_profile() -> Tuple[RequestProfile, contextvars.Token]:
+    """
+    Start collecting a timing breakdown for the current request.
+
+    Returns:
+        The profile and a token to pass to ``end_request_profile``
+    """
+    profile = RequestProfile()
+    return profile, _request_profile.set(profile)
+
+
+def end_request_profile(token: contextvars.Token):
+    """Stop collecting the timing breakdown started with ``start_request_profile``."""
+    _request_profile.reset(token)
+
+
+def current_request_profile() -> Optional[RequestProfile]:
+    """Get the timing breakdown of the current request, if one is being collected."""
+    return _request_profile.get()
+
+
+def _section_histogram(name: str) -> MetricHistogram:
+    histogram = _section_histograms.get(name)
+    if histogram is None:
+        histogram = get_registry().histogram(
+            SECTION_METRIC,
+            "Time spent in profiled hot paths (ms)",
+            labels={"section": name}
+        )
+        _section_histograms[name] = histogram
+    return histogram
+
+
+def record_section(name: str, elapsed_ms: float):
+    """Record time spent in a named section."""
+    _section_histogram(name).observe(elapsed_ms)
+    profile = _request_profile.get()
+    if profile is not None:
+        profile.add(name, elapsed_ms)
+
+
+def section_stats() -> Dict[str, Dict[str, float]]:
+    """Get call count, mean, p95 and p99 in milliseconds for every recorded section."""
+    stats = {}
+    for name, histogram in list(_section_histograms.items()):
+        snapshot = histogram.snapshot()
+        if not snapshot.count:
+            continue
+        stats[name] = {
+            "count": snapshot.count,
+            "mean": snapshot.mean,
+            "p95": snapshot.quantile(0.95),
+            "p99": snapshot.quantile(0.99)
+        }
+    return stats
+
+
+class profile_section:
+    """
+    Context manager timing a named hot path.
+
+    The duration is recorded in the ``profiling.section.duration`` histogram
+    and, while a request profile is active, in its breakdown.
+    """
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        record_section(self.name, (time.perf_counter() - self._start) * 1000)
+
+
+def profiled(name: str) -> Callable:
+    """
+    Decorator timing every call of a function as a named hot path.
+
+    Works with both regular and async functions.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record_section(name, (time.perf_counter() - start) * 1000)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_section(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a sampling profile is already being captured."""
+
+
+# (file name, function name) pairs where a thread is waiting rather than working
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("connection.py", "wait"),
+}
+
+Frame = Tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that periodically samples the stacks of all threads.
+
+    Sampling runs on the thread that calls ``run`` (use a worker thread when
+    calling from the event loop), so the profiled code is not instrumented
+    and pays nothing between samples. Only one capture can run at a time.
+
+    Args:
+        interval: Seconds between samples
+        include_idle: Keep samples of threads blocked waiting for work
+        max_depth: Maximum number of frames kept per stack
+    """
+
+    _capture_lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False, max_depth: int = 128):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.max_depth = max_depth
+        # (thread name, stack from root to leaf) -> sample count
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.duration = 0.0
+
+    def run(self, duration: float) -> "SamplingProfiler":
+        """
+        Sample all other threads for ``duration`` seconds.
+
+        Raises:
+            ProfilerBusyError: If another capture is in progress
+        """
+        if not SamplingProfiler._capture_lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already being captured")
+        try:
+            own_ident = threading.get_ident()
+            start = time.perf_counter()
+            deadline = start + duration
+            next_sample = start
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now < next_sample:
+                    time.sleep(next_sample - now)
+                self._sample(own_ident)
+                next_sample += self.interval
+            self.duration = time.perf_counter() - start
+        finally:
+            SamplingProfiler._capture_lock.release()
+        return self
+
+    def _sample(self, own_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack: List[Frame] = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                frame = frame.f_back
+            if not stack:
+                continue
+            leaf_file, leaf_name, _ = stack[0]
+            if not self.include_idle and (os.path.basename(leaf_file), leaf_name) in _IDLE_FRAMES:
+                continue
+            stack.reverse()
+            self.samples[(names.get(ident, str(ident)), tuple(stack))] += 1
+        self.sample_count += 1
+
+    @staticmethod
+    def _frame_label(frame: Frame) -> str:
+        filename, name, _ = frame
+        module = os.path.splitext(os.path.basename(filename))[0]
+        return f"{module}:{name}"
+
+    def collapsed(self) -> str:
+        """
+        Get the samples as collapsed stacks.
+
+        Each line holds the thread name and frames from root to leaf joined by
+        semicolons, followed by the sample count, as read by flamegraph.pl
+        and most flame graph viewers.
+        """
+        lines = []
+        for (thread_name, stack), count in self.samples.most_common():
+            frames = [thread_name.replace(";", ":")] + [self._frame_label(f) for f in stack]
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "math_llm_system") -> Dict[str, Any]:
+        """Get the samples as a speedscope file with one profile per thread."""
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[Frame, int] = {}
+        profiles: Dict[str, Dict[str, Any]] = {}
+
+        for (thread_name, stack), count in self.samples.items():
+            indices = []
+            for frame in stack:
+                index = frame_index.get(frame)
+                if index is None:
+                    index = len(frames)
+                    frame_index[frame] = index
+                    frames.append({"name": frame[1], "file": frame[0], "line": frame[2]})
+                indices.append(index)
+
+            profile = profiles.get(thread_name)
+            if profile is None:
+                profile = {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": [],
+                    "weights": []
+                }
+                profiles[thread_name] = profile
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "math_llm_system",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values())
+        }
+
+    def to_json(self) -> str:
+        """Get the speedscope file as JSON."""
+        return json.dumps(self.speedscope())
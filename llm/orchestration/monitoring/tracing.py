@@ -3,19 +3,59 @@ Distributed tracing implementation for the Multi-agent Communication Protocol (M
 
 This module provides tracing capabilities to track message flow through the system
 and help with debugging, performance analysis, and monitoring.
+
+The current span is held in a context variable, so nested spans find their
+parent automatically, including across asyncio tasks (which copy the context
+they are created in). Messages created inside a span carry its trace context,
+letting the receiving agent continue the same trace.
+
+Traces are head-sampled when their root span starts. Spans of unsampled
+traces are cheap: their IDs are only generated on demand and they are
+discarded when they end unless they are slow or failed (tail sampling).
+Recorded spans go into a bounded ring buffer that a background thread drains
+to the registered exporters and, optionally, to a JSON-lines file in the
+OTLP/JSON format.
 """
-import time
-import datetime
-import uuid
-from typing import Dict, Any, Optional, List
+import atexit
+import contextvars
+import hashlib
 import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Tuple
 from pydantic import BaseModel
-import asyncio
-import logging
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Offset to convert perf_counter_ns readings to Unix epoch nanoseconds
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_trace_id() -> str:
+    return "%032x" % random.getrandbits(128)
+
+
+def _new_span_id() -> str:
+    return "%016x" % random.getrandbits(64)
+
+
+def _otlp_id(value: str, length: int) -> str:
+    # OTLP wants lowercase hex of a fixed length; other IDs (dashed UUIDs
+    # such as workflow IDs used as trace IDs) map to one deterministically,
+    # so spans that share an ID still share it once exported
+    normalized = value.replace("-", "").lower()
+    if len(normalized) == length and all(c in "0123456789abcdef" for c in normalized):
+        return normalized
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:length]
+
 
 class SpanContext(BaseModel):
     """Context information for a trace span."""
@@ -30,39 +70,101 @@ class SpanContext(BaseModel):
 class Span:
     """
     A span represents a single operation within a trace.
-    
+
     Spans can be nested to represent a causal relationship between operations.
+    Timing uses the monotonic performance counter; wall-clock times are only
+    derived when a span is exported.
     """
+    __slots__ = (
+        "name", "_trace_id", "_span_id", "_parent", "_parent_span_id", "metadata",
+        "sampled", "tail_sampled", "error", "start_ns", "end_ns", "_tracer", "_token"
+    )
+
     def __init__(
         self,
         name: str,
         trace_id: Optional[str] = None,
         parent_span_id: Optional[str] = None,
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        sampled: bool = True,
+        parent: Optional["Span"] = None,
+        tracer: Optional["Tracer"] = None
     ):
         self.name = name
-        self.trace_id = trace_id or str(uuid.uuid4())
-        self.span_id = str(uuid.uuid4())
-        self.parent_span_id = parent_span_id
-        self.start_time = time.time()
-        self.end_time = None
-        self.metadata = metadata or {}
-        self.children: List[Span] = []
-        
+        self._trace_id = trace_id
+        self._parent = parent
+        self._parent_span_id = parent_span_id
+        self.metadata = metadata
+        self.sampled = sampled
+        self._tracer = tracer
+        self._span_id = self._token = self.end_ns = self.error = None
+        self.tail_sampled = False
+        if sampled:
+            # Recorded spans get their IDs up front; others only on demand
+            self._resolve_ids()
+        self.start_ns = time.perf_counter_ns()
+
+    def _resolve_ids(self):
+        """Materialize the trace, span and parent IDs and drop the parent reference."""
+        parent = self._parent
+        if parent is not None:
+            if self._trace_id is None:
+                self._trace_id = parent.trace_id
+            if self._parent_span_id is None:
+                self._parent_span_id = parent.span_id
+            self._parent = None
+        elif self._trace_id is None:
+            self._trace_id = _new_trace_id()
+        if self._span_id is None:
+            self._span_id = _new_span_id()
+
+    @property
+    def trace_id(self) -> str:
+        if self._trace_id is None:
+            self._resolve_ids()
+        return self._trace_id
+
+    @property
+    def span_id(self) -> str:
+        if self._span_id is None:
+            self._resolve_ids()
+        return self._span_id
+
+    @property
+    def parent_span_id(self) -> Optional[str]:
+        if self._parent is not None:
+            self._resolve_ids()
+        return self._parent_span_id
+
+    @property
+    def start_time(self) -> float:
+        """Start time as a Unix timestamp in seconds."""
+        return (self.start_ns + _EPOCH_OFFSET_NS) / 1e9
+
+    @property
+    def end_time(self) -> Optional[float]:
+        """End time as a Unix timestamp in seconds, or None while running."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns + _EPOCH_OFFSET_NS) / 1e9
+
     def add_metadata(self, key: str, value: Any):
         """Add metadata to the span."""
+        if self.metadata is None:
+            self.metadata = {}
         self.metadata[key] = value
-        
+
     def end(self):
         """End the span."""
-        self.end_time = time.time()
-        
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+
     def duration(self) -> Optional[float]:
         """Get the duration of the span in milliseconds."""
-        if self.end_time is None:
+        if self.end_ns is None:
             return None
-        return (self.end_time - self.start_time) * 1000  # Convert to milliseconds
-        
+        return (self.end_ns - self.start_ns) / 1e6
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the span to a dictionary."""
         result = {
@@ -73,53 +175,163 @@ class Span:
             "start_time": self.start_time,
             "end_time": self.end_time,
             "duration_ms": self.duration(),
-            "metadata": self.metadata,
-            "children": [child.to_dict() for child in self.children]
+            "sampled": self.sampled,
+            "metadata": self.metadata or {}
         }
+        if self.error is not None:
+            result["error"] = self.error
         return result
-        
+
     def to_json(self) -> str:
         """Convert the span to JSON."""
         return json.dumps(self.to_dict(), default=str)
-        
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert the span to the OTLP/JSON span representation."""
+        span = {
+            "traceId": _otlp_id(self.trace_id, 32),
+            "spanId": _otlp_id(self.span_id, 16),
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns + _EPOCH_OFFSET_NS),
+            "endTimeUnixNano": str((self.end_ns or self.start_ns) + _EPOCH_OFFSET_NS),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in (self.metadata or {}).items()
+            ],
+            "status": {"code": 1}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = _otlp_id(self.parent_span_id, 16)
+        if self.tail_sampled:
+            span["attributes"].append({"key": "sampling.tail", "value": {"boolValue": True}})
+        if self.error is not None:
+            span["status"] = {"code": 2, "message": f"{self.error['type']}: {self.error['message']}"}
+        return span
+
     def __enter__(self):
-        """Enter the context manager."""
+        """Enter the context manager and make this the current span."""
+        self._token = _current_span.set(self)
         return self
-        
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Exit the context manager."""
-        self.end()
+        """Exit the context manager, restore the parent span and finish this one."""
+        end_ns = time.perf_counter_ns()
+        if self.end_ns is None:
+            self.end_ns = end_ns
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                # Exited in a different context than it was entered in
+                pass
         if exc_type is not None:
-            self.add_metadata("error", {
+            self.error = {
                 "type": exc_type.__name__,
                 "message": str(exc_val)
-            })
-            
+            }
+            self.add_metadata("error", self.error)
+        tracer = self._tracer
+        if tracer is not None and (
+            self.sampled or exc_type is not None or end_ns - self.start_ns >= tracer._slow_ns
+        ):
+            tracer._finish(self)
+
     @staticmethod
+    @asynccontextmanager
     async def async_span(name: str, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None, metadata: Dict[str, Any] = None):
         """Create a span for use with 'async with'."""
-        span = Span(name, trace_id, parent_span_id, metadata)
-        try:
+        with get_tracer().span(name, trace_id, parent_span_id, metadata) as span:
             yield span
-        except Exception as e:
-            span.add_metadata("error", {
-                "type": type(e).__name__,
-                "message": str(e)
-            })
-            raise
-        finally:
-            span.end()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Convert a metadata value to an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
 
 
 class Tracer:
     """
     Tracer for tracking the execution of operations across multiple agents.
+
+    Args:
+        service_name: Service name reported with exported spans
+        sample_rate: Fraction of traces recorded from their root span
+        slow_span_ms: Spans of unsampled traces that take at least this long
+            are kept anyway (tail sampling); failed spans are always kept
+        buffer_size: Capacity of the span ring buffer; when the exporter
+            falls behind, the oldest spans are dropped
+        export_interval: Seconds between exporter runs
+        export_path: Optional JSON-lines file receiving OTLP/JSON batches
     """
-    def __init__(self, service_name: str):
+    def __init__(
+        self,
+        service_name: str,
+        sample_rate: float = 1.0,
+        slow_span_ms: float = 100.0,
+        buffer_size: int = 4096,
+        export_interval: float = 1.0,
+        export_path: Optional[str] = None
+    ):
         self.service_name = service_name
+        self.sample_rate = sample_rate
+        self.slow_span_ms = slow_span_ms
+        self.export_interval = export_interval
+        self.export_path = export_path
         self.active_spans: Dict[str, Span] = {}
         self.trace_exporters: List[callable] = []
-        
+
+        # deque.append and popleft are atomic, so producers never take a lock
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._slow_ns = int(slow_span_ms * 1e6)
+        self._export_lock = threading.Lock()
+        self._exporter_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.stats = {"recorded": 0, "tail_sampled": 0, "dropped": 0, "exported": 0}
+
+    def _head_sample(self, trace_id: Optional[str]) -> bool:
+        """Decide whether a new trace with a fractional sample rate is recorded."""
+        rate = self.sample_rate
+        if trace_id is not None:
+            # Deterministic for a given trace ID so every hop agrees
+            return zlib.crc32(trace_id.encode()) < rate * 0x100000000
+        return random.random() < rate
+
+    def span(
+        self,
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+        metadata: Dict[str, Any] = None,
+        sampled: Optional[bool] = None
+    ) -> Span:
+        """
+        Create a span context manager.
+
+        Without an explicit ``trace_id`` the span becomes a child of the
+        current span, if any. An explicit ``trace_id`` (for example one
+        carried by an incoming message) only nests under the current span
+        when that span belongs to the same trace.
+        """
+        parent = _current_span.get()
+        if parent is not None and (trace_id is None or trace_id == parent._trace_id):
+            if sampled is None:
+                sampled = parent.sampled
+            return Span(name, parent._trace_id, parent_span_id, metadata, sampled, parent, self)
+
+        if sampled is None:
+            rate = self.sample_rate
+            sampled = rate >= 1.0 or (rate > 0.0 and self._head_sample(trace_id))
+        return Span(name, trace_id, parent_span_id, metadata, sampled, None, self)
+
     def start_span(
         self,
         name: str,
@@ -127,47 +339,160 @@ class Tracer:
         parent_span_id: Optional[str] = None,
         metadata: Dict[str, Any] = None
     ) -> Span:
-        """Start a new span."""
-        span = Span(name, trace_id, parent_span_id, metadata)
+        """Start a new span that is ended explicitly with ``end_span``."""
+        span = self.span(name, trace_id, parent_span_id, metadata)
         self.active_spans[span.span_id] = span
         logger.debug(f"Started span {span.span_id} for {name}")
         return span
-        
+
     def end_span(self, span_id: str):
         """End a span by ID."""
-        if span_id in self.active_spans:
-            span = self.active_spans[span_id]
-            span.end()
-            del self.active_spans[span_id]
-            
-            # Export the completed span
-            for exporter in self.trace_exporters:
-                try:
-                    exporter(span)
-                except Exception as e:
-                    logger.error(f"Error exporting span: {str(e)}")
-                    
-            logger.debug(f"Ended span {span_id}")
-            return span
-        else:
+        span = self.active_spans.get(span_id)
+        if span is None:
             logger.warning(f"Attempted to end unknown span: {span_id}")
             return None
-            
+
+        span.end()
+        self._finish(span)
+        logger.debug(f"Ended span {span_id}")
+        return span
+
+    def _finish(self, span: Span):
+        """Apply tail sampling to an ended span and buffer it for export."""
+        if self.active_spans:
+            self.active_spans.pop(span._span_id, None)
+
+        if not span.sampled:
+            if span.error is None and span.end_ns - span.start_ns < self._slow_ns:
+                return
+            span.tail_sampled = True
+            self.stats["tail_sampled"] += 1
+
+        span._resolve_ids()
+        buffer = self._buffer
+        if len(buffer) == buffer.maxlen:
+            self.stats["dropped"] += 1
+        buffer.append(span)
+        self.stats["recorded"] += 1
+
+        if self._exporter_thread is None:
+            self._start_exporter()
+
+    def _start_exporter(self):
+        with self._export_lock:
+            if self._exporter_thread is not None:
+                return
+            self._stop_event.clear()
+            self._exporter_thread = threading.Thread(
+                target=self._export_loop,
+                name=f"tracer-exporter-{self.service_name}",
+                daemon=True
+            )
+            self._exporter_thread.start()
+
+    def _export_loop(self):
+        while not self._stop_event.wait(self.export_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error exporting spans: {str(e)}")
+
+    def flush(self) -> int:
+        """
+        Drain the span buffer to the exporters.
+
+        Returns:
+            Number of spans exported
+        """
+        with self._export_lock:
+            buffer = self._buffer
+            batch = []
+            while True:
+                try:
+                    batch.append(buffer.popleft())
+                except IndexError:
+                    break
+            if not batch:
+                return 0
+
+            for span in batch:
+                for exporter in self.trace_exporters:
+                    try:
+                        exporter(span)
+                    except Exception as e:
+                        logger.error(f"Error exporting span: {str(e)}")
+
+            if self.export_path:
+                self._write_otlp(batch)
+
+            self.stats["exported"] += len(batch)
+            return len(batch)
+
+    def _write_otlp(self, batch: List[Span]):
+        """Append a batch of spans to the export file as one OTLP/JSON line."""
+        request = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": self.service_name}}
+                    ]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in batch]
+                }]
+            }]
+        }
+        try:
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Error writing spans to {self.export_path}: {str(e)}")
+
+    def shutdown(self):
+        """Stop the background exporter and export any remaining spans."""
+        self._stop_event.set()
+        thread = self._exporter_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.export_interval + 1)
+        self._exporter_thread = None
+        self.flush()
+
     def add_exporter(self, exporter: callable):
         """Add a trace exporter function."""
         self.trace_exporters.append(exporter)
-        
+
     def clear_exporters(self):
         """Clear all trace exporters."""
         self.trace_exporters = []
-        
-    def span(self, name: str, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None, metadata: Dict[str, Any] = None) -> Span:
-        """Create a span context manager."""
-        return self.start_span(name, trace_id, parent_span_id, metadata)
+
+
+def current_span() -> Optional[Span]:
+    """Get the span active in the current context, if any."""
+    return _current_span.get()
+
+
+def current_trace_context() -> Optional[Tuple[str, str, bool]]:
+    """
+    Get the trace context to propagate to another agent.
+
+    Returns:
+        Tuple of (trace_id, span_id, sampled) for the current span, or None
+    """
+    span = _current_span.get()
+    if span is None:
+        return None
+    return span.trace_id, span.span_id, span.sampled
 
 
 # Initialize a global tracer for the message bus
-_global_tracer = Tracer("math_llm_system")
+_global_tracer = Tracer(
+    "math_llm_system",
+    sample_rate=float(os.environ.get("MATH_LLM_TRACE_SAMPLE_RATE", "0.1")),
+    slow_span_ms=float(os.environ.get("MATH_LLM_TRACE_SLOW_SPAN_MS", "100")),
+    export_path=os.environ.get("MATH_LLM_TRACE_FILE") or None
+)
+atexit.register(_global_tracer.shutdown)
 
 def get_tracer() -> Tracer:
     """Get the global tracer instance."""
@@ -16,6 +16,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from orchestration.monitoring.logger import get_logger
+from orchestration.monitoring.metrics import MetricsCollector, LATENCY_UNIT
 from orchestration.performance.performance_optimizer import get_performance_optimizer
 
 logger = get_logger(__name__)
@@ -40,6 +41,9 @@ class PerformanceMetricsVisualizer:
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
+        # Reads metric snapshots without blocking the code recording them
+        self.metrics_collector = MetricsCollector()
+        
         # Initialize metrics history
         self.metrics_history = []
         self.timestamps = []
@@ -57,6 +61,10 @@ class PerformanceMetricsVisualizer:
         optimizer = get_performance_optimizer()
         metrics = optimizer.get_performance_metrics()
         
+        # Add latency quantiles and request rates from the metrics registry
+        metrics["latency"] = self.metrics_collector.get_latency_metrics()
+        metrics["rates"] = self.metrics_collector.get_rates()
+        
         # Add timestamp
         timestamp = time.time()
         self.timestamps.append(timestamp)
@@ -206,76 +214,62 @@ class PerformanceMetricsVisualizer:
                                        save_path: Optional[str] = None,
                                        show: bool = False) -> str:
         """
-        Generate a chart of computation times by function type.
+        Generate a chart of computation latency by operation.
+
+        Latencies come from the histograms in the metrics registry, so the
+        chart shows the median with the 95th and 99th percentiles.
         
         Args:
-            computation_types: Optional list of computation types to include
+            computation_types: Optional list of histogram names to include
             save_path: Optional path to save the chart
             show: Whether to display the chart
             
         Returns:
             Path to the saved chart
         """
-        # Extract computation time data
-        computation_data = {}
-        
-        # Use any recorder computation times (this would be stored in the metrics)
-        # In a real implementation, you would have a more complete dataset
-        computation_examples = [
-            {"function": "symbolic_calculation", "time": 0.45},
-            {"function": "symbolic_calculation", "time": 0.52},
-            {"function": "symbolic_calculation", "time": 0.38},
-            {"function": "integrate_expression", "time": 0.78},
-            {"function": "integrate_expression", "time": 0.92},
-            {"function": "solve_equation", "time": 0.31},
-            {"function": "solve_equation", "time": 0.28},
-            {"function": "plot_2d", "time": 0.15},
-            {"function": "plot_3d", "time": 0.43},
-            {"function": "handwriting_recognition", "time": 1.25},
-            {"function": "handwriting_recognition", "time": 1.42}
-        ]
-        
-        # Group by function type
-        for entry in computation_examples:
-            func = entry["function"]
-            time_val = entry["time"]
-            
-            if func not in computation_data:
-                computation_data[func] = []
-                
-            computation_data[func].append(time_val)
-        
-        # Filter by computation types if specified
-        if computation_types:
-            computation_data = {k: v for k, v in computation_data.items() if k in computation_types}
-        
-        # Calculate statistics
-        function_names = list(computation_data.keys())
-        mean_times = [np.mean(computation_data[func]) for func in function_names]
-        std_times = [np.std(computation_data[func]) for func in function_names]
+        # Use the busiest labelled variant of each histogram
+        latency_metrics = {}
+        for histogram in list(self.metrics_collector.registry.histograms.values()):
+            if histogram.unit != LATENCY_UNIT:
+                continue
+            if computation_types and histogram.name not in computation_types:
+                continue
+            snapshot = histogram.snapshot()
+            if not snapshot.count:
+                continue
+            current = latency_metrics.get(histogram.name)
+            if current is None or snapshot.count > current.count:
+                latency_metrics[histogram.name] = snapshot
+        
+        if not latency_metrics:
+            logger.warning("No latency metrics available for visualization")
+            return ""
         
-        # Sort by mean time (descending)
-        sorted_indices = np.argsort(mean_times)[::-1]
-        function_names = [function_names[i] for i in sorted_indices]
-        mean_times = [mean_times[i] for i in sorted_indices]
-        std_times = [std_times[i] for i in sorted_indices]
+        # Sort by median latency (descending)
+        function_names = sorted(latency_metrics, key=lambda name: latency_metrics[name].quantile(0.5), reverse=True)
+        median_times = [latency_metrics[name].quantile(0.5) for name in function_names]
+        p95_times = [latency_metrics[name].quantile(0.95) for name in function_names]
+        p99_times = [latency_metrics[name].quantile(0.99) for name in function_names]
         
         # Create figure
         plt.figure(figsize=(10, 6))
-        bars = plt.bar(function_names, mean_times, yerr=std_times, capsize=5, color='skyblue')
+        bars = plt.bar(function_names, median_times, color='skyblue', label="Median")
+        plt.scatter(function_names, p95_times, color='orange', marker='_', s=400, label="95th percentile")
+        plt.scatter(function_names, p99_times, color='red', marker='_', s=400, label="99th percentile")
         
         # Add labels and formatting
-        plt.title("Average Computation Time by Function Type")
-        plt.xlabel("Function Type")
-        plt.ylabel("Time (seconds)")
+        plt.title("Computation Latency by Operation")
+        plt.xlabel("Operation")
+        plt.ylabel("Time (ms)")
         plt.xticks(rotation=45, ha='right')
+        plt.legend()
         plt.tight_layout()
         
         # Add values on top of bars
-        for bar, value in zip(bars, mean_times):
+        for bar, value in zip(bars, median_times):
             plt.text(bar.get_x() + bar.get_width()/2, 
-                    bar.get_height() + 0.02,
-                    f'{value:.2f}s',
+                    bar.get_height(),
+                    f'{value:.1f}ms',
                     ha='center', va='bottom')
         
         # Save if requested
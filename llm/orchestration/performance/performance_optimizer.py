@@ -14,6 +14,7 @@ import threading
 from typing import Dict, List, Optional, Tuple, Union, Any
 
 from orchestration.performance.resource_manager import ResourceManager
+from orchestration.monitoring.profiling import section_stats
 from math_processing.computation.computation_cache import ComputationCache
 from math_processing.computation.parallel_processor import ParallelProcessor
 from database.optimization.query_optimizer import QueryOptimizer
@@ -69,6 +70,7 @@ class PerformanceOptimizer:
             "slow_response": self.config.get("slow_response_threshold", 2.0),  # seconds
             "low_cache_hit": self.config.get("low_cache_hit_threshold", 0.4),  # ratio
             "slow_query": self.config.get("slow_query_threshold", 0.5),  # seconds
+            "slow_hot_path": self.config.get("slow_hot_path_threshold", 500.0),  # milliseconds (p95)
         }
         
         # Start monitoring thread
@@ -264,6 +266,21 @@ class PerformanceOptimizer:
                 "recommendation": "Review index coverage or query patterns"
             })
         
+        # Check profiled hot paths, slowest first
+        slow_sections = sorted(
+            ((name, stats) for name, stats in section_stats().items()
+             if stats["p95"] > self.thresholds["slow_hot_path"]),
+            key=lambda item: item[1]["p95"],
+            reverse=True
+        )
+        for name, stats in slow_sections:
+            bottlenecks.append({
+                "type": f"slow_hot_path_{name}",
+                "value": stats["p95"],
+                "threshold": self.thresholds["slow_hot_path"],
+                "recommendation": f"Profile the '{name}' path; p95 is {stats['p95']:.1f} ms over {stats['count']} calls"
+            })
+        
         return bottlenecks
     
     def get_optimization_recommendations(self) -> List[Dict[str, Any]]:
@@ -4,15 +4,16 @@ Provides dynamic resource allocation, request scheduling, and overload protectio
 """
 import time
 import threading
-import queue
 import logging
 import os
 import psutil
 import signal
 import atexit
 import json
-from typing import Dict, Any, List, Callable, Optional, Tuple, Union
-import numpy as np
+import functools
+import itertools
+from collections import deque
+from typing import Dict, Any, List, Callable, Optional, Tuple, Union, Deque
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, Future
 from math_llm_system.orchestration.monitoring.logger import get_logger
@@ -108,6 +109,15 @@ class ResourceManager:
         self.memory_usage = []
         self.gpu_usage = []
         
+        # Latest resource readings, refreshed by the monitoring thread so
+        # admission decisions never have to touch the history lists
+        self.resource_snapshot = {
+            "cpu_percent": 0.0,
+            "cpu_recent_avg": 0.0,
+            "memory_percent": 0.0,
+            "timestamp": 0.0
+        }
+        
         # Initialize thread and process pools
         self.thread_pool = ThreadPoolExecutor(
             max_workers=self.config["cpu"]["thread_pool_size"]
@@ -116,14 +126,19 @@ class ResourceManager:
             max_workers=self.config["cpu"]["process_pool_size"]
         )
         
-        # Initialize task queues by priority
-        self.task_queues = [
-            queue.PriorityQueue(self.config["scheduling"]["max_queue_size"])
-            for _ in range(self.config["scheduling"]["priority_levels"])
+        # Initialize task queues by priority. Each holds (submit_time, task)
+        # in FIFO order and is guarded by the scheduler condition, which is
+        # notified on every submit, completion and resource snapshot refresh
+        self.task_queues: List[Deque[Tuple[float, Dict[str, Any]]]] = [
+            deque() for _ in range(self.config["scheduling"]["priority_levels"])
         ]
+        self.scheduler_condition = threading.Condition()
+        self.queued_count = 0
+        self.running_count = 0
+        self._task_counter = itertools.count()
         
-        # Active tasks tracking
-        self.active_tasks = []
+        # Active tasks tracking, keyed by task ID
+        self.active_tasks: Dict[str, Dict[str, Any]] = {}
         self.active_tasks_lock = threading.Lock()
         
         # Initialize GPU resources if available
@@ -131,6 +146,9 @@ class ResourceManager:
         if self.config["gpu"]["enabled"] and HAS_TORCH:
             self._initialize_gpu_resources()
         
+        # Flag to indicate running state (set before the threads that check it)
+        self.running = True
+        
         # Start resource monitoring thread
         self.monitoring_thread = threading.Thread(
             target=self._monitor_resources,
@@ -145,9 +163,6 @@ class ResourceManager:
         )
         self.scheduler_thread.start()
         
-        # Flag to indicate running state
-        self.running = True
-        
         # Register cleanup handlers
         atexit.register(self.shutdown)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -233,6 +248,10 @@ class ResourceManager:
                 if len(self.memory_usage) > self.config["monitoring"]["history_size"]:
                     self.memory_usage = self.memory_usage[-self.config["monitoring"]["history_size"]:]
                 
+                # Refresh the admission snapshot and wake the scheduler in
+                # case it was holding tasks back for lack of resources
+                self._update_resource_snapshot(cpu_percent, memory_percent)
+                
                 # Monitor GPU usage if available
                 if self.config["gpu"]["enabled"] and self.gpu_devices:
                     self._update_gpu_usage()
@@ -253,6 +272,26 @@ class ResourceManager:
                 logger.error(f"Error in resource monitoring: {e}")
                 time.sleep(5)  # Sleep longer on error
     
+    def _update_resource_snapshot(self, cpu_percent: float, memory_percent: float):
+        """
+        Store the latest resource readings for admission decisions.
+        
+        Args:
+            cpu_percent: Latest CPU usage percentage
+            memory_percent: Latest memory usage percentage
+        """
+        recent_cpu = self.cpu_usage[-5:]
+        self.resource_snapshot = {
+            "cpu_percent": cpu_percent,
+            "cpu_recent_avg": sum(recent_cpu) / len(recent_cpu) if recent_cpu else cpu_percent,
+            "memory_percent": memory_percent,
+            "timestamp": time.time()
+        }
+        
+        with self.scheduler_condition:
+            if self.queued_count:
+                self.scheduler_condition.notify()
+    
     def _update_gpu_usage(self):
         """Update GPU usage statistics."""
         if not self.config["gpu"]["enabled"] or not self.gpu_devices:
@@ -317,8 +356,9 @@ class ResourceManager:
             self._handle_memory_overload()
         
         # Check CPU usage
-        if self.cpu_usage and np.mean(self.cpu_usage[-5:]) > self.config["monitoring"]["alert_threshold"]:
-            logger.warning(f"High CPU usage: {np.mean(self.cpu_usage[-5:])}%")
+        cpu_recent_avg = self.resource_snapshot["cpu_recent_avg"]
+        if self.cpu_usage and cpu_recent_avg > self.config["monitoring"]["alert_threshold"]:
+            logger.warning(f"High CPU usage: {cpu_recent_avg}%")
         
         # Check GPU memory usage
         if self.gpu_usage and self.config["gpu"]["enabled"]:
@@ -333,7 +373,7 @@ class ResourceManager:
         
         # Cancel low priority tasks
         with self.active_tasks_lock:
-            low_priority_tasks = [task for task in self.active_tasks 
+            low_priority_tasks = [task for task in self.active_tasks.values()
                                 if task.get("priority", 1) == 0]
             
             for task in low_priority_tasks:
@@ -342,12 +382,12 @@ class ResourceManager:
                     task["future"].cancel()
         
         # Clear all pending tasks from low priority queue
-        while not self.task_queues[0].empty():
-            try:
-                self.task_queues[0].get_nowait()
-                self.task_queues[0].task_done()
-            except queue.Empty:
-                break
+        with self.scheduler_condition:
+            dropped = [task for _, task in self.task_queues[0]]
+            self.queued_count -= len(dropped)
+            self.task_queues[0].clear()
+        for task in dropped:
+            self._abandon_queued_task(task)
         
         # Force garbage collection
         import gc
@@ -374,54 +414,81 @@ class ResourceManager:
                           f"Utilization {device_data.get('gpu_utilization', 0)}%")
     
     def _task_scheduler(self):
-        """Background thread for scheduling and executing tasks."""
+        """
+        Background thread for scheduling and executing tasks.
+        
+        The thread sleeps on the scheduler condition and only wakes when a
+        task is submitted, a task completes, the resource snapshot is
+        refreshed, or the manager shuts down.
+        """
         while self.running:
             try:
-                # Check resource availability before processing more tasks
-                if self._can_accept_more_tasks():
-                    # Try to get task from queues, starting with highest priority
-                    task = None
-                    for priority in range(self.config["scheduling"]["priority_levels"] - 1, -1, -1):
-                        try:
-                            # Get task from queue (non-blocking)
-                            # Queue items are (timestamp, task_info) tuples
-                            _, task = self.task_queues[priority].get_nowait()
-                            self.task_queues[priority].task_done()
-                            break
-                        except queue.Empty:
-                            continue
+                with self.scheduler_condition:
+                    task = self._next_admissible_task()
+                    while task is None and self.running:
+                        self.scheduler_condition.wait()
+                        task = self._next_admissible_task()
                     
-                    # If we found a task, execute it
-                    if task:
-                        self._execute_task(task)
+                    if task is None:
+                        break
+                    
+                    # Reserve the worker slot and make the task visible as
+                    # active before releasing the lock, so it is never
+                    # missing from both the queues and the active tasks
+                    self.running_count += 1
+                    task["start_time"] = time.time()
+                    with self.active_tasks_lock:
+                        self.active_tasks[task["id"]] = task
                 
-                # Sleep briefly to avoid busy waiting
-                time.sleep(0.01)
+                self._execute_task(task)
                 
             except Exception as e:
                 logger.error(f"Error in task scheduler: {e}")
                 time.sleep(1)
     
+    def _next_admissible_task(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the highest-priority queued task if resources allow.
+        
+        Within a priority level, tasks run in submission order. Must be
+        called with the scheduler condition held.
+        
+        Returns:
+            Task information dictionary, or None if nothing can run now
+        """
+        if not self.queued_count or not self._can_accept_more_tasks():
+            return None
+        
+        for priority in range(self.config["scheduling"]["priority_levels"] - 1, -1, -1):
+            if self.task_queues[priority]:
+                _, task = self.task_queues[priority].popleft()
+                self.queued_count -= 1
+                return task
+        
+        return None
+    
     def _can_accept_more_tasks(self) -> bool:
         """
         Check if system can accept more tasks based on resource usage.
         
+        Uses the running task counter and the cached resource snapshot, so
+        the check is O(1). Must be called with the scheduler condition held.
+        
         Returns:
             Boolean indicating if more tasks can be accepted
         """
         # Check active tasks count against CPU count
-        with self.active_tasks_lock:
-            active_count = len([t for t in self.active_tasks if "future" in t and not t["future"].done()])
-        
-        if active_count >= self.config["cpu"]["max_workers"]:
+        if self.running_count >= self.config["cpu"]["max_workers"]:
             return False
         
+        snapshot = self.resource_snapshot
+        
         # Check memory usage
-        if self.memory_usage and self.memory_usage[-1] > self.config["memory"]["max_usage_percent"]:
+        if snapshot["memory_percent"] > self.config["memory"]["max_usage_percent"]:
             return False
         
         # Check CPU usage
-        if self.cpu_usage and np.mean(self.cpu_usage[-5:]) > self.config["cpu"]["max_workers"] * 100 / os.cpu_count():
+        if snapshot["cpu_recent_avg"] > self.config["cpu"]["max_workers"] * 100 / os.cpu_count():
             return False
         
         # We can accept more tasks
@@ -440,26 +507,32 @@ class ResourceManager:
         else:
             executor = self.thread_pool
         
-        # Submit task to executor
-        future = executor.submit(
-            self._wrapped_task_execution,
-            task.get("func"),
-            task.get("args", ()),
-            task.get("kwargs", {})
-        )
+        # Submit task to executor (the scheduler has already added it to
+        # the active tasks)
+        try:
+            future = executor.submit(
+                self._wrapped_task_execution,
+                task.get("func"),
+                task.get("args", ()),
+                task.get("kwargs", {})
+            )
+        except Exception:
+            # Release the worker slot reserved by the scheduler
+            with self.active_tasks_lock:
+                self.active_tasks.pop(task["id"], None)
+            with self.scheduler_condition:
+                self.running_count -= 1
+                self.scheduler_condition.notify()
+            self._abandon_queued_task(task)
+            raise
+        
+        task["future"] = future
         
         # Add completion callback
         future.add_done_callback(
             lambda f: self._task_completed_callback(f, task)
         )
         
-        # Add to active tasks
-        task["future"] = future
-        task["start_time"] = time.time()
-        
-        with self.active_tasks_lock:
-            self.active_tasks.append(task)
-        
         logger.debug(f"Task {task.get('id', 'unknown')} started with "
                    f"priority {task.get('priority', 1)}")
     
@@ -537,7 +610,7 @@ class ResourceManager:
                 completion_status = "error"
         
         # Execute completion callback if provided
-        if "completion_callback" in task:
+        if task.get("completion_callback"):
             try:
                 callback_func = task["completion_callback"]
                 callback_func(task, future, completion_status)
@@ -546,7 +619,29 @@ class ResourceManager:
         
         # Remove from active tasks
         with self.active_tasks_lock:
-            self.active_tasks = [t for t in self.active_tasks if t.get("id") != task.get("id")]
+            self.active_tasks.pop(task.get("id"), None)
+        
+        # Free the worker slot and wake the scheduler
+        with self.scheduler_condition:
+            self.running_count -= 1
+            self.scheduler_condition.notify()
+    
+    def _abandon_queued_task(self, task: Dict[str, Any]):
+        """
+        Report a queued task that was removed without running as cancelled.
+        
+        Must be called without the scheduler condition held, since the
+        completion callback may submit or cancel tasks.
+        
+        Args:
+            task: Task information dictionary
+        """
+        logger.info(f"Task {task.get('id', 'unknown')} was cancelled before it started")
+        if task.get("completion_callback"):
+            try:
+                task["completion_callback"](task, None, "cancelled")
+            except Exception as e:
+                logger.error(f"Error in completion callback: {e}")
     
     def submit_task(self, func: Callable, args: tuple = None, kwargs: dict = None,
                   priority: int = 1, task_id: str = None, use_process_pool: bool = False,
@@ -561,14 +656,16 @@ class ResourceManager:
             priority: Task priority (0-2, higher is more important)
             task_id: Optional task identifier
             use_process_pool: Whether to use process pool instead of thread pool
-            completion_callback: Optional callback for task completion
+            completion_callback: Optional callback for task completion, called
+                with the task, its future (None if the task was cancelled
+                before it started) and the completion status
             
         Returns:
             Task ID
         """
         # Generate task ID if not provided
         if task_id is None:
-            task_id = f"task_{int(time.time())}_{id(func)}"
+            task_id = f"task_{int(time.time())}_{id(func)}_{next(self._task_counter)}"
         
         # Normalize arguments
         if args is None:
@@ -593,13 +690,17 @@ class ResourceManager:
         
         # Add to appropriate queue with timestamp for FIFO within same priority
         submit_timestamp = time.time()
-        try:
-            self.task_queues[priority].put((submit_timestamp, task))
-            logger.debug(f"Task {task_id} submitted with priority {priority}")
-            return task_id
-        except queue.Full:
-            logger.error(f"Task queue {priority} is full, rejecting task {task_id}")
-            raise RuntimeError(f"Task queue {priority} is full")
+        with self.scheduler_condition:
+            if len(self.task_queues[priority]) >= self.config["scheduling"]["max_queue_size"]:
+                logger.error(f"Task queue {priority} is full, rejecting task {task_id}")
+                raise RuntimeError(f"Task queue {priority} is full")
+            
+            self.task_queues[priority].append((submit_timestamp, task))
+            self.queued_count += 1
+            self.scheduler_condition.notify()
+        
+        logger.debug(f"Task {task_id} submitted with priority {priority}")
+        return task_id
     
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """
@@ -613,7 +714,7 @@ class ResourceManager:
         """
         # Check active tasks
         with self.active_tasks_lock:
-            active_task = next((t for t in self.active_tasks if t.get("id") == task_id), None)
+            active_task = self.active_tasks.get(task_id)
         
         if active_task:
             # Task is active, check future status
@@ -642,35 +743,21 @@ class ResourceManager:
             }
         
         # Check pending tasks in queues
-        for priority, queue_obj in enumerate(self.task_queues):
-            # Create a temporary copy of the queue to avoid modifying it
-            temp_queue = []
+        with self.scheduler_condition:
             found_task = None
-            
-            # Search through queue
-            try:
-                while not queue_obj.empty():
-                    item = queue_obj.get_nowait()
-                    temp_queue.append(item)
-                    
-                    if item[1].get("id") == task_id:
-                        found_task = item[1]
-            except queue.Empty:
-                pass
-            
-            # Restore queue
-            for item in temp_queue:
-                queue_obj.put(item)
-            
-            # If task found, return status
-            if found_task:
-                return {
-                    "id": task_id,
-                    "status": "queued",
-                    "priority": priority,
-                    "submit_time": found_task.get("submit_time"),
-                    "queue_time": time.time() - found_task.get("submit_time", time.time())
-                }
+            for priority, task_queue in enumerate(self.task_queues):
+                found_task = next((t for _, t in task_queue if t.get("id") == task_id), None)
+                if found_task:
+                    break
+        
+        if found_task:
+            return {
+                "id": task_id,
+                "status": "queued",
+                "priority": priority,
+                "submit_time": found_task.get("submit_time"),
+                "queue_time": time.time() - found_task.get("submit_time", time.time())
+            }
         
         # Task not found
         return {
@@ -690,7 +777,7 @@ class ResourceManager:
         """
         # Check active tasks
         with self.active_tasks_lock:
-            active_task = next((t for t in self.active_tasks if t.get("id") == task_id), None)
+            active_task = self.active_tasks.get(task_id)
         
         if active_task:
             # Task is active, try to cancel its future
@@ -700,33 +787,25 @@ class ResourceManager:
             return False
         
         # Check pending tasks in queues
-        for priority, queue_obj in enumerate(self.task_queues):
-            # Create a temporary copy of the queue to avoid losing data
-            temp_queue = []
-            found_task = False
-            
-            # Search through queue
-            try:
-                while not queue_obj.empty():
-                    timestamp, task = queue_obj.get_nowait()
-                    
-                    if task.get("id") == task_id:
-                        found_task = True
+        with self.scheduler_condition:
+            cancelled = None
+            for priority, task_queue in enumerate(self.task_queues):
+                for item in task_queue:
+                    if item[1].get("id") == task_id:
+                        task_queue.remove(item)
+                        self.queued_count -= 1
+                        cancelled = item[1]
                         logger.info(f"Cancelled queued task {task_id} with priority {priority}")
-                    else:
-                        temp_queue.append((timestamp, task))
-            except queue.Empty:
-                pass
-            
-            # Restore queue without the cancelled task
-            for item in temp_queue:
-                queue_obj.put(item)
-            
-            if found_task:
-                return True
+                        break
+                if cancelled is not None:
+                    break
         
-        # Task not found
-        return False
+        if cancelled is None:
+            # Task not found
+            return False
+        
+        self._abandon_queued_task(cancelled)
+        return True
     
     def get_resource_usage(self) -> Dict[str, Any]:
         """
@@ -736,8 +815,8 @@ class ResourceManager:
             Dictionary with resource usage information
         """
         # Get current CPU and memory usage
-        cpu_percent = np.mean(self.cpu_usage[-5:]) if self.cpu_usage else 0
-        memory_percent = self.memory_usage[-1] if self.memory_usage else 0
+        cpu_percent = self.resource_snapshot["cpu_recent_avg"]
+        memory_percent = self.resource_snapshot["memory_percent"]
         
         # Get memory details
         memory = psutil.virtual_memory()
@@ -748,13 +827,14 @@ class ResourceManager:
             gpu_info = self.gpu_usage[-1] if self.gpu_usage else []
         
         # Get task queue sizes
-        queue_sizes = [q.qsize() for q in self.task_queues]
+        with self.scheduler_condition:
+            queue_sizes = [len(q) for q in self.task_queues]
         
         # Get active task count
         with self.active_tasks_lock:
             active_count = len(self.active_tasks)
             active_by_priority = {}
-            for task in self.active_tasks:
+            for task in self.active_tasks.values():
                 priority = task.get("priority", 1)
                 active_by_priority[priority] = active_by_priority.get(priority, 0) + 1
         
@@ -805,7 +885,7 @@ class ResourceManager:
         with self.active_tasks_lock:
             # Create a copy with only safe information
             active_task_info = []
-            for task in self.active_tasks:
+            for task in self.active_tasks.values():
                 task_info = {
                     "id": task.get("id"),
                     "priority": task.get("priority", 1),
@@ -883,6 +963,17 @@ class ResourceManager:
         logger.info("Shutting down resource manager")
         self.running = False
         
+        # Wake the scheduler so it can observe the shutdown, and release
+        # anyone waiting on tasks that will now never run
+        with self.scheduler_condition:
+            abandoned = [task for task_queue in self.task_queues for _, task in task_queue]
+            for task_queue in self.task_queues:
+                task_queue.clear()
+            self.queued_count = 0
+            self.scheduler_condition.notify_all()
+        for task in abandoned:
+            self._abandon_queued_task(task)
+        
         # Shutdown thread pool
         logger.debug("Shutting down thread pool")
         self.thread_pool.shutdown(wait=False)
@@ -913,14 +1004,20 @@ class ResourceManager:
         self.shutdown()
 
 
+# Interval at which resource_managed callers check that their task still exists
+TASK_WAIT_CHECK_INTERVAL = 5.0
+
+
 # Decorator for resource-managed execution
-def resource_managed(priority: int = 1, use_process_pool: bool = False):
+def resource_managed(priority: int = 1, use_process_pool: bool = False,
+                     timeout: Optional[float] = None):
     """
     Decorator for executing functions with resource management.
     
     Args:
         priority: Task priority (0-2, higher is more important)
         use_process_pool: Whether to use process pool instead of thread pool
+        timeout: Optional maximum time in seconds to wait for the result
         
     Returns:
         Decorated function
@@ -931,38 +1028,53 @@ def resource_managed(priority: int = 1, use_process_pool: bool = False):
             # Get resource manager
             resource_manager = ResourceManager()
             
+            # Wait on the completion callback rather than polling task status
+            done = threading.Event()
+            outcome = {}
+            
+            def on_complete(task, future, completion_status):
+                outcome["future"] = future
+                outcome["status"] = completion_status
+                done.set()
+            
             # Submit task and wait for result
             task_id = resource_manager.submit_task(
                 func=func,
                 args=args,
                 kwargs=kwargs,
                 priority=priority,
-                use_process_pool=use_process_pool
+                use_process_pool=use_process_pool,
+                completion_callback=on_complete
             )
             
-            # Wait for task to complete
-            while True:
-                status = resource_manager.get_task_status(task_id)
-                if status["status"] in ["completed", "failed", "cancelled"]:
+            # The wait is bounded: a task that disappears without reporting
+            # (which should not happen) fails the call instead of hanging it
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not done.is_set():
+                interval = TASK_WAIT_CHECK_INTERVAL
+                if deadline is not None:
+                    interval = min(interval, max(0.0, deadline - time.monotonic()))
+                if done.wait(interval):
                     break
-                time.sleep(0.1)
+                if deadline is not None and time.monotonic() >= deadline:
+                    resource_manager.cancel_task(task_id)
+                    raise TimeoutError(f"Task {task_id} did not finish within {timeout} seconds")
+                if resource_manager.get_task_status(task_id)["status"] == "not_found" \
+                        and not done.is_set():
+                    raise RuntimeError(f"Task execution failed: task {task_id} was lost")
             
-            # Check for active task with this ID
-            with resource_manager.active_tasks_lock:
-                active_task = next((t for t in resource_manager.active_tasks if t.get("id") == task_id), None)
+            if outcome["status"] == "cancelled":
+                raise RuntimeError("Task execution failed: task was cancelled")
             
-            if active_task and "future" in active_task:
-                future = active_task["future"]
-                try:
-                    # Get result (will raise exception if task failed)
-                    result_data = future.result()
-                    if not result_data.get("success", False):
-                        raise RuntimeError(f"Task failed: {result_data.get('error', 'Unknown error')}")
-                    return result_data.get("result")
-                except Exception as e:
-                    raise RuntimeError(f"Task execution failed: {str(e)}")
+            try:
+                # Get result (will raise exception if task failed)
+                result_data = outcome["future"].result()
+            except Exception as e:
+                raise RuntimeError(f"Task execution failed: {str(e)}")
             
-            raise RuntimeError(f"Task {task_id} not found or did not complete")
+            if not result_data.get("success", False):
+                raise RuntimeError(f"Task failed: {result_data.get('error', 'Unknown error')}")
+            return result_data.get("result")
         
         return wrapper
     
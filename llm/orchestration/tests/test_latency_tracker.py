@@ -0,0 +1,179 @@
+"""
+Unit tests for observed latency tracking.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from orchestration.agents.communication import AgentCommunication
+from orchestration.agents.latency_tracker import LatencyTracker
+from orchestration.message_bus.message_formats import MessageType
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """Tests for the LatencyTracker class."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("orchestration.agents.latency_tracker.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tracker = LatencyTracker(decay_seconds=10.0, outlier_min_samples=3)
+
+    def _request(self, agent_id: str, latency_ms: float, success: bool = True):
+        start = self.tracker.start_request(agent_id)
+        self.clock.now += latency_ms / 1000
+        self.tracker.end_request(agent_id, start, success)
+
+    def test_in_flight_counting(self):
+        """Test that outstanding requests are counted."""
+        start = self.tracker.start_request("agent_a")
+        self.tracker.start_request("agent_a")
+        self.assertEqual(self.tracker.in_flight("agent_a"), 2)
+
+        self.tracker.end_request("agent_a", start)
+        self.assertEqual(self.tracker.in_flight("agent_a"), 1)
+
+    def test_peak_ewma(self):
+        """Test that latency spikes apply at once and decay gradually."""
+        self._request("agent_a", 50)
+        self.assertAlmostEqual(self.tracker.ewma_latency("agent_a"), 50, places=3)
+
+        self._request("agent_a", 500)
+        self.assertAlmostEqual(self.tracker.ewma_latency("agent_a"), 500, places=3)
+
+        self.clock.now += 10
+        self._request("agent_a", 50)
+        ewma = self.tracker.ewma_latency("agent_a")
+        self.assertLess(ewma, 500)
+        self.assertGreater(ewma, 50)
+
+    def test_cost_includes_queue(self):
+        """Test that peak-EWMA cost grows with outstanding requests."""
+        self._request("agent_a", 100)
+        idle_cost = self.tracker.peak_ewma_cost("agent_a")
+        self.tracker.start_request("agent_a")
+        self.assertAlmostEqual(self.tracker.peak_ewma_cost("agent_a"), idle_cost * 2)
+
+    def test_consecutive_failure_ejection(self):
+        """Test that repeated failures eject an agent temporarily."""
+        for _ in range(self.tracker.max_consecutive_failures):
+            self._request("agent_a", 10, success=False)
+        self.assertFalse(self.tracker.is_available("agent_a"))
+
+        self.clock.now += self.tracker.base_ejection_seconds + 1
+        self.assertTrue(self.tracker.is_available("agent_a"))
+
+    def test_latency_outlier_ejection(self):
+        """Test that an agent much slower than its peers is ejected."""
+        for _ in range(3):
+            self._request("agent_a", 20)
+            self._request("agent_b", 25)
+            self._request("agent_c", 2000)
+
+        ejected = self.tracker.check_outliers("integrate", ["agent_a", "agent_b", "agent_c"])
+        self.assertEqual(ejected, ["agent_c"])
+        self.assertEqual(
+            self.tracker.filter_available(["agent_a", "agent_b", "agent_c"]),
+            ["agent_a", "agent_b"]
+        )
+
+    def test_ejected_agent_recovers(self):
+        """Test that an ejected outlier is not re-ejected before serving probes."""
+        agents = ["agent_a", "agent_b", "agent_c"]
+        for _ in range(3):
+            self._request("agent_a", 20)
+            self._request("agent_b", 25)
+            self._request("agent_c", 2000)
+        self.assertEqual(self.tracker.check_outliers("integrate", agents), ["agent_c"])
+
+        self.clock.now += self.tracker.base_ejection_seconds + 1
+        self.assertTrue(self.tracker.is_available("agent_c"))
+        self.assertLess(self.tracker.ewma_latency("agent_c"), 200)
+        self.assertEqual(self.tracker.check_outliers("integrate", agents), [])
+
+        # Healthy probes keep it in rotation
+        for _ in range(3):
+            self._request("agent_a", 20)
+            self._request("agent_b", 25)
+            self._request("agent_c", 30)
+        self.clock.now += self.tracker.outlier_check_interval
+        self.assertEqual(self.tracker.check_outliers("integrate", agents), [])
+        self.assertTrue(self.tracker.is_available("agent_c"))
+
+    def test_ejection_count_resets_after_healthy_window(self):
+        """Test that repeated-ejection backoff is forgotten after a healthy period."""
+        for _ in range(self.tracker.max_consecutive_failures):
+            self._request("agent_a", 10, success=False)
+        self.assertEqual(self.tracker.stats["agent_a"].ejection_count, 1)
+
+        self.clock.now += self.tracker.base_ejection_seconds + self.tracker.ejection_reset_seconds
+        self._request("agent_a", 10)
+
+        self.assertEqual(self.tracker.stats["agent_a"].ejection_count, 0)
+
+    def test_all_ejected_falls_back(self):
+        """Test that candidates are kept when every one of them is ejected."""
+        for _ in range(self.tracker.max_consecutive_failures):
+            self._request("agent_a", 10, success=False)
+        self.assertEqual(self.tracker.filter_available(["agent_a"]), ["agent_a"])
+
+
+class TestRequestTracking(unittest.IsolatedAsyncioTestCase):
+    """Tests that AgentCommunication.request always releases its in-flight count."""
+
+    def setUp(self):
+        self.bus = AsyncMock()
+        patcher = patch("orchestration.agents.communication.get_message_bus", return_value=self.bus)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.communication = AgentCommunication("caller")
+        self.tracker = LatencyTracker()
+        self.communication.latency_tracker = self.tracker
+
+    async def _request(self, timeout=5):
+        return await self.communication.request("agent_a", MessageType.QUERY, {}, timeout=timeout)
+
+    async def test_send_error_releases_request(self):
+        """Test that a send raising an error is not left in flight."""
+        self.bus.send_message.side_effect = ConnectionError("bus down")
+
+        self.assertEqual(await self._request(), (False, None))
+        self.assertEqual(self.tracker.in_flight("agent_a"), 0)
+        self.assertEqual(self.communication.pending_requests, {})
+
+    async def test_timeout_releases_request(self):
+        """Test that a timed out request is released once."""
+        self.bus.send_message.return_value = True
+
+        self.assertEqual(await self._request(timeout=0.01), (False, None))
+        self.assertEqual(self.tracker.in_flight("agent_a"), 0)
+        self.assertEqual(self.tracker.get_stats()["agent_a"]["consecutive_failures"], 1)
+
+    async def test_cancellation_releases_request(self):
+        """Test that cancelling the caller releases the request."""
+        self.bus.send_message.return_value = True
+        task = asyncio.create_task(self._request())
+        await asyncio.sleep(0)
+        self.assertEqual(self.tracker.in_flight("agent_a"), 1)
+
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self.tracker.in_flight("agent_a"), 0)
+        self.assertEqual(self.communication.pending_requests, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the asynchronous logging pipeline.
+"""
+
+import io
+import logging
+import unittest
+
+from orchestration.monitoring.logger import AsyncLogHandler
+
+
+class CountingRepr:
+    """Object that counts how often it is formatted."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "formatted"
+
+
+class TestAsyncLogHandler(unittest.TestCase):
+    """Tests for the AsyncLogHandler class."""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        target = logging.StreamHandler(self.stream)
+        target.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        # A long interval keeps the writer thread out of the way
+        self.handler = AsyncLogHandler([target], flush_interval=60, rate_limit=3, rate_window=60)
+        self.logger = logging.getLogger(f"test_async_logging.{self.id()}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.handler.close)
+
+    def _lines(self):
+        self.handler.flush()
+        return self.stream.getvalue().splitlines()
+
+    def test_formatting_is_deferred(self):
+        """Test that arguments are formatted by the writer, not the caller."""
+        value = CountingRepr()
+        self.logger.info("value: %s", value)
+        self.assertEqual(value.calls, 0)
+        self.assertEqual(self.stream.getvalue(), "")
+
+        self.assertEqual(self._lines(), ["INFO value: formatted"])
+        self.assertEqual(value.calls, 1)
+
+    def test_rate_limit_per_call_site(self):
+        """Test that a call site over its limit is suppressed and summarized."""
+        for i in range(10):
+            self.logger.info("request %d", i)
+        lines = self._lines()
+        self.assertEqual(lines, ["INFO request 0", "INFO request 1", "INFO request 2"])
+
+        summaries = []
+        self.handler.rate_limiter.expire(float("inf"), summaries)
+        self.assertEqual(len(summaries), 1)
+        self.assertIn("Suppressed 7 similar messages", summaries[0].getMessage())
+
+    def test_repeats_are_collapsed(self):
+        """Test that consecutive identical messages are written once."""
+        self.handler.rate_limiter = None
+        for _ in range(5):
+            self.logger.warning("disk almost full")
+        self.logger.warning("disk full")
+        self.assertEqual(self._lines(), [
+            "WARNING disk almost full",
+            "WARNING Last message repeated 4 times",
+            "WARNING disk full"
+        ])
+
+    def test_bounded_queue(self):
+        """Test that a full queue drops the oldest records and reports it."""
+        self.handler.rate_limiter = None
+        self.handler.capacity = 2
+        self.handler._queue = type(self.handler._queue)(maxlen=2)
+        for i in range(5):
+            self.logger.info("message %d", i)
+        lines = self._lines()
+        self.assertEqual(lines[:2], ["INFO message 3", "INFO message 4"])
+        self.assertIn("dropped 3 records", lines[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Unit tests for the message processor scheduler.
+"""
+
+import asyncio
+import time
+import unittest
+
+from orchestration.message_bus.message_formats import (
+    MessagePriority,
+    MessageType,
+    create_message
+)
+from orchestration.message_bus.message_handler import MessageProcessor, MessageRouter
+
+
+def _message(priority: MessagePriority, message_type: MessageType = MessageType.QUERY):
+    return create_message(
+        message_type=message_type,
+        sender="test_sender",
+        recipient="test_recipient",
+        body={},
+        priority=priority
+    )
+
+
+class TestMessageSelection(unittest.IsolatedAsyncioTestCase):
+    """Tests for dispatch order without running workers."""
+
+    async def _drain(self, processor: MessageProcessor, count: int):
+        order = []
+        for _ in range(count):
+            priority, _, message = await processor._next_message()
+            await processor._release(message.header.message_type)
+            order.append(priority)
+        return order
+
+    async def test_strict_priority(self):
+        """Test that strict dispatch always serves the highest priority first."""
+        processor = MessageProcessor(MessageRouter(), policy=MessageProcessor.POLICY_STRICT)
+        for priority in [MessagePriority.LOW, MessagePriority.NORMAL, MessagePriority.CRITICAL]:
+            await processor.enqueue_message(_message(priority))
+
+        order = await self._drain(processor, 3)
+        self.assertEqual(order, [MessagePriority.CRITICAL, MessagePriority.NORMAL, MessagePriority.LOW])
+
+    async def test_weighted_fair_share(self):
+        """Test that weighted-fair dispatch serves levels in proportion to weight."""
+        processor = MessageProcessor(
+            MessageRouter(),
+            priority_weights={MessagePriority.CRITICAL: 3, MessagePriority.LOW: 1}
+        )
+        for _ in range(20):
+            await processor.enqueue_message(_message(MessagePriority.CRITICAL))
+            await processor.enqueue_message(_message(MessagePriority.LOW))
+
+        order = await self._drain(processor, 8)
+        self.assertEqual(order.count(MessagePriority.CRITICAL), 6)
+        self.assertEqual(order.count(MessagePriority.LOW), 2)
+
+    async def test_aging_prevents_starvation(self):
+        """Test that a message past the aging threshold jumps the queue."""
+        processor = MessageProcessor(
+            MessageRouter(),
+            policy=MessageProcessor.POLICY_STRICT,
+            aging_threshold=0.01
+        )
+        await processor.enqueue_message(_message(MessagePriority.LOW))
+        await asyncio.sleep(0.02)
+        await processor.enqueue_message(_message(MessagePriority.CRITICAL))
+
+        order = await self._drain(processor, 1)
+        self.assertEqual(order, [MessagePriority.LOW])
+        self.assertEqual(processor.stats["aged_dispatches"], 1)
+
+    async def test_type_concurrency_limit(self):
+        """Test that a type at its concurrency limit is skipped."""
+        processor = MessageProcessor(MessageRouter(), policy=MessageProcessor.POLICY_STRICT)
+        await processor.enqueue_message(_message(MessagePriority.CRITICAL, MessageType.HEARTBEAT))
+        await processor.enqueue_message(_message(MessagePriority.CRITICAL, MessageType.HEARTBEAT))
+        await processor.enqueue_message(_message(MessagePriority.LOW, MessageType.COMPUTATION_RESULT))
+
+        # First heartbeat takes the only heartbeat slot and stays in flight
+        _, _, first = await processor._next_message()
+        self.assertEqual(first.header.message_type, MessageType.HEARTBEAT)
+
+        _, _, second = await processor._next_message()
+        self.assertEqual(second.header.message_type, MessageType.COMPUTATION_RESULT)
+
+        stats = processor.get_queue_stats()
+        self.assertEqual(stats["queue_depth"][MessagePriority.CRITICAL.value], 1)
+
+    async def test_fifo_across_eligibility_classes(self):
+        """Test that a level dispatches in arrival order while skipping types at their limit."""
+        processor = MessageProcessor(MessageRouter(), policy=MessageProcessor.POLICY_STRICT)
+        types = [MessageType.HEARTBEAT, MessageType.QUERY, MessageType.HEARTBEAT,
+                 MessageType.LOG, MessageType.QUERY]
+        for message_type in types:
+            await processor.enqueue_message(_message(MessagePriority.NORMAL, message_type))
+
+        # The first heartbeat stays in flight, so the second one waits
+        dispatched = []
+        for _ in range(4):
+            _, _, message = await processor._next_message()
+            dispatched.append(message.header.message_type)
+        self.assertEqual(dispatched, [MessageType.HEARTBEAT, MessageType.QUERY,
+                                      MessageType.LOG, MessageType.QUERY])
+
+        await processor._release(MessageType.HEARTBEAT)
+        _, _, message = await processor._next_message()
+        self.assertEqual(message.header.message_type, MessageType.HEARTBEAT)
+        self.assertEqual(processor.get_queue_stats()["queue_depth"][MessagePriority.NORMAL.value], 0)
+
+
+class TestWorkerPool(unittest.IsolatedAsyncioTestCase):
+    """Tests for the running worker pool."""
+
+    async def test_workers_process_concurrently(self):
+        """Test that messages of one priority are processed in parallel."""
+        processor = MessageProcessor(MessageRouter(), num_workers=4)
+        done = []
+
+        async def slow_process(message):
+            await asyncio.sleep(0.05)
+            done.append(message.header.message_id)
+            return True
+
+        processor._process_message = slow_process
+        await processor.start()
+        try:
+            start = time.monotonic()
+            for _ in range(4):
+                await processor.enqueue_message(_message(MessagePriority.NORMAL))
+            while len(done) < 4:
+                await asyncio.sleep(0.01)
+            self.assertLess(time.monotonic() - start, 0.15)
+        finally:
+            await processor.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for MCP message serialization.
+"""
+
+import json
+import unittest
+
+from orchestration.message_bus.message_formats import (
+    Message,
+    MessageType,
+    OCRRequestBody,
+    create_computation_request,
+    create_message
+)
+from orchestration.message_bus.serialization import (
+    CONTENT_TYPE_JSON,
+    CONTENT_TYPE_MSGPACK,
+    MSGPACK_AVAILABLE,
+    CodecError,
+    decode_message,
+    encode_message,
+    negotiate_content_type
+)
+
+
+def _ocr_message(image_bytes: bytes) -> Message:
+    body = OCRRequestBody(image_data=image_bytes).dict()
+    return create_message(
+        message_type=MessageType.OCR_REQUEST,
+        sender="input_agent",
+        recipient="ocr_agent",
+        body=body
+    )
+
+
+class TestJSONCodec(unittest.TestCase):
+    """Tests for the JSON codec."""
+
+    def test_round_trip(self):
+        """Test that a computation request survives encoding and decoding."""
+        message = create_computation_request(
+            sender="core_llm_agent",
+            expression="x^2 + 3x",
+            operation="derivative",
+            variables=["x"]
+        )
+        payload, content_type = encode_message(message, CONTENT_TYPE_JSON)
+        self.assertEqual(content_type, CONTENT_TYPE_JSON)
+
+        decoded = decode_message(payload, content_type)
+        self.assertEqual(decoded.header.message_id, message.header.message_id)
+        self.assertEqual(decoded.header.message_type, MessageType.COMPUTATION_REQUEST)
+        self.assertEqual(decoded.body, message.body)
+
+    def test_legacy_consumers_can_parse(self):
+        """Test that JSON output is still a plain Message document."""
+        message = _ocr_message(b"\x89PNG\r\n")
+        payload, _ = encode_message(message, CONTENT_TYPE_JSON)
+
+        legacy = Message.parse_raw(payload)
+        self.assertIsInstance(legacy.body["image_data"], str)
+
+        # Codec-aware receivers get the bytes back
+        decoded = decode_message(payload, None)
+        self.assertEqual(decoded.body["image_data"], b"\x89PNG\r\n")
+
+    def test_invalid_payload(self):
+        """Test that malformed payloads raise CodecError."""
+        with self.assertRaises(CodecError):
+            decode_message(b"{not json", CONTENT_TYPE_JSON)
+
+
+@unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack is not installed")
+class TestMsgPackCodec(unittest.TestCase):
+    """Tests for the msgpack codec."""
+
+    def test_binary_attachment_round_trip(self):
+        """Test that binary body values are carried out of band."""
+        image_bytes = bytes(range(256)) * 64
+        message = _ocr_message(image_bytes)
+
+        payload, content_type = encode_message(message, CONTENT_TYPE_MSGPACK)
+        self.assertEqual(content_type, CONTENT_TYPE_MSGPACK)
+
+        # No base64 inflation: the frame is barely larger than the image
+        json_payload, _ = encode_message(message, CONTENT_TYPE_JSON)
+        self.assertLess(len(payload), len(json_payload))
+
+        decoded = decode_message(payload, content_type)
+        self.assertEqual(decoded.body["image_data"], image_bytes)
+        self.assertEqual(decoded.header.route.recipient, "ocr_agent")
+
+
+class TestContentNegotiation(unittest.TestCase):
+    """Tests for content type negotiation."""
+
+    def test_unadvertised_recipient_gets_json(self):
+        """Test that recipients without advertised formats get JSON."""
+        self.assertEqual(negotiate_content_type(None), CONTENT_TYPE_JSON)
+
+    def test_json_only_recipient(self):
+        """Test that JSON-only recipients get JSON."""
+        self.assertEqual(
+            negotiate_content_type([CONTENT_TYPE_JSON], CONTENT_TYPE_MSGPACK),
+            CONTENT_TYPE_JSON
+        )
+
+    @unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack is not installed")
+    def test_binary_capable_recipient(self):
+        """Test that the preferred binary format is chosen when supported."""
+        self.assertEqual(
+            negotiate_content_type([CONTENT_TYPE_MSGPACK, CONTENT_TYPE_JSON]),
+            CONTENT_TYPE_MSGPACK
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Unit tests for the metrics registry.
+"""
+
+import random
+import threading
+import unittest
+
+from orchestration.monitoring.dashboard_config import evaluate_expr
+from orchestration.monitoring.metrics import MetricsCollector, MetricsRegistry
+
+
+class TestMetricCounter(unittest.TestCase):
+    """Tests for sharded counters."""
+
+    def test_concurrent_increments(self):
+        """Test that increments from many threads are not lost."""
+        counter = MetricsRegistry().counter("requests")
+
+        def work():
+            for _ in range(10000):
+                counter.increment()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        counter.increment(5)
+        self.assertEqual(counter.value, 40005)
+        # Shards of finished threads are folded away
+        self.assertEqual(len(counter._shards), 1)
+
+    def test_rate(self):
+        """Test that the sliding-window rate reflects recent increments."""
+        counter = MetricsRegistry().counter("requests")
+        counter.increment(120)
+        self.assertAlmostEqual(counter.rate(60), 2.0)
+
+    def test_reset(self):
+        """Test that reset clears the value and rate."""
+        counter = MetricsRegistry().counter("requests")
+        counter.increment(3)
+        counter.reset()
+        self.assertEqual(counter.value, 0)
+        self.assertEqual(counter.rate(), 0)
+
+
+class TestMetricHistogram(unittest.TestCase):
+    """Tests for log-linear histograms."""
+
+    def test_quantiles(self):
+        """Test that quantiles are within the bucket resolution."""
+        histogram = MetricsRegistry().histogram("latency")
+        rng = random.Random(42)
+        values = sorted(rng.expovariate(1 / 50) for _ in range(20000))
+        for value in values:
+            histogram.observe(value)
+
+        for q in (0.5, 0.95, 0.99):
+            expected = values[int(q * len(values)) - 1]
+            self.assertAlmostEqual(histogram.quantile(q), expected, delta=expected * 0.02)
+        self.assertEqual(histogram.quantile(1.0), values[-1])
+
+    def test_fixed_bucket_counts(self):
+        """Test that counts per configured bucket are preserved."""
+        histogram = MetricsRegistry().histogram("size", buckets=[10, 100])
+        for value in [0, 5, 10, 50, 500]:
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [3, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.sum, 565)
+
+
+class TestExport(unittest.TestCase):
+    """Tests for metric export."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.counter("message_bus.messages.total", "Messages processed").increment(7)
+        self.registry.gauge("queue.depth", labels={"priority": "high"}).set(3)
+        histogram = self.registry.histogram("processing.ms", labels={"agent": "a\"b"})
+        for value in range(1, 101):
+            histogram.observe(value)
+
+    def test_prometheus_format(self):
+        """Test the Prometheus text exposition output."""
+        text = self.registry.export_metrics("prometheus")
+        self.assertIn("# HELP message_bus_messages_total Messages processed\n", text)
+        self.assertIn("# TYPE message_bus_messages_total counter\n", text)
+        self.assertIn("message_bus_messages_total 7\n", text)
+        self.assertIn('queue_depth{priority="high"} 3\n', text)
+        self.assertIn("# TYPE processing_ms summary\n", text)
+        self.assertIn('processing_ms_count{agent="a\\"b"} 100\n', text)
+        self.assertIn('processing_ms{agent="a\\"b",quantile="0.5"}', text)
+
+    def test_collector_latency(self):
+        """Test that the collector reports histogram quantiles."""
+        latency = MetricsCollector(self.registry).get_latency_metrics()
+        stats = latency['processing.ms[agent=a"b]']
+        self.assertEqual(stats["count"], 100)
+        self.assertAlmostEqual(stats["p99"], 99, delta=1)
+
+    def test_collector_latency_excludes_other_units(self):
+        """Test that non-latency histograms such as message sizes are not reported as latency."""
+        self.registry.histogram("message_bus.message_size", unit="bytes").observe(50000)
+        latency = MetricsCollector(self.registry).get_latency_metrics()
+        self.assertNotIn("message_bus.message_size", latency)
+        self.assertIn('processing.ms[agent=a"b]', latency)
+
+    def test_dashboard_expressions(self):
+        """Test that dashboard expressions read from the registry."""
+        [series] = evaluate_expr("processing_ms{quantile='0.5'}", self.registry)
+        self.assertAlmostEqual(series["value"], 50, delta=1)
+        [series] = evaluate_expr("queue_depth{priority='high'}", self.registry)
+        self.assertEqual(series["value"], 3)
+        self.assertEqual(evaluate_expr("queue_depth{priority='low'}", self.registry), [])
+        [series] = evaluate_expr("rate(message_bus_messages_total[1m])", self.registry)
+        self.assertAlmostEqual(series["value"], 7 / 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
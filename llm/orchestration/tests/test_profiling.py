@@ -0,0 +1,121 @@
+"""
+Unit tests for hot path timers and the sampling profiler.
+"""
+
+import threading
+import time
+import unittest
+
+from orchestration.monitoring.profiling import (
+    SamplingProfiler, ProfilerBusyError, profile_section, profiled,
+    start_request_profile, end_request_profile, current_request_profile,
+    section_stats
+)
+
+
+class TestSectionTimers(unittest.TestCase):
+    """Tests for section timers and request profiles."""
+
+    def test_sections_recorded_in_request_profile(self):
+        """Test that sections add up in the active request profile."""
+        profile, token = start_request_profile()
+        try:
+            with profile_section("test_parse"):
+                pass
+            with profile_section("test_parse"):
+                pass
+            self.assertIs(current_request_profile(), profile)
+        finally:
+            end_request_profile(token)
+
+        self.assertIsNone(current_request_profile())
+        breakdown = profile.to_dict()
+        self.assertEqual(breakdown["sections"]["test_parse"]["calls"], 2)
+        self.assertGreaterEqual(section_stats()["test_parse"]["count"], 2)
+
+    def test_server_timing_format(self):
+        """Test the Server-Timing header value."""
+        profile, token = start_request_profile()
+        end_request_profile(token)
+        profile.add("render", 12.5)
+
+        header = profile.server_timing()
+        self.assertTrue(header.startswith('render;dur=12.500;desc="1 calls"'))
+        self.assertIn("total;dur=", header)
+
+    def test_sections_outside_request(self):
+        """Test that sections still reach the histogram without a request."""
+        @profiled("test_outside")
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        self.assertEqual(section_stats()["test_outside"]["count"], 1)
+
+
+class TestAsyncSections(unittest.IsolatedAsyncioTestCase):
+    """Tests for timing async functions."""
+
+    async def test_profiled_coroutine(self):
+        """Test that awaited time is attributed to the section."""
+        @profiled("test_llm_call")
+        async def call():
+            return "done"
+
+        profile, token = start_request_profile()
+        try:
+            self.assertEqual(await call(), "done")
+        finally:
+            end_request_profile(token)
+        self.assertEqual(profile.to_dict()["sections"]["test_llm_call"]["calls"], 1)
+
+
+def _busy_hot_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Tests for the SamplingProfiler class."""
+
+    def setUp(self):
+        self.stop = threading.Event()
+        self.worker = threading.Thread(target=_busy_hot_loop, args=(self.stop,), name="busy")
+        self.worker.start()
+
+    def tearDown(self):
+        self.stop.set()
+        self.worker.join()
+
+    def test_captures_busy_thread(self):
+        """Test that a busy function shows up in collapsed stacks and speedscope."""
+        profiler = SamplingProfiler(interval=0.002).run(0.2)
+        self.assertGreater(profiler.sample_count, 0)
+
+        collapsed = profiler.collapsed()
+        self.assertIn("test_profiling:_busy_hot_loop", collapsed)
+        for line in collapsed.strip().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+
+        document = profiler.speedscope()
+        names = {frame["name"] for frame in document["shared"]["frames"]}
+        self.assertIn("_busy_hot_loop", names)
+        for profile in document["profiles"]:
+            self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+
+    def test_one_capture_at_a_time(self):
+        """Test that a second concurrent capture is rejected."""
+        first = SamplingProfiler(interval=0.01)
+        runner = threading.Thread(target=first.run, args=(0.3,))
+        runner.start()
+        try:
+            time.sleep(0.05)
+            with self.assertRaises(ProfilerBusyError):
+                SamplingProfiler().run(0.01)
+        finally:
+            runner.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
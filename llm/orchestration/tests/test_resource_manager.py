@@ -0,0 +1,165 @@
+"""
+Unit tests for the event-driven resource manager scheduler.
+"""
+
+import signal
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from orchestration.performance.resource_manager import ResourceManager, resource_managed
+
+
+class TestResourceManager(unittest.TestCase):
+    """Tests for ResourceManager scheduling."""
+
+    def setUp(self):
+        # The manager installs signal handlers and is a singleton
+        handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+        self.addCleanup(lambda: [signal.signal(sig, handler) for sig, handler in handlers.items()])
+        ResourceManager._instance = None
+        self.addCleanup(setattr, ResourceManager, "_instance", None)
+
+        # Without the monitoring thread the snapshot stays idle, so
+        # admission only depends on the worker limit
+        with patch.object(ResourceManager, "_monitor_resources", lambda manager: None):
+            self.manager = ResourceManager({"cpu": {"max_workers": 1, "thread_pool_size": 2}})
+        self.addCleanup(self.manager.shutdown)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def _wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("condition not reached")
+            time.sleep(0.01)
+
+    def _block(self):
+        # Occupy the only worker until the test releases it
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            self.release.wait(5)
+
+        self.manager.submit_task(blocking, task_id="blocker")
+        self.assertTrue(started.wait(5))
+
+    def test_next_admissible_task_order(self):
+        """Test that higher priorities run first and each level runs oldest first."""
+        self.manager.config["cpu"]["max_workers"] = 0
+        for task_id, priority in (("low", 0), ("normal_1", 1), ("high", 2), ("normal_2", 1)):
+            self.manager.submit_task(lambda: None, priority=priority, task_id=task_id)
+        self.manager.config["cpu"]["max_workers"] = 4
+
+        with self.manager.scheduler_condition:
+            # The scheduler thread is waiting on the condition, so the
+            # queue is only drained here
+            order = [self.manager._next_admissible_task()["id"] for _ in range(4)]
+            self.assertIsNone(self.manager._next_admissible_task())
+            self.assertEqual(self.manager.queued_count, 0)
+
+        self.assertEqual(order, ["high", "normal_1", "normal_2", "low"])
+
+    def test_counts_and_wake_up_on_completion(self):
+        """Test that a queued task starts as soon as the running one completes."""
+        self._block()
+        finished = threading.Event()
+        self.manager.submit_task(lambda: None, task_id="waiting",
+                                 completion_callback=lambda task, future, status: finished.set())
+
+        with self.manager.scheduler_condition:
+            self.assertEqual(self.manager.running_count, 1)
+            self.assertEqual(self.manager.queued_count, 1)
+        self.assertEqual(self.manager.get_task_status("waiting")["status"], "queued")
+
+        self.release.set()
+
+        self.assertTrue(finished.wait(5))
+        self._wait_for(lambda: self.manager.running_count == 0)
+        self.assertEqual(self.manager.queued_count, 0)
+        self.assertEqual(self.manager.get_task_status("waiting")["status"], "not_found")
+
+    def test_cancel_queued_task(self):
+        """Test that cancelling a queued task reports it to its callback."""
+        self._block()
+        outcomes = []
+        self.manager.submit_task(lambda: None, task_id="queued",
+                                 completion_callback=lambda task, future, status: outcomes.append((future, status)))
+
+        self.assertTrue(self.manager.cancel_task("queued"))
+
+        self.assertEqual(outcomes, [(None, "cancelled")])
+        self.assertEqual(self.manager.queued_count, 0)
+        self.assertFalse(self.manager.cancel_task("queued"))
+
+    def test_memory_overload_reports_dropped_tasks(self):
+        """Test that low priority tasks dropped under memory pressure are reported."""
+        self._block()
+        outcomes = []
+        self.manager.submit_task(lambda: None, priority=0, task_id="dropped",
+                                 completion_callback=lambda task, future, status: outcomes.append(status))
+
+        self.manager._handle_memory_overload()
+
+        self.assertEqual(outcomes, ["cancelled"])
+        self.assertEqual(self.manager.queued_count, 0)
+
+    def test_resource_managed_result_and_error(self):
+        """Test that decorated functions return results and raise task errors."""
+        @resource_managed(priority=2)
+        def add(a, b):
+            return a + b
+
+        @resource_managed()
+        def fail():
+            raise ValueError("bad input")
+
+        self.assertEqual(add(2, 3), 5)
+        with self.assertRaisesRegex(RuntimeError, "bad input"):
+            fail()
+
+    def test_resource_managed_cancelled_while_queued(self):
+        """Test that a caller waiting on a cancelled queued task is released."""
+        self._block()
+        errors = []
+
+        @resource_managed()
+        def queued():
+            return "ran"
+
+        def call():
+            try:
+                queued()
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        caller = threading.Thread(target=call)
+        caller.start()
+        self._wait_for(lambda: self.manager.queued_count == 1)
+        with self.manager.scheduler_condition:
+            task_id = self.manager.task_queues[1][0][1]["id"]
+
+        self.manager.cancel_task(task_id)
+        caller.join(5)
+
+        self.assertFalse(caller.is_alive())
+        self.assertEqual(errors, ["Task execution failed: task was cancelled"])
+
+    def test_resource_managed_timeout(self):
+        """Test that the wait is bounded when a timeout is given."""
+        self._block()
+
+        @resource_managed(timeout=0.1)
+        def queued():
+            return "ran"
+
+        with self.assertRaises(TimeoutError):
+            queued()
+        self.assertEqual(self.manager.queued_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
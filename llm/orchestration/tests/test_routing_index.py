@@ -0,0 +1,101 @@
+"""
+Unit tests for the capability routing index.
+"""
+
+import unittest
+
+from orchestration.agents.routing_index import CapabilityIndex
+
+
+class TestCapabilityIndex(unittest.TestCase):
+    """Tests for the CapabilityIndex class."""
+
+    def setUp(self):
+        self.index = CapabilityIndex()
+        self.index.add_agent("agent_a", ["integrate", "differentiate"], load=0.5)
+        self.index.add_agent("agent_b", ["integrate"], load=0.2)
+        self.index.add_agent("agent_c", ["integrate"], load=0.9)
+
+    def test_least_loaded(self):
+        """Test that the lowest-load agent is selected."""
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_b")
+        self.assertEqual(self.index.least_loaded("differentiate"), "agent_a")
+        self.assertIsNone(self.index.least_loaded("plot_3d"))
+
+    def test_load_update(self):
+        """Test that heartbeat load updates reorder the index."""
+        self.index.update_load("agent_b", 0.95)
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_a")
+
+        self.index.update_load("agent_c", 0.0)
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_c")
+
+    def test_priority_weighting(self):
+        """Test that priority scales the load score."""
+        self.index.set_priority("agent_a", 4.0)
+        # 0.5 / 4.0 beats 0.2 / 1.0
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_a")
+
+    def test_exclusions(self):
+        """Test that excluded agents are skipped but remain indexed."""
+        self.assertEqual(self.index.least_loaded("integrate", ["agent_b"]), "agent_a")
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_b")
+        self.assertIsNone(self.index.least_loaded("differentiate", ["agent_a"]))
+
+    def test_eligibility(self):
+        """Test that ineligible agents are not selected."""
+        self.index.set_eligible("agent_b", False)
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_a")
+        self.assertNotIn("agent_b", self.index.agents("integrate"))
+
+        self.index.set_eligible("agent_b", True)
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_b")
+
+    def test_remove_agent(self):
+        """Test that removed agents disappear from every capability."""
+        self.index.remove_agent("agent_a")
+        self.assertFalse(self.index.has_capability("differentiate"))
+        self.assertCountEqual(self.index.agents("integrate"), ["agent_b", "agent_c"])
+
+    def test_set_capabilities(self):
+        """Test that capability changes are applied incrementally."""
+        self.index.set_capabilities("agent_c", ["differentiate"])
+        self.assertNotIn("agent_c", self.index.agents("integrate"))
+        self.assertCountEqual(self.index.agents("differentiate"), ["agent_a", "agent_c"])
+        self.assertEqual(self.index.least_loaded("integrate"), "agent_b")
+
+    def test_power_of_two(self):
+        """Test that power-of-two-choices never picks the worst of two agents."""
+        index = CapabilityIndex()
+        index.add_agent("fast", ["compute"], load=0.1)
+        index.add_agent("slow", ["compute"], load=0.9)
+        for _ in range(20):
+            self.assertEqual(index.power_of_two("compute"), "fast")
+        self.assertEqual(index.power_of_two("compute", ["fast"]), "slow")
+
+    def test_sample(self):
+        """Test that sampling returns distinct accepted agents."""
+        index = CapabilityIndex()
+        for i in range(50):
+            index.add_agent(f"agent_{i}", ["compute"])
+
+        for _ in range(20):
+            first, second = index.sample("compute", 2, lambda agent_id: agent_id != "agent_0")
+            self.assertNotEqual(first, second)
+            self.assertNotIn("agent_0", (first, second))
+
+        # Most agents rejected: falls back to filtering the members
+        self.assertEqual(index.sample("compute", 2, lambda agent_id: agent_id == "agent_7"), ["agent_7"])
+        self.assertEqual(index.sample("compute", 2, lambda agent_id: False), [])
+        self.assertEqual(index.sample("plot_3d"), [])
+
+    def test_heap_compaction(self):
+        """Test that repeated load updates do not grow heaps without bound."""
+        for i in range(1000):
+            self.index.update_load("agent_a", (i % 10) / 10)
+        self.assertLess(len(self.index._heaps["integrate"]), 64)
+        self.assertEqual(self.index.least_loaded("differentiate"), "agent_a")
+
+
+if __name__ == "__main__":
+    unittest.main()
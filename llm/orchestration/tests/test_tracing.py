@@ -0,0 +1,170 @@
+"""
+Unit tests for sampled tracing.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import uuid
+import unittest
+
+from orchestration.message_bus.message_formats import MessageType, create_message
+from orchestration.monitoring.tracing import Tracer, current_span
+
+
+class TestTracer(unittest.TestCase):
+    """Tests for the Tracer class."""
+
+    def test_nested_spans_are_exported(self):
+        """Test that context-managed spans nest, end and reach exporters."""
+        tracer = Tracer("test")
+        exported = []
+        tracer.add_exporter(exported.append)
+
+        with tracer.span("parent") as parent:
+            with tracer.span("child") as child:
+                self.assertIs(current_span(), child)
+            self.assertIs(current_span(), parent)
+        self.assertIsNone(current_span())
+
+        self.assertEqual(tracer.flush(), 2)
+        self.assertEqual([span.name for span in exported], ["child", "parent"])
+        self.assertEqual(child.trace_id, parent.trace_id)
+        self.assertEqual(child.parent_span_id, parent.span_id)
+        self.assertEqual(tracer.active_spans, {})
+
+    def test_manual_spans(self):
+        """Test that start_span and end_span do not leak active spans."""
+        tracer = Tracer("test")
+        span = tracer.start_span("manual")
+        self.assertIn(span.span_id, tracer.active_spans)
+        tracer.end_span(span.span_id)
+        self.assertEqual(tracer.active_spans, {})
+        self.assertEqual(tracer.flush(), 1)
+
+    def test_unsampled_spans_are_dropped(self):
+        """Test that fast spans of unsampled traces are not recorded."""
+        tracer = Tracer("test", sample_rate=0.0)
+        with tracer.span("parent"):
+            with tracer.span("child") as child:
+                pass
+        self.assertFalse(child.sampled)
+        self.assertEqual(tracer.flush(), 0)
+
+    def test_tail_sampling_keeps_errors(self):
+        """Test that failed spans of unsampled traces are still exported."""
+        tracer = Tracer("test", sample_rate=0.0)
+        exported = []
+        tracer.add_exporter(exported.append)
+
+        with self.assertRaises(ValueError):
+            with tracer.span("parent") as parent:
+                with tracer.span("failing"):
+                    raise ValueError("boom")
+
+        tracer.flush()
+        self.assertEqual(len(exported), 2)
+        self.assertTrue(all(span.tail_sampled for span in exported))
+        self.assertEqual(exported[0].parent_span_id, parent.span_id)
+        self.assertEqual(exported[0].error["type"], "ValueError")
+
+    def test_trace_id_sampling_is_deterministic(self):
+        """Test that an explicit trace ID always gets the same decision."""
+        tracer = Tracer("test", sample_rate=0.5)
+        decisions = {tracer.span("op", trace_id="workflow-1").sampled for _ in range(10)}
+        self.assertEqual(len(decisions), 1)
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that the oldest spans are dropped when the buffer is full."""
+        tracer = Tracer("test", buffer_size=4)
+        for i in range(10):
+            with tracer.span(f"span_{i}"):
+                pass
+        self.assertEqual(tracer.stats["dropped"], 6)
+        self.assertEqual(tracer.flush(), 4)
+
+    def test_otlp_file_export(self):
+        """Test that spans are written as OTLP/JSON lines."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spans.jsonl")
+            tracer = Tracer("test", export_path=path)
+            with tracer.span("operation", metadata={"count": 3}):
+                pass
+            tracer.flush()
+
+            with open(path) as f:
+                lines = f.readlines()
+            self.assertEqual(len(lines), 1)
+            request = json.loads(lines[0])
+            spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+            self.assertEqual(spans[0]["name"], "operation")
+            self.assertEqual(spans[0]["attributes"][0], {"key": "count", "value": {"intValue": "3"}})
+            self.assertLessEqual(int(spans[0]["startTimeUnixNano"]), int(spans[0]["endTimeUnixNano"]))
+
+    def test_otlp_ids_are_hex(self):
+        """Test that exported IDs are OTLP hex even for UUID trace IDs."""
+        tracer = Tracer("test")
+        workflow_id = str(uuid.uuid4())
+        with tracer.span("workflow", trace_id=workflow_id) as parent:
+            with tracer.span("step") as child:
+                pass
+
+        for span in (parent.to_otlp(), child.to_otlp()):
+            self.assertRegex(span["traceId"], r"^[0-9a-f]{32}$")
+            self.assertRegex(span["spanId"], r"^[0-9a-f]{16}$")
+        self.assertEqual(parent.to_otlp()["traceId"], workflow_id.replace("-", ""))
+        self.assertEqual(child.to_otlp()["traceId"], parent.to_otlp()["traceId"])
+        self.assertEqual(child.to_otlp()["parentSpanId"], parent.to_otlp()["spanId"])
+
+        message = create_message(MessageType.QUERY, "a", "b", {})
+        self.assertRegex(message.header.trace.trace_id, r"^[0-9a-f]{32}$")
+        self.assertRegex(message.header.trace.span_id, r"^[0-9a-f]{16}$")
+
+
+class TestTracePropagation(unittest.IsolatedAsyncioTestCase):
+    """Tests for trace context propagation."""
+
+    async def test_propagates_across_tasks(self):
+        """Test that spans in child tasks nest under the creating span."""
+        tracer = Tracer("test")
+
+        async def work():
+            with tracer.span("task") as span:
+                return span
+
+        with tracer.span("root") as root:
+            child = await asyncio.create_task(work())
+
+        self.assertEqual(child.trace_id, root.trace_id)
+        self.assertEqual(child.parent_span_id, root.span_id)
+
+    async def test_propagates_through_messages(self):
+        """Test that messages carry the current trace to the receiver."""
+        sender = Tracer("sender", sample_rate=0.0)
+        receiver = Tracer("receiver")
+
+        with sender.span("send") as send_span:
+            message = create_message(
+                message_type=MessageType.QUERY,
+                sender="a",
+                recipient="b",
+                body={}
+            )
+
+        trace = message.header.trace
+        self.assertEqual(trace.trace_id, send_span.trace_id)
+        self.assertEqual(trace.parent_span_id, send_span.span_id)
+
+        span = receiver.span(
+            "receive",
+            trace_id=trace.trace_id,
+            parent_span_id=trace.parent_span_id,
+            sampled=trace.sampled
+        )
+        self.assertFalse(span.sampled)
+        self.assertEqual(span.parent_span_id, send_span.span_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
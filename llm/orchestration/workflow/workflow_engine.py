@@ -736,6 +736,7 @@ class WorkflowEngine:
         # Create a trace span for the workflow
         with self.tracer.span(
             f"workflow.{workflow.workflow_type}",
+            trace_id=workflow.workflow_id,
             metadata={"workflow_id": workflow.workflow_id}
         ) as span:
             # Start time for duration calculation
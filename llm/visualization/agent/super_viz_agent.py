@@ -123,19 +123,19 @@ class SuperVisualizationAgent(AdvancedVisualizationAgent):
             
             # Log message reception
             logger = logging.getLogger(__name__)
-            logger.info(f"SuperVisualizationAgent processing message: {header.get('message_id', 'unknown')}")
+            logger.info("SuperVisualizationAgent processing message: %s", header.get('message_id', 'unknown'))
             
             # Extract visualization type and parameters
             visualization_type = body.get("visualization_type")
             parameters = body.get("parameters", {})
             
             # Log the request details
-            logger.info(f"Visualization request - type: {visualization_type}")
-            logger.debug(f"Visualization parameters: {parameters}")
+            logger.info("Visualization request - type: %s", visualization_type)
+            logger.debug("Visualization parameters: %s", parameters)
             
             # Check if visualization type is supported
             if visualization_type not in self.supported_types:
-                logger.error(f"Unsupported visualization type: {visualization_type}")
+                logger.error("Unsupported visualization type: %s", visualization_type)
                 supported_types_list = list(self.supported_types.keys())
                 return {
                     "success": False,
@@ -11,6 +11,8 @@ from visualization.plotting.plot_2d import plot_function_2d, plot_multiple_funct
 from visualization.plotting.plot_3d import plot_function_3d, plot_parametric_3d
 from visualization.plotting.statistical import plot_histogram, plot_scatter
 from database.access.visualization_repository import VisualizationRepository
+from database.access.write_behind import get_write_buffer
+from database.cache.query_cache import get_query_cache
 
 class VisualizationAgent:
     """
@@ -40,7 +42,10 @@ class VisualizationAgent:
         self.db_repository = None
         if self.config.get("use_database", True):
             try:
-                self.db_repository = VisualizationRepository()
+                self.db_repository = VisualizationRepository(
+                    write_buffer=get_write_buffer(),
+                    query_cache=get_query_cache()
+                )
             except Exception as e:
                 print(f"Warning: Failed to initialize database repository: {e}")
         
@@ -8,6 +8,8 @@ import os
 from datetime import datetime
 import uuid
 
+from orchestration.monitoring.profiling import profile_section
+
 def plot_function_2d(
     function_expr: Union[sp.Expr, str], 
     x_range: Tuple[float, float] = (-10, 10), 
@@ -73,7 +75,8 @@ def plot_function_2d(
     plot_data = []
     for i, func_expr in enumerate(functions):
         try:
-            f = sp.lambdify(x, func_expr, "numpy")
+            with profile_section("lambdify"):
+                f = sp.lambdify(x, func_expr, "numpy")
             y_vals = f(x_vals)
             
             # Check for infinities or NaN values
@@ -116,7 +119,8 @@ def plot_function_2d(
         os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
         
         # Save the figure
-        plt.savefig(save_path)
+        with profile_section("render"):
+            plt.savefig(save_path)
         plt.close(fig)
         
         return {
@@ -128,7 +132,8 @@ def plot_function_2d(
     else:
         # Convert to base64 for embedding in web applications
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
+        with profile_section("render"):
+            plt.savefig(buffer, format='png')
         plt.close(fig)
         
         buffer.seek(0)
@@ -183,7 +188,8 @@ def plot_multiple_functions_2d(
                 
             # Convert SymPy expression to NumPy function
             x = sp.symbols('x')
-            f = sp.lambdify(x, func_expr, "numpy")
+            with profile_section("lambdify"):
+                f = sp.lambdify(x, func_expr, "numpy")
             
             # Compute y values
             y_vals = f(x_vals)
@@ -231,7 +237,8 @@ def plot_multiple_functions_2d(
         os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
         
         # Save the figure
-        plt.savefig(save_path)
+        with profile_section("render"):
+            plt.savefig(save_path)
         plt.close(fig)
         
         return {
@@ -243,7 +250,8 @@ def plot_multiple_functions_2d(
     else:
         # Convert to base64 for embedding in web applications
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
+        with profile_section("render"):
+            plt.savefig(buffer, format='png')
         plt.close(fig)
         
         buffer.seek(0)